@@ -147,11 +147,6 @@ private:
     //
     void writeInitializer(const DataMemberPtr&);
 
-    //
-    // Add a value to a hash code.
-    //
-    void writeHash(const string&, const TypePtr&, int&);
-
     //
     // Write Python metadata as a tuple.
     //
@@ -840,6 +835,18 @@ Slice::Python::CodeVisitor::visitClassDefStart(const ClassDefPtr& p)
             _out << "), " << contextParamName << "))";
             _out.dec();
 
+            //
+            // The encode function marshals the in parameters once, the returned Ice.EncodedArgs object
+            // can then invoke the operation on any number of proxies.
+            //
+            _out << sp << nl << fixedOpName << ".encode = lambda " << inParams << ": _M_" << classAbs << "._op_"
+                 << (*oli)->name() << ".encode((" << inParams;
+            if(!inParams.empty() && inParams.find(',') == string::npos)
+            {
+                _out << ", ";
+            }
+            _out << "))";
+
             //
             // Async operations.
             //
@@ -1353,6 +1360,28 @@ Slice::Python::CodeVisitor::visitStructStart(const StructPtr& p)
 
     writeDocstring(p->comment(), members);
 
+    //
+    // With the python:slots metadata, the members are stored in slots instead of a per-instance dictionary.
+    //
+    if(p->hasMetaData("python:slots"))
+    {
+        _out << nl << "__slots__ = (";
+        for(MemberInfoList::iterator r = memberList.begin(); r != memberList.end(); ++r)
+        {
+            if(r != memberList.begin())
+            {
+                _out << ", ";
+            }
+            _out << "'" << r->fixedName << "'";
+        }
+        if(memberList.size() == 1)
+        {
+            _out << ',';
+        }
+        _out << ")";
+        _out << sp;
+    }
+
     _out << nl << "def __init__(self";
     writeConstructorParams(memberList);
     _out << "):";
@@ -1364,7 +1393,14 @@ Slice::Python::CodeVisitor::visitStructStart(const StructPtr& p)
     _out.dec();
 
     //
-    // Only generate __hash__ and the comparison operators if this structure type
+    // The hash and comparison operators are implemented by IcePy using the type information.
+    // The last argument of compareStruct is the comparison operator (Py_LT, Py_LE, Py_EQ, Py_NE,
+    // Py_GT or Py_GE).
+    //
+    string type = "_M_" + getAbsolute(p, "_t_");
+
+    //
+    // Only generate __hash__ and the ordering operators if this structure type
     // is a legal dictionary key type.
     //
     bool containsSequence = false;
@@ -1372,175 +1408,31 @@ Slice::Python::CodeVisitor::visitStructStart(const StructPtr& p)
     {
         _out << sp << nl << "def __hash__(self):";
         _out.inc();
-        _out << nl << "_h = 0";
-        int iter = 0;
-        for(MemberInfoList::iterator r = memberList.begin(); r != memberList.end(); ++r)
-        {
-            string s = "self." + r->fixedName;
-            writeHash(s, r->dataMember->type(), iter);
-        }
-        _out << nl << "return _h % 0x7fffffff";
+        _out << nl << "return IcePy.hashStruct(self, " << type << ")";
         _out.dec();
 
-        //
-        // Rich operators.  __lt__, __le__, __eq__, __ne__, __gt__, __ge__
-        //
-
-        _out << sp << nl << "def __compare(self, other):";
-        _out.inc();
-        _out << nl << "if other is None:";
-        _out.inc();
-        _out << nl << "return 1";
-        _out.dec();
-        _out << nl << "elif not isinstance(other, _M_" << abs << "):";
-        _out.inc();
-        _out << nl << "return NotImplemented";
-        _out.dec();
-        _out << nl << "else:";
-        _out.inc();
-        for(MemberInfoList::iterator r = memberList.begin(); r != memberList.end(); ++r)
+        static const char* ordering[] = { "__lt__", "__le__", 0, 0, "__gt__", "__ge__" };
+        for(int op = 0; op < 6; ++op)
         {
-            //
-            // The None value is not orderable in Python 3.
-            //
-            _out << nl << "if self." << r->fixedName << " is None or other." << r->fixedName << " is None:";
-            _out.inc();
-            _out << nl << "if self." << r->fixedName << " != other." << r->fixedName << ':';
-            _out.inc();
-            _out << nl << "return (-1 if self." << r->fixedName << " is None else 1)";
-            _out.dec();
-            _out.dec();
-            _out << nl << "else:";
-            _out.inc();
-            _out << nl << "if self." << r->fixedName << " < other." << r->fixedName << ':';
-            _out.inc();
-            _out << nl << "return -1";
-            _out.dec();
-            _out << nl << "elif self." << r->fixedName << " > other." << r->fixedName << ':';
-            _out.inc();
-            _out << nl << "return 1";
-            _out.dec();
-            _out.dec();
+            if(ordering[op])
+            {
+                _out << sp << nl << "def " << ordering[op] << "(self, other):";
+                _out.inc();
+                _out << nl << "return IcePy.compareStruct(self, other, " << type << ", " << op << ")";
+                _out.dec();
+            }
         }
-        _out << nl << "return 0";
-        _out.dec();
-        _out.dec();
-
-        _out << sp << nl << "def __lt__(self, other):";
-        _out.inc();
-        _out << nl << "r = self.__compare(other)";
-        _out << nl << "if r is NotImplemented:";
-        _out.inc();
-        _out << nl << "return r";
-        _out.dec();
-        _out << nl << "else:";
-        _out.inc();
-        _out << nl << "return r < 0";
-        _out.dec();
-        _out.dec();
-
-        _out << sp << nl << "def __le__(self, other):";
-        _out.inc();
-        _out << nl << "r = self.__compare(other)";
-        _out << nl << "if r is NotImplemented:";
-        _out.inc();
-        _out << nl << "return r";
-        _out.dec();
-        _out << nl << "else:";
-        _out.inc();
-        _out << nl << "return r <= 0";
-        _out.dec();
-        _out.dec();
-
-        _out << sp << nl << "def __gt__(self, other):";
-        _out.inc();
-        _out << nl << "r = self.__compare(other)";
-        _out << nl << "if r is NotImplemented:";
-        _out.inc();
-        _out << nl << "return r";
-        _out.dec();
-        _out << nl << "else:";
-        _out.inc();
-        _out << nl << "return r > 0";
-        _out.dec();
-        _out.dec();
-
-        _out << sp << nl << "def __ge__(self, other):";
-        _out.inc();
-        _out << nl << "r = self.__compare(other)";
-        _out << nl << "if r is NotImplemented:";
-        _out.inc();
-        _out << nl << "return r";
-        _out.dec();
-        _out << nl << "else:";
-        _out.inc();
-        _out << nl << "return r >= 0";
-        _out.dec();
-        _out.dec();
-
-        _out << sp << nl << "def __eq__(self, other):";
-        _out.inc();
-        _out << nl << "r = self.__compare(other)";
-        _out << nl << "if r is NotImplemented:";
-        _out.inc();
-        _out << nl << "return r";
-        _out.dec();
-        _out << nl << "else:";
-        _out.inc();
-        _out << nl << "return r == 0";
-        _out.dec();
-        _out.dec();
-
-        _out << sp << nl << "def __ne__(self, other):";
-        _out.inc();
-        _out << nl << "r = self.__compare(other)";
-        _out << nl << "if r is NotImplemented:";
-        _out.inc();
-        _out << nl << "return r";
-        _out.dec();
-        _out << nl << "else:";
-        _out.inc();
-        _out << nl << "return r != 0";
-        _out.dec();
-        _out.dec();
     }
-    else
-    {
-        //
-        // Only generate the rich equality operators __eq__ and __ne__.
-        //
 
-        _out << sp << nl << "def __eq__(self, other):";
-        _out.inc();
-        _out << nl << "if other is None:";
-        _out.inc();
-        _out << nl << "return False";
-        _out.dec();
-        _out << nl << "elif not isinstance(other, _M_" << abs << "):";
-        _out.inc();
-        _out << nl << "return NotImplemented";
-        _out.dec();
-        _out << nl << "else:";
-        _out.inc();
-        for(MemberInfoList::iterator r = memberList.begin(); r != memberList.end(); ++r)
-        {
-            //
-            // The None value is not orderable in Python 3.
-            //
-            _out << nl << "if self." << r->fixedName << " != other." << r->fixedName << ':';
-            _out.inc();
-            _out << nl << "return False";
-            _out.dec();
-        }
-        _out << nl << "return True";
-        _out.dec();
-        _out.dec();
+    _out << sp << nl << "def __eq__(self, other):";
+    _out.inc();
+    _out << nl << "return IcePy.compareStruct(self, other, " << type << ", 2)";
+    _out.dec();
 
-        _out << sp << nl << "def __ne__(self, other):";
-        _out.inc();
-        _out << nl << "return not self.__eq__(other)";
-        _out.dec();
-    }
+    _out << sp << nl << "def __ne__(self, other):";
+    _out.inc();
+    _out << nl << "return IcePy.compareStruct(self, other, " << type << ", 3)";
+    _out.dec();
 
     //
     // __str__
@@ -1916,47 +1808,6 @@ Slice::Python::CodeVisitor::writeInitializer(const DataMemberPtr& m)
     _out << "None";
 }
 
-void
-Slice::Python::CodeVisitor::writeHash(const string& name, const TypePtr& p, int& iter)
-{
-    SequencePtr seq = SequencePtr::dynamicCast(p);
-    if(seq)
-    {
-        _out << nl << "if " << name << ':';
-        _out.inc();
-        _out << nl << "for _i" << iter << " in " << name << ':';
-        _out.inc();
-        ostringstream elem;
-        elem << "_i" << iter;
-        iter++;
-        writeHash(elem.str(), seq->type(), iter);
-        _out.dec();
-        _out.dec();
-        return;
-    }
-
-    DictionaryPtr dict = DictionaryPtr::dynamicCast(p);
-    if(dict)
-    {
-        _out << nl << "if " << name << ':';
-        _out.inc();
-        _out << nl << "for _i" << iter << " in " << name << ':';
-        _out.inc();
-        ostringstream key;
-        key << "_i" << iter;
-        ostringstream value;
-        value << name << '[' << key.str() << ']';
-        iter++;
-        writeHash(key.str(), dict->keyType(), iter);
-        writeHash(value.str(), dict->valueType(), iter);
-        _out.dec();
-        _out.dec();
-        return;
-    }
-
-    _out << nl << "_h = 5 * _h + Ice.getHash(" << name << ")";
-}
-
 void
 Slice::Python::CodeVisitor::writeMetaData(const StringList& meta)
 {
@@ -3198,7 +3049,24 @@ Slice::Python::MetaDataVisitor::visitExceptionStart(const ExceptionPtr& p)
 bool
 Slice::Python::MetaDataVisitor::visitStructStart(const StructPtr& p)
 {
-    reject(p);
+    StringList metaData = p->getMetaData();
+    for(StringList::const_iterator r = metaData.begin(); r != metaData.end();)
+    {
+        string s = *r++;
+        if(s == "python:slots")
+        {
+            continue;
+        }
+
+        if(s.find("python:") == 0)
+        {
+            p->definitionContext()->warning(InvalidMetaData, p->file(), p->line(),
+                                            "ignoring invalid metadata `" + s + "'");
+            metaData.remove(s);
+        }
+    }
+
+    p->setMetaData(metaData);
     return true;
 }
 
@@ -3309,6 +3177,38 @@ Slice::Python::MetaDataVisitor::validateSequence(const string& file, const strin
                     }
                 }
             }
+            else if(s == "python:array.array" || s == "python:memoryview" || s == "python:numpy.ndarray")
+            {
+                //
+                // Only sequences of bool, byte and numeric types can be mapped to an array.
+                //
+                SequencePtr seq = SequencePtr::dynamicCast(type);
+                if(seq)
+                {
+                    BuiltinPtr b = BuiltinPtr::dynamicCast(seq->type());
+                    if(b && b->kind() <= Builtin::KindDouble)
+                    {
+                        continue;
+                    }
+                }
+            }
+            else if(s == "python:intern")
+            {
+                //
+                // Only strings and sequences of strings can be interned.
+                //
+                TypePtr t = type;
+                SequencePtr seq = SequencePtr::dynamicCast(type);
+                if(seq)
+                {
+                    t = seq->type();
+                }
+                BuiltinPtr b = BuiltinPtr::dynamicCast(t);
+                if(b && b->kind() == Builtin::KindString)
+                {
+                    continue;
+                }
+            }
             dc->warning(InvalidMetaData, file, line, "ignoring invalid metadata `" + s + "'");
             newMetaData.remove(s);
         }
@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+# **********************************************************************
+#
+# Copyright (c) 2003-2018 ZeroC, Inc. All rights reserved.
+#
+# This copy of Ice is licensed to you under the terms described in the
+# ICE_LICENSE file included in this distribution.
+#
+# **********************************************************************
+
+#
+# Measures the time of asynchronous invocations to a server with protocol
+# tracing enabled, when the server logs to the logging module with a Python
+# Ice.Logger and with an Ice.AsyncLogger.
+#
+# Usage: python asyncLogger.py [requests] [repetitions]
+#
+
+import io, logging, os, shutil, sys, tempfile, time, Ice
+
+slice = """
+module Bench
+{
+    interface Service
+    {
+        string echo(string s);
+    }
+}
+"""
+
+tmpdir = tempfile.mkdtemp()
+try:
+    path = os.path.join(tmpdir, "Bench.ice")
+    with open(path, "w") as f:
+        f.write(slice)
+    Ice.loadSlice(path)
+finally:
+    shutil.rmtree(tmpdir)
+
+import Bench
+
+requests = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+repetitions = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+class ServiceI(Bench.Service):
+    def echo(self, s, current):
+        return s
+
+class LoggingLogger(Ice.Logger):
+    def _print(self, message):
+        logging.getLogger("Ice").info(message)
+
+    def trace(self, category, message):
+        logging.getLogger("Ice." + category).debug(message)
+
+    def warning(self, message):
+        logging.getLogger("Ice").warning(message)
+
+    def error(self, message):
+        logging.getLogger("Ice").error(message)
+
+    def getPrefix(self):
+        return ""
+
+    def cloneWithPrefix(self, prefix):
+        return self
+
+stream = io.StringIO() if sys.version_info[0] >= 3 else io.BytesIO()
+handler = logging.StreamHandler(stream)
+logging.getLogger("Ice").addHandler(handler)
+logging.getLogger("Ice").setLevel(logging.DEBUG)
+
+def measure(logger):
+    initData = Ice.InitializationData()
+    initData.properties = Ice.createProperties(sys.argv)
+    initData.properties.setProperty("Ice.Trace.Protocol", "1")
+    initData.logger = logger
+    with Ice.initialize(initData) as communicator:
+        adapter = communicator.createObjectAdapterWithEndpoints("Service", "tcp -h 127.0.0.1")
+        adapter.add(ServiceI(), Ice.stringToIdentity("echo"))
+        adapter.activate()
+
+        with Ice.initialize(sys.argv) as client:
+            prx = Bench.ServicePrx.uncheckedCast(client.stringToProxy(
+                communicator.proxyToString(adapter.createProxy(Ice.stringToIdentity("echo")))))
+            prx.ice_ping()
+            total = 0
+            for i in range(0, repetitions):
+                start = time.time()
+                for f in [prx.echoAsync("hello") for j in range(0, requests)]:
+                    f.result()
+                total += time.time() - start
+    stream.seek(0)
+    stream.truncate()
+    return total * 1000 / repetitions
+
+print("{0} requests with Ice.Trace.Protocol=1:".format(requests))
+print("{0:>16}: {1:8.2f} ms".format("Ice.Logger", measure(LoggingLogger())))
+logger = Ice.AsyncLogger(None, 65536)
+print("{0:>16}: {1:8.2f} ms".format("Ice.AsyncLogger", measure(logger)))
+m = logger.getMetrics()
+print("{0:>16}: {1} records in {2} batches, {3} dropped".format("", m.delivered, m.batches, m.dropped))
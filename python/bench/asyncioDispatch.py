@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# **********************************************************************
+#
+# Copyright (c) 2003-2018 ZeroC, Inc. All rights reserved.
+#
+# This copy of Ice is licensed to you under the terms described in the
+# ICE_LICENSE file included in this distribution.
+#
+# **********************************************************************
+
+#
+# Measures the throughput of a servant that waits for a slow operation. The
+# blocking implementation (time.sleep) is dispatched by a server thread pool of
+# the given size, the coroutine implementation (asyncio.sleep) is dispatched by
+# an asyncio event loop set with ObjectAdapter.setEventLoop.
+#
+# Usage: python3 asyncioDispatch.py [count] [delay in ms] [thread pool size]
+#
+
+import asyncio, os, shutil, sys, tempfile, threading, time, Ice
+
+slice = """
+module Bench
+{
+    interface Backend
+    {
+        int query(int key);
+    }
+}
+"""
+
+tmpdir = tempfile.mkdtemp()
+try:
+    path = os.path.join(tmpdir, "Bench.ice")
+    with open(path, "w") as f:
+        f.write(slice)
+    Ice.loadSlice(path)
+finally:
+    shutil.rmtree(tmpdir)
+
+import Bench
+
+count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+delay = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+size = int(sys.argv[3]) if len(sys.argv) > 3 else 10
+
+class BlockingBackendI(Bench.Backend):
+    def query(self, key, current):
+        time.sleep(delay / 1000.0)
+        return key
+
+class BackendI(Bench.Backend):
+    async def query(self, key, current):
+        await asyncio.sleep(delay / 1000.0)
+        return key
+
+def run(name, eventLoop):
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever)
+    thread.start()
+    try:
+        initData = Ice.InitializationData()
+        initData.properties = Ice.createProperties(sys.argv)
+        initData.properties.setProperty("Ice.ThreadPool.Server.Size", "1" if eventLoop else str(size))
+        with Ice.initialize(initData) as communicator:
+            adapter = communicator.createObjectAdapterWithEndpoints("Backend", "tcp -h 127.0.0.1")
+            servant = BackendI() if eventLoop else BlockingBackendI()
+            proxy = communicator.proxyToString(adapter.add(servant, Ice.stringToIdentity("backend")))
+            if eventLoop:
+                adapter.setEventLoop(loop)
+            adapter.activate()
+
+            with Ice.initialize() as client:
+                backend = Bench.BackendPrx.uncheckedCast(client.stringToProxy(proxy))
+                backend.ice_ping()
+                start = time.time()
+                futures = [backend.queryAsync(i) for i in range(0, count)]
+                for f in futures:
+                    f.result()
+                elapsed = time.time() - start
+            print("{0:<16} {1:8.0f} requests/s".format(name, count / elapsed))
+    finally:
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+
+run("thread pool ({0}):".format(size), False)
+run("event loop:", True)
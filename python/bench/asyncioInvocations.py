@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# **********************************************************************
+#
+# Copyright (c) 2003-2018 ZeroC, Inc. All rights reserved.
+#
+# This copy of Ice is licensed to you under the terms described in the
+# ICE_LICENSE file included in this distribution.
+#
+# **********************************************************************
+
+#
+# Measures the throughput of asynchronous invocations awaited by asyncio coroutines,
+# with Ice.wrap_future and with a communicator created with an event loop. The
+# servant is hosted by a separate communicator so that the invocations are sent
+# over a TCP connection.
+#
+# Usage: python3 asyncioInvocations.py [count] [inflight]
+#
+
+import asyncio, os, shutil, sys, tempfile, time, Ice
+
+slice = """
+module Bench
+{
+    interface Calc
+    {
+        int add(int x, int y);
+    }
+}
+"""
+
+tmpdir = tempfile.mkdtemp()
+try:
+    path = os.path.join(tmpdir, "Bench.ice")
+    with open(path, "w") as f:
+        f.write(slice)
+    Ice.loadSlice(path)
+finally:
+    shutil.rmtree(tmpdir)
+
+import Bench
+
+class CalcI(Bench.Calc):
+    def add(self, x, y, current):
+        return x + y
+
+count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+inflight = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+
+async def invoke(calc, wrap):
+    for i in range(0, count // inflight):
+        if wrap:
+            await asyncio.gather(*[Ice.wrap_future(calc.addAsync(j, 1)) for j in range(0, inflight)])
+        else:
+            await asyncio.gather(*[calc.addAsync(j, 1) for j in range(0, inflight)])
+
+def run(name, proxy, eventLoop):
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    initData = Ice.InitializationData()
+    initData.eventLoop = loop if eventLoop else None
+    with Ice.initialize(initData) as communicator:
+        calc = Bench.CalcPrx.uncheckedCast(communicator.stringToProxy(proxy))
+        calc.ice_ping()
+        start = time.time()
+        loop.run_until_complete(invoke(calc, not eventLoop))
+        elapsed = time.time() - start
+    loop.close()
+    print("{0:<16} {1:8.0f} invocations/s".format(name, count / elapsed))
+
+with Ice.initialize(sys.argv) as communicator:
+    adapter = communicator.createObjectAdapterWithEndpoints("Calc", "tcp -h 127.0.0.1")
+    proxy = communicator.proxyToString(adapter.add(CalcI(), Ice.stringToIdentity("calc")))
+    adapter.activate()
+
+    run("wrap_future:", proxy, False)
+    run("event loop:", proxy, True)
@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+# **********************************************************************
+#
+# Copyright (c) 2003-2018 ZeroC, Inc. All rights reserved.
+#
+# This copy of Ice is licensed to you under the terms described in the
+# ICE_LICENSE file included in this distribution.
+#
+# **********************************************************************
+
+#
+# Measures the throughput of byte sequences of 1KB, 64KB and 4MB echoed through a
+# Blobject servant that forwards the requests with ice_invoke, with the servant
+# receiving bytes and receiving a memoryview (Python 3 only).
+#
+# Usage: python blobject.py [total MB per measurement]
+#
+
+import os, shutil, sys, tempfile, time, Ice
+
+slice = """
+module Bench
+{
+    sequence<byte> ByteSeq;
+
+    interface Echoer
+    {
+        ByteSeq echo(ByteSeq seq);
+    }
+}
+"""
+
+tmpdir = tempfile.mkdtemp()
+try:
+    path = os.path.join(tmpdir, "Bench.ice")
+    with open(path, "w") as f:
+        f.write(slice)
+    Ice.loadSlice(path)
+finally:
+    shutil.rmtree(tmpdir)
+
+import Bench
+
+class EchoerI(Bench.Echoer):
+    def echo(self, seq, current):
+        return seq
+
+class ForwarderI(Ice.Blobject):
+    def __init__(self, target, memoryView):
+        self.target = target
+        self.memoryView = memoryView
+
+    def ice_invoke(self, inParams, current):
+        return self.target.ice_invoke(current.operation, current.mode, inParams, current.ctx)
+
+total = int(sys.argv[1]) if len(sys.argv) > 1 else 256
+sizes = [("1KB", 1024), ("64KB", 64 * 1024), ("4MB", 4 * 1024 * 1024)]
+modes = [("bytes", False)]
+if sys.version_info[0] >= 3:
+    modes.append(("memoryview", True))
+
+def measure(f, count):
+    start = time.time()
+    for i in range(0, count):
+        f()
+    return time.time() - start
+
+initData = Ice.InitializationData()
+initData.properties = Ice.createProperties(sys.argv)
+initData.properties.setProperty("Ice.MessageSizeMax", "0")
+with Ice.initialize(initData) as communicator:
+    adapter = communicator.createObjectAdapterWithEndpoints("Echo", "tcp -h 127.0.0.1")
+    echo = adapter.add(EchoerI(), Ice.stringToIdentity("echo"))
+    adapter.activate()
+
+    with Ice.initialize(initData) as forwarder:
+        target = forwarder.stringToProxy(communicator.proxyToString(echo))
+        forwarderAdapter = forwarder.createObjectAdapterWithEndpoints("Forwarder", "tcp -h 127.0.0.1")
+        forwarderAdapter.activate()
+        proxies = []
+        for name, memoryView in modes:
+            prx = forwarderAdapter.add(ForwarderI(target, memoryView), Ice.stringToIdentity(name))
+            proxies.append((name, forwarder.proxyToString(prx)))
+
+        with Ice.initialize(initData) as client:
+            for size, length in sizes:
+                payload = b"\x01" * length
+                count = max(total * 1024 * 1024 // length, 10)
+                results = []
+                for name, proxy in proxies:
+                    p = Bench.EchoerPrx.uncheckedCast(client.stringToProxy(proxy))
+                    p.echo(payload)
+                    t = measure(lambda: p.echo(payload), count)
+                    results.append("{0} {1:8.1f} MB/s".format(name, 2 * float(count * length) / (1024 * 1024) / t))
+                print("{0:>5}: {1}".format(size, ", ".join(results)))
@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+# **********************************************************************
+#
+# Copyright (c) 2003-2018 ZeroC, Inc. All rights reserved.
+#
+# This copy of Ice is licensed to you under the terms described in the
+# ICE_LICENSE file included in this distribution.
+#
+# **********************************************************************
+
+#
+# Measures the time of repeated checked casts of the same proxy, with and
+# without an Ice.CheckedCastCache.
+#
+# Usage: python checkedCastCache.py [casts] [repetitions]
+#
+
+import os, shutil, sys, tempfile, time, Ice
+
+slice = """
+module Bench
+{
+    interface Service
+    {
+        void op();
+    }
+}
+"""
+
+tmpdir = tempfile.mkdtemp()
+try:
+    path = os.path.join(tmpdir, "Bench.ice")
+    with open(path, "w") as f:
+        f.write(slice)
+    Ice.loadSlice(path)
+finally:
+    shutil.rmtree(tmpdir)
+
+import Bench
+
+casts = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+repetitions = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+class ServiceI(Bench.Service):
+    def op(self, current):
+        pass
+
+def measure(proxy, cache):
+    initData = Ice.InitializationData()
+    initData.properties = Ice.createProperties(sys.argv)
+    initData.checkedCastCache = cache
+    with Ice.initialize(initData) as client:
+        base = client.stringToProxy(proxy)
+        base.ice_ping()
+        total = 0
+        for i in range(0, repetitions):
+            start = time.time()
+            for j in range(0, casts):
+                Bench.ServicePrx.checkedCast(base)
+            total += time.time() - start
+    return total * 1000 / repetitions
+
+with Ice.initialize(sys.argv) as communicator:
+    adapter = communicator.createObjectAdapterWithEndpoints("Service", "tcp -h 127.0.0.1")
+    proxy = communicator.proxyToString(adapter.add(ServiceI(), Ice.stringToIdentity("service")))
+    adapter.activate()
+
+    print("{0} checked casts:".format(casts))
+    print("{0:>20}: {1:8.2f} ms".format("no cache", measure(proxy, None)))
+    cache = Ice.CheckedCastCache()
+    print("{0:>20}: {1:8.2f} ms".format("Ice.CheckedCastCache", measure(proxy, cache)))
+    m = cache.getMetrics()
+    print("{0:>20}: {1} hits, {2} misses".format("", m.hits, m.misses))
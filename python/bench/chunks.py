@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+# **********************************************************************
+#
+# Copyright (c) 2003-2018 ZeroC, Inc. All rights reserved.
+#
+# This copy of Ice is licensed to you under the terms described in the
+# ICE_LICENSE file included in this distribution.
+#
+# **********************************************************************
+
+#
+# Measures the time and the peak memory of the process to send a file to a
+# server in the same process, with a single invocation and with
+# Ice.sendChunks and Ice.ChunkReceiver. Each mode runs in its own process.
+#
+# Usage: python chunks.py [megabytes] [single|chunks]
+#
+
+import os, resource, shutil, subprocess, sys, tempfile, time, Ice
+
+slice = """
+#include <Ice/BuiltinSequences.ice>
+module Bench
+{
+    interface Storage
+    {
+        void put(Ice::ByteSeq data);
+        ["amd"] void write(long offset, Ice::ByteSeq data);
+    }
+}
+"""
+
+megabytes = int(sys.argv[1]) if len(sys.argv) > 1 else 64
+
+if len(sys.argv) <= 2:
+    print("sending {0} MB:".format(megabytes))
+    for mode in ["single", "chunks"]:
+        subprocess.check_call([sys.executable, __file__, str(megabytes), mode])
+    sys.exit(0)
+
+tmpdir = tempfile.mkdtemp()
+try:
+    path = os.path.join(tmpdir, "Bench.ice")
+    with open(path, "w") as f:
+        f.write(slice)
+    Ice.loadSlice("-I" + Ice.getSliceDir() + " " + path)
+finally:
+    shutil.rmtree(tmpdir)
+
+import Bench
+
+class Sink(object):
+    def __init__(self):
+        self.size = 0
+
+    def write(self, data):
+        self.size += len(data)
+
+class StorageI(Bench.Storage):
+    def __init__(self):
+        self.receiver = Ice.ChunkReceiver(Sink())
+
+    def put(self, data, current):
+        pass
+
+    def write(self, offset, data, current):
+        return self.receiver.put(offset, data)
+
+source = tempfile.TemporaryFile()
+try:
+    block = os.urandom(1024 * 1024)
+    for i in range(0, megabytes):
+        source.write(block)
+    source.seek(0)
+    block = None
+
+    properties = Ice.createProperties()
+    properties.setProperty("Ice.MessageSizeMax", str((megabytes + 1) * 1024))
+    properties.setProperty("Ice.ThreadPool.Server.Size", "4")
+    initData = Ice.InitializationData()
+    initData.properties = properties
+    with Ice.initialize(initData) as communicator:
+        adapter = communicator.createObjectAdapterWithEndpoints("Storage", "tcp -h 127.0.0.1")
+        proxy = communicator.proxyToString(adapter.add(StorageI(), Ice.stringToIdentity("storage")))
+        adapter.activate()
+
+        with Ice.initialize(initData) as client:
+            storage = Bench.StoragePrx.uncheckedCast(client.stringToProxy(proxy))
+            storage.ice_ping()
+            start = time.time()
+            if sys.argv[2] == "single":
+                storage.put(source.read())
+            else:
+                Ice.sendChunks(lambda offset, data: storage.writeAsync(offset, data), source, 256 * 1024, 4).result()
+            elapsed = time.time() - start
+finally:
+    source.close()
+
+maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+print("{0:>8}: {1:8.2f} ms, {2:6.0f} MB peak RSS".format(sys.argv[2], elapsed * 1000, maxrss))
@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+# **********************************************************************
+#
+# Copyright (c) 2003-2018 ZeroC, Inc. All rights reserved.
+#
+# This copy of Ice is licensed to you under the terms described in the
+# ICE_LICENSE file included in this distribution.
+#
+# **********************************************************************
+
+#
+# Measures the throughput of bursts of asynchronous invocations completed by the
+# client thread pool threads, with and without an Ice.CompletionQueue, and prints
+# the metrics of the completion queue.
+#
+# Usage: python completionQueue.py [count] [client thread pool size]
+#
+
+import os, shutil, sys, tempfile, threading, time, Ice
+
+slice = """
+module Bench
+{
+    sequence<int> IntSeq;
+
+    interface Calc
+    {
+        int add(int x, int y);
+        IntSeq range(int n);
+    }
+}
+"""
+
+tmpdir = tempfile.mkdtemp()
+try:
+    path = os.path.join(tmpdir, "Bench.ice")
+    with open(path, "w") as f:
+        f.write(slice)
+    Ice.loadSlice(path)
+finally:
+    shutil.rmtree(tmpdir)
+
+import Bench
+
+class CalcI(Bench.Calc):
+    def add(self, x, y, current):
+        return x + y
+
+    def range(self, n, current):
+        return list(range(0, n))
+
+count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+threads = sys.argv[2] if len(sys.argv) > 2 else "4"
+
+def burst(calc, invoke):
+    done = threading.Event()
+    lock = threading.Lock()
+    remaining = [count]
+    def callback(f):
+        f.result()
+        with lock:
+            remaining[0] -= 1
+            if remaining[0] == 0:
+                done.set()
+    for i in range(0, count):
+        invoke(calc, i).add_done_callback(callback)
+    done.wait()
+
+def measure(f, *args):
+    start = time.time()
+    f(*args)
+    return time.time() - start
+
+def run(proxy, queue):
+    initData = Ice.InitializationData()
+    initData.properties = Ice.createProperties()
+    initData.properties.setProperty("Ice.ThreadPool.Client.Size", threads)
+    initData.completionQueue = queue
+    with Ice.initialize(initData) as client:
+        calc = Bench.CalcPrx.uncheckedCast(client.stringToProxy(proxy))
+        calc.ice_ping()
+        name = "queue" if queue else "no queue"
+        t = measure(burst, calc, lambda c, i: c.addAsync(i, 1))
+        print("add ({0}):{1}{2:8.0f} invocations/s".format(name, " " * (12 - len(name)), count / t))
+        t = measure(burst, calc, lambda c, i: c.rangeAsync(16))
+        print("range ({0}):{1}{2:8.0f} invocations/s".format(name, " " * (10 - len(name)), count / t))
+
+with Ice.initialize(sys.argv) as communicator:
+    adapter = communicator.createObjectAdapterWithEndpoints("Calc", "tcp -h 127.0.0.1")
+    proxy = communicator.proxyToString(adapter.add(CalcI(), Ice.stringToIdentity("calc")))
+    adapter.activate()
+
+    run(proxy, None)
+    queue = Ice.CompletionQueue()
+    run(proxy, queue)
+
+    m = queue.getMetrics()
+    print("completions: {0}, batches: {1}, average batch: {2:.1f}, largest batch: {3}, max queue depth: {4}".format(
+        m.completions, m.batches, float(m.completions) / max(m.batches, 1), m.largestBatch, m.maxQueueDepth))
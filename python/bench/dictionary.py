@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+# **********************************************************************
+#
+# Copyright (c) 2003-2018 ZeroC, Inc. All rights reserved.
+#
+# This copy of Ice is licensed to you under the terms described in the
+# ICE_LICENSE file included in this distribution.
+#
+# **********************************************************************
+
+#
+# Measures the time to receive dictionaries of primitive, string and enum keys and
+# values, as returned by a synchronous invocation.
+#
+# Usage: python dictionary.py [entries] [repetitions]
+#
+
+import os, shutil, sys, tempfile, time, Ice
+
+slice = """
+module Bench
+{
+    enum Color { Red, Green, Blue }
+
+    dictionary<string, int> StringIntDict;
+    dictionary<int, string> IntStringDict;
+    dictionary<long, double> LongDoubleDict;
+    dictionary<int, Color> IntColorDict;
+
+    interface Tables
+    {
+        StringIntDict getStringInt();
+        IntStringDict getIntString();
+        LongDoubleDict getLongDouble();
+        IntColorDict getIntColor();
+    }
+}
+"""
+
+tmpdir = tempfile.mkdtemp()
+try:
+    path = os.path.join(tmpdir, "Bench.ice")
+    with open(path, "w") as f:
+        f.write(slice)
+    Ice.loadSlice(path)
+finally:
+    shutil.rmtree(tmpdir)
+
+import Bench
+
+entries = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+repetitions = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+class TablesI(Bench.Tables):
+    def __init__(self):
+        colors = [Bench.Color.Red, Bench.Color.Green, Bench.Color.Blue]
+        self.stringInt = dict(("key{0}".format(i), i) for i in range(0, entries))
+        self.intString = dict((i, "value{0}".format(i)) for i in range(0, entries))
+        self.longDouble = dict((i * 1000000007, i / 3.0) for i in range(0, entries))
+        self.intColor = dict((i, colors[i % 3]) for i in range(0, entries))
+
+    def getStringInt(self, current):
+        return self.stringInt
+
+    def getIntString(self, current):
+        return self.intString
+
+    def getLongDouble(self, current):
+        return self.longDouble
+
+    def getIntColor(self, current):
+        return self.intColor
+
+def measure(f):
+    f()
+    start = time.time()
+    for i in range(0, repetitions):
+        f()
+    return (time.time() - start) * 1000 / repetitions
+
+initData = Ice.InitializationData()
+initData.properties = Ice.createProperties(sys.argv)
+initData.properties.setProperty("Ice.MessageSizeMax", "0")
+with Ice.initialize(initData) as communicator:
+    adapter = communicator.createObjectAdapterWithEndpoints("Tables", "tcp -h 127.0.0.1")
+    proxy = communicator.proxyToString(adapter.add(TablesI(), Ice.stringToIdentity("tables")))
+    adapter.activate()
+
+    with Ice.initialize(initData) as client:
+        p = Bench.TablesPrx.uncheckedCast(client.stringToProxy(proxy))
+        print("{0} entries:".format(entries))
+        for name, f in [("string -> int", p.getStringInt),
+                        ("int -> string", p.getIntString),
+                        ("long -> double", p.getLongDouble),
+                        ("int -> enum", p.getIntColor)]:
+            print("{0:>16}: {1:8.2f} ms".format(name, measure(f)))
@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+# **********************************************************************
+#
+# Copyright (c) 2003-2018 ZeroC, Inc. All rights reserved.
+#
+# This copy of Ice is licensed to you under the terms described in the
+# ICE_LICENSE file included in this distribution.
+#
+# **********************************************************************
+
+#
+# Measures the dispatch of requests to many identities, with a servant locator
+# implemented in Python which caches the servants in an OrderedDict, and with
+# an Ice.Evictor of the same capacity. Most requests are for a small set of hot
+# identities, the other ones cause misses.
+#
+# Usage: python evictor.py [identities] [capacity] [requests]
+#
+
+import collections, os, random, shutil, sys, tempfile, threading, time, Ice
+
+slice = """
+module Bench
+{
+    interface Item
+    {
+        int get();
+    }
+}
+"""
+
+tmpdir = tempfile.mkdtemp()
+try:
+    path = os.path.join(tmpdir, "Bench.ice")
+    with open(path, "w") as f:
+        f.write(slice)
+    Ice.loadSlice(path)
+finally:
+    shutil.rmtree(tmpdir)
+
+import Bench
+
+identities = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+capacity = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+requests = int(sys.argv[3]) if len(sys.argv) > 3 else 20000
+
+class ItemI(Bench.Item):
+    def __init__(self, value):
+        self.value = value
+
+    def get(self, current):
+        return self.value
+
+def load(current):
+    return ItemI(len(current.id.name))
+
+class LRUServantLocator(Ice.ServantLocator):
+    def __init__(self, capacity):
+        self._lock = threading.Lock()
+        self._servants = collections.OrderedDict()
+        self._capacity = capacity
+
+    def locate(self, current):
+        with self._lock:
+            servant = self._servants.get(current.id)
+            if servant:
+                self._servants.move_to_end(current.id)
+                return servant
+        servant = load(current)
+        with self._lock:
+            self._servants[current.id] = servant
+            if len(self._servants) > self._capacity:
+                self._servants.popitem(False)
+        return servant
+
+    def finished(self, current, servant, cookie):
+        pass
+
+    def deactivate(self, category):
+        pass
+
+random.seed(0)
+hot = ["item{0}".format(i) for i in range(0, capacity // 2)]
+names = [random.choice(hot) if random.random() < 0.9 else "item{0}".format(random.randrange(identities))
+         for i in range(0, requests)]
+
+initData = Ice.InitializationData()
+initData.properties = Ice.createProperties(sys.argv)
+with Ice.initialize(initData) as communicator:
+    with Ice.initialize(initData) as client:
+        def measure(locator):
+            adapter = communicator.createObjectAdapterWithEndpoints("", "tcp -h 127.0.0.1")
+            adapter.addServantLocator(locator, "")
+            adapter.activate()
+            prx = client.stringToProxy(communicator.proxyToString(adapter.createProxy(Ice.stringToIdentity("item"))))
+            proxies = [Bench.ItemPrx.uncheckedCast(prx.ice_identity(Ice.Identity(name, ""))) for name in names]
+            start = time.time()
+            for f in [p.getAsync() for p in proxies]:
+                f.result()
+            t = (time.time() - start) * 1000
+            adapter.destroy()
+            return t
+
+        print("{0} requests, {1} identities, capacity {2}:".format(requests, identities, capacity))
+        print("{0:>20}: {1:8.2f} ms".format("Python locator", measure(LRUServantLocator(capacity))))
+        evictor = Ice.Evictor(load, capacity)
+        print("{0:>20}: {1:8.2f} ms".format("Ice.Evictor", measure(evictor)))
+        m = evictor.getMetrics()
+        print("{0:>20}: {1} hits, {2} misses, {3} evictions".format("", m.hits, m.misses, m.evictions))
@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+# **********************************************************************
+#
+# Copyright (c) 2003-2018 ZeroC, Inc. All rights reserved.
+#
+# This copy of Ice is licensed to you under the terms described in the
+# ICE_LICENSE file included in this distribution.
+#
+# **********************************************************************
+
+#
+# Measures the time to push the same update to many subscriber proxies with
+# asynchronous invocations, marshaling the update for each proxy and marshaling
+# it once with the encode function of the operation.
+#
+# Usage: python fanout.py [subscribers] [items per update] [repetitions]
+#
+
+import os, shutil, sys, tempfile, time, Ice
+
+slice = """
+module Bench
+{
+    struct Item
+    {
+        string name;
+        int quantity;
+        double price;
+    }
+    sequence<Item> ItemSeq;
+
+    interface Subscriber
+    {
+        void update(string topic, ItemSeq items);
+    }
+}
+"""
+
+tmpdir = tempfile.mkdtemp()
+try:
+    path = os.path.join(tmpdir, "Bench.ice")
+    with open(path, "w") as f:
+        f.write(slice)
+    Ice.loadSlice(path)
+finally:
+    shutil.rmtree(tmpdir)
+
+import Bench
+
+subscribers = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+items = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+repetitions = int(sys.argv[3]) if len(sys.argv) > 3 else 10
+
+class SubscriberI(Bench.Subscriber):
+    def update(self, topic, items, current):
+        pass
+
+def measure(f):
+    f()
+    start = time.time()
+    for i in range(0, repetitions):
+        f()
+    return (time.time() - start) * 1000 / repetitions
+
+initData = Ice.InitializationData()
+initData.properties = Ice.createProperties(sys.argv)
+with Ice.initialize(initData) as communicator:
+    adapter = communicator.createObjectAdapterWithEndpoints("Subscribers", "tcp -h 127.0.0.1")
+    adapter.addDefaultServant(SubscriberI(), "")
+    adapter.activate()
+    base = communicator.proxyToString(adapter.createProxy(Ice.stringToIdentity("subscriber")))
+
+    with Ice.initialize(initData) as client:
+        prx = client.stringToProxy(base)
+        proxies = [Bench.SubscriberPrx.uncheckedCast(prx.ice_identity(Ice.Identity("subscriber{0}".format(i))))
+                   for i in range(0, subscribers)]
+        update = [Bench.Item("item{0}".format(i), i, i * 1.5) for i in range(0, items)]
+
+        def typed():
+            for f in [p.updateAsync("topic", update) for p in proxies]:
+                f.result()
+
+        def encoded():
+            e = Bench.SubscriberPrx.update.encode("topic", update)
+            for f in [e.invokeAsync(p) for p in proxies]:
+                f.result()
+
+        print("{0} subscribers, {1} items per update:".format(subscribers, items))
+        for name, f in [("updateAsync", typed), ("encode", encoded)]:
+            print("{0:>12}: {1:8.2f} ms".format(name, measure(f)))
@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+# **********************************************************************
+#
+# Copyright (c) 2003-2018 ZeroC, Inc. All rights reserved.
+#
+# This copy of Ice is licensed to you under the terms described in the
+# ICE_LICENSE file included in this distribution.
+#
+# **********************************************************************
+
+#
+# Measures the cost of the futures returned by asynchronous invocations: the
+# throughput of asynchronous invocations completed with a done callback or
+# waited for with result(), and the time to create and complete an Ice.Future.
+#
+# Usage: python futures.py [count]
+#
+
+import os, shutil, sys, tempfile, threading, time, Ice
+
+slice = """
+module Bench
+{
+    interface Calc
+    {
+        int add(int x, int y);
+    }
+}
+"""
+
+tmpdir = tempfile.mkdtemp()
+try:
+    path = os.path.join(tmpdir, "Bench.ice")
+    with open(path, "w") as f:
+        f.write(slice)
+    Ice.loadSlice(path)
+finally:
+    shutil.rmtree(tmpdir)
+
+import Bench
+
+class CalcI(Bench.Calc):
+    def add(self, x, y, current):
+        return x + y
+
+count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+
+def callbacks(calc):
+    done = threading.Event()
+    remaining = [count]
+    def callback(f):
+        f.result()
+        remaining[0] -= 1
+        if remaining[0] == 0:
+            done.set()
+    for i in range(0, count):
+        calc.addAsync(i, 1).add_done_callback(callback)
+    done.wait()
+
+def results(calc):
+    for i in range(0, count // 1000):
+        futures = [calc.addAsync(j, 1) for j in range(0, 1000)]
+        for f in futures:
+            f.result()
+
+def local():
+    for i in range(0, count):
+        f = Ice.Future()
+        f.add_done_callback(lambda f: None)
+        f.set_result(i)
+        f.result()
+
+def measure(f, *args):
+    start = time.time()
+    f(*args)
+    return time.time() - start
+
+with Ice.initialize(sys.argv) as communicator:
+    adapter = communicator.createObjectAdapterWithEndpoints("Calc", "tcp -h 127.0.0.1")
+    proxy = communicator.proxyToString(adapter.add(CalcI(), Ice.stringToIdentity("calc")))
+    adapter.activate()
+
+    with Ice.initialize() as client:
+        calc = Bench.CalcPrx.uncheckedCast(client.stringToProxy(proxy))
+        calc.ice_ping()
+        print("done callbacks:     {0:8.0f} invocations/s".format(count / measure(callbacks, calc)))
+        print("result():           {0:8.0f} invocations/s".format(count / measure(results, calc)))
+    print("Ice.Future:         {0:8.2f}us".format(measure(local) / count * 1000000))
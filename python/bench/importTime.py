@@ -0,0 +1,38 @@
+#!/usr/bin/env python
+# **********************************************************************
+#
+# Copyright (c) 2003-2018 ZeroC, Inc. All rights reserved.
+#
+# This copy of Ice is licensed to you under the terms described in the
+# ICE_LICENSE file included in this distribution.
+#
+# **********************************************************************
+
+#
+# Measures the time needed to import the Ice package in a new interpreter. The "full"
+# measurement also loads the generated modules and the Python modules that "import Ice"
+# no longer loads eagerly, which is what "import Ice" used to cost.
+#
+# Usage: python importTime.py [count]
+#
+
+import subprocess, sys, time
+
+def measure(code, count):
+    best = None
+    for i in range(0, count):
+        start = time.time()
+        subprocess.check_call([sys.executable, "-c", code])
+        elapsed = time.time() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best * 1000
+
+count = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+
+interpreter = measure("pass", count)
+lazy = measure("import Ice", count)
+full = measure("import Ice; dir(Ice); import asyncio" if sys.version_info[:2] >= (3, 5) else "import Ice", count)
+
+print("interpreter startup:        {0:8.2f}ms".format(interpreter))
+print("import Ice:                 {0:8.2f}ms ({1:.2f}ms)".format(lazy, lazy - interpreter))
+print("import Ice (all modules):   {0:8.2f}ms ({1:.2f}ms)".format(full, full - interpreter))
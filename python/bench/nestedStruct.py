@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+# **********************************************************************
+#
+# Copyright (c) 2003-2018 ZeroC, Inc. All rights reserved.
+#
+# This copy of Ice is licensed to you under the terms described in the
+# ICE_LICENSE file included in this distribution.
+#
+# **********************************************************************
+
+#
+# Measures the time needed to marshal a nested sequence<Struct>. The request is sent to a
+# collocated Blobject servant which doesn't unmarshal the parameters, so the result is
+# dominated by the validation and marshaling of the structure members.
+#
+# Usage: python nestedStruct.py [count] [length]
+#
+
+import os, shutil, sys, tempfile, time, Ice
+
+slice = """
+module Bench
+{
+    struct Point
+    {
+        int x;
+        int y;
+        double weight;
+        string label;
+    }
+    sequence<Point> PointSeq;
+
+    struct Shape
+    {
+        long id;
+        bool closed;
+        PointSeq points;
+    }
+    sequence<Shape> ShapeSeq;
+
+    interface Sink
+    {
+        void send(ShapeSeq shapes);
+    }
+}
+"""
+
+tmpdir = tempfile.mkdtemp()
+try:
+    path = os.path.join(tmpdir, "Bench.ice")
+    with open(path, "w") as f:
+        f.write(slice)
+    Ice.loadSlice(path)
+finally:
+    shutil.rmtree(tmpdir)
+
+import Bench
+
+class SinkI(Ice.Blobject):
+    def ice_invoke(self, inParams, current):
+        return (True, b"\x06\x00\x00\x00\x01\x01") # Empty 1.1 encapsulation
+
+count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+length = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+
+shapes = [Bench.Shape(i, i % 2 == 0, [Bench.Point(j, -j, j * 0.5, "p") for j in range(0, 10)])
+          for i in range(0, length)]
+
+with Ice.initialize(sys.argv) as communicator:
+    adapter = communicator.createObjectAdapter("")
+    sink = Bench.SinkPrx.uncheckedCast(adapter.addWithUUID(SinkI()))
+    adapter.activate()
+
+    sink.send(shapes) # Warm up
+
+    best = None
+    for i in range(0, 5):
+        start = time.time()
+        for j in range(0, count):
+            sink.send(shapes)
+        elapsed = time.time() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    print("{0} shapes of 10 points: {1:.3f}ms per request".format(length, best * 1000 / count))
@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+# **********************************************************************
+#
+# Copyright (c) 2003-2018 ZeroC, Inc. All rights reserved.
+#
+# This copy of Ice is licensed to you under the terms described in the
+# ICE_LICENSE file included in this distribution.
+#
+# **********************************************************************
+
+#
+# Measures the overhead of instrumentation observers on collocated invocations:
+# without observer, with an Ice.BatchObserver which aggregates the latencies in
+# the Ice run time, and with a Python implementation of
+# Ice.Instrumentation.CommunicatorObserver called for each invocation and dispatch.
+#
+# Usage: python observer.py [count]
+#
+
+import os, shutil, sys, tempfile, time, Ice
+
+slice = """
+module Bench
+{
+    interface Hello
+    {
+        void sayHello();
+    }
+}
+"""
+
+tmpdir = tempfile.mkdtemp()
+try:
+    path = os.path.join(tmpdir, "Bench.ice")
+    with open(path, "w") as f:
+        f.write(slice)
+    Ice.loadSlice(path)
+finally:
+    shutil.rmtree(tmpdir)
+
+import Bench
+
+class HelloI(Bench.Hello):
+    def sayHello(self, current):
+        pass
+
+class ObserverI(Ice.Instrumentation.InvocationObserver, Ice.Instrumentation.DispatchObserver):
+    def attach(self):
+        self.start = time.time()
+
+    def detach(self):
+        self.elapsed = time.time() - self.start
+
+    def failed(self, exceptionName):
+        pass
+
+    def userException(self):
+        pass
+
+    def retried(self):
+        pass
+
+    def reply(self, size):
+        pass
+
+    def getRemoteObserver(self, con, endpt, requestId, size):
+        return None
+
+    def getCollocatedObserver(self, adapter, requestId, size):
+        return None
+
+class CommunicatorObserverI(Ice.Instrumentation.CommunicatorObserver):
+    def getConnectionEstablishmentObserver(self, endpt, connector):
+        return None
+
+    def getEndpointLookupObserver(self, endpt):
+        return None
+
+    def getConnectionObserver(self, con, endpt, state, old):
+        return None
+
+    def getThreadObserver(self, parent, id, state, old):
+        return None
+
+    def getInvocationObserver(self, prx, operation, ctx):
+        return ObserverI()
+
+    def getDispatchObserver(self, current, size):
+        return ObserverI()
+
+    def setObserverUpdater(self, updater):
+        pass
+
+count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+
+def run(name, observer):
+    initData = Ice.InitializationData()
+    initData.properties = Ice.createProperties(sys.argv)
+    initData.observer = observer
+    with Ice.initialize(sys.argv, initData) as communicator:
+        adapter = communicator.createObjectAdapter("")
+        hello = Bench.HelloPrx.uncheckedCast(adapter.addWithUUID(HelloI()))
+        adapter.activate()
+
+        hello.sayHello() # Warm up
+
+        best = None
+        for i in range(0, 5):
+            start = time.time()
+            for j in range(0, count):
+                hello.sayHello()
+            elapsed = time.time() - start
+            best = elapsed if best is None else min(best, elapsed)
+        print("{0:<20} {1:8.2f}us per invocation".format(name, best * 1000000 / count))
+
+run("no observer:", None)
+run("batch observer:", Ice.BatchObserver(lambda stats: None))
+run("python observer:", CommunicatorObserverI())
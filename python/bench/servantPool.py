@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+# **********************************************************************
+#
+# Copyright (c) 2003-2018 ZeroC, Inc. All rights reserved.
+#
+# This copy of Ice is licensed to you under the terms described in the
+# ICE_LICENSE file included in this distribution.
+#
+# **********************************************************************
+
+#
+# Measures the throughput of a CPU-bound servant dispatched by the object
+# adapter thread pool and by an Ice.ServantPool of worker processes, with
+# concurrent asynchronous invocations. The speedup of the servant pool depends
+# on the number of cores of the host.
+#
+# Usage: python servantPool.py [workers] [requests] [iterations per request]
+#
+
+import os, shutil, sys, tempfile, time, Ice
+
+slice = """
+module Bench
+{
+    interface Compute
+    {
+        long sum(int iterations);
+    }
+}
+"""
+
+tmpdir = tempfile.mkdtemp()
+try:
+    path = os.path.join(tmpdir, "Bench.ice")
+    with open(path, "w") as f:
+        f.write(slice)
+    Ice.loadSlice(path)
+finally:
+    shutil.rmtree(tmpdir)
+
+import Bench
+
+class ComputeI(Bench.Compute):
+    def sum(self, iterations, current):
+        r = 0
+        for i in range(0, iterations):
+            r += i * i % 7
+        return r
+
+def createServants(adapter):
+    adapter.addDefaultServant(ComputeI(), "")
+
+if __name__ == "__main__":
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    requests = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    iterations = int(sys.argv[3]) if len(sys.argv) > 3 else 20000
+
+    initData = Ice.InitializationData()
+    initData.properties = Ice.createProperties(sys.argv)
+    initData.properties.setProperty("Ice.ThreadPool.Server.Size", str(workers))
+    with Ice.initialize(initData) as communicator:
+        local = communicator.createObjectAdapterWithEndpoints("Local", "tcp -h 127.0.0.1")
+        createServants(local)
+        local.activate()
+
+        pooled = communicator.createObjectAdapterWithEndpoints("Pooled", "tcp -h 127.0.0.1")
+        pool = Ice.ServantPool(pooled, createServants, workers, Ice.ServantPool.RouteRoundRobin)
+        pooled.addDefaultServant(pool, "")
+        pooled.activate()
+
+        try:
+            with Ice.initialize(initData) as client:
+                def measure(adapter):
+                    prx = Bench.ComputePrx.uncheckedCast(client.stringToProxy(
+                        communicator.proxyToString(adapter.createProxy(Ice.stringToIdentity("compute")))))
+                    prx.sum(iterations)
+                    start = time.time()
+                    for f in [prx.sumAsync(iterations) for i in range(0, requests)]:
+                        f.result()
+                    return requests / (time.time() - start)
+
+                print("{0} requests, {1} iterations per request, {2} cores:".format(requests, iterations,
+                                                                                  os.cpu_count()))
+                print("{0:>24}: {1:8.1f} requests/s".format("thread pool", measure(local)))
+                print("{0:>24}: {1:8.1f} requests/s".format("{0} worker processes".format(workers),
+                                                           measure(pooled)))
+        finally:
+            pool.destroy()
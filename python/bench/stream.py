@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+# **********************************************************************
+#
+# Copyright (c) 2003-2018 ZeroC, Inc. All rights reserved.
+#
+# This copy of Ice is licensed to you under the terms described in the
+# ICE_LICENSE file included in this distribution.
+#
+# **********************************************************************
+
+#
+# Measures the time of repeated invocations sending the same sequence of
+# structures, marshaled for each invocation by a typed proxy and encoded once
+# with an Ice.OutputStream and sent with ice_invoke. Also measures the time to
+# encode and decode the sequence with the streams.
+#
+# Usage: python stream.py [invocations] [structures]
+#
+
+import os, shutil, sys, tempfile, time, Ice
+
+slice = """
+module Bench
+{
+    struct Point
+    {
+        int x;
+        int y;
+        string label;
+    }
+    sequence<Point> PointSeq;
+
+    interface Receiver
+    {
+        void send(PointSeq points);
+    }
+}
+"""
+
+tmpdir = tempfile.mkdtemp()
+try:
+    path = os.path.join(tmpdir, "Bench.ice")
+    with open(path, "w") as f:
+        f.write(slice)
+    Ice.loadSlice(path)
+finally:
+    shutil.rmtree(tmpdir)
+
+import Bench
+
+invocations = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+structures = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+
+class ReceiverI(Bench.Receiver):
+    def send(self, points, current):
+        pass
+
+def measure(f, count):
+    start = time.time()
+    for i in range(0, count):
+        f()
+    return (time.time() - start) * 1000
+
+points = [Bench.Point(i, i * 2, "point {0}".format(i)) for i in range(0, structures)]
+
+with Ice.initialize(sys.argv) as communicator:
+    adapter = communicator.createObjectAdapterWithEndpoints("Receiver", "tcp -h 127.0.0.1")
+    proxy = communicator.proxyToString(adapter.add(ReceiverI(), Ice.stringToIdentity("receiver")))
+    adapter.activate()
+
+    with Ice.initialize(sys.argv) as client:
+        receiver = Bench.ReceiverPrx.uncheckedCast(client.stringToProxy(proxy))
+        receiver.ice_ping()
+
+        out = Ice.OutputStream(client)
+        out.startEncapsulation()
+        out.writeValue(Bench._t_PointSeq, points)
+        out.endEncapsulation()
+        encoded = out.finished()
+
+        print("{0} invocations with {1} structures:".format(invocations, structures))
+        print("{0:>20}: {1:8.2f} ms".format("typed proxy", measure(lambda: receiver.send(points), invocations)))
+        print("{0:>20}: {1:8.2f} ms".format("pre-encoded",
+              measure(lambda: receiver.ice_invoke("send", Ice.OperationMode.Normal, encoded), invocations)))
+
+        def encode():
+            out = Ice.OutputStream(client)
+            out.writeValue(Bench._t_PointSeq, points)
+            return out.finished()
+        data = encode()
+
+        def decode():
+            Ice.InputStream(client, data).readValue(Bench._t_PointSeq)
+
+        print("{0} encodings and decodings:".format(invocations))
+        print("{0:>20}: {1:8.2f} ms".format("Ice.OutputStream", measure(encode, invocations)))
+        print("{0:>20}: {1:8.2f} ms".format("Ice.InputStream", measure(decode, invocations)))
@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+# **********************************************************************
+#
+# Copyright (c) 2003-2018 ZeroC, Inc. All rights reserved.
+#
+# This copy of Ice is licensed to you under the terms described in the
+# ICE_LICENSE file included in this distribution.
+#
+# **********************************************************************
+
+#
+# Measures the time to receive string sequences with a few distinct values, as
+# returned by a synchronous invocation, and the memory used by the received strings,
+# with and without the python:intern metadata.
+#
+# Usage: python strings.py [elements] [distinct values] [repetitions]
+#
+
+import os, shutil, sys, tempfile, time, Ice
+
+slice = """
+module Bench
+{
+    sequence<string> StringSeq;
+    ["python:intern"] sequence<string> InternedStringSeq;
+
+    interface Strings
+    {
+        StringSeq getStrings();
+        InternedStringSeq getInternedStrings();
+    }
+}
+"""
+
+tmpdir = tempfile.mkdtemp()
+try:
+    path = os.path.join(tmpdir, "Bench.ice")
+    with open(path, "w") as f:
+        f.write(slice)
+    Ice.loadSlice(path)
+finally:
+    shutil.rmtree(tmpdir)
+
+import Bench
+
+elements = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+distinct = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+repetitions = int(sys.argv[3]) if len(sys.argv) > 3 else 20
+
+class StringsI(Bench.Strings):
+    def __init__(self):
+        self.strings = ["status value number {0}".format(i % distinct) for i in range(0, elements)]
+
+    def getStrings(self, current):
+        return self.strings
+
+    def getInternedStrings(self, current):
+        return self.strings
+
+def measure(f):
+    f()
+    start = time.time()
+    for i in range(0, repetitions):
+        f()
+    return (time.time() - start) * 1000 / repetitions
+
+def size(strings):
+    return sum(sys.getsizeof(s) for s in dict((id(s), s) for s in strings).values())
+
+initData = Ice.InitializationData()
+initData.properties = Ice.createProperties(sys.argv)
+initData.properties.setProperty("Ice.MessageSizeMax", "0")
+with Ice.initialize(initData) as communicator:
+    adapter = communicator.createObjectAdapterWithEndpoints("Strings", "tcp -h 127.0.0.1")
+    proxy = communicator.proxyToString(adapter.add(StringsI(), Ice.stringToIdentity("strings")))
+    adapter.activate()
+
+    with Ice.initialize(initData) as client:
+        p = Bench.StringsPrx.uncheckedCast(client.stringToProxy(proxy))
+        print("{0} strings, {1} distinct values:".format(elements, distinct))
+        for name, f in [("default", p.getStrings), ("python:intern", p.getInternedStrings)]:
+            print("{0:>16}: {1:8.2f} ms, {2:8.1f} KB".format(name, measure(f), size(f()) / 1024.0))
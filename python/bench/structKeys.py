@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+# **********************************************************************
+#
+# Copyright (c) 2003-2018 ZeroC, Inc. All rights reserved.
+#
+# This copy of Ice is licensed to you under the terms described in the
+# ICE_LICENSE file included in this distribution.
+#
+# **********************************************************************
+
+#
+# Measures the cost of the hash and comparison operators of structs used as
+# dictionary keys: building and querying a Python dictionary, sorting a list of
+# structs, and receiving a dictionary<Key, Value> from a collocated servant.
+#
+# Usage: python structKeys.py [length]
+#
+
+import os, random, shutil, sys, tempfile, time, Ice
+
+slice = """
+module Bench
+{
+    struct Key
+    {
+        int category;
+        long id;
+        string name;
+    }
+    dictionary<Key, double> KeyDict;
+
+    interface Source
+    {
+        KeyDict getDict();
+    }
+}
+"""
+
+tmpdir = tempfile.mkdtemp()
+try:
+    path = os.path.join(tmpdir, "Bench.ice")
+    with open(path, "w") as f:
+        f.write(slice)
+    Ice.loadSlice(path)
+finally:
+    shutil.rmtree(tmpdir)
+
+import Bench
+
+length = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+
+keys = [Bench.Key(i % 10, i, "key") for i in range(0, length)]
+values = dict((k, 1.0) for k in keys)
+shuffled = list(keys)
+random.Random(0).shuffle(shuffled)
+
+class SourceI(Bench.Source):
+    def getDict(self, current):
+        return values
+
+def measure(f):
+    best = None
+    for i in range(0, 5):
+        start = time.time()
+        f()
+        elapsed = time.time() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best * 1000
+
+def lookup():
+    d = dict((k, 1.0) for k in keys)
+    for k in keys:
+        d[Bench.Key(k.category, k.id, k.name)]
+
+with Ice.initialize(sys.argv) as communicator:
+    adapter = communicator.createObjectAdapter("")
+    source = Bench.SourcePrx.uncheckedCast(adapter.addWithUUID(SourceI()))
+    adapter.activate()
+
+    print("build and query a dictionary of {0} keys: {1:8.2f}ms".format(length, measure(lookup)))
+    print("sort {0} keys:                            {1:8.2f}ms".format(length, measure(lambda: sorted(shuffled))))
+    print("receive a dictionary of {0} keys:         {1:8.2f}ms".format(length, measure(source.getDict)))
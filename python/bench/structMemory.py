@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+# **********************************************************************
+#
+# Copyright (c) 2003-2018 ZeroC, Inc. All rights reserved.
+#
+# This copy of Ice is licensed to you under the terms described in the
+# ICE_LICENSE file included in this distribution.
+#
+# **********************************************************************
+
+#
+# Measures the memory used by a received sequence of structs, with and without the
+# python:slots metadata. The sequences are returned by a collocated servant and the
+# memory still allocated after the call is measured with tracemalloc.
+#
+# Usage: python3 structMemory.py [length]
+#
+
+import os, shutil, sys, tempfile, tracemalloc, Ice
+
+slice = """
+module Bench
+{
+    struct Point
+    {
+        int x;
+        int y;
+    }
+    sequence<Point> PointSeq;
+
+    ["python:slots"] struct SlotsPoint
+    {
+        int x;
+        int y;
+    }
+    sequence<SlotsPoint> SlotsPointSeq;
+
+    interface Source
+    {
+        PointSeq getPoints(int length);
+        SlotsPointSeq getSlotsPoints(int length);
+    }
+}
+"""
+
+tmpdir = tempfile.mkdtemp()
+try:
+    path = os.path.join(tmpdir, "Bench.ice")
+    with open(path, "w") as f:
+        f.write(slice)
+    Ice.loadSlice(path)
+finally:
+    shutil.rmtree(tmpdir)
+
+import Bench
+
+class SourceI(Bench.Source):
+    def getPoints(self, length, current):
+        p = Bench.Point(1, 2)
+        return [p] * length
+
+    def getSlotsPoints(self, length, current):
+        p = Bench.SlotsPoint(1, 2)
+        return [p] * length
+
+def measure(op, length):
+    op(1) # Warm up
+    before = tracemalloc.get_traced_memory()[0]
+    points = op(length)
+    used = tracemalloc.get_traced_memory()[0] - before
+    del points
+    return used
+
+length = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+
+initData = Ice.InitializationData()
+initData.properties = Ice.createProperties(sys.argv)
+initData.properties.setProperty("Ice.MessageSizeMax", "0")
+
+with Ice.initialize(sys.argv, initData) as communicator:
+    adapter = communicator.createObjectAdapter("")
+    source = Bench.SourcePrx.uncheckedCast(adapter.addWithUUID(SourceI()))
+    adapter.activate()
+
+    tracemalloc.start()
+    default = measure(source.getPoints, length)
+    slots = measure(source.getSlotsPoints, length)
+    tracemalloc.stop()
+
+    print("{0} structs with __dict__:   {1:8.2f}MB ({2} bytes per struct)".format(
+        length, default / 1048576.0, default // length))
+    print("{0} structs with __slots__:  {1:8.2f}MB ({2} bytes per struct)".format(
+        length, slots / 1048576.0, slots // length))
@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+# **********************************************************************
+#
+# Copyright (c) 2003-2018 ZeroC, Inc. All rights reserved.
+#
+# This copy of Ice is licensed to you under the terms described in the
+# ICE_LICENSE file included in this distribution.
+#
+# **********************************************************************
+
+#
+# Measures the throughput of synchronous invocations that send, receive and echo
+# byte sequences of 1KB, 64KB and 4MB.
+#
+# Usage: python throughput.py [total MB per measurement]
+#
+
+import os, shutil, sys, tempfile, time, Ice
+
+slice = """
+module Bench
+{
+    sequence<byte> ByteSeq;
+
+    interface Throughput
+    {
+        void send(ByteSeq seq);
+        ByteSeq recv(int size);
+        ByteSeq echo(ByteSeq seq);
+    }
+}
+"""
+
+tmpdir = tempfile.mkdtemp()
+try:
+    path = os.path.join(tmpdir, "Bench.ice")
+    with open(path, "w") as f:
+        f.write(slice)
+    Ice.loadSlice(path)
+finally:
+    shutil.rmtree(tmpdir)
+
+import Bench
+
+class ThroughputI(Bench.Throughput):
+    def __init__(self):
+        self.payloads = {}
+
+    def send(self, seq, current):
+        pass
+
+    def recv(self, size, current):
+        payload = self.payloads.get(size)
+        if payload is None:
+            payload = self.payloads.setdefault(size, b"\x01" * size)
+        return payload
+
+    def echo(self, seq, current):
+        return seq
+
+total = int(sys.argv[1]) if len(sys.argv) > 1 else 256
+sizes = [("1KB", 1024), ("64KB", 64 * 1024), ("4MB", 4 * 1024 * 1024)]
+
+def measure(f, count):
+    start = time.time()
+    for i in range(0, count):
+        f()
+    return time.time() - start
+
+initData = Ice.InitializationData()
+initData.properties = Ice.createProperties(sys.argv)
+initData.properties.setProperty("Ice.MessageSizeMax", "0")
+with Ice.initialize(initData) as communicator:
+    adapter = communicator.createObjectAdapterWithEndpoints("Throughput", "tcp -h 127.0.0.1")
+    proxy = communicator.proxyToString(adapter.add(ThroughputI(), Ice.stringToIdentity("throughput")))
+    adapter.activate()
+
+    with Ice.initialize(initData) as client:
+        p = Bench.ThroughputPrx.uncheckedCast(client.stringToProxy(proxy))
+        p.ice_ping()
+        for name, size in sizes:
+            payload = b"\x01" * size
+            count = max(total * 1024 * 1024 // size, 10)
+            p.echo(payload)
+            sent = measure(lambda: p.send(payload), count)
+            received = measure(lambda: p.recv(size), count)
+            echoed = measure(lambda: p.echo(payload), count)
+            mb = float(count * size) / (1024 * 1024)
+            print("{0:>5}: send {1:8.1f} MB/s, recv {2:8.1f} MB/s, echo {3:8.1f} MB/s".format(
+                name, mb / sent, mb / received, 2 * mb / echoed))
@@ -0,0 +1,377 @@
+// **********************************************************************
+//
+// Copyright (c) 2003-2018 ZeroC, Inc. All rights reserved.
+//
+// This copy of Ice is licensed to you under the terms described in the
+// ICE_LICENSE file included in this distribution.
+//
+// **********************************************************************
+
+#ifdef _WIN32
+#   include <IceUtil/Config.h>
+#endif
+#include <CheckedCastCache.h>
+#include <Proxy.h>
+#include <Ice/Endpoint.h>
+#include <Ice/Initialize.h>
+
+using namespace std;
+using namespace IcePy;
+
+namespace IcePy
+{
+
+struct CheckedCastCacheObject
+{
+    PyObject_HEAD
+    CheckedCastCachePtr* cache;
+};
+
+}
+
+namespace
+{
+
+const Py_ssize_t defaultCapacity = 1024;
+
+}
+
+#ifdef WIN32
+extern "C"
+#endif
+static CheckedCastCacheObject*
+checkedCastCacheNew(PyTypeObject* type, PyObject* /*args*/, PyObject* /*kwds*/)
+{
+    CheckedCastCacheObject* self = reinterpret_cast<CheckedCastCacheObject*>(type->tp_alloc(type, 0));
+    if(!self)
+    {
+        return 0;
+    }
+    self->cache = 0;
+    return self;
+}
+
+#ifdef WIN32
+extern "C"
+#endif
+static int
+checkedCastCacheInit(CheckedCastCacheObject* self, PyObject* args, PyObject* kwds)
+{
+    static char* argNames[] =
+    {
+        const_cast<char*>("capacity"),
+        const_cast<char*>("ttl"),
+        0
+    };
+    Py_ssize_t capacity = defaultCapacity;
+    PyObject* ttlObj = Py_None;
+    if(!PyArg_ParseTupleAndKeywords(args, kwds, STRCAST("|nO"), argNames, &capacity, &ttlObj))
+    {
+        return -1;
+    }
+
+    if(capacity <= 0)
+    {
+        PyErr_Format(PyExc_ValueError, STRCAST("capacity must be a positive integer"));
+        return -1;
+    }
+
+    IceUtil::Time ttl;
+    if(ttlObj != Py_None)
+    {
+        double seconds = PyFloat_AsDouble(ttlObj);
+        if(PyErr_Occurred() || seconds <= 0)
+        {
+            PyErr_Clear();
+            PyErr_Format(PyExc_ValueError, STRCAST("ttl must be a positive number of seconds or None"));
+            return -1;
+        }
+        ttl = IceUtil::Time::secondsDouble(seconds);
+    }
+
+    if(self->cache)
+    {
+        PyErr_Format(PyExc_RuntimeError, STRCAST("checked cast cache is already initialized"));
+        return -1;
+    }
+
+    self->cache = new CheckedCastCachePtr(new CheckedCastCache(static_cast<size_t>(capacity), ttl));
+    return 0;
+}
+
+#ifdef WIN32
+extern "C"
+#endif
+static void
+checkedCastCacheDealloc(CheckedCastCacheObject* self)
+{
+    delete self->cache;
+    Py_TYPE(self)->tp_free(reinterpret_cast<PyObject*>(self));
+}
+
+#ifdef WIN32
+extern "C"
+#endif
+static PyObject*
+checkedCastCacheInvalidate(CheckedCastCacheObject* self, PyObject* args)
+{
+    PyObject* proxyObj = Py_None;
+    if(!PyArg_ParseTuple(args, STRCAST("|O"), &proxyObj))
+    {
+        return 0;
+    }
+
+    if(!self->cache)
+    {
+        PyErr_Format(PyExc_RuntimeError, STRCAST("checked cast cache is not initialized"));
+        return 0;
+    }
+
+    Ice::ObjectPrx proxy;
+    if(proxyObj != Py_None)
+    {
+        if(!checkProxy(proxyObj))
+        {
+            PyErr_Format(PyExc_ValueError, STRCAST("invalidate expects a proxy or None"));
+            return 0;
+        }
+        proxy = getProxy(proxyObj);
+    }
+
+    (*self->cache)->invalidate(proxy);
+
+    Py_INCREF(Py_None);
+    return Py_None;
+}
+
+#ifdef WIN32
+extern "C"
+#endif
+static PyObject*
+checkedCastCacheGetMetrics(CheckedCastCacheObject* self, PyObject* /*args*/)
+{
+    if(!self->cache)
+    {
+        PyErr_Format(PyExc_RuntimeError, STRCAST("checked cast cache is not initialized"));
+        return 0;
+    }
+    return (*self->cache)->getMetrics();
+}
+
+static PyMethodDef CheckedCastCacheMethods[] =
+{
+    { STRCAST("invalidate"), reinterpret_cast<PyCFunction>(checkedCastCacheInvalidate), METH_VARARGS,
+        PyDoc_STR(STRCAST("invalidate([proxy]) -> None")) },
+    { STRCAST("getMetrics"), reinterpret_cast<PyCFunction>(checkedCastCacheGetMetrics), METH_NOARGS,
+        PyDoc_STR(STRCAST("getMetrics() -> Ice.CheckedCastCacheMetrics")) },
+    { 0, 0 } /* sentinel */
+};
+
+namespace IcePy
+{
+
+PyTypeObject CheckedCastCacheType =
+{
+    /* The ob_type field must be initialized in the module init function
+     * to be portable to Windows without using C++. */
+    PyVarObject_HEAD_INIT(0, 0)
+    STRCAST("IcePy.CheckedCastCache"), /* tp_name */
+    sizeof(CheckedCastCacheObject),  /* tp_basicsize */
+    0,                               /* tp_itemsize */
+    /* methods */
+    reinterpret_cast<destructor>(checkedCastCacheDealloc), /* tp_dealloc */
+    0,                               /* tp_print */
+    0,                               /* tp_getattr */
+    0,                               /* tp_setattr */
+    0,                               /* tp_reserved */
+    0,                               /* tp_repr */
+    0,                               /* tp_as_number */
+    0,                               /* tp_as_sequence */
+    0,                               /* tp_as_mapping */
+    0,                               /* tp_hash */
+    0,                               /* tp_call */
+    0,                               /* tp_str */
+    0,                               /* tp_getattro */
+    0,                               /* tp_setattro */
+    0,                               /* tp_as_buffer */
+    Py_TPFLAGS_DEFAULT,              /* tp_flags */
+    0,                               /* tp_doc */
+    0,                               /* tp_traverse */
+    0,                               /* tp_clear */
+    0,                               /* tp_richcompare */
+    0,                               /* tp_weaklistoffset */
+    0,                               /* tp_iter */
+    0,                               /* tp_iternext */
+    CheckedCastCacheMethods,         /* tp_methods */
+    0,                               /* tp_members */
+    0,                               /* tp_getset */
+    0,                               /* tp_base */
+    0,                               /* tp_dict */
+    0,                               /* tp_descr_get */
+    0,                               /* tp_descr_set */
+    0,                               /* tp_dictoffset */
+    reinterpret_cast<initproc>(checkedCastCacheInit), /* tp_init */
+    0,                               /* tp_alloc */
+    reinterpret_cast<newfunc>(checkedCastCacheNew), /* tp_new */
+    0,                               /* tp_free */
+    0,                               /* tp_is_gc */
+};
+
+}
+
+bool
+IcePy::initCheckedCastCache(PyObject* module)
+{
+    if(PyType_Ready(&CheckedCastCacheType) < 0)
+    {
+        return false;
+    }
+    PyTypeObject* type = &CheckedCastCacheType; // Necessary to prevent GCC's strict-alias warnings.
+    if(PyModule_AddObject(module, STRCAST("CheckedCastCache"), reinterpret_cast<PyObject*>(type)) < 0)
+    {
+        return false;
+    }
+    return true;
+}
+
+CheckedCastCachePtr
+IcePy::getCheckedCastCache(PyObject* obj)
+{
+    if(!PyObject_IsInstance(obj, reinterpret_cast<PyObject*>(&CheckedCastCacheType)))
+    {
+        return 0;
+    }
+    CheckedCastCacheObject* c = reinterpret_cast<CheckedCastCacheObject*>(obj);
+    return c->cache ? *c->cache : CheckedCastCachePtr();
+}
+
+IcePy::CheckedCastCache::CheckedCastCache(size_t capacity, const IceUtil::Time& ttl) :
+    _capacity(capacity),
+    _ttl(ttl),
+    _hits(0),
+    _misses(0)
+{
+}
+
+bool
+IcePy::CheckedCastCache::find(const Ice::ObjectPrx& proxy, const string& id)
+{
+    Key key(getTarget(proxy), id);
+
+    IceUtil::Mutex::Lock sync(*this);
+    EntryMap::iterator p = _map.find(key);
+    if(p != _map.end())
+    {
+        if(_ttl == IceUtil::Time() || p->second->expires > IceUtil::Time::now(IceUtil::Time::Monotonic))
+        {
+            _entries.splice(_entries.begin(), _entries, p->second);
+            ++_hits;
+            return true;
+        }
+        _entries.erase(p->second);
+        _map.erase(p);
+    }
+    ++_misses;
+    return false;
+}
+
+void
+IcePy::CheckedCastCache::add(const Ice::ObjectPrx& proxy, const string& id)
+{
+    Key key(getTarget(proxy), id);
+    IceUtil::Time expires;
+    if(_ttl != IceUtil::Time())
+    {
+        expires = IceUtil::Time::now(IceUtil::Time::Monotonic) + _ttl;
+    }
+
+    IceUtil::Mutex::Lock sync(*this);
+    EntryMap::iterator p = _map.find(key);
+    if(p != _map.end())
+    {
+        p->second->expires = expires;
+        _entries.splice(_entries.begin(), _entries, p->second);
+        return;
+    }
+
+    Entry e;
+    e.key = key;
+    e.expires = expires;
+    _entries.push_front(e);
+    _map.insert(make_pair(key, _entries.begin()));
+    if(_entries.size() > _capacity)
+    {
+        _map.erase(_entries.back().key);
+        _entries.pop_back();
+    }
+}
+
+void
+IcePy::CheckedCastCache::invalidate(const Ice::ObjectPrx& proxy)
+{
+    if(!proxy)
+    {
+        IceUtil::Mutex::Lock sync(*this);
+        _map.clear();
+        _entries.clear();
+        return;
+    }
+
+    string target = getTarget(proxy);
+
+    IceUtil::Mutex::Lock sync(*this);
+    EntryMap::iterator p = _map.lower_bound(Key(target, string()));
+    while(p != _map.end() && p->first.first == target)
+    {
+        _entries.erase(p->second);
+        _map.erase(p++);
+    }
+}
+
+PyObject*
+IcePy::CheckedCastCache::getMetrics()
+{
+    Ice::Long hits;
+    Ice::Long misses;
+    size_t size;
+    {
+        IceUtil::Mutex::Lock sync(*this);
+        hits = _hits;
+        misses = _misses;
+        size = _entries.size();
+    }
+
+    PyObject* metricsType = lookupType("Ice.CheckedCastCacheMetrics");
+    if(!metricsType)
+    {
+        return 0;
+    }
+    PyObjectHandle args = Py_BuildValue(STRCAST("(LLn)"), static_cast<PY_LONG_LONG>(hits),
+                                        static_cast<PY_LONG_LONG>(misses), static_cast<Py_ssize_t>(size));
+    if(!args.get())
+    {
+        return 0;
+    }
+    return PyObject_Call(metricsType, args.get(), 0);
+}
+
+string
+IcePy::CheckedCastCache::getTarget(const Ice::ObjectPrx& proxy)
+{
+    //
+    // The target of a proxy is its identity, facet, adapter id and endpoints, the other proxy
+    // settings don't change the object that receives the ice_isA request.
+    //
+    string target = Ice::identityToString(proxy->ice_getIdentity());
+    target += '\0';
+    target += proxy->ice_getFacet();
+    target += '\0';
+    target += proxy->ice_getAdapterId();
+    Ice::EndpointSeq endpoints = proxy->ice_getEndpoints();
+    for(Ice::EndpointSeq::const_iterator p = endpoints.begin(); p != endpoints.end(); ++p)
+    {
+        target += '\0';
+        target += (*p)->toString();
+    }
+    return target;
+}
@@ -0,0 +1,90 @@
+// **********************************************************************
+//
+// Copyright (c) 2003-2018 ZeroC, Inc. All rights reserved.
+//
+// This copy of Ice is licensed to you under the terms described in the
+// ICE_LICENSE file included in this distribution.
+//
+// **********************************************************************
+
+#ifndef ICEPY_CHECKED_CAST_CACHE_H
+#define ICEPY_CHECKED_CAST_CACHE_H
+
+#include <Config.h>
+#include <Util.h>
+#include <Ice/Proxy.h>
+#include <IceUtil/Mutex.h>
+#include <IceUtil/Time.h>
+#include <list>
+#include <map>
+
+namespace IcePy
+{
+
+extern PyTypeObject CheckedCastCacheType;
+
+bool initCheckedCastCache(PyObject*);
+
+//
+// The cache of a communicator created with the checkedCastCache attribute of Ice.InitializationData.
+// It records the successful ice_isA checks of checkedCast for each target (identity, facet,
+// adapter id and endpoints) and type id, so that repeated checkedCasts of the same target don't
+// send an ice_isA request. The entries expire after the time-to-live of the cache, and the least
+// recently used entry is evicted once the cache is full.
+//
+class CheckedCastCache : public IceUtil::Shared, private IceUtil::Mutex
+{
+public:
+
+    CheckedCastCache(size_t, const IceUtil::Time&);
+
+    //
+    // Returns true if the cache has an entry for the given proxy and type id. Increments the hit
+    // or miss count.
+    //
+    bool find(const Ice::ObjectPrx&, const std::string&);
+
+    void add(const Ice::ObjectPrx&, const std::string&);
+
+    //
+    // Removes the entries of the given proxy's target, or all the entries if the proxy is nil.
+    //
+    void invalidate(const Ice::ObjectPrx&);
+
+    //
+    // Returns a new Ice.CheckedCastCacheMetrics object. The GIL must be acquired.
+    //
+    PyObject* getMetrics();
+
+private:
+
+    typedef std::pair<std::string, std::string> Key; // The target and the type id.
+
+    struct Entry
+    {
+        Key key;
+        IceUtil::Time expires;
+    };
+    typedef std::list<Entry> EntryList;
+    typedef std::map<Key, EntryList::iterator> EntryMap;
+
+    static std::string getTarget(const Ice::ObjectPrx&);
+
+    const size_t _capacity;
+    const IceUtil::Time _ttl; // Zero if the entries don't expire.
+    EntryList _entries; // The most recently used entry first.
+    EntryMap _map;
+
+    Ice::Long _hits;
+    Ice::Long _misses;
+};
+typedef IceUtil::Handle<CheckedCastCache> CheckedCastCachePtr;
+
+//
+// Returns the cache of an IcePy.CheckedCastCache object, or nil if the object has another type.
+//
+CheckedCastCachePtr getCheckedCastCache(PyObject*);
+
+}
+
+#endif
@@ -13,8 +13,14 @@
 #include <IceUtil/DisableWarnings.h>
 #include <Communicator.h>
 #include <BatchRequestInterceptor.h>
+#include <CheckedCastCache.h>
+#include <CompletionQueue.h>
 #include <Dispatcher.h>
+#include <EventLoop.h>
+#include <Future.h>
 #include <ImplicitContext.h>
+#include <InternCache.h>
+#include <Instrumentation.h>
 #include <Logger.h>
 #include <ObjectAdapter.h>
 #include <Operation.h>
@@ -44,6 +50,12 @@ static long _mainThreadId;
 typedef map<Ice::CommunicatorPtr, PyObject*> CommunicatorMap;
 static CommunicatorMap _communicatorMap;
 
+//
+// The default maximum number of strings in the cache of the strings unmarshaled with the
+// python:intern metadata.
+//
+static const Py_ssize_t defaultInternCacheSize = 4096;
+
 namespace IcePy
 {
 
@@ -52,6 +64,8 @@ struct CommunicatorObject;
 typedef InvokeThread<Ice::Communicator> WaitForShutdownThread;
 typedef IceUtil::Handle<WaitForShutdownThread> WaitForShutdownThreadPtr;
 
+typedef map<Ice::ObjectAdapterPtr, EventLoopQueuePtr> AdapterEventLoopMap;
+
 struct CommunicatorObject
 {
     PyObject_HEAD
@@ -61,10 +75,28 @@ struct CommunicatorObject
     WaitForShutdownThreadPtr* shutdownThread;
     bool shutdown;
     DispatcherPtr* dispatcher;
+    EventLoopQueuePtr* eventLoop;
+    AdapterEventLoopMap* adapterEventLoops;
+    CompletionQueuePtr* completionQueue;
+    AsyncLoggerQueuePtr* loggerQueue;
+    CheckedCastCachePtr* checkedCastCache;
+    Py_ssize_t internCacheSize;
+    InternCachePtr* internCache;
 };
 
 }
 
+//
+// Releases the observer of a communicator that failed to initialize. A batch observer stops its
+// timer thread when it's destroyed, the thread needs the GIL to report the metrics.
+//
+static void
+releaseObserver(Ice::InitializationData& data)
+{
+    AllowThreads allowThreads;
+    data.observer = 0;
+}
+
 #ifdef WIN32
 extern "C"
 #endif
@@ -83,6 +115,13 @@ communicatorNew(PyTypeObject* type, PyObject* /*args*/, PyObject* /*kwds*/)
     self->shutdownThread = 0;
     self->shutdown = false;
     self->dispatcher = 0;
+    self->eventLoop = 0;
+    self->adapterEventLoops = new AdapterEventLoopMap;
+    self->completionQueue = 0;
+    self->loggerQueue = 0;
+    self->checkedCastCache = 0;
+    self->internCacheSize = defaultInternCacheSize;
+    self->internCache = 0;
     return self;
 }
 
@@ -200,6 +239,11 @@ communicatorInit(CommunicatorObject* self, PyObject* args, PyObject* /*kwds*/)
 
     Ice::InitializationData data;
     DispatcherPtr dispatcherWrapper;
+    EventLoopQueuePtr eventLoopQueue;
+    CompletionQueuePtr completionQueue;
+    AsyncLoggerQueuePtr loggerQueue;
+    CheckedCastCachePtr checkedCastCache;
+    Py_ssize_t internCacheSize = defaultInternCacheSize;
 
     try
     {
@@ -212,6 +256,11 @@ communicatorInit(CommunicatorObject* self, PyObject* args, PyObject* /*kwds*/)
             PyObjectHandle threadStop = getAttr(initData, "threadStop", false);
             PyObjectHandle batchRequestInterceptor = getAttr(initData, "batchRequestInterceptor", false);
             PyObjectHandle dispatcher = getAttr(initData, "dispatcher", false);
+            PyObjectHandle observer = getAttr(initData, "observer", false);
+            PyObjectHandle eventLoop = getAttr(initData, "eventLoop", false);
+            PyObjectHandle queue = getAttr(initData, "completionQueue", false);
+            PyObjectHandle cacheSize = getAttr(initData, "internCacheSize", false);
+            PyObjectHandle castCache = getAttr(initData, "checkedCastCache", false);
 
             if(properties.get())
             {
@@ -225,7 +274,20 @@ communicatorInit(CommunicatorObject* self, PyObject* args, PyObject* /*kwds*/)
 
             if(logger.get())
             {
-                data.logger = new LoggerWrapper(logger.get());
+                //
+                // An Ice.AsyncLogger is used directly, its queue thread runs while the communicator
+                // is not destroyed.
+                //
+                AsyncLoggerPtr asyncLogger = getAsyncLogger(logger.get());
+                if(asyncLogger)
+                {
+                    data.logger = asyncLogger;
+                    loggerQueue = asyncLogger->getQueue();
+                }
+                else
+                {
+                    data.logger = new LoggerWrapper(logger.get());
+                }
             }
 
             if(threadHook.get() || threadStart.get() || threadStop.get())
@@ -243,6 +305,52 @@ communicatorInit(CommunicatorObject* self, PyObject* args, PyObject* /*kwds*/)
             {
                 data.batchRequestInterceptor = new BatchRequestInterceptor(batchRequestInterceptor.get());
             }
+
+            if(eventLoop.get())
+            {
+                eventLoopQueue = new EventLoopQueue(eventLoop.get());
+            }
+
+            if(queue.get())
+            {
+                completionQueue = getCompletionQueue(queue.get());
+                if(!completionQueue)
+                {
+                    PyErr_Clear();
+                    throw Ice::InitializationException(__FILE__, __LINE__,
+                                                       "completionQueue must be an Ice.CompletionQueue");
+                }
+            }
+
+            if(cacheSize.get())
+            {
+                internCacheSize = PyLong_Check(cacheSize.get()) ? PyLong_AsSsize_t(cacheSize.get()) : -1;
+                if(internCacheSize < 0)
+                {
+                    PyErr_Clear();
+                    throw Ice::InitializationException(__FILE__, __LINE__,
+                                                       "internCacheSize must be a non-negative integer");
+                }
+            }
+
+            if(castCache.get())
+            {
+                checkedCastCache = getCheckedCastCache(castCache.get());
+                if(!checkedCastCache)
+                {
+                    PyErr_Clear();
+                    throw Ice::InitializationException(__FILE__, __LINE__,
+                                                       "checkedCastCache must be an Ice.CheckedCastCache");
+                }
+            }
+
+            //
+            // Created once the other members are validated, a batch observer starts a timer thread.
+            //
+            if(observer.get())
+            {
+                data.observer = createCommunicatorObserver(observer.get());
+            }
         }
 
         //
@@ -267,6 +375,7 @@ communicatorInit(CommunicatorObject* self, PyObject* args, PyObject* /*kwds*/)
     }
     catch(const Ice::Exception& ex)
     {
+        releaseObserver(data);
         setPythonException(ex);
         return -1;
     }
@@ -307,6 +416,7 @@ communicatorInit(CommunicatorObject* self, PyObject* args, PyObject* /*kwds*/)
         }
         delete[] argv;
 
+        releaseObserver(data);
         setPythonException(ex);
         return -1;
     }
@@ -346,6 +456,30 @@ communicatorInit(CommunicatorObject* self, PyObject* args, PyObject* /*kwds*/)
         dispatcherWrapper->setCommunicator(communicator);
     }
 
+    if(eventLoopQueue)
+    {
+        self->eventLoop = new EventLoopQueuePtr(eventLoopQueue);
+    }
+
+    if(completionQueue)
+    {
+        self->completionQueue = new CompletionQueuePtr(completionQueue);
+        completionQueue->attach();
+    }
+
+    if(loggerQueue)
+    {
+        self->loggerQueue = new AsyncLoggerQueuePtr(loggerQueue);
+        loggerQueue->attach();
+    }
+
+    if(checkedCastCache)
+    {
+        self->checkedCastCache = new CheckedCastCachePtr(checkedCastCache);
+    }
+
+    self->internCacheSize = internCacheSize;
+
     return 0;
 }
 
@@ -374,6 +508,26 @@ communicatorDealloc(CommunicatorObject* self)
     delete self->communicator;
     delete self->shutdownMonitor;
     delete self->shutdownThread;
+    delete self->eventLoop;
+    delete self->adapterEventLoops;
+    if(self->completionQueue)
+    {
+        {
+            AllowThreads allowThreads; // The queue thread needs the GIL to process the pending completions.
+            (*self->completionQueue)->detach();
+        }
+        delete self->completionQueue;
+    }
+    if(self->loggerQueue)
+    {
+        {
+            AllowThreads allowThreads; // The queue thread needs the GIL to deliver the pending records.
+            (*self->loggerQueue)->detach();
+        }
+        delete self->loggerQueue;
+    }
+    delete self->checkedCastCache;
+    delete self->internCache;
     Py_TYPE(self)->tp_free(reinterpret_cast<PyObject*>(self));
 }
 
@@ -398,6 +552,46 @@ communicatorDestroy(CommunicatorObject* self)
         setPythonException(ex);
     }
 
+    if(self->completionQueue)
+    {
+        //
+        // Clear the queue while holding the GIL so that concurrent calls to destroy don't detach
+        // it twice.
+        //
+        CompletionQueuePtr completionQueue = *self->completionQueue;
+        delete self->completionQueue;
+        self->completionQueue = 0;
+
+        //
+        // The invocations are completed once the communicator is destroyed, wait for the queue
+        // thread to process their completions.
+        //
+        AllowThreads allowThreads; // The queue thread needs the GIL.
+        completionQueue->detach();
+    }
+
+    if(self->loggerQueue)
+    {
+        //
+        // Clear the queue while holding the GIL so that concurrent calls to destroy don't detach
+        // it twice.
+        //
+        AsyncLoggerQueuePtr loggerQueue = *self->loggerQueue;
+        delete self->loggerQueue;
+        self->loggerQueue = 0;
+
+        //
+        // Deliver the records logged until the communicator was destroyed.
+        //
+        AllowThreads allowThreads; // The queue thread needs the GIL.
+        loggerQueue->detach();
+    }
+
+    if(self->internCache)
+    {
+        (*self->internCache)->clear();
+    }
+
     vfm->destroy();
 
     if(self->dispatcher)
@@ -405,6 +599,11 @@ communicatorDestroy(CommunicatorObject* self)
         (*self->dispatcher)->setCommunicator(0); // Break cyclic reference.
     }
 
+    //
+    // The object adapters are destroyed.
+    //
+    self->adapterEventLoops->clear();
+
     //
     // Break cyclic reference between this object and its Python wrapper.
     //
@@ -1880,6 +2079,94 @@ IcePy::createCommunicator(const Ice::CommunicatorPtr& communicator)
     return (PyObject*)obj;
 }
 
+EventLoopQueuePtr
+IcePy::getEventLoopQueue(const Ice::CommunicatorPtr& communicator)
+{
+    CommunicatorMap::iterator p = _communicatorMap.find(communicator);
+    if(p == _communicatorMap.end())
+    {
+        return 0;
+    }
+    CommunicatorObject* obj = reinterpret_cast<CommunicatorObject*>(p->second);
+    return obj->eventLoop ? *obj->eventLoop : EventLoopQueuePtr();
+}
+
+CompletionQueuePtr
+IcePy::getCompletionQueue(const Ice::CommunicatorPtr& communicator)
+{
+    CommunicatorMap::iterator p = _communicatorMap.find(communicator);
+    if(p == _communicatorMap.end())
+    {
+        return 0;
+    }
+    CommunicatorObject* obj = reinterpret_cast<CommunicatorObject*>(p->second);
+    return obj->completionQueue ? *obj->completionQueue : CompletionQueuePtr();
+}
+
+CheckedCastCachePtr
+IcePy::getCheckedCastCache(const Ice::CommunicatorPtr& communicator)
+{
+    CommunicatorMap::iterator p = _communicatorMap.find(communicator);
+    if(p == _communicatorMap.end())
+    {
+        return 0;
+    }
+    CommunicatorObject* obj = reinterpret_cast<CommunicatorObject*>(p->second);
+    return obj->checkedCastCache ? *obj->checkedCastCache : CheckedCastCachePtr();
+}
+
+InternCachePtr
+IcePy::getInternCache(const Ice::CommunicatorPtr& communicator)
+{
+    CommunicatorMap::iterator p = _communicatorMap.find(communicator);
+    if(p == _communicatorMap.end())
+    {
+        return 0;
+    }
+    CommunicatorObject* obj = reinterpret_cast<CommunicatorObject*>(p->second);
+    if(!obj->internCache && obj->internCacheSize > 0)
+    {
+        obj->internCache = new InternCachePtr(new InternCache(static_cast<size_t>(obj->internCacheSize)));
+    }
+    return obj->internCache ? *obj->internCache : InternCachePtr();
+}
+
+EventLoopQueuePtr
+IcePy::getEventLoopQueue(const Ice::ObjectAdapterPtr& adapter)
+{
+    CommunicatorMap::iterator p = _communicatorMap.find(adapter->getCommunicator());
+    if(p == _communicatorMap.end())
+    {
+        return 0;
+    }
+    CommunicatorObject* obj = reinterpret_cast<CommunicatorObject*>(p->second);
+    if(obj->adapterEventLoops->empty())
+    {
+        return 0;
+    }
+    AdapterEventLoopMap::const_iterator q = obj->adapterEventLoops->find(adapter);
+    return q != obj->adapterEventLoops->end() ? q->second : EventLoopQueuePtr();
+}
+
+void
+IcePy::setEventLoopQueue(const Ice::ObjectAdapterPtr& adapter, const EventLoopQueuePtr& queue)
+{
+    CommunicatorMap::iterator p = _communicatorMap.find(adapter->getCommunicator());
+    if(p == _communicatorMap.end())
+    {
+        return;
+    }
+    CommunicatorObject* obj = reinterpret_cast<CommunicatorObject*>(p->second);
+    if(queue)
+    {
+        (*obj->adapterEventLoops)[adapter] = queue;
+    }
+    else
+    {
+        obj->adapterEventLoops->erase(adapter);
+    }
+}
+
 PyObject*
 IcePy::getCommunicatorWrapper(const Ice::CommunicatorPtr& communicator)
 {
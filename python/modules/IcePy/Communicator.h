@@ -11,7 +11,12 @@
 #define ICEPY_COMMUNICATOR_H
 
 #include <Config.h>
+#include <CheckedCastCache.h>
+#include <CompletionQueue.h>
+#include <EventLoop.h>
+#include <InternCache.h>
 #include <Ice/CommunicatorF.h>
+#include <Ice/ObjectAdapterF.h>
 
 namespace IcePy
 {
@@ -25,6 +30,34 @@ Ice::CommunicatorPtr getCommunicator(PyObject*);
 PyObject* createCommunicator(const Ice::CommunicatorPtr&);
 PyObject* getCommunicatorWrapper(const Ice::CommunicatorPtr&);
 
+//
+// Returns the queue of the event loop used to complete asynchronous invocations, or nil if the
+// communicator has no event loop.
+//
+EventLoopQueuePtr getEventLoopQueue(const Ice::CommunicatorPtr&);
+
+//
+// Returns the completion queue of the communicator, or nil if the communicator has no completion queue.
+//
+CompletionQueuePtr getCompletionQueue(const Ice::CommunicatorPtr&);
+
+//
+// Returns the checked cast cache of the communicator, or nil if the communicator has no such cache.
+//
+CheckedCastCachePtr getCheckedCastCache(const Ice::CommunicatorPtr&);
+
+//
+// Returns the cache of the strings unmarshaled with the python:intern metadata, or nil if the
+// communicator's internCacheSize is 0.
+//
+InternCachePtr getInternCache(const Ice::CommunicatorPtr&);
+
+//
+// Get or set the queue of the event loop used to dispatch the requests of an object adapter.
+//
+EventLoopQueuePtr getEventLoopQueue(const Ice::ObjectAdapterPtr&);
+void setEventLoopQueue(const Ice::ObjectAdapterPtr&, const EventLoopQueuePtr&);
+
 }
 
 extern "C" PyObject* IcePy_initialize(PyObject*, PyObject*);
@@ -0,0 +1,449 @@
+// **********************************************************************
+//
+// Copyright (c) 2003-2018 ZeroC, Inc. All rights reserved.
+//
+// This copy of Ice is licensed to you under the terms described in the
+// ICE_LICENSE file included in this distribution.
+//
+// **********************************************************************
+
+#ifdef _WIN32
+#   include <IceUtil/Config.h>
+#endif
+#include <CompletionQueue.h>
+#include <Thread.h>
+
+using namespace std;
+using namespace IcePy;
+
+namespace IcePy
+{
+
+struct CompletionQueueObject
+{
+    PyObject_HEAD
+    CompletionQueuePtr* queue;
+};
+
+}
+
+namespace
+{
+
+const size_t defaultMaxBatchSize = 256;
+
+class CompletionThread : public IceUtil::Thread
+{
+public:
+
+    CompletionThread(const CompletionQueuePtr& queue) :
+        IceUtil::Thread("Ice.CompletionQueue"),
+        _queue(queue)
+    {
+    }
+
+    virtual void run()
+    {
+        _queue->run(this);
+    }
+
+private:
+
+    const CompletionQueuePtr _queue;
+};
+
+}
+
+#ifdef WIN32
+extern "C"
+#endif
+static CompletionQueueObject*
+completionQueueNew(PyTypeObject* type, PyObject* /*args*/, PyObject* /*kwds*/)
+{
+    CompletionQueueObject* self = reinterpret_cast<CompletionQueueObject*>(type->tp_alloc(type, 0));
+    if(!self)
+    {
+        return 0;
+    }
+    self->queue = 0;
+    return self;
+}
+
+#ifdef WIN32
+extern "C"
+#endif
+static int
+completionQueueInit(CompletionQueueObject* self, PyObject* args, PyObject* kwds)
+{
+    static char* argNames[] =
+    {
+        const_cast<char*>("maxBatchSize"),
+        0
+    };
+    int maxBatchSize = static_cast<int>(defaultMaxBatchSize);
+    if(!PyArg_ParseTupleAndKeywords(args, kwds, STRCAST("|i"), argNames, &maxBatchSize))
+    {
+        return -1;
+    }
+
+    if(maxBatchSize <= 0)
+    {
+        PyErr_Format(PyExc_ValueError, STRCAST("maxBatchSize must be a positive integer"));
+        return -1;
+    }
+
+    if(self->queue)
+    {
+        PyErr_Format(PyExc_RuntimeError, STRCAST("completion queue is already initialized"));
+        return -1;
+    }
+
+    self->queue = new CompletionQueuePtr(new CompletionQueue(static_cast<size_t>(maxBatchSize)));
+    return 0;
+}
+
+#ifdef WIN32
+extern "C"
+#endif
+static void
+completionQueueDealloc(CompletionQueueObject* self)
+{
+    if(self->queue)
+    {
+        //
+        // The queue can still be used by communicators, in which case this doesn't release the last
+        // reference. Otherwise the queue thread is already joined.
+        //
+        delete self->queue;
+    }
+    Py_TYPE(self)->tp_free(reinterpret_cast<PyObject*>(self));
+}
+
+#ifdef WIN32
+extern "C"
+#endif
+static PyObject*
+completionQueueGetMetrics(CompletionQueueObject* self, PyObject* /*args*/)
+{
+    if(!self->queue)
+    {
+        PyErr_Format(PyExc_RuntimeError, STRCAST("completion queue is not initialized"));
+        return 0;
+    }
+    return (*self->queue)->getMetrics();
+}
+
+static PyMethodDef CompletionQueueMethods[] =
+{
+    { STRCAST("getMetrics"), reinterpret_cast<PyCFunction>(completionQueueGetMetrics), METH_NOARGS,
+        PyDoc_STR(STRCAST("getMetrics() -> Ice.CompletionQueueMetrics")) },
+    { 0, 0 } /* sentinel */
+};
+
+namespace IcePy
+{
+
+PyTypeObject CompletionQueueType =
+{
+    /* The ob_type field must be initialized in the module init function
+     * to be portable to Windows without using C++. */
+    PyVarObject_HEAD_INIT(0, 0)
+    STRCAST("IcePy.CompletionQueue"), /* tp_name */
+    sizeof(CompletionQueueObject),   /* tp_basicsize */
+    0,                               /* tp_itemsize */
+    /* methods */
+    reinterpret_cast<destructor>(completionQueueDealloc), /* tp_dealloc */
+    0,                               /* tp_print */
+    0,                               /* tp_getattr */
+    0,                               /* tp_setattr */
+    0,                               /* tp_reserved */
+    0,                               /* tp_repr */
+    0,                               /* tp_as_number */
+    0,                               /* tp_as_sequence */
+    0,                               /* tp_as_mapping */
+    0,                               /* tp_hash */
+    0,                               /* tp_call */
+    0,                               /* tp_str */
+    0,                               /* tp_getattro */
+    0,                               /* tp_setattro */
+    0,                               /* tp_as_buffer */
+    Py_TPFLAGS_DEFAULT,              /* tp_flags */
+    0,                               /* tp_doc */
+    0,                               /* tp_traverse */
+    0,                               /* tp_clear */
+    0,                               /* tp_richcompare */
+    0,                               /* tp_weaklistoffset */
+    0,                               /* tp_iter */
+    0,                               /* tp_iternext */
+    CompletionQueueMethods,          /* tp_methods */
+    0,                               /* tp_members */
+    0,                               /* tp_getset */
+    0,                               /* tp_base */
+    0,                               /* tp_dict */
+    0,                               /* tp_descr_get */
+    0,                               /* tp_descr_set */
+    0,                               /* tp_dictoffset */
+    reinterpret_cast<initproc>(completionQueueInit), /* tp_init */
+    0,                               /* tp_alloc */
+    reinterpret_cast<newfunc>(completionQueueNew), /* tp_new */
+    0,                               /* tp_free */
+    0,                               /* tp_is_gc */
+};
+
+}
+
+bool
+IcePy::initCompletionQueue(PyObject* module)
+{
+    if(PyType_Ready(&CompletionQueueType) < 0)
+    {
+        return false;
+    }
+    PyTypeObject* type = &CompletionQueueType; // Necessary to prevent GCC's strict-alias warnings.
+    if(PyModule_AddObject(module, STRCAST("CompletionQueue"), reinterpret_cast<PyObject*>(type)) < 0)
+    {
+        return false;
+    }
+    return true;
+}
+
+CompletionQueuePtr
+IcePy::getCompletionQueue(PyObject* obj)
+{
+    if(!PyObject_IsInstance(obj, reinterpret_cast<PyObject*>(&CompletionQueueType)))
+    {
+        return 0;
+    }
+    CompletionQueueObject* q = reinterpret_cast<CompletionQueueObject*>(obj);
+    return q->queue ? *q->queue : CompletionQueuePtr();
+}
+
+IcePy::CompletionQueue::CompletionQueue(size_t maxBatchSize) :
+    _maxBatchSize(maxBatchSize),
+    _attached(0),
+    _completed(0),
+    _batches(0),
+    _largestBatch(0),
+    _maxQueueDepth(0)
+{
+}
+
+IcePy::CompletionQueue::~CompletionQueue()
+{
+    assert(!_thread);
+
+    AdoptThread adoptThread; // The last reference can be released by any thread.
+    for(deque<Completion>::iterator p = _completions.begin(); p != _completions.end(); ++p)
+    {
+        delete p->ex;
+    }
+    _completions.clear();
+}
+
+void
+IcePy::CompletionQueue::attach()
+{
+    Lock sync(*this);
+    if(_attached++ == 0)
+    {
+        //
+        // A thread from a previous attachment that is still draining the queue exits once the
+        // queue is empty, the new thread takes over.
+        //
+        _thread = new CompletionThread(this);
+        _thread->start();
+    }
+}
+
+void
+IcePy::CompletionQueue::detach()
+{
+    IceUtil::ThreadPtr thread;
+    {
+        Lock sync(*this);
+        assert(_attached > 0);
+        if(--_attached > 0)
+        {
+            return;
+        }
+        thread = _thread;
+        _thread = 0;
+        notifyAll();
+    }
+
+    if(thread->getThreadControl() == IceUtil::ThreadControl())
+    {
+        //
+        // Detached from a completion callback, the thread processes the remaining completions
+        // once the callback returns and then exits.
+        //
+        thread->getThreadControl().detach();
+        return;
+    }
+
+    //
+    // Wait for the thread to process the remaining completions.
+    //
+    thread->getThreadControl().join();
+}
+
+void
+IcePy::CompletionQueue::response(const CompletionHandlerPtr& handler, bool ok,
+                                 const pair<const Ice::Byte*, const Ice::Byte*>& results)
+{
+    Completion c;
+    c.handler = handler;
+    c.kind = Response;
+    c.flag = ok;
+    c.results.assign(results.first, results.second);
+    c.ex = 0;
+    enqueue(c);
+}
+
+void
+IcePy::CompletionQueue::exception(const CompletionHandlerPtr& handler, const Ice::Exception& ex)
+{
+    Completion c;
+    c.handler = handler;
+    c.kind = Exception;
+    c.flag = false;
+    c.ex = ex.ice_clone();
+    enqueue(c);
+}
+
+void
+IcePy::CompletionQueue::sent(const CompletionHandlerPtr& handler, bool sentSynchronously)
+{
+    Completion c;
+    c.handler = handler;
+    c.kind = Sent;
+    c.flag = sentSynchronously;
+    c.ex = 0;
+    enqueue(c);
+}
+
+PyObject*
+IcePy::CompletionQueue::getMetrics()
+{
+    Ice::Long completed;
+    Ice::Long batches;
+    size_t largestBatch;
+    size_t queueDepth;
+    size_t maxQueueDepth;
+    {
+        Lock sync(*this);
+        completed = _completed;
+        batches = _batches;
+        largestBatch = _largestBatch;
+        queueDepth = _completions.size();
+        maxQueueDepth = _maxQueueDepth;
+    }
+
+    PyObject* metricsType = lookupType("Ice.CompletionQueueMetrics");
+    if(!metricsType)
+    {
+        return 0;
+    }
+    PyObjectHandle args = Py_BuildValue(STRCAST("(LLnnn)"), static_cast<PY_LONG_LONG>(completed),
+                                        static_cast<PY_LONG_LONG>(batches), static_cast<Py_ssize_t>(largestBatch),
+                                        static_cast<Py_ssize_t>(queueDepth), static_cast<Py_ssize_t>(maxQueueDepth));
+    if(!args.get())
+    {
+        return 0;
+    }
+    return PyObject_Call(metricsType, args.get(), 0);
+}
+
+void
+IcePy::CompletionQueue::run(IceUtil::Thread* thread)
+{
+    while(true)
+    {
+        vector<Completion> batch;
+        {
+            Lock sync(*this);
+            while(_completions.empty() && _thread.get() == thread)
+            {
+                wait();
+            }
+
+            if(_completions.empty())
+            {
+                //
+                // Detached and drained, or replaced by the thread of a new attachment.
+                //
+                return;
+            }
+
+            batch.resize(min(_maxBatchSize, _completions.size()));
+            for(vector<Completion>::iterator p = batch.begin(); p != batch.end(); ++p)
+            {
+                Completion& c = _completions.front();
+                p->handler.swap(c.handler);
+                p->kind = c.kind;
+                p->flag = c.flag;
+                p->results.swap(c.results);
+                p->ex = c.ex;
+                _completions.pop_front();
+            }
+
+            _completed += static_cast<Ice::Long>(batch.size());
+            ++_batches;
+            _largestBatch = max(_largestBatch, batch.size());
+        }
+
+        //
+        // Acquire the GIL once for the whole batch. The handlers are also released with the GIL.
+        //
+        AdoptThread adoptThread;
+        process(batch);
+        batch.clear();
+    }
+}
+
+void
+IcePy::CompletionQueue::enqueue(Completion& c)
+{
+    Lock sync(*this);
+    _completions.push_back(Completion());
+    Completion& last = _completions.back();
+    last.handler.swap(c.handler);
+    last.kind = c.kind;
+    last.flag = c.flag;
+    last.results.swap(c.results);
+    last.ex = c.ex;
+    _maxQueueDepth = max(_maxQueueDepth, _completions.size());
+    if(_completions.size() == 1)
+    {
+        notifyAll();
+    }
+}
+
+void
+IcePy::CompletionQueue::process(vector<Completion>& batch)
+{
+    for(vector<Completion>::iterator p = batch.begin(); p != batch.end(); ++p)
+    {
+        switch(p->kind)
+        {
+        case Response:
+        {
+            const Ice::Byte* start = p->results.empty() ? 0 : &p->results[0];
+            p->handler->completeResponse(p->flag, make_pair(start, start + p->results.size()));
+            break;
+        }
+        case Exception:
+        {
+            p->handler->completeException(*p->ex);
+            delete p->ex;
+            p->ex = 0;
+            break;
+        }
+        case Sent:
+        {
+            p->handler->completeSent(p->flag);
+            break;
+        }
+        }
+    }
+}
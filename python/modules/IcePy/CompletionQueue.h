@@ -0,0 +1,118 @@
+// **********************************************************************
+//
+// Copyright (c) 2003-2018 ZeroC, Inc. All rights reserved.
+//
+// This copy of Ice is licensed to you under the terms described in the
+// ICE_LICENSE file included in this distribution.
+//
+// **********************************************************************
+
+#ifndef ICEPY_COMPLETION_QUEUE_H
+#define ICEPY_COMPLETION_QUEUE_H
+
+#include <Config.h>
+#include <Util.h>
+#include <Ice/Exception.h>
+#include <IceUtil/Monitor.h>
+#include <IceUtil/Thread.h>
+#include <deque>
+
+namespace IcePy
+{
+
+extern PyTypeObject CompletionQueueType;
+
+bool initCompletionQueue(PyObject*);
+
+//
+// Receives the completions of an asynchronous invocation. These methods are called with the GIL
+// acquired, either directly by the Ice thread that received the reply or by the thread of the
+// completion queue.
+//
+class CompletionHandler : public virtual IceUtil::Shared
+{
+public:
+
+    virtual void completeResponse(bool, const std::pair<const Ice::Byte*, const Ice::Byte*>&) = 0;
+    virtual void completeException(const Ice::Exception&) = 0;
+    virtual void completeSent(bool) = 0;
+};
+typedef IceUtil::Handle<CompletionHandler> CompletionHandlerPtr;
+
+//
+// The completion queue of a communicator created with the completionQueue attribute of
+// Ice.InitializationData. The Ice threads don't acquire the GIL to complete asynchronous
+// invocations: they only copy the reply to the queue. The queue thread acquires the GIL
+// once for a batch of up to maxBatchSize completions, which reduces the contention on the
+// GIL when many replies are received at the same time.
+//
+// The queue thread is started when the queue is attached to its first communicator and it
+// is joined when it is detached from its last communicator, once the pending completions
+// are processed.
+//
+class CompletionQueue : public IceUtil::Shared, private IceUtil::Monitor<IceUtil::Mutex>
+{
+public:
+
+    CompletionQueue(size_t);
+    ~CompletionQueue();
+
+    void attach();
+    void detach(); // Must be called without the GIL.
+
+    //
+    // Queue a completion. These methods can be called without the GIL.
+    //
+    void response(const CompletionHandlerPtr&, bool, const std::pair<const Ice::Byte*, const Ice::Byte*>&);
+    void exception(const CompletionHandlerPtr&, const Ice::Exception&);
+    void sent(const CompletionHandlerPtr&, bool);
+
+    //
+    // Returns a new Ice.CompletionQueueMetrics object. The GIL must be acquired.
+    //
+    PyObject* getMetrics();
+
+    //
+    // Process the completions until the given thread is no longer the queue thread and the
+    // queue is empty.
+    //
+    void run(IceUtil::Thread*);
+
+private:
+
+    enum Kind { Response, Exception, Sent };
+
+    struct Completion
+    {
+        CompletionHandlerPtr handler;
+        Kind kind;
+        bool flag; // The ok flag of a response, or sentSynchronously.
+        std::vector<Ice::Byte> results;
+        Ice::Exception* ex;
+    };
+
+    void enqueue(Completion&);
+    void process(std::vector<Completion>&);
+
+    const size_t _maxBatchSize;
+    std::deque<Completion> _completions;
+    IceUtil::ThreadPtr _thread;
+    int _attached;
+    bool _destroyed;
+
+    Ice::Long _completed;
+    Ice::Long _batches;
+    size_t _largestBatch;
+    size_t _maxQueueDepth;
+};
+typedef IceUtil::Handle<CompletionQueue> CompletionQueuePtr;
+
+//
+// Returns the completion queue of an IcePy.CompletionQueue object, or nil if the object has
+// another type.
+//
+CompletionQueuePtr getCompletionQueue(PyObject*);
+
+}
+
+#endif
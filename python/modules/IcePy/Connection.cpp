@@ -14,6 +14,7 @@
 #include <Communicator.h>
 #include <ConnectionInfo.h>
 #include <Endpoint.h>
+#include <Future.h>
 #include <ObjectAdapter.h>
 #include <Operation.h>
 #include <Proxy.h>
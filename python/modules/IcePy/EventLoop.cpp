@@ -0,0 +1,290 @@
+// **********************************************************************
+//
+// Copyright (c) 2003-2018 ZeroC, Inc. All rights reserved.
+//
+// This copy of Ice is licensed to you under the terms described in the
+// ICE_LICENSE file included in this distribution.
+//
+// **********************************************************************
+
+#ifdef _WIN32
+#   include <IceUtil/Config.h>
+#endif
+#include <EventLoop.h>
+#include <Thread.h>
+#include <Ice/LocalException.h>
+
+using namespace std;
+using namespace IcePy;
+
+namespace
+{
+
+//
+// Interned method names, created by initEventLoop.
+//
+PyObject* setResultName = 0;
+PyObject* setExceptionName = 0;
+PyObject* doneName = 0;
+
+}
+
+namespace IcePy
+{
+
+//
+// The callable passed to call_soon_threadsafe to run the queued completions and calls.
+//
+struct EventLoopRunObject
+{
+    PyObject_HEAD
+    EventLoopQueuePtr* queue;
+};
+
+}
+
+#ifdef WIN32
+extern "C"
+#endif
+static void
+eventLoopRunDealloc(EventLoopRunObject* self)
+{
+    delete self->queue;
+    Py_TYPE(self)->tp_free(reinterpret_cast<PyObject*>(self));
+}
+
+#ifdef WIN32
+extern "C"
+#endif
+static PyObject*
+eventLoopRunInvoke(EventLoopRunObject* self, PyObject* /*args*/, PyObject* /*kwds*/)
+{
+    (*self->queue)->run();
+    return incRef(Py_None);
+}
+
+namespace IcePy
+{
+
+PyTypeObject EventLoopRunType =
+{
+    /* The ob_type field must be initialized in the module init function
+     * to be portable to Windows without using C++. */
+    PyVarObject_HEAD_INIT(0, 0)
+    STRCAST("IcePy.EventLoopRun"),        /* tp_name */
+    sizeof(EventLoopRunObject),           /* tp_basicsize */
+    0,                                    /* tp_itemsize */
+    /* methods */
+    reinterpret_cast<destructor>(eventLoopRunDealloc), /* tp_dealloc */
+    0,                               /* tp_print */
+    0,                               /* tp_getattr */
+    0,                               /* tp_setattr */
+    0,                               /* tp_reserved */
+    0,                               /* tp_repr */
+    0,                               /* tp_as_number */
+    0,                               /* tp_as_sequence */
+    0,                               /* tp_as_mapping */
+    0,                               /* tp_hash */
+    reinterpret_cast<ternaryfunc>(eventLoopRunInvoke), /* tp_call */
+    0,                               /* tp_str */
+    0,                               /* tp_getattro */
+    0,                               /* tp_setattro */
+    0,                               /* tp_as_buffer */
+    Py_TPFLAGS_DEFAULT,              /* tp_flags */
+    0,                               /* tp_doc */
+    0,                               /* tp_traverse */
+    0,                               /* tp_clear */
+    0,                               /* tp_richcompare */
+    0,                               /* tp_weaklistoffset */
+    0,                               /* tp_iter */
+    0,                               /* tp_iternext */
+    0,                               /* tp_methods */
+    0,                               /* tp_members */
+    0,                               /* tp_getset */
+    0,                               /* tp_base */
+    0,                               /* tp_dict */
+    0,                               /* tp_descr_get */
+    0,                               /* tp_descr_set */
+    0,                               /* tp_dictoffset */
+    0,                               /* tp_init */
+    0,                               /* tp_alloc */
+    0,                               /* tp_new */
+    0,                               /* tp_free */
+    0,                               /* tp_is_gc */
+};
+
+}
+
+bool
+IcePy::initEventLoop(PyObject* module)
+{
+    if(PyType_Ready(&EventLoopRunType) < 0)
+    {
+        return false;
+    }
+    PyTypeObject* type = &EventLoopRunType; // Necessary to prevent GCC's strict-alias warnings.
+    if(PyModule_AddObject(module, STRCAST("EventLoopRun"), reinterpret_cast<PyObject*>(type)) < 0)
+    {
+        return false;
+    }
+
+    setResultName = createInternedString("set_result");
+    setExceptionName = createInternedString("set_exception");
+    doneName = createInternedString("done");
+    if(!setResultName || !setExceptionName || !doneName)
+    {
+        return false;
+    }
+
+    return true;
+}
+
+IcePy::EventLoopQueue::EventLoopQueue(PyObject* loop) :
+    _loop(incRef(loop)),
+    _scheduled(false)
+{
+    _createFuture = getAttr(loop, "create_future", false);
+    _callSoonThreadsafe = getAttr(loop, "call_soon_threadsafe", false);
+    if(!_createFuture.get() || !_callSoonThreadsafe.get())
+    {
+        PyErr_Clear();
+        throw Ice::InitializationException(__FILE__, __LINE__, "eventLoop must be an asyncio event loop");
+    }
+}
+
+IcePy::EventLoopQueue::~EventLoopQueue()
+{
+    AdoptThread adoptThread; // The last reference can be released by any Ice thread.
+    _completions.clear();
+    _createFuture = 0;
+    _callSoonThreadsafe = 0;
+    _loop = 0;
+}
+
+PyObject*
+IcePy::EventLoopQueue::getLoop() const
+{
+    return _loop.get();
+}
+
+PyObject*
+IcePy::EventLoopQueue::createFuture()
+{
+    return PyObject_CallObject(_createFuture.get(), 0);
+}
+
+void
+IcePy::EventLoopQueue::setResult(PyObject* future, PyObject* result)
+{
+    enqueue(Result, future, result);
+}
+
+void
+IcePy::EventLoopQueue::setException(PyObject* future, PyObject* ex)
+{
+    enqueue(Exception, future, ex);
+}
+
+void
+IcePy::EventLoopQueue::call(PyObject* callable, PyObject* args)
+{
+    enqueue(Call, callable, args);
+}
+
+void
+IcePy::EventLoopQueue::run()
+{
+    vector<Completion> completions;
+    {
+        IceUtil::Mutex::Lock sync(*this);
+        completions.swap(_completions);
+        _scheduled = false;
+    }
+
+    for(vector<Completion>::const_iterator p = completions.begin(); p != completions.end(); ++p)
+    {
+        if(p->kind == Call)
+        {
+            PyObjectHandle tmp = PyObject_Call(p->target.get(), p->value.get(), 0);
+            if(!tmp.get())
+            {
+                PyErr_Print();
+            }
+            continue;
+        }
+
+        PyObject* name = p->kind == Exception ? setExceptionName : setResultName;
+        PyObjectHandle tmp = PyObject_CallMethodObjArgs(p->target.get(), name, p->value.get(),
+                                                        static_cast<PyObject*>(0));
+        if(!tmp.get())
+        {
+            //
+            // The future fails to complete if it was cancelled by the application, in which case the
+            // result is discarded.
+            //
+            PyObject* type;
+            PyObject* value;
+            PyObject* traceback;
+            PyErr_Fetch(&type, &value, &traceback);
+            PyObjectHandle done = PyObject_CallMethodObjArgs(p->target.get(), doneName,
+                                                             static_cast<PyObject*>(0));
+            if(done.get() && PyObject_IsTrue(done.get()))
+            {
+                Py_XDECREF(type);
+                Py_XDECREF(value);
+                Py_XDECREF(traceback);
+            }
+            else
+            {
+                PyErr_Restore(type, value, traceback);
+                PyErr_Print();
+            }
+        }
+    }
+}
+
+void
+IcePy::EventLoopQueue::enqueue(Kind kind, PyObject* target, PyObject* value)
+{
+    bool schedule;
+    {
+        IceUtil::Mutex::Lock sync(*this);
+        Completion c;
+        c.kind = kind;
+        c.target = incRef(target);
+        c.value = incRef(value);
+        _completions.push_back(c);
+        schedule = !_scheduled;
+        _scheduled = true;
+    }
+
+    if(!schedule)
+    {
+        //
+        // The event loop was already woken up and will also run this completion.
+        //
+        return;
+    }
+
+    EventLoopRunObject* obj = reinterpret_cast<EventLoopRunObject*>(EventLoopRunType.tp_alloc(&EventLoopRunType, 0));
+    if(obj)
+    {
+        obj->queue = new EventLoopQueuePtr(this);
+
+        PyObjectHandle callable = reinterpret_cast<PyObject*>(obj);
+        PyObjectHandle tmp = PyObject_CallFunctionObjArgs(_callSoonThreadsafe.get(), callable.get(),
+                                                          static_cast<PyObject*>(0));
+        if(tmp.get())
+        {
+            return;
+        }
+    }
+
+    //
+    // The event loop is closed. The event loop won't run the queued work, run it with the calling
+    // thread rather than leaving the futures pending. This also clears the scheduled flag so that
+    // the next completion tries to wake up the event loop again.
+    //
+    PyErr_Print();
+    run();
+}
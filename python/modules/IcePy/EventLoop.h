@@ -0,0 +1,76 @@
+// **********************************************************************
+//
+// Copyright (c) 2003-2018 ZeroC, Inc. All rights reserved.
+//
+// This copy of Ice is licensed to you under the terms described in the
+// ICE_LICENSE file included in this distribution.
+//
+// **********************************************************************
+
+#ifndef ICEPY_EVENT_LOOP_H
+#define ICEPY_EVENT_LOOP_H
+
+#include <Config.h>
+#include <Util.h>
+#include <IceUtil/Mutex.h>
+#include <vector>
+
+namespace IcePy
+{
+
+bool initEventLoop(PyObject*);
+
+//
+// Completes the asyncio futures returned by the asynchronous invocations of a communicator
+// created with the eventLoop attribute of Ice.InitializationData, and runs the dispatches of
+// the object adapters configured with an event loop. The futures are created with the event
+// loop and must only be completed from the event loop thread: the completions and calls are
+// queued by the Ice threads, and a single call_soon_threadsafe call wakes up the event loop
+// to run all the work queued until the event loop runs.
+//
+// The GIL must be acquired to call these methods.
+//
+class EventLoopQueue : public IceUtil::Shared, private IceUtil::Mutex
+{
+public:
+
+    EventLoopQueue(PyObject*);
+    ~EventLoopQueue();
+
+    PyObject* getLoop() const;
+
+    PyObject* createFuture();
+    void setResult(PyObject*, PyObject*);
+    void setException(PyObject*, PyObject*);
+
+    //
+    // Call the given callable with the given arguments tuple from the event loop thread.
+    //
+    void call(PyObject*, PyObject*);
+
+    void run();
+
+private:
+
+    enum Kind { Result, Exception, Call };
+
+    void enqueue(Kind, PyObject*, PyObject*);
+
+    struct Completion
+    {
+        Kind kind;
+        PyObjectHandle target; // The future, or the callable.
+        PyObjectHandle value; // The result or exception, or the arguments.
+    };
+
+    PyObjectHandle _loop;
+    PyObjectHandle _createFuture;
+    PyObjectHandle _callSoonThreadsafe;
+    std::vector<Completion> _completions;
+    bool _scheduled;
+};
+typedef IceUtil::Handle<EventLoopQueue> EventLoopQueuePtr;
+
+}
+
+#endif
@@ -0,0 +1,572 @@
+// **********************************************************************
+//
+// Copyright (c) 2003-2018 ZeroC, Inc. All rights reserved.
+//
+// This copy of Ice is licensed to you under the terms described in the
+// ICE_LICENSE file included in this distribution.
+//
+// **********************************************************************
+
+#ifdef _WIN32
+#   include <IceUtil/Config.h>
+#endif
+#include <Evictor.h>
+#include <Current.h>
+#include <Thread.h>
+#include <Types.h>
+#include <Ice/Communicator.h>
+#include <Ice/ObjectAdapter.h>
+
+using namespace std;
+using namespace IcePy;
+
+namespace IcePy
+{
+
+struct EvictorObject
+{
+    PyObject_HEAD
+    EvictorPtr* evictor;
+};
+
+}
+
+#ifdef WIN32
+extern "C"
+#endif
+static EvictorObject*
+evictorNew(PyTypeObject* type, PyObject* /*args*/, PyObject* /*kwds*/)
+{
+    EvictorObject* self = reinterpret_cast<EvictorObject*>(type->tp_alloc(type, 0));
+    if(!self)
+    {
+        return 0;
+    }
+    self->evictor = 0;
+    return self;
+}
+
+#ifdef WIN32
+extern "C"
+#endif
+static int
+evictorInit(EvictorObject* self, PyObject* args, PyObject* kwds)
+{
+    static char* argNames[] =
+    {
+        const_cast<char*>("loader"),
+        const_cast<char*>("capacity"),
+        const_cast<char*>("saver"),
+        0
+    };
+    PyObject* loader;
+    Py_ssize_t capacity;
+    PyObject* saver = Py_None;
+    if(!PyArg_ParseTupleAndKeywords(args, kwds, STRCAST("On|O"), argNames, &loader, &capacity, &saver))
+    {
+        return -1;
+    }
+
+    if(!PyCallable_Check(loader))
+    {
+        PyErr_Format(PyExc_ValueError, STRCAST("loader must be callable"));
+        return -1;
+    }
+
+    if(saver != Py_None && !PyCallable_Check(saver))
+    {
+        PyErr_Format(PyExc_ValueError, STRCAST("saver must be callable or None"));
+        return -1;
+    }
+
+    if(capacity <= 0)
+    {
+        PyErr_Format(PyExc_ValueError, STRCAST("capacity must be a positive integer"));
+        return -1;
+    }
+
+    if(self->evictor)
+    {
+        PyErr_Format(PyExc_RuntimeError, STRCAST("evictor is already initialized"));
+        return -1;
+    }
+
+    self->evictor = new EvictorPtr(new Evictor(loader, saver, static_cast<size_t>(capacity)));
+    (*self->evictor)->setObject(reinterpret_cast<PyObject*>(self));
+    return 0;
+}
+
+#ifdef WIN32
+extern "C"
+#endif
+static void
+evictorDealloc(EvictorObject* self)
+{
+    if(self->evictor)
+    {
+        //
+        // The evictor can still be used by object adapters, which create a new object for it
+        // if necessary.
+        //
+        (*self->evictor)->setObject(0);
+        delete self->evictor;
+    }
+    Py_TYPE(self)->tp_free(reinterpret_cast<PyObject*>(self));
+}
+
+#ifdef WIN32
+extern "C"
+#endif
+static PyObject*
+evictorGetCapacity(EvictorObject* self, PyObject* /*args*/)
+{
+    if(!self->evictor)
+    {
+        PyErr_Format(PyExc_RuntimeError, STRCAST("evictor is not initialized"));
+        return 0;
+    }
+    return PyLong_FromSsize_t(static_cast<Py_ssize_t>((*self->evictor)->getCapacity()));
+}
+
+#ifdef WIN32
+extern "C"
+#endif
+static PyObject*
+evictorSetCapacity(EvictorObject* self, PyObject* args)
+{
+    Py_ssize_t capacity;
+    if(!PyArg_ParseTuple(args, STRCAST("n"), &capacity))
+    {
+        return 0;
+    }
+
+    if(!self->evictor)
+    {
+        PyErr_Format(PyExc_RuntimeError, STRCAST("evictor is not initialized"));
+        return 0;
+    }
+
+    if(capacity <= 0)
+    {
+        PyErr_Format(PyExc_ValueError, STRCAST("capacity must be a positive integer"));
+        return 0;
+    }
+
+    (*self->evictor)->setCapacity(static_cast<size_t>(capacity));
+
+    Py_INCREF(Py_None);
+    return Py_None;
+}
+
+#ifdef WIN32
+extern "C"
+#endif
+static PyObject*
+evictorGetMetrics(EvictorObject* self, PyObject* /*args*/)
+{
+    if(!self->evictor)
+    {
+        PyErr_Format(PyExc_RuntimeError, STRCAST("evictor is not initialized"));
+        return 0;
+    }
+    return (*self->evictor)->getMetrics();
+}
+
+static PyMethodDef EvictorMethods[] =
+{
+    { STRCAST("getCapacity"), reinterpret_cast<PyCFunction>(evictorGetCapacity), METH_NOARGS,
+        PyDoc_STR(STRCAST("getCapacity() -> int")) },
+    { STRCAST("setCapacity"), reinterpret_cast<PyCFunction>(evictorSetCapacity), METH_VARARGS,
+        PyDoc_STR(STRCAST("setCapacity(int) -> None")) },
+    { STRCAST("getMetrics"), reinterpret_cast<PyCFunction>(evictorGetMetrics), METH_NOARGS,
+        PyDoc_STR(STRCAST("getMetrics() -> Ice.EvictorMetrics")) },
+    { 0, 0 } /* sentinel */
+};
+
+namespace IcePy
+{
+
+PyTypeObject EvictorType =
+{
+    /* The ob_type field must be initialized in the module init function
+     * to be portable to Windows without using C++. */
+    PyVarObject_HEAD_INIT(0, 0)
+    STRCAST("IcePy.Evictor"),        /* tp_name */
+    sizeof(EvictorObject),           /* tp_basicsize */
+    0,                               /* tp_itemsize */
+    /* methods */
+    reinterpret_cast<destructor>(evictorDealloc), /* tp_dealloc */
+    0,                               /* tp_print */
+    0,                               /* tp_getattr */
+    0,                               /* tp_setattr */
+    0,                               /* tp_reserved */
+    0,                               /* tp_repr */
+    0,                               /* tp_as_number */
+    0,                               /* tp_as_sequence */
+    0,                               /* tp_as_mapping */
+    0,                               /* tp_hash */
+    0,                               /* tp_call */
+    0,                               /* tp_str */
+    0,                               /* tp_getattro */
+    0,                               /* tp_setattro */
+    0,                               /* tp_as_buffer */
+    Py_TPFLAGS_DEFAULT,              /* tp_flags */
+    0,                               /* tp_doc */
+    0,                               /* tp_traverse */
+    0,                               /* tp_clear */
+    0,                               /* tp_richcompare */
+    0,                               /* tp_weaklistoffset */
+    0,                               /* tp_iter */
+    0,                               /* tp_iternext */
+    EvictorMethods,                  /* tp_methods */
+    0,                               /* tp_members */
+    0,                               /* tp_getset */
+    0,                               /* tp_base */
+    0,                               /* tp_dict */
+    0,                               /* tp_descr_get */
+    0,                               /* tp_descr_set */
+    0,                               /* tp_dictoffset */
+    reinterpret_cast<initproc>(evictorInit), /* tp_init */
+    0,                               /* tp_alloc */
+    reinterpret_cast<newfunc>(evictorNew), /* tp_new */
+    0,                               /* tp_free */
+    0,                               /* tp_is_gc */
+};
+
+}
+
+bool
+IcePy::initEvictor(PyObject* module)
+{
+    if(PyType_Ready(&EvictorType) < 0)
+    {
+        return false;
+    }
+    PyTypeObject* type = &EvictorType; // Necessary to prevent GCC's strict-alias warnings.
+    if(PyModule_AddObject(module, STRCAST("Evictor"), reinterpret_cast<PyObject*>(type)) < 0)
+    {
+        return false;
+    }
+    return true;
+}
+
+EvictorPtr
+IcePy::getEvictor(PyObject* obj)
+{
+    if(!PyObject_IsInstance(obj, reinterpret_cast<PyObject*>(&EvictorType)))
+    {
+        return 0;
+    }
+    EvictorObject* e = reinterpret_cast<EvictorObject*>(obj);
+    return e->evictor ? *e->evictor : EvictorPtr();
+}
+
+IcePy::Evictor::Entry::Entry(const Key& k, const ServantWrapperPtr& s) :
+    key(k),
+    servant(s),
+    inUse(0)
+{
+}
+
+IcePy::Evictor::Evictor(PyObject* loader, PyObject* saver, size_t capacity) :
+    _loader(loader),
+    _saver(saver),
+    _object(0),
+    _capacity(capacity),
+    _hits(0),
+    _misses(0),
+    _evictions(0)
+{
+    Py_INCREF(_loader);
+    Py_INCREF(_saver);
+    _objectType = lookupType("Ice.Object");
+}
+
+IcePy::Evictor::~Evictor()
+{
+    AdoptThread adoptThread; // The last reference can be released by any thread.
+    _entries.clear();
+    _lru.clear();
+    Py_DECREF(_loader);
+    Py_DECREF(_saver);
+}
+
+Ice::ObjectPtr
+IcePy::Evictor::locate(const Ice::Current& current, Ice::LocalObjectPtr& cookie)
+{
+    Key key(current.id, current.facet);
+    {
+        IceUtil::Mutex::Lock sync(*this);
+        EntryMap::iterator p = _entries.find(key);
+        if(p != _entries.end())
+        {
+            _lru.splice(_lru.begin(), _lru, p->second->pos);
+            ++p->second->inUse;
+            ++_hits;
+            cookie = p->second;
+            return p->second->servant;
+        }
+        ++_misses;
+        if(!_logger)
+        {
+            _logger = current.adapter->getCommunicator()->getLogger();
+        }
+    }
+
+    AdoptThread adoptThread; // Ensure the current thread is able to call into Python.
+
+    PyObjectHandle c = createCurrent(current);
+    if(!c.get())
+    {
+        throwPythonException();
+    }
+
+    PyObjectHandle res = PyObject_CallFunctionObjArgs(_loader, c.get(), 0);
+    if(PyErr_Occurred())
+    {
+        PyException ex; // Retrieve the exception before another Python API call clears it.
+
+        //
+        // A loader that calls sys.exit() will raise the SystemExit exception.
+        // This is normally caught by the interpreter, causing it to exit.
+        // However, we have no way to pass this exception to the interpreter,
+        // so we act on it directly.
+        //
+        ex.checkSystemExit();
+
+        PyObject* userExceptionType = lookupType("Ice.UserException");
+        if(PyObject_IsInstance(ex.ex.get(), userExceptionType))
+        {
+            throw ExceptionWriter(ex.ex);
+        }
+
+        ex.raise();
+    }
+
+    if(res.get() == Py_None)
+    {
+        return 0;
+    }
+
+    //
+    // Verify that the servant is an Ice object.
+    //
+    if(!PyObject_IsInstance(res.get(), _objectType))
+    {
+        PyErr_WarnEx(PyExc_RuntimeWarning, STRCAST("return value of the Evictor loader is not an Ice object"), 1);
+        return 0;
+    }
+
+    ServantWrapperPtr servant = createServantWrapper(res.get());
+    if(PyErr_Occurred())
+    {
+        throwPythonException();
+    }
+
+    vector<EntryPtr> evicted;
+    EntryPtr entry;
+    {
+        IceUtil::Mutex::Lock sync(*this);
+
+        //
+        // Another thread may have loaded the same servant in the meantime, in which case its
+        // servant is used and ours is discarded.
+        //
+        EntryMap::iterator p = _entries.find(key);
+        if(p != _entries.end())
+        {
+            entry = p->second;
+            _lru.splice(_lru.begin(), _lru, entry->pos);
+            ++entry->inUse;
+        }
+        else
+        {
+            entry = new Entry(key, servant);
+            ++entry->inUse;
+            _lru.push_front(entry);
+            entry->pos = _lru.begin();
+            _entries.insert(make_pair(key, entry));
+            evict(evicted);
+        }
+    }
+
+    save(evicted);
+    cookie = entry;
+    return entry->servant;
+}
+
+void
+IcePy::Evictor::finished(const Ice::Current&, const Ice::ObjectPtr&, const Ice::LocalObjectPtr& cookie)
+{
+    EntryPtr entry = EntryPtr::dynamicCast(cookie);
+    assert(entry);
+
+    vector<EntryPtr> evicted;
+    {
+        IceUtil::Mutex::Lock sync(*this);
+        if(--entry->inUse == 0 && _entries.size() > _capacity)
+        {
+            evict(evicted);
+        }
+    }
+
+    if(!evicted.empty())
+    {
+        AdoptThread adoptThread; // Ensure the current thread is able to call into Python.
+        save(evicted);
+        evicted.clear();
+    }
+}
+
+void
+IcePy::Evictor::deactivate(const string&)
+{
+    //
+    // The object adapter calls deactivate once the dispatches are completed, for each category
+    // of the evictor. The first call saves and releases all the servants.
+    //
+    vector<EntryPtr> evicted;
+    {
+        IceUtil::Mutex::Lock sync(*this);
+        evicted.insert(evicted.end(), _lru.begin(), _lru.end());
+        _lru.clear();
+        _entries.clear();
+    }
+
+    if(!evicted.empty())
+    {
+        AdoptThread adoptThread; // Ensure the current thread is able to call into Python.
+        save(evicted);
+        evicted.clear();
+    }
+}
+
+size_t
+IcePy::Evictor::getCapacity()
+{
+    IceUtil::Mutex::Lock sync(*this);
+    return _capacity;
+}
+
+void
+IcePy::Evictor::setCapacity(size_t capacity)
+{
+    vector<EntryPtr> evicted;
+    {
+        IceUtil::Mutex::Lock sync(*this);
+        _capacity = capacity;
+        evict(evicted);
+    }
+    save(evicted);
+}
+
+PyObject*
+IcePy::Evictor::getMetrics()
+{
+    Ice::Long hits;
+    Ice::Long misses;
+    Ice::Long evictions;
+    size_t size;
+    {
+        IceUtil::Mutex::Lock sync(*this);
+        hits = _hits;
+        misses = _misses;
+        evictions = _evictions;
+        size = _entries.size();
+    }
+
+    PyObject* metricsType = lookupType("Ice.EvictorMetrics");
+    if(!metricsType)
+    {
+        return 0;
+    }
+    PyObjectHandle args = Py_BuildValue(STRCAST("(LLLn)"), static_cast<PY_LONG_LONG>(hits),
+                                        static_cast<PY_LONG_LONG>(misses), static_cast<PY_LONG_LONG>(evictions),
+                                        static_cast<Py_ssize_t>(size));
+    if(!args.get())
+    {
+        return 0;
+    }
+    return PyObject_Call(metricsType, args.get(), 0);
+}
+
+PyObject*
+IcePy::Evictor::getObject()
+{
+    if(_object)
+    {
+        Py_INCREF(_object);
+        return _object;
+    }
+
+    EvictorObject* obj = evictorNew(&EvictorType, 0, 0);
+    if(!obj)
+    {
+        return 0;
+    }
+    obj->evictor = new EvictorPtr(this);
+    _object = reinterpret_cast<PyObject*>(obj);
+    Py_INCREF(_object);
+    return _object;
+}
+
+void
+IcePy::Evictor::setObject(PyObject* obj)
+{
+    _object = obj;
+}
+
+void
+IcePy::Evictor::evict(vector<EntryPtr>& evicted)
+{
+    EntryList::iterator p = _lru.end();
+    while(_entries.size() > _capacity && p != _lru.begin())
+    {
+        --p;
+        if((*p)->inUse == 0)
+        {
+            evicted.push_back(*p);
+            _entries.erase((*p)->key);
+            p = _lru.erase(p);
+            ++_evictions;
+        }
+    }
+}
+
+void
+IcePy::Evictor::save(const vector<EntryPtr>& evicted)
+{
+    if(_saver == Py_None)
+    {
+        return;
+    }
+
+    for(vector<EntryPtr>::const_iterator p = evicted.begin(); p != evicted.end(); ++p)
+    {
+        PyObjectHandle id = createIdentity((*p)->key.first);
+        PyObjectHandle facet = createString((*p)->key.second);
+        PyObjectHandle servant = (*p)->servant->getObject();
+        if(!id.get() || !facet.get())
+        {
+            PyErr_Clear();
+            continue;
+        }
+
+        PyObjectHandle res = PyObject_CallFunctionObjArgs(_saver, id.get(), facet.get(), servant.get(), 0);
+        if(PyErr_Occurred())
+        {
+            PyException ex; // Retrieve the exception raised by the saver.
+            ex.checkSystemExit();
+
+            //
+            // The servant is evicted even if it couldn't be saved, the error is only logged since
+            // the eviction isn't related to the request that caused it.
+            //
+            if(_logger)
+            {
+                _logger->warning("Ice.Evictor: exception raised by the saver of `" +
+                                 (*p)->key.first.category + "/" + (*p)->key.first.name + "':\n" + ex.getTraceback());
+            }
+        }
+    }
+}
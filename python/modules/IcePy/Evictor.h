@@ -0,0 +1,117 @@
+// **********************************************************************
+//
+// Copyright (c) 2003-2018 ZeroC, Inc. All rights reserved.
+//
+// This copy of Ice is licensed to you under the terms described in the
+// ICE_LICENSE file included in this distribution.
+//
+// **********************************************************************
+
+#ifndef ICEPY_EVICTOR_H
+#define ICEPY_EVICTOR_H
+
+#include <Config.h>
+#include <Operation.h>
+#include <Util.h>
+#include <Ice/Logger.h>
+#include <Ice/ServantLocator.h>
+#include <IceUtil/Mutex.h>
+#include <list>
+#include <map>
+
+namespace IcePy
+{
+
+extern PyTypeObject EvictorType;
+
+bool initEvictor(PyObject*);
+
+//
+// A servant locator that keeps the servants of the most recently used identities (and facets)
+// in a LRU cache. A dispatch for a cached servant doesn't acquire the GIL, the Python loader is
+// only called when the servant isn't cached and the Python saver when a servant is evicted.
+// The servants that are dispatching requests are never evicted, so the cache can temporarily
+// hold more servants than its capacity.
+//
+class Evictor : public Ice::ServantLocator, private IceUtil::Mutex
+{
+public:
+
+    Evictor(PyObject*, PyObject*, size_t);
+    ~Evictor();
+
+    virtual Ice::ObjectPtr locate(const Ice::Current&, Ice::LocalObjectPtr&);
+    virtual void finished(const Ice::Current&, const Ice::ObjectPtr&, const Ice::LocalObjectPtr&);
+    virtual void deactivate(const std::string&);
+
+    //
+    // These methods must be called with the GIL acquired.
+    //
+    size_t getCapacity();
+    void setCapacity(size_t);
+    PyObject* getMetrics();
+
+    //
+    // Returns the IcePy.Evictor object of this evictor, creating a new one if the previous
+    // object was released. The GIL must be acquired.
+    //
+    PyObject* getObject();
+    void setObject(PyObject*);
+
+private:
+
+    typedef std::pair<Ice::Identity, std::string> Key;
+
+    struct Entry;
+    typedef IceUtil::Handle<Entry> EntryPtr;
+    typedef std::list<EntryPtr> EntryList;
+    typedef std::map<Key, EntryPtr> EntryMap;
+
+    //
+    // An entry is also the cookie of the dispatches that use its servant.
+    //
+    struct Entry : public Ice::LocalObject
+    {
+        Entry(const Key&, const ServantWrapperPtr&);
+
+        const Key key;
+        const ServantWrapperPtr servant;
+        int inUse;
+        EntryList::iterator pos;
+    };
+
+    //
+    // Moves the least recently used entries which are not in use to the given vector until
+    // the cache size is within the capacity. Must be called with the mutex locked, the entries
+    // must be saved and released without the mutex.
+    //
+    void evict(std::vector<EntryPtr>&);
+
+    //
+    // Calls the saver for the given entries. Must be called with the GIL acquired.
+    //
+    void save(const std::vector<EntryPtr>&);
+
+    PyObject* _loader;
+    PyObject* _saver;
+    PyObject* _objectType;
+    PyObject* _object; // Borrowed reference, reset when the object is released.
+    size_t _capacity;
+    EntryList _lru;
+    EntryMap _entries;
+    Ice::LoggerPtr _logger;
+
+    Ice::Long _hits;
+    Ice::Long _misses;
+    Ice::Long _evictions;
+};
+typedef IceUtil::Handle<Evictor> EvictorPtr;
+
+//
+// Returns the evictor of an IcePy.Evictor object, or nil if the object has another type.
+//
+EvictorPtr getEvictor(PyObject*);
+
+}
+
+#endif
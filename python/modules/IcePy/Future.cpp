@@ -0,0 +1,1377 @@
+// **********************************************************************
+//
+// Copyright (c) 2003-2018 ZeroC, Inc. All rights reserved.
+//
+// This copy of Ice is licensed to you under the terms described in the
+// ICE_LICENSE file included in this distribution.
+//
+// **********************************************************************
+
+#ifdef _WIN32
+#   include <IceUtil/Config.h>
+#endif
+#include <Future.h>
+#include <Operation.h>
+#include <Thread.h>
+#include <Ice/AsyncResult.h>
+#include <Ice/Communicator.h>
+#include <Ice/LocalException.h>
+#include <Ice/Logger.h>
+#include <Ice/Properties.h>
+#include <IceUtil/Monitor.h>
+
+using namespace std;
+using namespace IcePy;
+
+namespace
+{
+
+enum FutureState
+{
+    StateRunning,
+    StateCancelled,
+    StateDone
+};
+
+}
+
+namespace IcePy
+{
+
+//
+// The state of a future is only modified with the GIL locked. The monitor is created by the
+// first thread that waits for the future with the GIL released, from then on the state is also
+// modified with the monitor locked.
+//
+struct FutureObject
+{
+    PyObject_HEAD
+    int state;
+    PyObject* result;
+    PyObject* exception;
+    PyObject* doneCallbacks;
+    IceUtil::Monitor<IceUtil::Mutex>* monitor;
+
+    //
+    // Only used by InvocationFuture.
+    //
+    PyObject* operation;
+    PyObject* asyncResult;
+    bool sent;
+    bool sentSynchronously;
+    PyObject* sentCallbacks;
+
+    //
+    // The attributes set by the application and the weak references, as with the Python
+    // implementation of the futures.
+    //
+    PyObject* dict;
+    PyObject* weakrefs;
+};
+
+//
+// The callable passed to AsyncResult.callLater by add_done_callback_async and add_sent_callback_async.
+//
+struct FutureCallbackObject
+{
+    PyObject_HEAD
+    FutureObject* future;
+    PyObject* callback;
+    bool sent;
+};
+
+extern PyTypeObject FutureCallbackType;
+
+#if PY_VERSION_HEX >= 0x03050000
+//
+// The iterator returned by __await__. It yields the future if it's not completed yet, the caller
+// is expected to resume the coroutine once the future is completed.
+//
+struct FutureIterObject
+{
+    PyObject_HEAD
+    FutureObject* future;
+    bool yielded;
+};
+
+extern PyTypeObject FutureIterType;
+#endif
+
+}
+
+static bool
+isPending(FutureObject* self, bool sent)
+{
+    if(sent)
+    {
+        return !self->sent && self->state != StateCancelled && !(self->state == StateDone && self->exception);
+    }
+    return self->state == StateRunning;
+}
+
+//
+// Wait for the future to complete, or to be sent if sent is true. A timeout of None or 0 waits
+// indefinitely. Returns 1 if the future is completed (or sent), 0 if the timeout expired and -1
+// if the timeout is invalid.
+//
+static int
+waitFuture(FutureObject* self, PyObject* timeout, bool sent)
+{
+    double seconds = 0;
+    if(timeout && timeout != Py_None)
+    {
+        seconds = PyFloat_AsDouble(timeout);
+        if(seconds == -1.0 && PyErr_Occurred())
+        {
+            return -1;
+        }
+    }
+
+    if(!isPending(self, sent))
+    {
+        return 1;
+    }
+
+    if(!self->monitor)
+    {
+        self->monitor = new IceUtil::Monitor<IceUtil::Mutex>();
+    }
+
+    AllowThreads allowThreads; // Release Python's global interpreter lock while waiting.
+    IceUtil::Monitor<IceUtil::Mutex>::Lock lock(*self->monitor);
+    if(seconds == 0)
+    {
+        while(isPending(self, sent))
+        {
+            self->monitor->wait();
+        }
+        return 1;
+    }
+
+    IceUtil::Time end = IceUtil::Time::now(IceUtil::Time::Monotonic) + IceUtil::Time::secondsDouble(seconds);
+    while(isPending(self, sent))
+    {
+        IceUtil::Time delay = end - IceUtil::Time::now(IceUtil::Time::Monotonic);
+        if(delay <= IceUtil::Time())
+        {
+            return 0;
+        }
+        self->monitor->timedWait(delay);
+    }
+    return 1;
+}
+
+//
+// Log the exception raised by a done or sent callback.
+//
+static void
+warn(FutureObject* self, const string& msg)
+{
+    PyException ex; // Retrieve the exception raised by the callback.
+    string tb = ex.getTraceback();
+
+    if(self->asyncResult && PyObject_TypeCheck(self->asyncResult, &AsyncResultType))
+    {
+        try
+        {
+            Ice::CommunicatorPtr communicator = getAsyncResult(self->asyncResult)->getCommunicator();
+            if(communicator->getProperties()->getPropertyAsIntWithDefault("Ice.Warn.AMICallback", 1) > 0)
+            {
+                communicator->getLogger()->warning("Ice.Future: " + msg + ":\n" + tb);
+            }
+        }
+        catch(const Ice::Exception&)
+        {
+            // Ignore.
+        }
+        return;
+    }
+
+    //
+    // We need the equivalent of the following Python code:
+    //
+    // logging.getLogger("Ice.Future").error(msg + "\n" + tb)
+    //
+    PyObjectHandle logging = PyImport_ImportModule(STRCAST("logging"));
+    if(logging.get())
+    {
+        PyObjectHandle logger = PyObject_CallMethod(logging.get(), STRCAST("getLogger"), STRCAST("s"),
+                                                    STRCAST("Ice.Future"));
+        if(logger.get())
+        {
+            string s = msg + "\n" + tb;
+            PyObjectHandle tmp = PyObject_CallMethod(logger.get(), STRCAST("error"), STRCAST("s"), STRCAST(s.c_str()));
+        }
+    }
+    PyErr_Clear();
+}
+
+static void
+callCallbacks(FutureObject* self, PyObject* callbacks, bool sent)
+{
+    if(!callbacks)
+    {
+        return;
+    }
+
+    PyObject* obj = reinterpret_cast<PyObject*>(self);
+    for(Py_ssize_t i = 0; i < PyList_GET_SIZE(callbacks); ++i)
+    {
+        PyObject* callback = PyList_GET_ITEM(callbacks, i);
+        PyObjectHandle tmp;
+        if(sent)
+        {
+            tmp = PyObject_CallFunctionObjArgs(callback, obj, self->sentSynchronously ? getTrue() : getFalse(),
+                                               static_cast<PyObject*>(0));
+        }
+        else
+        {
+            tmp = PyObject_CallFunctionObjArgs(callback, obj, static_cast<PyObject*>(0));
+        }
+        if(!tmp.get())
+        {
+            warn(self, sent ? "sent callback raised exception" : "done callback raised exception");
+        }
+    }
+}
+
+static bool
+addCallback(PyObject*& callbacks, PyObject* callback)
+{
+    if(!callbacks)
+    {
+        callbacks = PyList_New(0);
+        if(!callbacks)
+        {
+            return false;
+        }
+    }
+    return PyList_Append(callbacks, callback) == 0;
+}
+
+//
+// Change the state of a running future and call its done callbacks.
+//
+static void
+completeFuture(FutureObject* self, int state, PyObject* result, PyObject* ex)
+{
+    assert(self->state == StateRunning);
+    if(self->monitor)
+    {
+        IceUtil::Monitor<IceUtil::Mutex>::Lock lock(*self->monitor);
+        self->state = state;
+        self->result = result ? incRef(result) : 0;
+        self->exception = ex ? incRef(ex) : 0;
+        self->monitor->notifyAll();
+    }
+    else
+    {
+        self->state = state;
+        self->result = result ? incRef(result) : 0;
+        self->exception = ex ? incRef(ex) : 0;
+    }
+
+    PyObjectHandle callbacks = self->doneCallbacks; // Steals the reference.
+    self->doneCallbacks = 0;
+    callCallbacks(self, callbacks.get(), false);
+}
+
+static void
+markSent(FutureObject* self, bool sentSynchronously)
+{
+    if(self->sent)
+    {
+        return;
+    }
+
+    if(self->monitor)
+    {
+        IceUtil::Monitor<IceUtil::Mutex>::Lock lock(*self->monitor);
+        self->sent = true;
+        self->sentSynchronously = sentSynchronously;
+        self->monitor->notifyAll();
+    }
+    else
+    {
+        self->sent = true;
+        self->sentSynchronously = sentSynchronously;
+    }
+
+    PyObjectHandle callbacks = self->sentCallbacks; // Steals the reference.
+    self->sentCallbacks = 0;
+    callCallbacks(self, callbacks.get(), true);
+}
+
+static PyObject*
+getResult(FutureObject* self, PyObject* timeout)
+{
+    int status = waitFuture(self, timeout, false);
+    if(status < 0)
+    {
+        return 0;
+    }
+    else if(status == 0)
+    {
+        setPythonException(Ice::TimeoutException(__FILE__, __LINE__));
+        return 0;
+    }
+
+    if(self->state == StateCancelled)
+    {
+        setPythonException(Ice::InvocationCanceledException(__FILE__, __LINE__));
+        return 0;
+    }
+    else if(self->exception)
+    {
+        setPythonException(self->exception);
+        return 0;
+    }
+    return incRef(self->result ? self->result : Py_None);
+}
+
+static PyObject*
+scheduleCallback(FutureObject* self, PyObject* callback, bool sent)
+{
+    FutureCallbackObject* obj =
+        reinterpret_cast<FutureCallbackObject*>(FutureCallbackType.tp_alloc(&FutureCallbackType, 0));
+    if(!obj)
+    {
+        return 0;
+    }
+    Py_INCREF(self);
+    obj->future = self;
+    obj->callback = incRef(callback);
+    obj->sent = sent;
+
+    PyObjectHandle cb = reinterpret_cast<PyObject*>(obj);
+    PyObjectHandle tmp = callMethod(self->asyncResult, "callLater", cb.get());
+    if(!tmp.get())
+    {
+        return 0;
+    }
+    return incRef(Py_None);
+}
+
+static PyObject*
+callAsyncResult(FutureObject* self, const string& method)
+{
+    if(!self->asyncResult || self->asyncResult == Py_None)
+    {
+        return incRef(Py_None);
+    }
+    return callMethod(self->asyncResult, method);
+}
+
+#ifdef WIN32
+extern "C"
+#endif
+static FutureObject*
+futureNew(PyTypeObject* type, PyObject* /*args*/, PyObject* /*kwds*/)
+{
+    FutureObject* self = reinterpret_cast<FutureObject*>(type->tp_alloc(type, 0));
+    if(!self)
+    {
+        return 0;
+    }
+    self->state = StateRunning;
+    self->result = 0;
+    self->exception = 0;
+    self->doneCallbacks = 0;
+    self->monitor = 0;
+    self->operation = 0;
+    self->asyncResult = 0;
+    self->sent = false;
+    self->sentSynchronously = false;
+    self->sentCallbacks = 0;
+    self->dict = 0;
+    self->weakrefs = 0;
+    return self;
+}
+
+#ifdef WIN32
+extern "C"
+#endif
+static int
+futureInit(FutureObject* /*self*/, PyObject* args, PyObject* /*kwds*/)
+{
+    if(!PyArg_ParseTuple(args, STRCAST("")))
+    {
+        return -1;
+    }
+    return 0;
+}
+
+#ifdef WIN32
+extern "C"
+#endif
+static int
+futureTraverse(FutureObject* self, visitproc visit, void* arg)
+{
+    Py_VISIT(self->result);
+    Py_VISIT(self->exception);
+    Py_VISIT(self->doneCallbacks);
+    Py_VISIT(self->asyncResult);
+    Py_VISIT(self->sentCallbacks);
+    Py_VISIT(self->dict);
+    return 0;
+}
+
+#ifdef WIN32
+extern "C"
+#endif
+static int
+futureClear(FutureObject* self)
+{
+    Py_CLEAR(self->result);
+    Py_CLEAR(self->exception);
+    Py_CLEAR(self->doneCallbacks);
+    Py_CLEAR(self->operation);
+    Py_CLEAR(self->asyncResult);
+    Py_CLEAR(self->sentCallbacks);
+    Py_CLEAR(self->dict);
+    return 0;
+}
+
+#ifdef WIN32
+extern "C"
+#endif
+static void
+futureDealloc(FutureObject* self)
+{
+    PyObject_GC_UnTrack(self);
+    if(self->weakrefs)
+    {
+        PyObject_ClearWeakRefs(reinterpret_cast<PyObject*>(self));
+    }
+    futureClear(self);
+    delete self->monitor;
+    Py_TYPE(self)->tp_free(reinterpret_cast<PyObject*>(self));
+}
+
+#ifdef WIN32
+extern "C"
+#endif
+static PyObject*
+futureCancel(FutureObject* self, PyObject* /*args*/)
+{
+    if(self->state == StateDone)
+    {
+        PyRETURN_FALSE;
+    }
+    else if(self->state == StateRunning)
+    {
+        completeFuture(self, StateCancelled, 0, 0);
+    }
+    PyRETURN_TRUE;
+}
+
+#ifdef WIN32
+extern "C"
+#endif
+static PyObject*
+futureCancelled(FutureObject* self, PyObject* /*args*/)
+{
+    PyRETURN_BOOL(self->state == StateCancelled);
+}
+
+#ifdef WIN32
+extern "C"
+#endif
+static PyObject*
+futureRunning(FutureObject* self, PyObject* /*args*/)
+{
+    PyRETURN_BOOL(self->state == StateRunning);
+}
+
+#ifdef WIN32
+extern "C"
+#endif
+static PyObject*
+futureDone(FutureObject* self, PyObject* /*args*/)
+{
+    PyRETURN_BOOL(self->state != StateRunning);
+}
+
+#ifdef WIN32
+extern "C"
+#endif
+static PyObject*
+futureAddDoneCallback(FutureObject* self, PyObject* args)
+{
+    PyObject* callback;
+    if(!PyArg_ParseTuple(args, STRCAST("O"), &callback))
+    {
+        return 0;
+    }
+
+    if(self->state == StateRunning)
+    {
+        if(!addCallback(self->doneCallbacks, callback))
+        {
+            return 0;
+        }
+        return incRef(Py_None);
+    }
+
+    PyObjectHandle tmp = PyObject_CallFunctionObjArgs(callback, reinterpret_cast<PyObject*>(self),
+                                                      static_cast<PyObject*>(0));
+    if(!tmp.get())
+    {
+        return 0;
+    }
+    return incRef(Py_None);
+}
+
+#ifdef WIN32
+extern "C"
+#endif
+static PyObject*
+futureResult(FutureObject* self, PyObject* args, PyObject* kwds)
+{
+    static char* argNames[] =
+    {
+        const_cast<char*>("timeout"),
+        0
+    };
+    PyObject* timeout = Py_None;
+    if(!PyArg_ParseTupleAndKeywords(args, kwds, STRCAST("|O"), argNames, &timeout))
+    {
+        return 0;
+    }
+    return getResult(self, timeout);
+}
+
+#ifdef WIN32
+extern "C"
+#endif
+static PyObject*
+futureException(FutureObject* self, PyObject* args, PyObject* kwds)
+{
+    static char* argNames[] =
+    {
+        const_cast<char*>("timeout"),
+        0
+    };
+    PyObject* timeout = Py_None;
+    if(!PyArg_ParseTupleAndKeywords(args, kwds, STRCAST("|O"), argNames, &timeout))
+    {
+        return 0;
+    }
+
+    int status = waitFuture(self, timeout, false);
+    if(status < 0)
+    {
+        return 0;
+    }
+    else if(status == 0)
+    {
+        setPythonException(Ice::TimeoutException(__FILE__, __LINE__));
+        return 0;
+    }
+
+    if(self->state == StateCancelled)
+    {
+        setPythonException(Ice::InvocationCanceledException(__FILE__, __LINE__));
+        return 0;
+    }
+    return incRef(self->exception ? self->exception : Py_None);
+}
+
+#ifdef WIN32
+extern "C"
+#endif
+static PyObject*
+futureSetResult(FutureObject* self, PyObject* args)
+{
+    PyObject* result;
+    if(!PyArg_ParseTuple(args, STRCAST("O"), &result))
+    {
+        return 0;
+    }
+
+    if(self->state == StateRunning)
+    {
+        completeFuture(self, StateDone, result, 0);
+    }
+    return incRef(Py_None);
+}
+
+#ifdef WIN32
+extern "C"
+#endif
+static PyObject*
+futureSetException(FutureObject* self, PyObject* args)
+{
+    PyObject* ex;
+    if(!PyArg_ParseTuple(args, STRCAST("O"), &ex))
+    {
+        return 0;
+    }
+
+    if(self->state == StateRunning)
+    {
+        completeFuture(self, StateDone, 0, ex == Py_None ? 0 : ex);
+    }
+    return incRef(Py_None);
+}
+
+#ifdef WIN32
+extern "C"
+#endif
+static PyObject*
+futureCompleted(PyObject* /*cls*/, PyObject* args)
+{
+    PyObject* result;
+    if(!PyArg_ParseTuple(args, STRCAST("O"), &result))
+    {
+        return 0;
+    }
+
+    FutureObject* self = futureNew(&FutureType, 0, 0);
+    if(!self)
+    {
+        return 0;
+    }
+    completeFuture(self, StateDone, result, 0);
+    return reinterpret_cast<PyObject*>(self);
+}
+
+#if PY_VERSION_HEX >= 0x03050000
+#ifdef WIN32
+extern "C"
+#endif
+static PyObject*
+futureAwait(FutureObject* self)
+{
+    FutureIterObject* iter = reinterpret_cast<FutureIterObject*>(FutureIterType.tp_alloc(&FutureIterType, 0));
+    if(!iter)
+    {
+        return 0;
+    }
+    Py_INCREF(self);
+    iter->future = self;
+    iter->yielded = false;
+    return reinterpret_cast<PyObject*>(iter);
+}
+#endif
+
+//
+// InvocationFuture operations.
+//
+
+#ifdef WIN32
+extern "C"
+#endif
+static int
+invocationFutureInit(FutureObject* self, PyObject* args, PyObject* /*kwds*/)
+{
+    PyObject* operation;
+    PyObject* asyncResult;
+    if(!PyArg_ParseTuple(args, STRCAST("OO"), &operation, &asyncResult))
+    {
+        return -1;
+    }
+
+    Py_XDECREF(self->operation);
+    self->operation = incRef(operation);
+    Py_XDECREF(self->asyncResult);
+    self->asyncResult = incRef(asyncResult);
+    return 0;
+}
+
+#ifdef WIN32
+extern "C"
+#endif
+static PyObject*
+invocationFutureCancel(FutureObject* self, PyObject* args)
+{
+    if(self->asyncResult && PyObject_TypeCheck(self->asyncResult, &AsyncResultType))
+    {
+        getAsyncResult(self->asyncResult)->cancel();
+    }
+    else if(self->asyncResult && self->asyncResult != Py_None)
+    {
+        PyObjectHandle tmp = callMethod(self->asyncResult, "cancel");
+        if(!tmp.get())
+        {
+            return 0;
+        }
+    }
+    return futureCancel(self, args);
+}
+
+#ifdef WIN32
+extern "C"
+#endif
+static PyObject*
+invocationFutureAddDoneCallbackAsync(FutureObject* self, PyObject* args)
+{
+    PyObject* callback;
+    if(!PyArg_ParseTuple(args, STRCAST("O"), &callback))
+    {
+        return 0;
+    }
+
+    if(self->state == StateRunning)
+    {
+        if(!addCallback(self->doneCallbacks, callback))
+        {
+            return 0;
+        }
+        return incRef(Py_None);
+    }
+    return scheduleCallback(self, callback, false);
+}
+
+#ifdef WIN32
+extern "C"
+#endif
+static PyObject*
+invocationFutureIsSent(FutureObject* self, PyObject* /*args*/)
+{
+    PyRETURN_BOOL(self->sent);
+}
+
+#ifdef WIN32
+extern "C"
+#endif
+static PyObject*
+invocationFutureIsSentSynchronously(FutureObject* self, PyObject* /*args*/)
+{
+    PyRETURN_BOOL(self->sentSynchronously);
+}
+
+#ifdef WIN32
+extern "C"
+#endif
+static PyObject*
+invocationFutureAddSentCallback(FutureObject* self, PyObject* args)
+{
+    PyObject* callback;
+    if(!PyArg_ParseTuple(args, STRCAST("O"), &callback))
+    {
+        return 0;
+    }
+
+    if(!self->sent)
+    {
+        if(!addCallback(self->sentCallbacks, callback))
+        {
+            return 0;
+        }
+        return incRef(Py_None);
+    }
+
+    PyObjectHandle tmp = PyObject_CallFunctionObjArgs(callback, reinterpret_cast<PyObject*>(self),
+                                                      self->sentSynchronously ? getTrue() : getFalse(),
+                                                      static_cast<PyObject*>(0));
+    if(!tmp.get())
+    {
+        return 0;
+    }
+    return incRef(Py_None);
+}
+
+#ifdef WIN32
+extern "C"
+#endif
+static PyObject*
+invocationFutureAddSentCallbackAsync(FutureObject* self, PyObject* args)
+{
+    PyObject* callback;
+    if(!PyArg_ParseTuple(args, STRCAST("O"), &callback))
+    {
+        return 0;
+    }
+
+    if(!self->sent)
+    {
+        if(!addCallback(self->sentCallbacks, callback))
+        {
+            return 0;
+        }
+        return incRef(Py_None);
+    }
+    return scheduleCallback(self, callback, true);
+}
+
+#ifdef WIN32
+extern "C"
+#endif
+static PyObject*
+invocationFutureSent(FutureObject* self, PyObject* args, PyObject* kwds)
+{
+    static char* argNames[] =
+    {
+        const_cast<char*>("timeout"),
+        0
+    };
+    PyObject* timeout = Py_None;
+    if(!PyArg_ParseTupleAndKeywords(args, kwds, STRCAST("|O"), argNames, &timeout))
+    {
+        return 0;
+    }
+
+    int status = waitFuture(self, timeout, true);
+    if(status < 0)
+    {
+        return 0;
+    }
+    else if(status == 0)
+    {
+        setPythonException(Ice::TimeoutException(__FILE__, __LINE__));
+        return 0;
+    }
+
+    if(self->state == StateCancelled)
+    {
+        setPythonException(Ice::InvocationCanceledException(__FILE__, __LINE__));
+        return 0;
+    }
+    else if(self->exception)
+    {
+        setPythonException(self->exception);
+        return 0;
+    }
+    PyRETURN_BOOL(self->sentSynchronously);
+}
+
+#ifdef WIN32
+extern "C"
+#endif
+static PyObject*
+invocationFutureSetSent(FutureObject* self, PyObject* args)
+{
+    PyObject* sentSynchronously;
+    if(!PyArg_ParseTuple(args, STRCAST("O"), &sentSynchronously))
+    {
+        return 0;
+    }
+
+    markSent(self, PyObject_IsTrue(sentSynchronously) == 1);
+    return incRef(Py_None);
+}
+
+#ifdef WIN32
+extern "C"
+#endif
+static PyObject*
+invocationFutureOperation(FutureObject* self, PyObject* /*args*/)
+{
+    return incRef(self->operation ? self->operation : Py_None);
+}
+
+#ifdef WIN32
+extern "C"
+#endif
+static PyObject*
+invocationFutureProxy(FutureObject* self, PyObject* /*args*/)
+{
+    return callAsyncResult(self, "getProxy");
+}
+
+#ifdef WIN32
+extern "C"
+#endif
+static PyObject*
+invocationFutureConnection(FutureObject* self, PyObject* /*args*/)
+{
+    return callAsyncResult(self, "getConnection");
+}
+
+#ifdef WIN32
+extern "C"
+#endif
+static PyObject*
+invocationFutureCommunicator(FutureObject* self, PyObject* /*args*/)
+{
+    return callAsyncResult(self, "getCommunicator");
+}
+
+//
+// FutureCallback operations.
+//
+
+#ifdef WIN32
+extern "C"
+#endif
+static void
+futureCallbackDealloc(FutureCallbackObject* self)
+{
+    Py_XDECREF(self->future);
+    Py_XDECREF(self->callback);
+    Py_TYPE(self)->tp_free(reinterpret_cast<PyObject*>(self));
+}
+
+#ifdef WIN32
+extern "C"
+#endif
+static PyObject*
+futureCallbackInvoke(FutureCallbackObject* self, PyObject* /*args*/, PyObject* /*kwds*/)
+{
+    PyObject* future = reinterpret_cast<PyObject*>(self->future);
+    PyObjectHandle tmp;
+    if(self->sent)
+    {
+        tmp = PyObject_CallFunctionObjArgs(self->callback, future,
+                                           self->future->sentSynchronously ? getTrue() : getFalse(),
+                                           static_cast<PyObject*>(0));
+    }
+    else
+    {
+        tmp = PyObject_CallFunctionObjArgs(self->callback, future, static_cast<PyObject*>(0));
+    }
+    if(!tmp.get())
+    {
+        warn(self->future, self->sent ? "sent callback raised exception" : "done callback raised exception");
+    }
+    return incRef(Py_None);
+}
+
+#if PY_VERSION_HEX >= 0x03050000
+//
+// FutureIter operations.
+//
+
+#ifdef WIN32
+extern "C"
+#endif
+static void
+futureIterDealloc(FutureIterObject* self)
+{
+    Py_XDECREF(self->future);
+    Py_TYPE(self)->tp_free(reinterpret_cast<PyObject*>(self));
+}
+
+#ifdef WIN32
+extern "C"
+#endif
+static PyObject*
+futureIterNext(FutureIterObject* self)
+{
+    if(self->future->state == StateRunning && !self->yielded)
+    {
+        self->yielded = true;
+        return incRef(reinterpret_cast<PyObject*>(self->future));
+    }
+
+    PyObjectHandle result = getResult(self->future, Py_None);
+    if(!result.get())
+    {
+        return 0;
+    }
+
+    //
+    // Raise StopIteration with the result as its value. The exception is instantiated explicitly
+    // because PyErr_SetObject would otherwise interpret a tuple result as the exception arguments.
+    //
+    PyObjectHandle ex = PyObject_CallFunctionObjArgs(PyExc_StopIteration, result.get(), static_cast<PyObject*>(0));
+    if(ex.get())
+    {
+        PyErr_SetObject(PyExc_StopIteration, ex.get());
+    }
+    return 0;
+}
+
+#ifdef WIN32
+extern "C"
+#endif
+static PyObject*
+futureIterSend(FutureIterObject* self, PyObject* /*value*/)
+{
+    return futureIterNext(self);
+}
+#endif
+
+static PyMethodDef FutureMethods[] =
+{
+    { STRCAST("cancel"), reinterpret_cast<PyCFunction>(futureCancel), METH_NOARGS,
+        PyDoc_STR(STRCAST("cancel() -> bool")) },
+    { STRCAST("cancelled"), reinterpret_cast<PyCFunction>(futureCancelled), METH_NOARGS,
+        PyDoc_STR(STRCAST("cancelled() -> bool")) },
+    { STRCAST("running"), reinterpret_cast<PyCFunction>(futureRunning), METH_NOARGS,
+        PyDoc_STR(STRCAST("running() -> bool")) },
+    { STRCAST("done"), reinterpret_cast<PyCFunction>(futureDone), METH_NOARGS,
+        PyDoc_STR(STRCAST("done() -> bool")) },
+    { STRCAST("add_done_callback"), reinterpret_cast<PyCFunction>(futureAddDoneCallback), METH_VARARGS,
+        PyDoc_STR(STRCAST("add_done_callback(fn) -> None")) },
+    { STRCAST("result"), reinterpret_cast<PyCFunction>(futureResult), METH_VARARGS | METH_KEYWORDS,
+        PyDoc_STR(STRCAST("result(timeout=None) -> object")) },
+    { STRCAST("exception"), reinterpret_cast<PyCFunction>(futureException), METH_VARARGS | METH_KEYWORDS,
+        PyDoc_STR(STRCAST("exception(timeout=None) -> Exception")) },
+    { STRCAST("set_result"), reinterpret_cast<PyCFunction>(futureSetResult), METH_VARARGS,
+        PyDoc_STR(STRCAST("set_result(result) -> None")) },
+    { STRCAST("set_exception"), reinterpret_cast<PyCFunction>(futureSetException), METH_VARARGS,
+        PyDoc_STR(STRCAST("set_exception(ex) -> None")) },
+    { STRCAST("completed"), reinterpret_cast<PyCFunction>(futureCompleted), METH_VARARGS | METH_STATIC,
+        PyDoc_STR(STRCAST("completed(result) -> Ice.Future")) },
+    { 0, 0 } /* sentinel */
+};
+
+static PyMethodDef InvocationFutureMethods[] =
+{
+    { STRCAST("cancel"), reinterpret_cast<PyCFunction>(invocationFutureCancel), METH_NOARGS,
+        PyDoc_STR(STRCAST("cancel() -> bool")) },
+    { STRCAST("add_done_callback_async"), reinterpret_cast<PyCFunction>(invocationFutureAddDoneCallbackAsync),
+        METH_VARARGS, PyDoc_STR(STRCAST("add_done_callback_async(fn) -> None")) },
+    { STRCAST("is_sent"), reinterpret_cast<PyCFunction>(invocationFutureIsSent), METH_NOARGS,
+        PyDoc_STR(STRCAST("is_sent() -> bool")) },
+    { STRCAST("is_sent_synchronously"), reinterpret_cast<PyCFunction>(invocationFutureIsSentSynchronously),
+        METH_NOARGS, PyDoc_STR(STRCAST("is_sent_synchronously() -> bool")) },
+    { STRCAST("add_sent_callback"), reinterpret_cast<PyCFunction>(invocationFutureAddSentCallback), METH_VARARGS,
+        PyDoc_STR(STRCAST("add_sent_callback(fn) -> None")) },
+    { STRCAST("add_sent_callback_async"), reinterpret_cast<PyCFunction>(invocationFutureAddSentCallbackAsync),
+        METH_VARARGS, PyDoc_STR(STRCAST("add_sent_callback_async(fn) -> None")) },
+    { STRCAST("sent"), reinterpret_cast<PyCFunction>(invocationFutureSent), METH_VARARGS | METH_KEYWORDS,
+        PyDoc_STR(STRCAST("sent(timeout=None) -> bool")) },
+    { STRCAST("set_sent"), reinterpret_cast<PyCFunction>(invocationFutureSetSent), METH_VARARGS,
+        PyDoc_STR(STRCAST("set_sent(sentSynchronously) -> None")) },
+    { STRCAST("operation"), reinterpret_cast<PyCFunction>(invocationFutureOperation), METH_NOARGS,
+        PyDoc_STR(STRCAST("operation() -> string")) },
+    { STRCAST("proxy"), reinterpret_cast<PyCFunction>(invocationFutureProxy), METH_NOARGS,
+        PyDoc_STR(STRCAST("proxy() -> Ice.ObjectPrx")) },
+    { STRCAST("connection"), reinterpret_cast<PyCFunction>(invocationFutureConnection), METH_NOARGS,
+        PyDoc_STR(STRCAST("connection() -> Ice.Connection")) },
+    { STRCAST("communicator"), reinterpret_cast<PyCFunction>(invocationFutureCommunicator), METH_NOARGS,
+        PyDoc_STR(STRCAST("communicator() -> Ice.Communicator")) },
+    { 0, 0 } /* sentinel */
+};
+
+#if PY_VERSION_HEX >= 0x03050000
+static PyAsyncMethods FutureAsyncMethods =
+{
+    reinterpret_cast<unaryfunc>(futureAwait), /* am_await */
+    0,                               /* am_aiter */
+    0                                /* am_anext */
+};
+
+static PyMethodDef FutureIterMethods[] =
+{
+    { STRCAST("send"), reinterpret_cast<PyCFunction>(futureIterSend), METH_O,
+        PyDoc_STR(STRCAST("send(value) -> object")) },
+    { 0, 0 } /* sentinel */
+};
+#endif
+
+namespace IcePy
+{
+
+PyTypeObject FutureType =
+{
+    /* The ob_type field must be initialized in the module init function
+     * to be portable to Windows without using C++. */
+    PyVarObject_HEAD_INIT(0, 0)
+    STRCAST("IcePy.Future"),         /* tp_name */
+    sizeof(FutureObject),            /* tp_basicsize */
+    0,                               /* tp_itemsize */
+    /* methods */
+    reinterpret_cast<destructor>(futureDealloc), /* tp_dealloc */
+    0,                               /* tp_print */
+    0,                               /* tp_getattr */
+    0,                               /* tp_setattr */
+#if PY_VERSION_HEX >= 0x03050000
+    &FutureAsyncMethods,             /* tp_as_async */
+#else
+    0,                               /* tp_reserved */
+#endif
+    0,                               /* tp_repr */
+    0,                               /* tp_as_number */
+    0,                               /* tp_as_sequence */
+    0,                               /* tp_as_mapping */
+    0,                               /* tp_hash */
+    0,                               /* tp_call */
+    0,                               /* tp_str */
+    0,                               /* tp_getattro */
+    0,                               /* tp_setattro */
+    0,                               /* tp_as_buffer */
+    Py_TPFLAGS_DEFAULT | Py_TPFLAGS_BASETYPE | Py_TPFLAGS_HAVE_GC, /* tp_flags */
+    0,                               /* tp_doc */
+    reinterpret_cast<traverseproc>(futureTraverse), /* tp_traverse */
+    reinterpret_cast<inquiry>(futureClear), /* tp_clear */
+    0,                               /* tp_richcompare */
+    offsetof(FutureObject, weakrefs), /* tp_weaklistoffset */
+    0,                               /* tp_iter */
+    0,                               /* tp_iternext */
+    FutureMethods,                   /* tp_methods */
+    0,                               /* tp_members */
+    0,                               /* tp_getset */
+    0,                               /* tp_base */
+    0,                               /* tp_dict */
+    0,                               /* tp_descr_get */
+    0,                               /* tp_descr_set */
+    offsetof(FutureObject, dict), /* tp_dictoffset */
+    reinterpret_cast<initproc>(futureInit), /* tp_init */
+    0,                               /* tp_alloc */
+    reinterpret_cast<newfunc>(futureNew), /* tp_new */
+    0,                               /* tp_free */
+    0,                               /* tp_is_gc */
+};
+
+PyTypeObject InvocationFutureType =
+{
+    /* The ob_type field must be initialized in the module init function
+     * to be portable to Windows without using C++. */
+    PyVarObject_HEAD_INIT(0, 0)
+    STRCAST("IcePy.InvocationFuture"), /* tp_name */
+    sizeof(FutureObject),            /* tp_basicsize */
+    0,                               /* tp_itemsize */
+    /* methods */
+    reinterpret_cast<destructor>(futureDealloc), /* tp_dealloc */
+    0,                               /* tp_print */
+    0,                               /* tp_getattr */
+    0,                               /* tp_setattr */
+#if PY_VERSION_HEX >= 0x03050000
+    &FutureAsyncMethods,             /* tp_as_async */
+#else
+    0,                               /* tp_reserved */
+#endif
+    0,                               /* tp_repr */
+    0,                               /* tp_as_number */
+    0,                               /* tp_as_sequence */
+    0,                               /* tp_as_mapping */
+    0,                               /* tp_hash */
+    0,                               /* tp_call */
+    0,                               /* tp_str */
+    0,                               /* tp_getattro */
+    0,                               /* tp_setattro */
+    0,                               /* tp_as_buffer */
+    Py_TPFLAGS_DEFAULT | Py_TPFLAGS_BASETYPE | Py_TPFLAGS_HAVE_GC, /* tp_flags */
+    0,                               /* tp_doc */
+    reinterpret_cast<traverseproc>(futureTraverse), /* tp_traverse */
+    reinterpret_cast<inquiry>(futureClear), /* tp_clear */
+    0,                               /* tp_richcompare */
+    offsetof(FutureObject, weakrefs), /* tp_weaklistoffset */
+    0,                               /* tp_iter */
+    0,                               /* tp_iternext */
+    InvocationFutureMethods,         /* tp_methods */
+    0,                               /* tp_members */
+    0,                               /* tp_getset */
+    0,                               /* tp_base */
+    0,                               /* tp_dict */
+    0,                               /* tp_descr_get */
+    0,                               /* tp_descr_set */
+    offsetof(FutureObject, dict), /* tp_dictoffset */
+    reinterpret_cast<initproc>(invocationFutureInit), /* tp_init */
+    0,                               /* tp_alloc */
+    reinterpret_cast<newfunc>(futureNew), /* tp_new */
+    0,                               /* tp_free */
+    0,                               /* tp_is_gc */
+};
+
+PyTypeObject FutureCallbackType =
+{
+    /* The ob_type field must be initialized in the module init function
+     * to be portable to Windows without using C++. */
+    PyVarObject_HEAD_INIT(0, 0)
+    STRCAST("IcePy.FutureCallback"), /* tp_name */
+    sizeof(FutureCallbackObject),    /* tp_basicsize */
+    0,                               /* tp_itemsize */
+    /* methods */
+    reinterpret_cast<destructor>(futureCallbackDealloc), /* tp_dealloc */
+    0,                               /* tp_print */
+    0,                               /* tp_getattr */
+    0,                               /* tp_setattr */
+    0,                               /* tp_reserved */
+    0,                               /* tp_repr */
+    0,                               /* tp_as_number */
+    0,                               /* tp_as_sequence */
+    0,                               /* tp_as_mapping */
+    0,                               /* tp_hash */
+    reinterpret_cast<ternaryfunc>(futureCallbackInvoke), /* tp_call */
+    0,                               /* tp_str */
+    0,                               /* tp_getattro */
+    0,                               /* tp_setattro */
+    0,                               /* tp_as_buffer */
+    Py_TPFLAGS_DEFAULT,              /* tp_flags */
+    0,                               /* tp_doc */
+    0,                               /* tp_traverse */
+    0,                               /* tp_clear */
+    0,                               /* tp_richcompare */
+    0,                               /* tp_weaklistoffset */
+    0,                               /* tp_iter */
+    0,                               /* tp_iternext */
+    0,                               /* tp_methods */
+    0,                               /* tp_members */
+    0,                               /* tp_getset */
+    0,                               /* tp_base */
+    0,                               /* tp_dict */
+    0,                               /* tp_descr_get */
+    0,                               /* tp_descr_set */
+    0,                               /* tp_dictoffset */
+    0,                               /* tp_init */
+    0,                               /* tp_alloc */
+    0,                               /* tp_new */
+    0,                               /* tp_free */
+    0,                               /* tp_is_gc */
+};
+
+#if PY_VERSION_HEX >= 0x03050000
+PyTypeObject FutureIterType =
+{
+    /* The ob_type field must be initialized in the module init function
+     * to be portable to Windows without using C++. */
+    PyVarObject_HEAD_INIT(0, 0)
+    STRCAST("IcePy.FutureIter"),     /* tp_name */
+    sizeof(FutureIterObject),        /* tp_basicsize */
+    0,                               /* tp_itemsize */
+    /* methods */
+    reinterpret_cast<destructor>(futureIterDealloc), /* tp_dealloc */
+    0,                               /* tp_print */
+    0,                               /* tp_getattr */
+    0,                               /* tp_setattr */
+    0,                               /* tp_reserved */
+    0,                               /* tp_repr */
+    0,                               /* tp_as_number */
+    0,                               /* tp_as_sequence */
+    0,                               /* tp_as_mapping */
+    0,                               /* tp_hash */
+    0,                               /* tp_call */
+    0,                               /* tp_str */
+    0,                               /* tp_getattro */
+    0,                               /* tp_setattro */
+    0,                               /* tp_as_buffer */
+    Py_TPFLAGS_DEFAULT,              /* tp_flags */
+    0,                               /* tp_doc */
+    0,                               /* tp_traverse */
+    0,                               /* tp_clear */
+    0,                               /* tp_richcompare */
+    0,                               /* tp_weaklistoffset */
+    PyObject_SelfIter,               /* tp_iter */
+    reinterpret_cast<iternextfunc>(futureIterNext), /* tp_iternext */
+    FutureIterMethods,               /* tp_methods */
+    0,                               /* tp_members */
+    0,                               /* tp_getset */
+    0,                               /* tp_base */
+    0,                               /* tp_dict */
+    0,                               /* tp_descr_get */
+    0,                               /* tp_descr_set */
+    0,                               /* tp_dictoffset */
+    0,                               /* tp_init */
+    0,                               /* tp_alloc */
+    0,                               /* tp_new */
+    0,                               /* tp_free */
+    0,                               /* tp_is_gc */
+};
+#endif
+
+}
+
+bool
+IcePy::initFuture(PyObject* module)
+{
+    if(PyType_Ready(&FutureType) < 0)
+    {
+        return false;
+    }
+    PyTypeObject* futureType = &FutureType; // Necessary to prevent GCC's strict-alias warnings.
+    if(PyModule_AddObject(module, STRCAST("Future"), reinterpret_cast<PyObject*>(futureType)) < 0)
+    {
+        return false;
+    }
+
+    const char* states[][2] =
+    {
+        { "StateRunning", "running" },
+        { "StateCancelled", "cancelled" },
+        { "StateDone", "done" }
+    };
+    for(size_t i = 0; i < sizeof(states) / sizeof(states[0]); ++i)
+    {
+        PyObjectHandle value = createString(states[i][1]);
+        if(!value.get() || PyDict_SetItemString(FutureType.tp_dict, states[i][0], value.get()) < 0)
+        {
+            return false;
+        }
+    }
+
+    InvocationFutureType.tp_base = &FutureType; // Force inheritance from FutureType.
+    if(PyType_Ready(&InvocationFutureType) < 0)
+    {
+        return false;
+    }
+    PyTypeObject* invocationFutureType = &InvocationFutureType; // Necessary to prevent GCC's strict-alias warnings.
+    if(PyModule_AddObject(module, STRCAST("InvocationFuture"), reinterpret_cast<PyObject*>(invocationFutureType)) < 0)
+    {
+        return false;
+    }
+
+    if(PyType_Ready(&FutureCallbackType) < 0)
+    {
+        return false;
+    }
+
+#if PY_VERSION_HEX >= 0x03050000
+    if(PyType_Ready(&FutureIterType) < 0)
+    {
+        return false;
+    }
+#endif
+
+    return true;
+}
+
+PyObject*
+IcePy::createFuture()
+{
+    return reinterpret_cast<PyObject*>(futureNew(&FutureType, 0, 0));
+}
+
+PyObject*
+IcePy::createFuture(const string& operation, PyObject* asyncResult)
+{
+    FutureObject* self = futureNew(&InvocationFutureType, 0, 0);
+    if(!self)
+    {
+        return 0;
+    }
+    self->operation = createString(operation);
+    self->asyncResult = incRef(asyncResult ? asyncResult : Py_None); // Can be nil for batch invocations.
+    return reinterpret_cast<PyObject*>(self);
+}
+
+bool
+IcePy::setFutureResult(PyObject* future, PyObject* result)
+{
+    if(Py_TYPE(future) == &FutureType || Py_TYPE(future) == &InvocationFutureType)
+    {
+        FutureObject* self = reinterpret_cast<FutureObject*>(future);
+        if(self->state == StateRunning)
+        {
+            completeFuture(self, StateDone, result, 0);
+        }
+        return true;
+    }
+
+    PyObjectHandle tmp = callMethod(future, "set_result", result);
+    return tmp.get() != 0;
+}
+
+bool
+IcePy::setFutureException(PyObject* future, PyObject* ex)
+{
+    if(Py_TYPE(future) == &FutureType || Py_TYPE(future) == &InvocationFutureType)
+    {
+        FutureObject* self = reinterpret_cast<FutureObject*>(future);
+        if(self->state == StateRunning)
+        {
+            completeFuture(self, StateDone, 0, ex);
+        }
+        return true;
+    }
+
+    PyObjectHandle tmp = callMethod(future, "set_exception", ex);
+    return tmp.get() != 0;
+}
+
+bool
+IcePy::setFutureSent(PyObject* future, bool sentSynchronously)
+{
+    if(Py_TYPE(future) != &InvocationFutureType)
+    {
+        PyObjectHandle tmp = callMethod(future, "set_sent", sentSynchronously ? getTrue() : getFalse());
+        return tmp.get() != 0;
+    }
+
+    markSent(reinterpret_cast<FutureObject*>(future), sentSynchronously);
+    return true;
+}
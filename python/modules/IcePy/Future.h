@@ -0,0 +1,42 @@
+// **********************************************************************
+//
+// Copyright (c) 2003-2018 ZeroC, Inc. All rights reserved.
+//
+// This copy of Ice is licensed to you under the terms described in the
+// ICE_LICENSE file included in this distribution.
+//
+// **********************************************************************
+
+#ifndef ICEPY_FUTURE_H
+#define ICEPY_FUTURE_H
+
+#include <Config.h>
+#include <Util.h>
+
+namespace IcePy
+{
+
+extern PyTypeObject FutureType;
+extern PyTypeObject InvocationFutureType;
+
+bool initFuture(PyObject*);
+
+//
+// Create an Ice.Future, or an Ice.InvocationFuture for the given operation and Ice.AsyncResult
+// (which is None for batch invocations).
+//
+PyObject* createFuture();
+PyObject* createFuture(const std::string&, PyObject*);
+
+//
+// Complete a future. The futures created by IcePy are completed directly, other futures such
+// as asyncio futures are completed by calling their set_result, set_exception or set_sent
+// methods. These functions return false and set a Python exception on failure.
+//
+bool setFutureResult(PyObject*, PyObject*);
+bool setFutureException(PyObject*, PyObject*);
+bool setFutureSent(PyObject*, bool);
+
+}
+
+#endif
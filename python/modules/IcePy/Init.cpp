@@ -11,14 +11,20 @@
 #   include <IceUtil/Config.h>
 #endif
 #include <BatchRequestInterceptor.h>
+#include <CheckedCastCache.h>
 #include <Communicator.h>
+#include <CompletionQueue.h>
 #include <Connection.h>
 #include <ConnectionInfo.h>
 #include <Current.h>
 #include <Dispatcher.h>
 #include <Endpoint.h>
 #include <EndpointInfo.h>
+#include <EventLoop.h>
+#include <Evictor.h>
+#include <Future.h>
 #include <ImplicitContext.h>
+#include <Instrumentation.h>
 #include <Logger.h>
 #include <ObjectAdapter.h>
 #include <Operation.h>
@@ -26,6 +32,7 @@
 #include <PropertiesAdmin.h>
 #include <Proxy.h>
 #include <Slice.h>
+#include <Stream.h>
 #include <Types.h>
 #include <ValueFactoryManager.h>
 #include <Ice/Initialize.h>
@@ -96,6 +103,10 @@ static PyMethodDef methods[] =
         PyDoc_STR(STRCAST("internal function")) },
     { STRCAST("stringifyException"), reinterpret_cast<PyCFunction>(IcePy_stringifyException), METH_VARARGS,
         PyDoc_STR(STRCAST("internal function")) },
+    { STRCAST("hashStruct"), reinterpret_cast<PyCFunction>(IcePy_hashStruct), METH_VARARGS,
+        PyDoc_STR(STRCAST("internal function")) },
+    { STRCAST("compareStruct"), reinterpret_cast<PyCFunction>(IcePy_compareStruct), METH_VARARGS,
+        PyDoc_STR(STRCAST("internal function")) },
     { STRCAST("loadSlice"), reinterpret_cast<PyCFunction>(IcePy_loadSlice), METH_VARARGS,
         PyDoc_STR(STRCAST("loadSlice(cmd) -> None")) },
     { STRCAST("cleanup"), reinterpret_cast<PyCFunction>(IcePy_cleanup), METH_NOARGS,
@@ -177,6 +188,10 @@ initIcePy(void)
     {
         INIT_RETURN;
     }
+    if(!initStream(module))
+    {
+        INIT_RETURN;
+    }
     if(!initProperties(module))
     {
         INIT_RETURN;
@@ -193,6 +208,26 @@ initIcePy(void)
     {
         INIT_RETURN;
     }
+    if(!initInstrumentation(module))
+    {
+        INIT_RETURN;
+    }
+    if(!initEventLoop(module))
+    {
+        INIT_RETURN;
+    }
+    if(!initFuture(module))
+    {
+        INIT_RETURN;
+    }
+    if(!initCompletionQueue(module))
+    {
+        INIT_RETURN;
+    }
+    if(!initCheckedCastCache(module))
+    {
+        INIT_RETURN;
+    }
     if(!initCommunicator(module))
     {
         INIT_RETURN;
@@ -205,6 +240,10 @@ initIcePy(void)
     {
         INIT_RETURN;
     }
+    if(!initEvictor(module))
+    {
+        INIT_RETURN;
+    }
     if(!initOperation(module))
     {
         INIT_RETURN;
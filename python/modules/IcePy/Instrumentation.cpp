@@ -0,0 +1,952 @@
+// **********************************************************************
+//
+// Copyright (c) 2003-2018 ZeroC, Inc. All rights reserved.
+//
+// This copy of Ice is licensed to you under the terms described in the
+// ICE_LICENSE file included in this distribution.
+//
+// **********************************************************************
+
+#ifdef _WIN32
+#   include <IceUtil/Config.h>
+#endif
+#include <Instrumentation.h>
+#include <ConnectionInfo.h>
+#include <Current.h>
+#include <Endpoint.h>
+#include <ObjectAdapter.h>
+#include <Proxy.h>
+#include <Thread.h>
+#include <Ice/LocalException.h>
+#include <IceUtil/Mutex.h>
+#include <IceUtil/Timer.h>
+
+using namespace std;
+using namespace IcePy;
+using namespace Ice::Instrumentation;
+
+namespace IcePy
+{
+
+extern PyTypeObject ObserverUpdaterType;
+
+struct ObserverUpdaterObject
+{
+    PyObject_HEAD
+    ObserverUpdaterPtr* updater;
+};
+
+}
+
+#ifdef WIN32
+extern "C"
+#endif
+static void
+observerUpdaterDealloc(ObserverUpdaterObject* self)
+{
+    delete self->updater;
+    Py_TYPE(self)->tp_free(reinterpret_cast<PyObject*>(self));
+}
+
+#ifdef WIN32
+extern "C"
+#endif
+static PyObject*
+observerUpdaterUpdateConnectionObservers(ObserverUpdaterObject* self)
+{
+    assert(self->updater);
+    try
+    {
+        AllowThreads allowThreads; // Release Python's global interpreter lock during blocking calls.
+        (*self->updater)->updateConnectionObservers();
+    }
+    catch(const Ice::Exception& ex)
+    {
+        setPythonException(ex);
+        return 0;
+    }
+
+    return incRef(Py_None);
+}
+
+#ifdef WIN32
+extern "C"
+#endif
+static PyObject*
+observerUpdaterUpdateThreadObservers(ObserverUpdaterObject* self)
+{
+    assert(self->updater);
+    try
+    {
+        AllowThreads allowThreads; // Release Python's global interpreter lock during blocking calls.
+        (*self->updater)->updateThreadObservers();
+    }
+    catch(const Ice::Exception& ex)
+    {
+        setPythonException(ex);
+        return 0;
+    }
+
+    return incRef(Py_None);
+}
+
+static PyMethodDef ObserverUpdaterMethods[] =
+{
+    { STRCAST("updateConnectionObservers"), reinterpret_cast<PyCFunction>(observerUpdaterUpdateConnectionObservers),
+        METH_NOARGS, PyDoc_STR(STRCAST("updateConnectionObservers() -> None")) },
+    { STRCAST("updateThreadObservers"), reinterpret_cast<PyCFunction>(observerUpdaterUpdateThreadObservers),
+        METH_NOARGS, PyDoc_STR(STRCAST("updateThreadObservers() -> None")) },
+    { 0, 0 } /* sentinel */
+};
+
+namespace IcePy
+{
+
+PyTypeObject ObserverUpdaterType =
+{
+    /* The ob_type field must be initialized in the module init function
+     * to be portable to Windows without using C++. */
+    PyVarObject_HEAD_INIT(0, 0)
+    STRCAST("IcePy.ObserverUpdater"),     /* tp_name */
+    sizeof(ObserverUpdaterObject),        /* tp_basicsize */
+    0,                                    /* tp_itemsize */
+    /* methods */
+    reinterpret_cast<destructor>(observerUpdaterDealloc), /* tp_dealloc */
+    0,                               /* tp_print */
+    0,                               /* tp_getattr */
+    0,                               /* tp_setattr */
+    0,                               /* tp_reserved */
+    0,                               /* tp_repr */
+    0,                               /* tp_as_number */
+    0,                               /* tp_as_sequence */
+    0,                               /* tp_as_mapping */
+    0,                               /* tp_hash */
+    0,                               /* tp_call */
+    0,                               /* tp_str */
+    0,                               /* tp_getattro */
+    0,                               /* tp_setattro */
+    0,                               /* tp_as_buffer */
+    Py_TPFLAGS_DEFAULT,              /* tp_flags */
+    0,                               /* tp_doc */
+    0,                               /* tp_traverse */
+    0,                               /* tp_clear */
+    0,                               /* tp_richcompare */
+    0,                               /* tp_weaklistoffset */
+    0,                               /* tp_iter */
+    0,                               /* tp_iternext */
+    ObserverUpdaterMethods,          /* tp_methods */
+    0,                               /* tp_members */
+    0,                               /* tp_getset */
+    0,                               /* tp_base */
+    0,                               /* tp_dict */
+    0,                               /* tp_descr_get */
+    0,                               /* tp_descr_set */
+    0,                               /* tp_dictoffset */
+    0,                               /* tp_init */
+    0,                               /* tp_alloc */
+    0,                               /* tp_new */
+    0,                               /* tp_free */
+    0,                               /* tp_is_gc */
+};
+
+}
+
+bool
+IcePy::initInstrumentation(PyObject* module)
+{
+    if(PyType_Ready(&ObserverUpdaterType) < 0)
+    {
+        return false;
+    }
+    PyTypeObject* type = &ObserverUpdaterType; // Necessary to prevent GCC's strict-alias warnings.
+    if(PyModule_AddObject(module, STRCAST("ObserverUpdater"), reinterpret_cast<PyObject*>(type)) < 0)
+    {
+        return false;
+    }
+
+    return true;
+}
+
+namespace
+{
+
+//
+// Calls a method of a Python observer with up to four arguments. The Ice run time doesn't expect
+// observers to raise exceptions, so errors raised by the Python implementation are printed.
+//
+PyObject*
+callObserver(PyObject* observer, const char* name, PyObject* arg1 = 0, PyObject* arg2 = 0, PyObject* arg3 = 0,
+             PyObject* arg4 = 0)
+{
+    PyObjectHandle method = PyObject_GetAttrString(observer, const_cast<char*>(name));
+    PyObject* result = 0;
+    if(method.get())
+    {
+        //
+        // The argument list ends with the first null argument.
+        //
+        result = PyObject_CallFunctionObjArgs(method.get(), arg1, arg2, arg3, arg4, static_cast<PyObject*>(0));
+    }
+
+    if(!result)
+    {
+        assert(PyErr_Occurred());
+        PyErr_Print();
+    }
+    return result;
+}
+
+//
+// Checks the arguments created for an observer call, printing the error if one of them couldn't be created.
+//
+bool
+checkArgs(PyObject* arg1, PyObject* arg2 = Py_None, PyObject* arg3 = Py_None, PyObject* arg4 = Py_None)
+{
+    if(!arg1 || !arg2 || !arg3 || !arg4)
+    {
+        assert(PyErr_Occurred());
+        PyErr_Print();
+        return false;
+    }
+    return true;
+}
+
+PyObject*
+createEnumerator(const char* type, int value)
+{
+    PyObject* enumType = lookupType(type);
+    if(!enumType)
+    {
+        return 0;
+    }
+    return PyObject_CallMethod(enumType, STRCAST("valueOf"), STRCAST("i"), value);
+}
+
+//
+// Base class for the wrappers of Python observers.
+//
+template<typename T>
+class ObserverWrapperT : public T
+{
+public:
+
+    ObserverWrapperT(PyObject* observer) :
+        _observer(incRef(observer))
+    {
+    }
+
+    ~ObserverWrapperT()
+    {
+        AdoptThread adoptThread; // The last reference can be released by any Ice thread.
+        _observer = 0;
+    }
+
+    virtual void attach()
+    {
+        AdoptThread adoptThread; // Ensure the current thread is able to call into Python.
+        PyObjectHandle tmp = callObserver(_observer.get(), "attach");
+    }
+
+    virtual void detach()
+    {
+        AdoptThread adoptThread; // Ensure the current thread is able to call into Python.
+        PyObjectHandle tmp = callObserver(_observer.get(), "detach");
+    }
+
+    virtual void failed(const string& exceptionName)
+    {
+        AdoptThread adoptThread; // Ensure the current thread is able to call into Python.
+        PyObjectHandle name = createString(exceptionName);
+        if(checkArgs(name.get()))
+        {
+            PyObjectHandle tmp = callObserver(_observer.get(), "failed", name.get());
+        }
+    }
+
+    PyObject* getObject() const
+    {
+        return _observer.get();
+    }
+
+protected:
+
+    PyObjectHandle _observer;
+};
+
+typedef ObserverWrapperT<Observer> ObserverWrapper;
+
+class ThreadObserverWrapper : public ObserverWrapperT<ThreadObserver>
+{
+public:
+
+    ThreadObserverWrapper(PyObject* observer) :
+        ObserverWrapperT<ThreadObserver>(observer)
+    {
+    }
+
+    virtual void stateChanged(ThreadState oldState, ThreadState newState)
+    {
+        AdoptThread adoptThread; // Ensure the current thread is able to call into Python.
+        PyObjectHandle o = createEnumerator("Ice.Instrumentation.ThreadState", static_cast<int>(oldState));
+        PyObjectHandle n = createEnumerator("Ice.Instrumentation.ThreadState", static_cast<int>(newState));
+        if(checkArgs(o.get(), n.get()))
+        {
+            PyObjectHandle tmp = callObserver(_observer.get(), "stateChanged", o.get(), n.get());
+        }
+    }
+};
+
+class ConnectionObserverWrapper : public ObserverWrapperT<ConnectionObserver>
+{
+public:
+
+    ConnectionObserverWrapper(PyObject* observer) :
+        ObserverWrapperT<ConnectionObserver>(observer)
+    {
+    }
+
+    virtual void sentBytes(Ice::Int num)
+    {
+        AdoptThread adoptThread; // Ensure the current thread is able to call into Python.
+        PyObjectHandle n = PyLong_FromLong(num);
+        if(checkArgs(n.get()))
+        {
+            PyObjectHandle tmp = callObserver(_observer.get(), "sentBytes", n.get());
+        }
+    }
+
+    virtual void receivedBytes(Ice::Int num)
+    {
+        AdoptThread adoptThread; // Ensure the current thread is able to call into Python.
+        PyObjectHandle n = PyLong_FromLong(num);
+        if(checkArgs(n.get()))
+        {
+            PyObjectHandle tmp = callObserver(_observer.get(), "receivedBytes", n.get());
+        }
+    }
+};
+
+class DispatchObserverWrapper : public ObserverWrapperT<DispatchObserver>
+{
+public:
+
+    DispatchObserverWrapper(PyObject* observer) :
+        ObserverWrapperT<DispatchObserver>(observer)
+    {
+    }
+
+    virtual void userException()
+    {
+        AdoptThread adoptThread; // Ensure the current thread is able to call into Python.
+        PyObjectHandle tmp = callObserver(_observer.get(), "userException");
+    }
+
+    virtual void reply(Ice::Int size)
+    {
+        AdoptThread adoptThread; // Ensure the current thread is able to call into Python.
+        PyObjectHandle n = PyLong_FromLong(size);
+        if(checkArgs(n.get()))
+        {
+            PyObjectHandle tmp = callObserver(_observer.get(), "reply", n.get());
+        }
+    }
+};
+
+template<typename T>
+class ChildInvocationObserverWrapperT : public ObserverWrapperT<T>
+{
+public:
+
+    ChildInvocationObserverWrapperT(PyObject* observer) :
+        ObserverWrapperT<T>(observer)
+    {
+    }
+
+    virtual void reply(Ice::Int size)
+    {
+        AdoptThread adoptThread; // Ensure the current thread is able to call into Python.
+        PyObjectHandle n = PyLong_FromLong(size);
+        if(checkArgs(n.get()))
+        {
+            PyObjectHandle tmp = callObserver(this->_observer.get(), "reply", n.get());
+        }
+    }
+};
+
+typedef ChildInvocationObserverWrapperT<RemoteObserver> RemoteObserverWrapper;
+typedef ChildInvocationObserverWrapperT<CollocatedObserver> CollocatedObserverWrapper;
+
+//
+// Wraps the observer returned by a Python method, None means no observer.
+//
+template<typename T>
+T*
+wrapObserver(PyObject* observer)
+{
+    if(!observer || observer == Py_None)
+    {
+        return 0;
+    }
+    return new T(observer);
+}
+
+//
+// Returns the Python object of an observer previously returned by the Python implementation.
+//
+template<typename T>
+PyObject*
+getObserverObject(const T& observer)
+{
+    ObserverWrapperT<typename T::element_type>* wrapper =
+        dynamic_cast<ObserverWrapperT<typename T::element_type>*>(observer.get());
+    return wrapper ? wrapper->getObject() : Py_None;
+}
+
+class InvocationObserverWrapper : public ObserverWrapperT<InvocationObserver>
+{
+public:
+
+    InvocationObserverWrapper(PyObject* observer) :
+        ObserverWrapperT<InvocationObserver>(observer)
+    {
+    }
+
+    virtual void retried()
+    {
+        AdoptThread adoptThread; // Ensure the current thread is able to call into Python.
+        PyObjectHandle tmp = callObserver(_observer.get(), "retried");
+    }
+
+    virtual void userException()
+    {
+        AdoptThread adoptThread; // Ensure the current thread is able to call into Python.
+        PyObjectHandle tmp = callObserver(_observer.get(), "userException");
+    }
+
+    virtual RemoteObserverPtr getRemoteObserver(const Ice::ConnectionInfoPtr& con, const Ice::EndpointPtr& endpt,
+                                                Ice::Int requestId, Ice::Int size)
+    {
+        AdoptThread adoptThread; // Ensure the current thread is able to call into Python.
+        PyObjectHandle c = createConnectionInfo(con);
+        PyObjectHandle e = createEndpoint(endpt);
+        PyObjectHandle r = PyLong_FromLong(requestId);
+        PyObjectHandle s = PyLong_FromLong(size);
+        if(!checkArgs(c.get(), e.get(), r.get(), s.get()))
+        {
+            return 0;
+        }
+        PyObjectHandle observer = callObserver(_observer.get(), "getRemoteObserver", c.get(), e.get(), r.get(),
+                                               s.get());
+        return wrapObserver<RemoteObserverWrapper>(observer.get());
+    }
+
+    virtual CollocatedObserverPtr getCollocatedObserver(const Ice::ObjectAdapterPtr& adapter, Ice::Int requestId,
+                                                        Ice::Int size)
+    {
+        AdoptThread adoptThread; // Ensure the current thread is able to call into Python.
+        PyObjectHandle a = wrapObjectAdapter(adapter);
+        PyObjectHandle r = PyLong_FromLong(requestId);
+        PyObjectHandle s = PyLong_FromLong(size);
+        if(!checkArgs(a.get(), r.get(), s.get()))
+        {
+            return 0;
+        }
+        PyObjectHandle observer = callObserver(_observer.get(), "getCollocatedObserver", a.get(), r.get(), s.get());
+        return wrapObserver<CollocatedObserverWrapper>(observer.get());
+    }
+};
+
+//
+// Forwards the notifications of the Ice run time to a Python implementation of
+// Ice.Instrumentation.CommunicatorObserver.
+//
+class CommunicatorObserverWrapper : public CommunicatorObserver
+{
+public:
+
+    CommunicatorObserverWrapper(PyObject* observer) :
+        _observer(incRef(observer))
+    {
+    }
+
+    ~CommunicatorObserverWrapper()
+    {
+        AdoptThread adoptThread; // The last reference can be released by any Ice thread.
+        _observer = 0;
+    }
+
+    virtual ObserverPtr getConnectionEstablishmentObserver(const Ice::EndpointPtr& endpt, const string& connector)
+    {
+        AdoptThread adoptThread; // Ensure the current thread is able to call into Python.
+        PyObjectHandle e = createEndpoint(endpt);
+        PyObjectHandle c = createString(connector);
+        if(!checkArgs(e.get(), c.get()))
+        {
+            return 0;
+        }
+        PyObjectHandle observer = callObserver(_observer.get(), "getConnectionEstablishmentObserver", e.get(), c.get());
+        return wrapObserver<ObserverWrapper>(observer.get());
+    }
+
+    virtual ObserverPtr getEndpointLookupObserver(const Ice::EndpointPtr& endpt)
+    {
+        AdoptThread adoptThread; // Ensure the current thread is able to call into Python.
+        PyObjectHandle e = createEndpoint(endpt);
+        if(!checkArgs(e.get()))
+        {
+            return 0;
+        }
+        PyObjectHandle observer = callObserver(_observer.get(), "getEndpointLookupObserver", e.get());
+        return wrapObserver<ObserverWrapper>(observer.get());
+    }
+
+    virtual ConnectionObserverPtr getConnectionObserver(const Ice::ConnectionInfoPtr& con,
+                                                        const Ice::EndpointPtr& endpt,
+                                                        ConnectionState state,
+                                                        const ConnectionObserverPtr& old)
+    {
+        AdoptThread adoptThread; // Ensure the current thread is able to call into Python.
+        PyObjectHandle c = createConnectionInfo(con);
+        PyObjectHandle e = createEndpoint(endpt);
+        PyObjectHandle s = createEnumerator("Ice.Instrumentation.ConnectionState", static_cast<int>(state));
+        if(!checkArgs(c.get(), e.get(), s.get()))
+        {
+            return 0;
+        }
+        PyObjectHandle observer = callObserver(_observer.get(), "getConnectionObserver", c.get(), e.get(), s.get(),
+                                               getObserverObject(old));
+        return wrapObserver<ConnectionObserverWrapper>(observer.get());
+    }
+
+    virtual ThreadObserverPtr getThreadObserver(const string& parent, const string& id, ThreadState state,
+                                                const ThreadObserverPtr& old)
+    {
+        AdoptThread adoptThread; // Ensure the current thread is able to call into Python.
+        PyObjectHandle p = createString(parent);
+        PyObjectHandle i = createString(id);
+        PyObjectHandle s = createEnumerator("Ice.Instrumentation.ThreadState", static_cast<int>(state));
+        if(!checkArgs(p.get(), i.get(), s.get()))
+        {
+            return 0;
+        }
+        PyObjectHandle observer = callObserver(_observer.get(), "getThreadObserver", p.get(), i.get(), s.get(),
+                                               getObserverObject(old));
+        return wrapObserver<ThreadObserverWrapper>(observer.get());
+    }
+
+    virtual InvocationObserverPtr getInvocationObserver(const Ice::ObjectPrx& prx, const string& operation,
+                                                        const Ice::Context& ctx)
+    {
+        AdoptThread adoptThread; // Ensure the current thread is able to call into Python.
+        PyObjectHandle p = createProxy(prx, prx->ice_getCommunicator());
+        PyObjectHandle o = createString(operation);
+        PyObjectHandle c = PyDict_New();
+        if(c.get() && !contextToDictionary(ctx, c.get()))
+        {
+            c = 0;
+        }
+        if(!checkArgs(p.get(), o.get(), c.get()))
+        {
+            return 0;
+        }
+        PyObjectHandle observer = callObserver(_observer.get(), "getInvocationObserver", p.get(), o.get(), c.get());
+        return wrapObserver<InvocationObserverWrapper>(observer.get());
+    }
+
+    virtual DispatchObserverPtr getDispatchObserver(const Ice::Current& current, Ice::Int size)
+    {
+        AdoptThread adoptThread; // Ensure the current thread is able to call into Python.
+        PyObjectHandle c = createCurrent(current);
+        PyObjectHandle s = PyLong_FromLong(size);
+        if(!checkArgs(c.get(), s.get()))
+        {
+            return 0;
+        }
+        PyObjectHandle observer = callObserver(_observer.get(), "getDispatchObserver", c.get(), s.get());
+        return wrapObserver<DispatchObserverWrapper>(observer.get());
+    }
+
+    virtual void setObserverUpdater(const ObserverUpdaterPtr& updater)
+    {
+        AdoptThread adoptThread; // Ensure the current thread is able to call into Python.
+        PyObjectHandle u;
+        if(updater)
+        {
+            ObserverUpdaterObject* obj = reinterpret_cast<ObserverUpdaterObject*>(
+                ObserverUpdaterType.tp_alloc(&ObserverUpdaterType, 0));
+            if(!checkArgs(reinterpret_cast<PyObject*>(obj)))
+            {
+                return;
+            }
+            obj->updater = new ObserverUpdaterPtr(updater);
+            u = reinterpret_cast<PyObject*>(obj);
+        }
+        else
+        {
+            u = incRef(Py_None);
+        }
+        PyObjectHandle tmp = callObserver(_observer.get(), "setObserverUpdater", u.get());
+    }
+
+private:
+
+    PyObjectHandle _observer;
+};
+
+//
+// Aggregates the latency of invocations and dispatches per operation for an Ice.BatchObserver.
+// The Python callback is only called by flush().
+//
+class OperationMetrics : public IceUtil::Shared, private IceUtil::Mutex
+{
+public:
+
+    OperationMetrics(PyObject* callback, const vector<double>& buckets) :
+        _callback(incRef(callback)),
+        _buckets(buckets)
+    {
+        for(vector<double>::const_iterator p = buckets.begin(); p != buckets.end(); ++p)
+        {
+            _bucketTimes.push_back(static_cast<IceUtil::Int64>(*p * 1000000));
+        }
+    }
+
+    ~OperationMetrics()
+    {
+        AdoptThread adoptThread; // The last reference can be released by any Ice thread.
+        _callback = 0;
+    }
+
+    void add(const char* kind, const string& operation, IceUtil::Int64 elapsed, bool failed, bool userException)
+    {
+        IceUtil::Mutex::Lock sync(*this);
+        Stats& stats = _stats[make_pair(string(kind), operation)];
+        if(stats.histogram.empty())
+        {
+            stats.histogram.resize(_bucketTimes.size() + 1, 0);
+        }
+        ++stats.count;
+        stats.failures += failed ? 1 : 0;
+        stats.userExceptions += userException ? 1 : 0;
+        stats.totalTime += elapsed;
+        stats.maxTime = max(stats.maxTime, elapsed);
+        stats.histogram[lower_bound(_bucketTimes.begin(), _bucketTimes.end(), elapsed) - _bucketTimes.begin()]++;
+    }
+
+    void flush()
+    {
+        StatsMap stats;
+        {
+            IceUtil::Mutex::Lock sync(*this);
+            stats.swap(_stats);
+        }
+
+        if(stats.empty())
+        {
+            return;
+        }
+
+        AdoptThread adoptThread; // Ensure the current thread is able to call into Python.
+
+        PyObject* statsType = lookupType("Ice.OperationStats");
+        PyObjectHandle buckets = PyTuple_New(static_cast<Py_ssize_t>(_buckets.size()));
+        PyObjectHandle list = PyList_New(0);
+        if(!statsType || !buckets.get() || !list.get())
+        {
+            PyErr_Print();
+            return;
+        }
+        for(Py_ssize_t i = 0; i < static_cast<Py_ssize_t>(_buckets.size()); ++i)
+        {
+            PyTuple_SET_ITEM(buckets.get(), i, PyFloat_FromDouble(_buckets[i])); // Steals a reference.
+        }
+
+        for(StatsMap::const_iterator p = stats.begin(); p != stats.end(); ++p)
+        {
+            PyObjectHandle histogram = PyTuple_New(static_cast<Py_ssize_t>(p->second.histogram.size()));
+            if(!histogram.get())
+            {
+                PyErr_Print();
+                return;
+            }
+            for(Py_ssize_t i = 0; i < static_cast<Py_ssize_t>(p->second.histogram.size()); ++i)
+            {
+                PyTuple_SET_ITEM(histogram.get(), i, PyLong_FromLongLong(p->second.histogram[i])); // Steals a reference.
+            }
+
+            PyObjectHandle kind = createString(p->first.first);
+            PyObjectHandle operation = createString(p->first.second);
+            PyObjectHandle args = Py_BuildValue(STRCAST("(OOLLLddOO)"), kind.get(), operation.get(),
+                                                static_cast<PY_LONG_LONG>(p->second.count),
+                                                static_cast<PY_LONG_LONG>(p->second.failures),
+                                                static_cast<PY_LONG_LONG>(p->second.userExceptions),
+                                                p->second.totalTime / 1000000.0, p->second.maxTime / 1000000.0,
+                                                buckets.get(), histogram.get());
+            PyObjectHandle record = args.get() ? PyObject_Call(statsType, args.get(), 0) : 0;
+            if(!record.get() || PyList_Append(list.get(), record.get()) < 0)
+            {
+                PyErr_Print();
+                return;
+            }
+        }
+
+        PyObjectHandle tmp = PyObject_CallFunctionObjArgs(_callback.get(), list.get(), static_cast<PyObject*>(0));
+        if(!tmp.get())
+        {
+            PyErr_Print();
+        }
+    }
+
+private:
+
+    struct Stats
+    {
+        Stats() : count(0), failures(0), userExceptions(0), totalTime(0), maxTime(0)
+        {
+        }
+
+        Ice::Long count;
+        Ice::Long failures;
+        Ice::Long userExceptions;
+        IceUtil::Int64 totalTime; // In microseconds.
+        IceUtil::Int64 maxTime; // In microseconds.
+        vector<Ice::Long> histogram;
+    };
+    typedef map<pair<string, string>, Stats> StatsMap;
+
+    PyObjectHandle _callback;
+    const vector<double> _buckets;
+    vector<IceUtil::Int64> _bucketTimes; // The bucket upper bounds in microseconds.
+    StatsMap _stats;
+};
+typedef IceUtil::Handle<OperationMetrics> OperationMetricsPtr;
+
+//
+// Measures the latency of an invocation or dispatch, from attach() to detach().
+//
+template<typename T>
+class BatchObserverT : public T
+{
+public:
+
+    BatchObserverT(const OperationMetricsPtr& metrics, const char* kind, const string& operation) :
+        _metrics(metrics), _kind(kind), _operation(operation), _failed(false), _userException(false)
+    {
+    }
+
+    virtual void attach()
+    {
+        _start = IceUtil::Time::now(IceUtil::Time::Monotonic);
+    }
+
+    virtual void detach()
+    {
+        IceUtil::Int64 elapsed = (IceUtil::Time::now(IceUtil::Time::Monotonic) - _start).toMicroSeconds();
+        _metrics->add(_kind, _operation, elapsed, _failed, _userException);
+    }
+
+    virtual void failed(const string&)
+    {
+        _failed = true;
+    }
+
+    virtual void userException()
+    {
+        _userException = true;
+    }
+
+protected:
+
+    const OperationMetricsPtr _metrics;
+    const char* _kind;
+    const string _operation;
+    IceUtil::Time _start;
+    bool _failed;
+    bool _userException;
+};
+
+class BatchDispatchObserver : public BatchObserverT<DispatchObserver>
+{
+public:
+
+    BatchDispatchObserver(const OperationMetricsPtr& metrics, const string& operation) :
+        BatchObserverT<DispatchObserver>(metrics, "dispatch", operation)
+    {
+    }
+
+    virtual void reply(Ice::Int)
+    {
+    }
+};
+
+class BatchInvocationObserver : public BatchObserverT<InvocationObserver>
+{
+public:
+
+    BatchInvocationObserver(const OperationMetricsPtr& metrics, const string& operation) :
+        BatchObserverT<InvocationObserver>(metrics, "invocation", operation)
+    {
+    }
+
+    virtual void retried()
+    {
+    }
+
+    virtual RemoteObserverPtr getRemoteObserver(const Ice::ConnectionInfoPtr&, const Ice::EndpointPtr&, Ice::Int,
+                                                Ice::Int)
+    {
+        return 0;
+    }
+
+    virtual CollocatedObserverPtr getCollocatedObserver(const Ice::ObjectAdapterPtr&, Ice::Int, Ice::Int)
+    {
+        return 0;
+    }
+};
+
+class FlushTask : public IceUtil::TimerTask
+{
+public:
+
+    FlushTask(const OperationMetricsPtr& metrics) :
+        _metrics(metrics)
+    {
+    }
+
+    virtual void runTimerTask()
+    {
+        _metrics->flush();
+    }
+
+private:
+
+    const OperationMetricsPtr _metrics;
+};
+
+//
+// The communicator observer of an Ice.BatchObserver. Only invocations and dispatches are observed,
+// and the metrics are reported by a timer thread.
+//
+class BatchCommunicatorObserver : public CommunicatorObserver
+{
+public:
+
+    BatchCommunicatorObserver(PyObject* callback, double interval, const vector<double>& buckets) :
+        _metrics(new OperationMetrics(callback, buckets)),
+        _timer(new IceUtil::Timer)
+    {
+        _timer->scheduleRepeated(new FlushTask(_metrics),
+                                 IceUtil::Time::microSeconds(static_cast<IceUtil::Int64>(interval * 1000000)));
+    }
+
+    ~BatchCommunicatorObserver()
+    {
+        //
+        // The updater is never reset if the communicator fails to initialize. The timer thread
+        // acquires the GIL to report the metrics, the observer must be released without the GIL.
+        //
+        if(_timer)
+        {
+            _timer->destroy();
+        }
+    }
+
+    virtual ObserverPtr getConnectionEstablishmentObserver(const Ice::EndpointPtr&, const string&)
+    {
+        return 0;
+    }
+
+    virtual ObserverPtr getEndpointLookupObserver(const Ice::EndpointPtr&)
+    {
+        return 0;
+    }
+
+    virtual ConnectionObserverPtr getConnectionObserver(const Ice::ConnectionInfoPtr&, const Ice::EndpointPtr&,
+                                                        ConnectionState, const ConnectionObserverPtr&)
+    {
+        return 0;
+    }
+
+    virtual ThreadObserverPtr getThreadObserver(const string&, const string&, ThreadState, const ThreadObserverPtr&)
+    {
+        return 0;
+    }
+
+    virtual InvocationObserverPtr getInvocationObserver(const Ice::ObjectPrx&, const string& operation,
+                                                        const Ice::Context&)
+    {
+        return new BatchInvocationObserver(_metrics, operation);
+    }
+
+    virtual DispatchObserverPtr getDispatchObserver(const Ice::Current& current, Ice::Int)
+    {
+        return new BatchDispatchObserver(_metrics, current.operation);
+    }
+
+    virtual void setObserverUpdater(const ObserverUpdaterPtr& updater)
+    {
+        //
+        // The updater is reset when the communicator is destroyed. Report the remaining metrics
+        // once the timer thread is stopped.
+        //
+        if(!updater && _timer)
+        {
+            _timer->destroy();
+            _timer = 0;
+            _metrics->flush();
+        }
+    }
+
+private:
+
+    const OperationMetricsPtr _metrics;
+    IceUtil::TimerPtr _timer;
+};
+
+}
+
+CommunicatorObserverPtr
+IcePy::createCommunicatorObserver(PyObject* observer)
+{
+    PyObject* batchObserverType = lookupType("Ice.BatchObserver");
+    if(!PyObject_IsInstance(observer, batchObserverType))
+    {
+        return new CommunicatorObserverWrapper(observer);
+    }
+
+    PyObjectHandle callback = getAttr(observer, "callback", false);
+    if(!callback.get() || !PyCallable_Check(callback.get()))
+    {
+        throw Ice::InitializationException(__FILE__, __LINE__, "batch observer callback must be a callable");
+    }
+
+    PyObjectHandle interval = getAttr(observer, "interval", false);
+    double seconds = interval.get() ? PyFloat_AsDouble(interval.get()) : -1.0;
+    if(PyErr_Occurred() || seconds <= 0)
+    {
+        PyErr_Clear();
+        throw Ice::InitializationException(__FILE__, __LINE__, "batch observer interval must be a positive number");
+    }
+
+    vector<double> buckets;
+    PyObjectHandle seq = getAttr(observer, "buckets", false);
+    PyObjectHandle fast = seq.get() ? PySequence_Fast(seq.get(), STRCAST("")) : 0;
+    if(!fast.get())
+    {
+        PyErr_Clear();
+        throw Ice::InitializationException(__FILE__, __LINE__, "batch observer buckets must be a sequence");
+    }
+    for(Py_ssize_t i = 0; i < PySequence_Fast_GET_SIZE(fast.get()); ++i)
+    {
+        double bound = PyFloat_AsDouble(PySequence_Fast_GET_ITEM(fast.get(), i));
+        if(PyErr_Occurred() || (!buckets.empty() && bound <= buckets.back()))
+        {
+            PyErr_Clear();
+            throw Ice::InitializationException(__FILE__, __LINE__,
+                                               "batch observer buckets must be numbers in increasing order");
+        }
+        buckets.push_back(bound);
+    }
+
+    return new BatchCommunicatorObserver(callback.get(), seconds, buckets);
+}
@@ -0,0 +1,32 @@
+// **********************************************************************
+//
+// Copyright (c) 2003-2018 ZeroC, Inc. All rights reserved.
+//
+// This copy of Ice is licensed to you under the terms described in the
+// ICE_LICENSE file included in this distribution.
+//
+// **********************************************************************
+
+#ifndef ICEPY_INSTRUMENTATION_H
+#define ICEPY_INSTRUMENTATION_H
+
+#include <Config.h>
+#include <Util.h>
+#include <Ice/Instrumentation.h>
+
+namespace IcePy
+{
+
+bool initInstrumentation(PyObject*);
+
+//
+// Create the communicator observer for the observer attribute of Ice.InitializationData. The
+// observer is either an Ice.BatchObserver, in which case the invocations and dispatches are
+// aggregated in C++ and periodically reported to Python, or an implementation of
+// Ice.Instrumentation.CommunicatorObserver to which all the notifications are forwarded.
+//
+Ice::Instrumentation::CommunicatorObserverPtr createCommunicatorObserver(PyObject*);
+
+}
+
+#endif
@@ -0,0 +1,87 @@
+// **********************************************************************
+//
+// Copyright (c) 2003-2018 ZeroC, Inc. All rights reserved.
+//
+// This copy of Ice is licensed to you under the terms described in the
+// ICE_LICENSE file included in this distribution.
+//
+// **********************************************************************
+
+#ifdef _WIN32
+#   include <IceUtil/Config.h>
+#endif
+#include <InternCache.h>
+
+using namespace std;
+using namespace IcePy;
+
+IcePy::InternCache::InternCache(size_t capacity) :
+    _capacity(capacity)
+{
+    assert(_capacity > 0);
+}
+
+IcePy::InternCache::~InternCache()
+{
+    clear();
+}
+
+PyObject*
+IcePy::InternCache::get(const char* data, size_t size)
+{
+    string key(data, size);
+    EntryMap::iterator p = _map.find(key);
+    if(p != _map.end())
+    {
+        _entries.splice(_entries.begin(), _entries, p->second);
+        return incRef(p->second->value);
+    }
+
+    PyObject* value = createString(data, static_cast<Py_ssize_t>(size));
+    if(!value)
+    {
+        return 0;
+    }
+
+    if(_map.size() == _capacity)
+    {
+        //
+        // Evict the least recently used string.
+        //
+        Entry& last = _entries.back();
+        _map.erase(last.key);
+        Py_DECREF(last.value);
+        _entries.pop_back();
+    }
+
+    Entry entry;
+    entry.key.swap(key);
+    entry.value = incRef(value);
+    _entries.push_front(entry);
+    _map.insert(make_pair(_entries.front().key, _entries.begin()));
+    return value;
+}
+
+void
+IcePy::InternCache::clear()
+{
+    for(EntryList::iterator p = _entries.begin(); p != _entries.end(); ++p)
+    {
+        Py_DECREF(p->value);
+    }
+    _entries.clear();
+    _map.clear();
+}
+
+bool
+IcePy::hasInternMetaData(const Ice::StringSeq& metaData)
+{
+    for(Ice::StringSeq::const_iterator p = metaData.begin(); p != metaData.end(); ++p)
+    {
+        if(*p == "python:intern")
+        {
+            return true;
+        }
+    }
+    return false;
+}
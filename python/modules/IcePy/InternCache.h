@@ -0,0 +1,69 @@
+// **********************************************************************
+//
+// Copyright (c) 2003-2018 ZeroC, Inc. All rights reserved.
+//
+// This copy of Ice is licensed to you under the terms described in the
+// ICE_LICENSE file included in this distribution.
+//
+// **********************************************************************
+
+#ifndef ICEPY_INTERN_CACHE_H
+#define ICEPY_INTERN_CACHE_H
+
+#include <Config.h>
+#include <Util.h>
+#include <Ice/BuiltinSequences.h>
+#include <IceUtil/Shared.h>
+#include <IceUtil/Handle.h>
+#include <list>
+#include <map>
+
+namespace IcePy
+{
+
+//
+// A bounded cache of the string objects created for the strings unmarshaled with the python:intern
+// metadata. Unmarshaling the same string again returns the cached object, and the least recently
+// used string is evicted once the cache is full. Each communicator has its own cache, created on
+// first use with the size given by the internCacheSize attribute of Ice.InitializationData.
+//
+// The GIL must be acquired to use the cache and to release the last reference.
+//
+class InternCache : public IceUtil::Shared
+{
+public:
+
+    InternCache(size_t);
+    ~InternCache();
+
+    //
+    // Returns a new reference to the string object for the given UTF-8 bytes.
+    //
+    PyObject* get(const char*, size_t);
+
+    void clear();
+
+private:
+
+    struct Entry
+    {
+        std::string key;
+        PyObject* value;
+    };
+    typedef std::list<Entry> EntryList;
+    typedef std::map<std::string, EntryList::iterator> EntryMap;
+
+    const size_t _capacity;
+    EntryList _entries; // The most recently used entry first.
+    EntryMap _map;
+};
+typedef IceUtil::Handle<InternCache> InternCachePtr;
+
+//
+// Returns true if the given metadata contains python:intern.
+//
+bool hasInternMetaData(const Ice::StringSeq&);
+
+}
+
+#endif
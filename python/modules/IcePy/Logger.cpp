@@ -14,6 +14,8 @@
 #include <Thread.h>
 #include <Ice/Initialize.h>
 
+#include <sstream>
+
 using namespace std;
 using namespace IcePy;
 
@@ -21,6 +23,7 @@ namespace IcePy
 {
 
 extern PyTypeObject LoggerType;
+extern PyTypeObject AsyncLoggerType;
 
 struct LoggerObject
 {
@@ -30,6 +33,29 @@ struct LoggerObject
 
 }
 
+namespace
+{
+
+//
+// Create a string object for a log message. Invalid UTF-8 sequences are replaced so that the
+// record isn't lost.
+//
+PyObject*
+createLogString(const string& str)
+{
+    PyObject* obj = createString(str);
+#if PY_VERSION_HEX >= 0x03000000
+    if(!obj && PyErr_ExceptionMatches(PyExc_UnicodeDecodeError))
+    {
+        PyErr_Clear();
+        obj = PyUnicode_DecodeUTF8(str.c_str(), static_cast<Py_ssize_t>(str.size()), "replace");
+    }
+#endif
+    return obj;
+}
+
+}
+
 IcePy::LoggerWrapper::LoggerWrapper(PyObject* logger) :
     _logger(logger)
 {
@@ -121,6 +147,451 @@ IcePy::LoggerWrapper::getObject()
     return _logger.get();
 }
 
+namespace
+{
+
+const size_t defaultAsyncLoggerCapacity = 4096;
+const size_t defaultAsyncLoggerMaxBatchSize = 256;
+
+class AsyncLoggerThread : public IceUtil::Thread
+{
+public:
+
+    AsyncLoggerThread(const AsyncLoggerQueuePtr& queue) :
+        IceUtil::Thread("Ice.AsyncLogger"),
+        _queue(queue)
+    {
+    }
+
+    virtual void run()
+    {
+        _queue->run(this);
+    }
+
+private:
+
+    const AsyncLoggerQueuePtr _queue;
+};
+
+}
+
+IcePy::AsyncLoggerQueue::AsyncLoggerQueue(PyObject* logger, size_t capacity, size_t maxBatchSize) :
+    _logger(logger),
+    _maxBatchSize(maxBatchSize),
+    _records(capacity),
+    _head(0),
+    _size(0),
+    _attached(0),
+    _queued(0),
+    _delivered(0),
+    _dropped(0),
+    _reported(0),
+    _batches(0)
+{
+    Py_INCREF(logger);
+}
+
+IcePy::AsyncLoggerQueue::~AsyncLoggerQueue()
+{
+    assert(!_thread);
+
+    AdoptThread adoptThread; // The last reference can be released by any thread.
+    _targets.clear();
+    _logger = 0;
+    _logging = 0;
+}
+
+void
+IcePy::AsyncLoggerQueue::attach()
+{
+    Lock sync(*this);
+    if(_attached++ == 0)
+    {
+        //
+        // A thread from a previous attachment that is still delivering records exits once the
+        // queue is empty, the new thread takes over.
+        //
+        _thread = new AsyncLoggerThread(this);
+        _thread->start();
+    }
+}
+
+void
+IcePy::AsyncLoggerQueue::detach()
+{
+    IceUtil::ThreadPtr thread;
+    {
+        Lock sync(*this);
+        assert(_attached > 0);
+        if(--_attached > 0)
+        {
+            return;
+        }
+        thread = _thread;
+        _thread = 0;
+        notifyAll();
+    }
+
+    if(thread->getThreadControl() == IceUtil::ThreadControl())
+    {
+        //
+        // Detached from a logger called by the queue thread, the thread delivers the remaining
+        // records once the logger returns and then exits.
+        //
+        thread->getThreadControl().detach();
+        return;
+    }
+
+    //
+    // Wait for the thread to deliver the remaining records.
+    //
+    thread->getThreadControl().join();
+}
+
+void
+IcePy::AsyncLoggerQueue::add(Kind kind, const string& prefix, const string& category, const string& message)
+{
+    Lock sync(*this);
+    if(_size == _records.size())
+    {
+        ++_dropped;
+        return;
+    }
+
+    Record& r = _records[(_head + _size) % _records.size()];
+    r.kind = kind;
+    r.prefix = prefix;
+    r.category = category;
+    r.message = message;
+    ++_queued;
+    if(++_size == 1)
+    {
+        notifyAll();
+    }
+}
+
+void
+IcePy::AsyncLoggerQueue::flush()
+{
+    {
+        AllowThreads allowThreads; // The queue thread needs the GIL to deliver the records.
+        Lock sync(*this);
+        Ice::Long queued = _queued;
+        while(_thread && _delivered < queued)
+        {
+            wait();
+        }
+        if(_thread)
+        {
+            return;
+        }
+    }
+
+    //
+    // The queue isn't attached to a communicator, deliver the records with the calling thread.
+    //
+    while(true)
+    {
+        vector<Record> batch;
+        Ice::Long dropped;
+        {
+            Lock sync(*this);
+            if(_size == 0)
+            {
+                return;
+            }
+            take(batch, _size);
+            dropped = _dropped - _reported;
+            _reported = _dropped;
+        }
+        Ice::Long count = static_cast<Ice::Long>(batch.size());
+        deliver(batch, dropped);
+        {
+            Lock sync(*this);
+            _delivered += count;
+        }
+    }
+}
+
+PyObject*
+IcePy::AsyncLoggerQueue::getMetrics()
+{
+    Ice::Long delivered;
+    Ice::Long dropped;
+    Ice::Long batches;
+    size_t queueDepth;
+    {
+        Lock sync(*this);
+        delivered = _delivered;
+        dropped = _dropped;
+        batches = _batches;
+        queueDepth = _size;
+    }
+
+    PyObject* metricsType = lookupType("Ice.AsyncLoggerMetrics");
+    if(!metricsType)
+    {
+        return 0;
+    }
+    PyObjectHandle args = Py_BuildValue(STRCAST("(LLLn)"), static_cast<PY_LONG_LONG>(delivered),
+                                        static_cast<PY_LONG_LONG>(dropped), static_cast<PY_LONG_LONG>(batches),
+                                        static_cast<Py_ssize_t>(queueDepth));
+    if(!args.get())
+    {
+        return 0;
+    }
+    return PyObject_Call(metricsType, args.get(), 0);
+}
+
+void
+IcePy::AsyncLoggerQueue::run(IceUtil::Thread* thread)
+{
+    while(true)
+    {
+        vector<Record> batch;
+        Ice::Long dropped;
+        {
+            Lock sync(*this);
+            while(_size == 0 && _thread.get() == thread)
+            {
+                wait();
+            }
+
+            if(_size == 0)
+            {
+                //
+                // Detached and drained, or replaced by the thread of a new attachment.
+                //
+                return;
+            }
+
+            take(batch, _maxBatchSize);
+            dropped = _dropped - _reported;
+            _reported = _dropped;
+            ++_batches;
+        }
+
+        //
+        // Acquire the GIL once for the whole batch.
+        //
+        Ice::Long count = static_cast<Ice::Long>(batch.size());
+        {
+            AdoptThread adoptThread;
+            deliver(batch, dropped);
+        }
+
+        {
+            Lock sync(*this);
+            _delivered += count;
+            notifyAll();
+        }
+    }
+}
+
+void
+IcePy::AsyncLoggerQueue::take(vector<Record>& batch, size_t maxSize)
+{
+    batch.resize(min(maxSize, _size));
+    for(vector<Record>::iterator p = batch.begin(); p != batch.end(); ++p)
+    {
+        Record& r = _records[_head];
+        p->kind = r.kind;
+        p->prefix.swap(r.prefix);
+        p->category.swap(r.category);
+        p->message.swap(r.message);
+        _head = (_head + 1) % _records.size();
+        --_size;
+    }
+}
+
+void
+IcePy::AsyncLoggerQueue::deliver(vector<Record>& batch, Ice::Long dropped)
+{
+    if(dropped > 0)
+    {
+        ostringstream os;
+        os << "Ice.AsyncLogger: " << dropped << " log record(s) dropped because the buffer is full";
+        Record r;
+        r.kind = Warning;
+        r.message = os.str();
+        batch.push_back(r);
+    }
+
+    for(vector<Record>::const_iterator p = batch.begin(); p != batch.end(); ++p)
+    {
+        PyObject* target = getTarget(*p);
+        if(!target)
+        {
+            PyErr_Print();
+            continue;
+        }
+
+        //
+        // The arguments are created with createLogString rather than with the "s" format of
+        // PyObject_CallMethod, which would lose the records that are not valid UTF-8.
+        //
+        PyObjectHandle message = createLogString(p->message);
+        if(!message.get())
+        {
+            PyErr_WriteUnraisable(target);
+            continue;
+        }
+
+        const char* method;
+        PyObjectHandle args;
+        if(_logger.get() != Py_None)
+        {
+            static const char* methods[] = { "_print", "trace", "warning", "error" };
+            method = methods[p->kind];
+            if(p->kind == Trace)
+            {
+                PyObjectHandle category = createLogString(p->category);
+                if(category.get())
+                {
+                    args = PyTuple_Pack(2, category.get(), message.get());
+                }
+            }
+            else
+            {
+                args = PyTuple_Pack(1, message.get());
+            }
+        }
+        else
+        {
+            //
+            // The levels of the logging module.
+            //
+            static const long levels[] = { 20, 10, 30, 40 }; // INFO, DEBUG, WARNING and ERROR.
+            method = "log";
+            PyObjectHandle level = PyLong_FromLong(levels[p->kind]);
+            if(level.get())
+            {
+                args = PyTuple_Pack(2, level.get(), message.get());
+            }
+        }
+
+        PyObjectHandle res;
+        if(args.get())
+        {
+            PyObjectHandle func = PyObject_GetAttrString(target, STRCAST(method));
+            if(func.get())
+            {
+                res = PyObject_Call(func.get(), args.get(), 0);
+            }
+        }
+
+        if(!res.get())
+        {
+            PyErr_WriteUnraisable(target);
+        }
+    }
+}
+
+PyObject*
+IcePy::AsyncLoggerQueue::getTarget(const Record& r)
+{
+    //
+    // A Python logger is cloned for each prefix. With the logging module, the logger of a record
+    // is named after the prefix ("Ice" by default) and the category of the traces.
+    //
+    string key;
+    if(_logger.get() != Py_None)
+    {
+        if(r.prefix.empty())
+        {
+            return _logger.get();
+        }
+        key = r.prefix;
+    }
+    else
+    {
+        key = r.prefix.empty() ? "Ice" : r.prefix;
+        if(r.kind == Trace && !r.category.empty())
+        {
+            key += "." + r.category;
+        }
+    }
+
+    map<string, PyObjectHandle>::iterator p = _targets.find(key);
+    if(p != _targets.end())
+    {
+        return p->second.get();
+    }
+
+    PyObjectHandle target;
+    if(_logger.get() != Py_None)
+    {
+        target = PyObject_CallMethod(_logger.get(), STRCAST("cloneWithPrefix"), STRCAST("s"), key.c_str());
+    }
+    else
+    {
+        if(!_logging.get())
+        {
+            _logging = PyImport_ImportModule(STRCAST("logging"));
+            if(!_logging.get())
+            {
+                return 0;
+            }
+        }
+        target = PyObject_CallMethod(_logging.get(), STRCAST("getLogger"), STRCAST("s"), key.c_str());
+    }
+
+    if(!target.get())
+    {
+        return 0;
+    }
+    _targets.insert(make_pair(key, target));
+    return target.get();
+}
+
+IcePy::AsyncLogger::AsyncLogger(const AsyncLoggerQueuePtr& queue, const string& prefix) :
+    _queue(queue),
+    _prefix(prefix)
+{
+}
+
+void
+IcePy::AsyncLogger::print(const string& message)
+{
+    _queue->add(AsyncLoggerQueue::Print, _prefix, string(), message);
+}
+
+void
+IcePy::AsyncLogger::trace(const string& category, const string& message)
+{
+    _queue->add(AsyncLoggerQueue::Trace, _prefix, category, message);
+}
+
+void
+IcePy::AsyncLogger::warning(const string& message)
+{
+    _queue->add(AsyncLoggerQueue::Warning, _prefix, string(), message);
+}
+
+void
+IcePy::AsyncLogger::error(const string& message)
+{
+    _queue->add(AsyncLoggerQueue::Error, _prefix, string(), message);
+}
+
+string
+IcePy::AsyncLogger::getPrefix()
+{
+    return _prefix;
+}
+
+Ice::LoggerPtr
+IcePy::AsyncLogger::cloneWithPrefix(const string& prefix)
+{
+    return new AsyncLogger(_queue, prefix);
+}
+
+AsyncLoggerQueuePtr
+IcePy::AsyncLogger::getQueue() const
+{
+    return _queue;
+}
+
 #ifdef WIN32
 extern "C"
 #endif
@@ -424,6 +895,147 @@ PyTypeObject LoggerType =
 
 }
 
+#ifdef WIN32
+extern "C"
+#endif
+static int
+asyncLoggerInit(LoggerObject* self, PyObject* args, PyObject* kwds)
+{
+    static char* argNames[] =
+    {
+        const_cast<char*>("logger"),
+        const_cast<char*>("capacity"),
+        const_cast<char*>("maxBatchSize"),
+        0
+    };
+    PyObject* logger = Py_None;
+    Py_ssize_t capacity = static_cast<Py_ssize_t>(defaultAsyncLoggerCapacity);
+    Py_ssize_t maxBatchSize = static_cast<Py_ssize_t>(defaultAsyncLoggerMaxBatchSize);
+    if(!PyArg_ParseTupleAndKeywords(args, kwds, STRCAST("|Onn"), argNames, &logger, &capacity, &maxBatchSize))
+    {
+        return -1;
+    }
+
+    PyObject* loggerType = lookupType("Ice.Logger");
+    if(logger != Py_None && !PyObject_IsInstance(logger, loggerType))
+    {
+        PyErr_Format(PyExc_ValueError, STRCAST("logger must be an Ice.Logger or None"));
+        return -1;
+    }
+
+    if(capacity <= 0 || maxBatchSize <= 0)
+    {
+        PyErr_Format(PyExc_ValueError, STRCAST("capacity and maxBatchSize must be positive integers"));
+        return -1;
+    }
+
+    if(self->logger)
+    {
+        PyErr_Format(PyExc_RuntimeError, STRCAST("logger is already initialized"));
+        return -1;
+    }
+
+    AsyncLoggerQueuePtr queue = new AsyncLoggerQueue(logger, static_cast<size_t>(capacity),
+                                                     static_cast<size_t>(maxBatchSize));
+    self->logger = new Ice::LoggerPtr(new AsyncLogger(queue, ""));
+    return 0;
+}
+
+#ifdef WIN32
+extern "C"
+#endif
+static PyObject*
+asyncLoggerFlush(LoggerObject* self, PyObject* /*args*/)
+{
+    AsyncLoggerPtr logger = self->logger ? AsyncLoggerPtr::dynamicCast(*self->logger) : AsyncLoggerPtr();
+    if(!logger)
+    {
+        PyErr_Format(PyExc_RuntimeError, STRCAST("logger is not initialized"));
+        return 0;
+    }
+
+    logger->getQueue()->flush();
+
+    Py_INCREF(Py_None);
+    return Py_None;
+}
+
+#ifdef WIN32
+extern "C"
+#endif
+static PyObject*
+asyncLoggerGetMetrics(LoggerObject* self, PyObject* /*args*/)
+{
+    AsyncLoggerPtr logger = self->logger ? AsyncLoggerPtr::dynamicCast(*self->logger) : AsyncLoggerPtr();
+    if(!logger)
+    {
+        PyErr_Format(PyExc_RuntimeError, STRCAST("logger is not initialized"));
+        return 0;
+    }
+    return logger->getQueue()->getMetrics();
+}
+
+static PyMethodDef AsyncLoggerMethods[] =
+{
+    { STRCAST("flush"), reinterpret_cast<PyCFunction>(asyncLoggerFlush), METH_NOARGS,
+        PyDoc_STR(STRCAST("flush() -> None")) },
+    { STRCAST("getMetrics"), reinterpret_cast<PyCFunction>(asyncLoggerGetMetrics), METH_NOARGS,
+        PyDoc_STR(STRCAST("getMetrics() -> Ice.AsyncLoggerMetrics")) },
+    { 0, 0 } /* sentinel */
+};
+
+namespace IcePy
+{
+
+PyTypeObject AsyncLoggerType =
+{
+    /* The ob_type field must be initialized in the module init function
+     * to be portable to Windows without using C++. */
+    PyVarObject_HEAD_INIT(0, 0)
+    STRCAST("IcePy.AsyncLogger"),   /* tp_name */
+    sizeof(LoggerObject),           /* tp_basicsize */
+    0,                              /* tp_itemsize */
+    /* methods */
+    reinterpret_cast<destructor>(loggerDealloc), /* tp_dealloc */
+    0,                              /* tp_print */
+    0,                              /* tp_getattr */
+    0,                              /* tp_setattr */
+    0,                              /* tp_reserved */
+    0,                              /* tp_repr */
+    0,                              /* tp_as_number */
+    0,                              /* tp_as_sequence */
+    0,                              /* tp_as_mapping */
+    0,                              /* tp_hash */
+    0,                              /* tp_call */
+    0,                              /* tp_str */
+    0,                              /* tp_getattro */
+    0,                              /* tp_setattro */
+    0,                              /* tp_as_buffer */
+    Py_TPFLAGS_DEFAULT,             /* tp_flags */
+    0,                              /* tp_doc */
+    0,                              /* tp_traverse */
+    0,                              /* tp_clear */
+    0,                              /* tp_richcompare */
+    0,                              /* tp_weaklistoffset */
+    0,                              /* tp_iter */
+    0,                              /* tp_iternext */
+    AsyncLoggerMethods,             /* tp_methods */
+    0,                              /* tp_members */
+    0,                              /* tp_getset */
+    0,                              /* tp_base */
+    0,                              /* tp_dict */
+    0,                              /* tp_descr_get */
+    0,                              /* tp_descr_set */
+    0,                              /* tp_dictoffset */
+    reinterpret_cast<initproc>(asyncLoggerInit), /* tp_init */
+    0,                              /* tp_alloc */
+    reinterpret_cast<newfunc>(loggerNew), /* tp_new */
+    0,                              /* tp_free */
+    0,                              /* tp_is_gc */
+};
+
+}
+
 bool
 IcePy::initLogger(PyObject* module)
 {
@@ -437,6 +1049,20 @@ IcePy::initLogger(PyObject* module)
         return false;
     }
 
+    //
+    // The methods of IcePy.Logger are inherited by IcePy.AsyncLogger.
+    //
+    AsyncLoggerType.tp_base = &LoggerType;
+    if(PyType_Ready(&AsyncLoggerType) < 0)
+    {
+        return false;
+    }
+    type = &AsyncLoggerType;
+    if(PyModule_AddObject(module, STRCAST("AsyncLogger"), reinterpret_cast<PyObject*>(type)) < 0)
+    {
+        return false;
+    }
+
     return true;
 }
 
@@ -449,6 +1075,17 @@ IcePy::cleanupLogger()
     Ice::setProcessLogger(0);
 }
 
+AsyncLoggerPtr
+IcePy::getAsyncLogger(PyObject* obj)
+{
+    if(!PyObject_IsInstance(obj, reinterpret_cast<PyObject*>(&AsyncLoggerType)))
+    {
+        return 0;
+    }
+    LoggerObject* l = reinterpret_cast<LoggerObject*>(obj);
+    return l->logger ? AsyncLoggerPtr::dynamicCast(*l->logger) : AsyncLoggerPtr();
+}
+
 PyObject*
 IcePy::createLogger(const Ice::LoggerPtr& logger)
 {
@@ -13,6 +13,9 @@
 #include <Config.h>
 #include <Util.h>
 #include <Ice/Logger.h>
+#include <IceUtil/Monitor.h>
+#include <IceUtil/Thread.h>
+#include <map>
 
 namespace IcePy
 {
@@ -40,6 +43,112 @@ private:
 };
 typedef IceUtil::Handle<LoggerWrapper> LoggerWrapperPtr;
 
+//
+// The queue shared by an AsyncLogger and its clones. The Ice threads only append the log records
+// to a bounded ring buffer and the queue thread delivers them in batches, acquiring the GIL once
+// per batch, either to a Python Ice.Logger or to the loggers of the logging module. The records
+// that don't fit in the buffer are dropped and counted.
+//
+// The queue thread runs while the queue is attached to at least one communicator, it delivers
+// the pending records before it's joined.
+//
+class AsyncLoggerQueue : public IceUtil::Shared, private IceUtil::Monitor<IceUtil::Mutex>
+{
+public:
+
+    enum Kind { Print, Trace, Warning, Error };
+
+    AsyncLoggerQueue(PyObject*, size_t, size_t);
+    ~AsyncLoggerQueue();
+
+    void attach();
+    void detach(); // Must be called without the GIL.
+
+    //
+    // Queue a record, can be called without the GIL.
+    //
+    void add(Kind, const std::string&, const std::string&, const std::string&);
+
+    //
+    // Waits for the records queued so far to be delivered, or delivers them if the queue
+    // thread isn't running. The GIL must be acquired.
+    //
+    void flush();
+
+    //
+    // Returns a new Ice.AsyncLoggerMetrics object. The GIL must be acquired.
+    //
+    PyObject* getMetrics();
+
+    //
+    // Deliver the records until the given thread is no longer the queue thread and the
+    // queue is empty.
+    //
+    void run(IceUtil::Thread*);
+
+private:
+
+    struct Record
+    {
+        Kind kind;
+        std::string prefix;
+        std::string category;
+        std::string message;
+    };
+
+    void take(std::vector<Record>&, size_t);
+    void deliver(std::vector<Record>&, Ice::Long); // The GIL must be acquired.
+    PyObject* getTarget(const Record&);
+
+    PyObjectHandle _logger; // An Ice.Logger, or None for the logging module.
+    PyObjectHandle _logging;
+    std::map<std::string, PyObjectHandle> _targets;
+
+    const size_t _maxBatchSize;
+    std::vector<Record> _records;
+    size_t _head;
+    size_t _size;
+    IceUtil::ThreadPtr _thread;
+    int _attached;
+
+    Ice::Long _queued;
+    Ice::Long _delivered;
+    Ice::Long _dropped;
+    Ice::Long _reported;
+    Ice::Long _batches;
+};
+typedef IceUtil::Handle<AsyncLoggerQueue> AsyncLoggerQueuePtr;
+
+//
+// The logger of an Ice.AsyncLogger object.
+//
+class AsyncLogger : public Ice::Logger
+{
+public:
+
+    AsyncLogger(const AsyncLoggerQueuePtr&, const std::string&);
+
+    virtual void print(const std::string&);
+    virtual void trace(const std::string&, const std::string&);
+    virtual void warning(const std::string&);
+    virtual void error(const std::string&);
+    virtual std::string getPrefix();
+    virtual Ice::LoggerPtr cloneWithPrefix(const std::string&);
+
+    AsyncLoggerQueuePtr getQueue() const;
+
+private:
+
+    const AsyncLoggerQueuePtr _queue;
+    const std::string _prefix;
+};
+typedef IceUtil::Handle<AsyncLogger> AsyncLoggerPtr;
+
+//
+// Returns the logger of an IcePy.AsyncLogger object, or nil if the object has another type.
+//
+AsyncLoggerPtr getAsyncLogger(PyObject*);
+
 bool initLogger(PyObject*);
 
 void cleanupLogger();
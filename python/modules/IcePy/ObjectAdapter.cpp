@@ -14,6 +14,8 @@
 #include <Communicator.h>
 #include <Current.h>
 #include <Endpoint.h>
+#include <EventLoop.h>
+#include <Evictor.h>
 #include <Operation.h>
 #include <Proxy.h>
 #include <Thread.h>
@@ -644,6 +646,8 @@ adapterDestroy(ObjectAdapterObject* self)
         return 0;
     }
 
+    setEventLoopQueue(*self->adapter, 0);
+
     Py_INCREF(Py_None);
     return Py_None;
 }
@@ -1266,12 +1270,24 @@ adapterAddServantLocator(ObjectAdapterObject* self, PyObject* args)
     PyObject* locatorType = lookupType("Ice.ServantLocator");
     PyObject* locator;
     PyObject* categoryObj;
-    if(!PyArg_ParseTuple(args, STRCAST("O!O"), locatorType, &locator, &categoryObj))
+    if(!PyArg_ParseTuple(args, STRCAST("OO"), &locator, &categoryObj))
     {
         return 0;
     }
 
-    ServantLocatorWrapperPtr wrapper = new ServantLocatorWrapper(locator);
+    //
+    // An Ice.Evictor is a native servant locator, it's used directly.
+    //
+    Ice::ServantLocatorPtr wrapper = getEvictor(locator);
+    if(!wrapper)
+    {
+        if(!PyObject_IsInstance(locator, locatorType))
+        {
+            PyErr_Format(PyExc_TypeError, STRCAST("expected Ice.ServantLocator or Ice.Evictor object"));
+            return 0;
+        }
+        wrapper = new ServantLocatorWrapper(locator);
+    }
 
     string category;
     if(!getStringArg(categoryObj, "category", category))
@@ -1329,6 +1345,12 @@ adapterRemoveServantLocator(ObjectAdapterObject* self, PyObject* args)
         return Py_None;
     }
 
+    EvictorPtr evictor = EvictorPtr::dynamicCast(locator);
+    if(evictor)
+    {
+        return evictor->getObject();
+    }
+
     ServantLocatorWrapperPtr wrapper = ServantLocatorWrapperPtr::dynamicCast(locator);
     assert(wrapper);
     return wrapper->getObject();
@@ -1370,6 +1392,12 @@ adapterFindServantLocator(ObjectAdapterObject* self, PyObject* args)
         return Py_None;
     }
 
+    EvictorPtr evictor = EvictorPtr::dynamicCast(locator);
+    if(evictor)
+    {
+        return evictor->getObject();
+    }
+
     ServantLocatorWrapperPtr wrapper = ServantLocatorWrapperPtr::dynamicCast(locator);
     assert(wrapper);
     return wrapper->getObject();
@@ -1675,6 +1703,56 @@ adapterSetPublishedEndpoints(ObjectAdapterObject* self, PyObject* args)
     return Py_None;
 }
 
+#ifdef WIN32
+extern "C"
+#endif
+static PyObject*
+adapterSetEventLoop(ObjectAdapterObject* self, PyObject* args)
+{
+    PyObject* loop;
+    if(!PyArg_ParseTuple(args, STRCAST("O"), &loop))
+    {
+        return 0;
+    }
+
+    assert(self->adapter);
+    EventLoopQueuePtr queue;
+    if(loop != Py_None)
+    {
+        //
+        // Share the queue of the communicator if it uses the same event loop.
+        //
+        queue = getEventLoopQueue((*self->adapter)->getCommunicator());
+        if(!queue || queue->getLoop() != loop)
+        {
+            try
+            {
+                queue = new EventLoopQueue(loop);
+            }
+            catch(const Ice::InitializationException&)
+            {
+                PyErr_Format(PyExc_ValueError, STRCAST("setEventLoop expects an asyncio event loop or None"));
+                return 0;
+            }
+        }
+    }
+    setEventLoopQueue(*self->adapter, queue);
+
+    Py_INCREF(Py_None);
+    return Py_None;
+}
+
+#ifdef WIN32
+extern "C"
+#endif
+static PyObject*
+adapterGetEventLoop(ObjectAdapterObject* self)
+{
+    assert(self->adapter);
+    EventLoopQueuePtr queue = getEventLoopQueue(*self->adapter);
+    return incRef(queue ? queue->getLoop() : Py_None);
+}
+
 static PyMethodDef AdapterMethods[] =
 {
     { STRCAST("getName"), reinterpret_cast<PyCFunction>(adapterGetName), METH_NOARGS,
@@ -1747,6 +1825,10 @@ static PyMethodDef AdapterMethods[] =
         PyDoc_STR(STRCAST("getPublishedEndpoints() -> None")) },
     { STRCAST("setPublishedEndpoints"), reinterpret_cast<PyCFunction>(adapterSetPublishedEndpoints), METH_VARARGS,
         PyDoc_STR(STRCAST("setPublishedEndpoints(endpoints) -> None")) },
+    { STRCAST("setEventLoop"), reinterpret_cast<PyCFunction>(adapterSetEventLoop), METH_VARARGS,
+        PyDoc_STR(STRCAST("setEventLoop(loop) -> None")) },
+    { STRCAST("getEventLoop"), reinterpret_cast<PyCFunction>(adapterGetEventLoop), METH_NOARGS,
+        PyDoc_STR(STRCAST("getEventLoop() -> asyncio.AbstractEventLoop")) },
     { 0, 0 } /* sentinel */
 };
 
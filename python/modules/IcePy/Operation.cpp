@@ -12,7 +12,10 @@
 #endif
 #include <Operation.h>
 #include <Communicator.h>
+#include <CompletionQueue.h>
 #include <Current.h>
+#include <EventLoop.h>
+#include <Future.h>
 #include <Proxy.h>
 #include <Thread.h>
 #include <Types.h>
@@ -25,6 +28,7 @@
 #include <Ice/Logger.h>
 #include <Ice/ObjectAdapter.h>
 #include <Ice/AsyncResult.h>
+#include <Ice/OutgoingAsync.h>
 #include <Ice/Properties.h>
 #include <Ice/Proxy.h>
 #include <IceUtil/Time.h>
@@ -81,6 +85,7 @@ public:
     ParamInfoPtr returnType;
     ExceptionInfoList exceptions;
     string dispatchName;
+    PyObjectHandle pyDispatchName; // Interned dispatchName, used to look up the servant method.
     bool sendsClasses;
     bool returnsClasses;
     bool pseudoOp;
@@ -105,16 +110,32 @@ public:
 
     virtual PyObject* invoke(PyObject*, PyObject* = 0) = 0;
 
+    enum MappingType { SyncMapping, AsyncMapping, NewAsyncMapping };
+
+    //
+    // Validates the number and the types of the arguments.
+    //
+    static bool validateParams(const OperationPtr&, PyObject*, MappingType);
+
+    //
+    // Validates and marshals the in parameters, the caller starts and ends the encapsulation.
+    //
+    static bool writeParams(const OperationPtr&, PyObject*, MappingType, Ice::OutputStream*);
+
 protected:
 
     //
-    // Helpers for typed invocations.
+    // Marshals the in parameters validated with validateParams.
     //
+    static bool marshalParams(const OperationPtr&, PyObject*, Ice::OutputStream*);
 
-    enum MappingType { SyncMapping, AsyncMapping, NewAsyncMapping };
+    //
+    // Helpers for typed invocations.
+    //
 
     bool prepareRequest(const OperationPtr&, PyObject*, MappingType, Ice::OutputStream*,
                         pair<const Ice::Byte*, const Ice::Byte*>&);
+    bool getEncodedParams(PyObject*, pair<const Ice::Byte*, const Ice::Byte*>&);
     PyObject* unmarshalResults(const OperationPtr&, const pair<const Ice::Byte*, const Ice::Byte*>&);
     PyObject* unmarshalException(const OperationPtr&, const pair<const Ice::Byte*, const Ice::Byte*>&);
     bool validateException(const OperationPtr&, PyObject*) const;
@@ -175,7 +196,7 @@ typedef IceUtil::Handle<AsyncTypedInvocation> AsyncTypedInvocationPtr;
 //
 // Asynchronous invocation with futures.
 //
-class NewAsyncInvocation : public Invocation
+class NewAsyncInvocation : public Invocation, public CompletionHandler
 {
 public:
 
@@ -184,15 +205,30 @@ public:
 
     virtual PyObject* invoke(PyObject*, PyObject* = 0);
 
+    //
+    // Called by the Ice threads. With a completion queue, the completions are queued and the
+    // queue thread calls completeResponse, completeException or completeSent.
+    //
     void response(bool, const pair<const Ice::Byte*, const Ice::Byte*>&);
     void exception(const Ice::Exception&);
     void sent(bool);
 
+    virtual void completeResponse(bool, const pair<const Ice::Byte*, const Ice::Byte*>&);
+    virtual void completeException(const Ice::Exception&);
+    virtual void completeSent(bool);
+
 protected:
 
     virtual Ice::AsyncResultPtr handleInvoke(PyObject*, PyObject*) = 0;
     virtual void handleResponse(PyObject*, bool, const pair<const Ice::Byte*, const Ice::Byte*>&) = 0;
 
+    //
+    // Complete the future. With an event loop, the asyncio future is completed later by the event loop thread.
+    //
+    void setResult(PyObject*, PyObject*);
+    void setException(PyObject*, PyObject*);
+    void setSent(PyObject*, bool);
+
     PyObject* _pyProxy;
     string _operation;
     bool _twoway;
@@ -203,6 +239,8 @@ protected:
     bool _ok;
     vector<Ice::Byte> _results;
     PyObject* _exception;
+    EventLoopQueuePtr _eventLoop;
+    CompletionQueuePtr _completionQueue;
 };
 typedef IceUtil::Handle<NewAsyncInvocation> NewAsyncInvocationPtr;
 
@@ -295,7 +333,7 @@ public:
 
 protected:
 
-    void dispatchImpl(PyObject*, const string&, PyObject*, const Ice::Current&);
+    void dispatchImpl(PyObject*, const string&, PyObject*, PyObject*, const Ice::Current&);
 };
 typedef IceUtil::Handle<Upcall> UpcallPtr;
 
@@ -416,28 +454,109 @@ struct MarshaledResultObject
     Ice::OutputStream* out;
 };
 
+//
+// The in parameters of an operation marshaled once by Operation.encode, to be sent to any number
+// of proxies. The parameters are marshaled again, once, for each other encoding version.
+//
+typedef map<Ice::EncodingVersion, vector<Ice::Byte> > EncapsulationMap;
+
+struct EncodedArgsObject
+{
+    PyObject_HEAD
+    OperationPtr* op;
+    PyObject* args;
+    EncapsulationMap* encaps;
+};
+
 extern PyTypeObject MarshaledResultType;
+extern PyTypeObject EncodedArgsType;
 
 extern PyTypeObject OperationType;
 
-class UserExceptionFactory : public Ice::UserExceptionFactory
+}
+
+namespace
+{
+
+//
+// Interned attribute names, created by initOperation.
+//
+PyObject* iceDispatchName = 0;
+PyObject* iceDispatchEventLoopName = 0;
+PyObject* iceInvokeName = 0;
+PyObject* memoryViewName = 0;
+
+const string iceInvokeOperationName = "ice_invoke";
+
+#if PY_VERSION_HEX >= 0x03000000
+//
+// Provides access to the contents of an object that supports the buffer protocol, such as
+// bytes, bytearray or memoryview, without copying them. The buffer is released by the
+// destructor, which must be called with the GIL acquired.
+//
+class ByteBuffer : private IceUtil::noncopyable
 {
 public:
 
-    virtual void createAndThrow(const string& id)
+    ByteBuffer() :
+        _acquired(false)
+    {
+    }
+
+    ~ByteBuffer()
+    {
+        if(_acquired)
+        {
+            PyBuffer_Release(&_view);
+        }
+    }
+
+    bool get(PyObject* obj, pair<const Ice::Byte*, const Ice::Byte*>& bytes)
     {
-        ExceptionInfoPtr info = lookupExceptionInfo(id);
-        if(info)
+        assert(!_acquired);
+        if(PyObject_GetBuffer(obj, &_view, PyBUF_C_CONTIGUOUS) < 0)
+        {
+            return false;
+        }
+        _acquired = true;
+
+        bytes.first = 0;
+        bytes.second = 0;
+        if(_view.len > 0)
         {
-            throw ExceptionReader(info);
+            bytes.first = static_cast<const Ice::Byte*>(_view.buf);
+            bytes.second = bytes.first + _view.len;
         }
+        return true;
     }
+
+private:
+
+    Py_buffer _view;
+    bool _acquired;
 };
 
-}
+#endif
 
-namespace
+//
+// Returns the name of the operation's Python method for the given mapping, used in error messages.
+//
+string
+mappedName(const OperationPtr& op, Invocation::MappingType mapping)
 {
+    if(mapping == Invocation::NewAsyncMapping)
+    {
+        return op->name + "Async";
+    }
+    else if(mapping == Invocation::AsyncMapping)
+    {
+        return "begin_" + op->name;
+    }
+    else
+    {
+        return fixIdent(op->name);
+    }
+}
 
 OperationPtr
 getOperation(PyObject* p)
@@ -500,6 +619,139 @@ callSent(PyObject* method, bool sentSynchronously, bool passArg)
 
 }
 
+//
+// EncodedArgs operations
+//
+
+static EncodedArgsObject*
+encodedArgsNew(PyTypeObject* type)
+{
+    EncodedArgsObject* self = reinterpret_cast<EncodedArgsObject*>(type->tp_alloc(type, 0));
+    if(!self)
+    {
+        return 0;
+    }
+    self->op = 0;
+    self->args = 0;
+    self->encaps = 0;
+    return self;
+}
+
+#ifdef WIN32
+extern "C"
+#endif
+static void
+encodedArgsDealloc(EncodedArgsObject* self)
+{
+    delete self->op;
+    Py_XDECREF(self->args);
+    delete self->encaps;
+    Py_TYPE(self)->tp_free(reinterpret_cast<PyObject*>(self));
+}
+
+//
+// Returns the encapsulation of the in parameters for the given encoding, marshaling them if this
+// encoding wasn't used yet. Returns 0 if the marshaling fails.
+//
+static const vector<Ice::Byte>*
+encodedArgsGet(EncodedArgsObject* self, const Ice::EncodingVersion& encoding)
+{
+    EncapsulationMap::const_iterator p = self->encaps->find(encoding);
+    if(p != self->encaps->end())
+    {
+        return &p->second;
+    }
+
+    //
+    // The parameters are marshaled without a communicator: classes use the compact format unless
+    // the operation has the format metadata, and strings are not converted by string converters.
+    //
+    const OperationPtr& op = *self->op;
+    Ice::OutputStream os;
+    os.startEncapsulation(encoding, op->format);
+    if(!Invocation::writeParams(op, self->args, Invocation::SyncMapping, &os))
+    {
+        return 0;
+    }
+    os.endEncapsulation();
+
+    //
+    // Marshaling the parameters might have let another thread marshal them for the same encoding,
+    // keep the first encapsulation since it might already be used without the GIL.
+    //
+    pair<const Ice::Byte*, const Ice::Byte*> encaps = os.finished();
+    pair<EncapsulationMap::iterator, bool> q =
+        self->encaps->insert(make_pair(encoding, vector<Ice::Byte>(encaps.first, encaps.second)));
+    return &q.first->second;
+}
+
+#ifdef WIN32
+extern "C"
+#endif
+static PyObject*
+encodedArgsInvoke(EncodedArgsObject* self, PyObject* args, PyObject* kwds)
+{
+    static char* argNames[] =
+    {
+        const_cast<char*>("proxy"),
+        const_cast<char*>("context"),
+        0
+    };
+    PyObject* proxy;
+    PyObject* ctx = Py_None;
+    if(!PyArg_ParseTupleAndKeywords(args, kwds, STRCAST("O!|O"), argNames, &ProxyType, &proxy, &ctx))
+    {
+        return 0;
+    }
+
+    PyObjectHandle opArgs = Py_BuildValue(STRCAST("(OO)"), reinterpret_cast<PyObject*>(self), ctx);
+    if(!opArgs.get())
+    {
+        return 0;
+    }
+
+    InvocationPtr i = new SyncTypedInvocation(getProxy(proxy), *self->op);
+    return i->invoke(opArgs.get());
+}
+
+#ifdef WIN32
+extern "C"
+#endif
+static PyObject*
+encodedArgsInvokeAsync(EncodedArgsObject* self, PyObject* args, PyObject* kwds)
+{
+    static char* argNames[] =
+    {
+        const_cast<char*>("proxy"),
+        const_cast<char*>("context"),
+        0
+    };
+    PyObject* proxy;
+    PyObject* ctx = Py_None;
+    if(!PyArg_ParseTupleAndKeywords(args, kwds, STRCAST("O!|O"), argNames, &ProxyType, &proxy, &ctx))
+    {
+        return 0;
+    }
+
+    PyObjectHandle opArgs = Py_BuildValue(STRCAST("(OO)"), reinterpret_cast<PyObject*>(self), ctx);
+    if(!opArgs.get())
+    {
+        return 0;
+    }
+
+    InvocationPtr i = new NewAsyncTypedInvocation(getProxy(proxy), proxy, *self->op);
+    return i->invoke(opArgs.get());
+}
+
+#ifdef WIN32
+extern "C"
+#endif
+static PyObject*
+encodedArgsGetOperation(EncodedArgsObject* self, PyObject* /*args*/)
+{
+    return createString((*self->op)->name);
+}
+
 #ifdef WIN32
 extern "C"
 #endif
@@ -540,8 +792,16 @@ operationInit(OperationObject* self, PyObject* args, PyObject* /*kwds*/)
         return -1;
     }
 
-    OperationPtr op = new Operation(name, mode, sendMode, amd, format, metaData, inParams, outParams, returnType,
-                                    exceptions);
+    OperationPtr op;
+    try
+    {
+        op = new Operation(name, mode, sendMode, amd, format, metaData, inParams, outParams, returnType,
+                           exceptions);
+    }
+    catch(const AbortMarshaling&)
+    {
+        return -1;
+    }
     self->op = new OperationPtr(op);
 
     return 0;
@@ -657,6 +917,48 @@ operationDeprecate(OperationObject* self, PyObject* args)
     return incRef(Py_None);
 }
 
+#ifdef WIN32
+extern "C"
+#endif
+static PyObject*
+operationEncode(OperationObject* self, PyObject* args)
+{
+    PyObject* opArgs;
+    if(!PyArg_ParseTuple(args, STRCAST("O!"), &PyTuple_Type, &opArgs))
+    {
+        return 0;
+    }
+
+    assert(self->op);
+    PyObjectHandle obj = reinterpret_cast<PyObject*>(encodedArgsNew(&EncodedArgsType));
+    if(!obj.get())
+    {
+        return 0;
+    }
+
+    EncodedArgsObject* encoded = reinterpret_cast<EncodedArgsObject*>(obj.get());
+    encoded->op = new OperationPtr(*self->op);
+    encoded->args = incRef(opArgs);
+    encoded->encaps = new EncapsulationMap;
+
+    //
+    // Marshal the parameters with the default encoding, most proxies use it.
+    //
+    if((*self->op)->inParams.empty())
+    {
+        if(!Invocation::validateParams(*self->op, opArgs, Invocation::SyncMapping))
+        {
+            return 0;
+        }
+    }
+    else if(!encodedArgsGet(encoded, Ice::currentEncoding))
+    {
+        return 0;
+    }
+
+    return obj.release();
+}
+
 //
 // DoneCallback operations
 //
@@ -1261,6 +1563,12 @@ IcePy::Operation::Operation(const char* n, PyObject* m, PyObject* sm, int amdFla
     //
     amd = amdFlag ? true : false;
     dispatchName = fixIdent(name); // Use the same dispatch name regardless of AMD.
+    pyDispatchName = createInternedString(dispatchName);
+    if(!pyDispatchName.get())
+    {
+        assert(PyErr_Occurred());
+        throw AbortMarshaling();
+    }
 
     //
     // format
@@ -1563,6 +1871,21 @@ static PyMethodDef OperationMethods[] =
       PyDoc_STR(STRCAST("internal function")) },
     { STRCAST("deprecate"), reinterpret_cast<PyCFunction>(operationDeprecate), METH_VARARGS,
       PyDoc_STR(STRCAST("internal function")) },
+    { STRCAST("encode"), reinterpret_cast<PyCFunction>(operationEncode), METH_VARARGS,
+      PyDoc_STR(STRCAST("internal function")) },
+    { 0, 0 } /* sentinel */
+};
+
+static PyMethodDef EncodedArgsMethods[] =
+{
+    { STRCAST("invoke"), reinterpret_cast<PyCFunction>(encodedArgsInvoke), METH_VARARGS | METH_KEYWORDS,
+      PyDoc_STR(STRCAST("invoke(proxy[, context]) -> results\n\n"
+                        "Invokes the operation on the given proxy with the encoded arguments.")) },
+    { STRCAST("invokeAsync"), reinterpret_cast<PyCFunction>(encodedArgsInvokeAsync), METH_VARARGS | METH_KEYWORDS,
+      PyDoc_STR(STRCAST("invokeAsync(proxy[, context]) -> future\n\n"
+                        "Invokes the operation asynchronously on the given proxy with the encoded arguments.")) },
+    { STRCAST("getOperation"), reinterpret_cast<PyCFunction>(encodedArgsGetOperation), METH_NOARGS,
+      PyDoc_STR(STRCAST("returns the name of the operation")) },
     { 0, 0 } /* sentinel */
 };
 
@@ -1849,6 +2172,54 @@ PyTypeObject MarshaledResultType =
     0,                               /* tp_is_gc */
 };
 
+PyTypeObject EncodedArgsType =
+{
+    /* The ob_type field must be initialized in the module init function
+     * to be portable to Windows without using C++. */
+    PyVarObject_HEAD_INIT(0, 0)
+    STRCAST("IcePy.EncodedArgs"),    /* tp_name */
+    sizeof(EncodedArgsObject),       /* tp_basicsize */
+    0,                               /* tp_itemsize */
+    /* methods */
+    reinterpret_cast<destructor>(encodedArgsDealloc), /* tp_dealloc */
+    0,                               /* tp_print */
+    0,                               /* tp_getattr */
+    0,                               /* tp_setattr */
+    0,                               /* tp_reserved */
+    0,                               /* tp_repr */
+    0,                               /* tp_as_number */
+    0,                               /* tp_as_sequence */
+    0,                               /* tp_as_mapping */
+    0,                               /* tp_hash */
+    0,                               /* tp_call */
+    0,                               /* tp_str */
+    0,                               /* tp_getattro */
+    0,                               /* tp_setattro */
+    0,                               /* tp_as_buffer */
+    Py_TPFLAGS_DEFAULT,              /* tp_flags */
+    PyDoc_STR(STRCAST("The encoded in parameters of an operation invocation.")), /* tp_doc */
+    0,                               /* tp_traverse */
+    0,                               /* tp_clear */
+    0,                               /* tp_richcompare */
+    0,                               /* tp_weaklistoffset */
+    0,                               /* tp_iter */
+    0,                               /* tp_iternext */
+    EncodedArgsMethods,              /* tp_methods */
+    0,                               /* tp_members */
+    0,                               /* tp_getset */
+    0,                               /* tp_base */
+    0,                               /* tp_dict */
+    0,                               /* tp_descr_get */
+    0,                               /* tp_descr_set */
+    0,                               /* tp_dictoffset */
+    0,                               /* tp_init */
+    0,                               /* tp_alloc */
+    0,                               /* tp_new */
+    0,                               /* tp_free */
+    0,                               /* tp_is_gc */
+};
+
+
 }
 
 bool
@@ -1904,6 +2275,25 @@ IcePy::initOperation(PyObject* module)
         return false;
     }
 
+    if(PyType_Ready(&EncodedArgsType) < 0)
+    {
+        return false;
+    }
+    PyTypeObject* eaType = &EncodedArgsType; // Necessary to prevent GCC's strict-alias warnings.
+    if(PyModule_AddObject(module, STRCAST("EncodedArgs"), reinterpret_cast<PyObject*>(eaType)) < 0)
+    {
+        return false;
+    }
+
+    iceDispatchName = createInternedString("_iceDispatch");
+    iceDispatchEventLoopName = createInternedString("_iceDispatchEventLoop");
+    iceInvokeName = createInternedString("ice_invoke");
+    memoryViewName = createInternedString("memoryView");
+    if(!iceDispatchName || !iceDispatchEventLoopName || !iceInvokeName || !memoryViewName)
+    {
+        return false;
+    }
+
     return true;
 }
 
@@ -1919,9 +2309,53 @@ bool
 IcePy::Invocation::prepareRequest(const OperationPtr& op, PyObject* args, MappingType mapping, Ice::OutputStream* os,
                                   pair<const Ice::Byte*, const Ice::Byte*>& params)
 {
-    assert(PyTuple_Check(args));
     params.first = params.second = static_cast<const Ice::Byte*>(0);
 
+    if(op->inParams.empty())
+    {
+        //
+        // Only validate the number of arguments, the request has an empty encapsulation.
+        //
+        return writeParams(op, args, mapping, os);
+    }
+
+    os->startEncapsulation(_prx->ice_getEncodingVersion(), op->format);
+    if(!writeParams(op, args, mapping, os))
+    {
+        return false;
+    }
+    os->endEncapsulation();
+    params = os->finished();
+    return true;
+}
+
+bool
+IcePy::Invocation::getEncodedParams(PyObject* encoded, pair<const Ice::Byte*, const Ice::Byte*>& params)
+{
+    assert(PyObject_TypeCheck(encoded, &EncodedArgsType));
+    EncodedArgsObject* obj = reinterpret_cast<EncodedArgsObject*>(encoded);
+
+    params.first = params.second = static_cast<const Ice::Byte*>(0);
+    if((*obj->op)->inParams.empty())
+    {
+        return true; // The request has an empty encapsulation.
+    }
+
+    const vector<Ice::Byte>* encaps = encodedArgsGet(obj, _prx->ice_getEncodingVersion());
+    if(!encaps)
+    {
+        return false;
+    }
+    params.first = &(*encaps)[0];
+    params.second = params.first + encaps->size();
+    return true;
+}
+
+bool
+IcePy::Invocation::validateParams(const OperationPtr& op, PyObject* args, MappingType mapping)
+{
+    assert(PyTuple_Check(args));
+
     //
     // Validate the number of arguments.
     //
@@ -1929,109 +2363,92 @@ IcePy::Invocation::prepareRequest(const OperationPtr& op, PyObject* args, Mappin
     Py_ssize_t paramCount = static_cast<Py_ssize_t>(op->inParams.size());
     if(argc != paramCount)
     {
-        string opName;
-        if(mapping == NewAsyncMapping)
-        {
-            opName = op->name + "Async";
-        }
-        else if(mapping == AsyncMapping)
-        {
-            opName = "begin_" + op->name;
-        }
-        else
-        {
-            opName = fixIdent(op->name);
-        }
-        PyErr_Format(PyExc_RuntimeError, STRCAST("%s expects %d in parameters"), opName.c_str(),
+        PyErr_Format(PyExc_RuntimeError, STRCAST("%s expects %d in parameters"), mappedName(op, mapping).c_str(),
                      static_cast<int>(paramCount));
         return false;
     }
 
-    if(!op->inParams.empty())
+    //
+    // Validate the supplied arguments.
+    //
+    for(ParamInfoList::iterator p = op->inParams.begin(); p != op->inParams.end(); ++p)
     {
-        try
+        ParamInfoPtr info = *p;
+        PyObject* arg = PyTuple_GET_ITEM(args, info->pos);
+        if((!info->optional || arg != Unset) && !info->type->validate(arg))
         {
-            //
-            // Marshal the in parameters.
-            //
-            os->startEncapsulation(_prx->ice_getEncodingVersion(), op->format);
+            PyErr_Format(PyExc_ValueError, STRCAST("invalid value for argument %" PY_FORMAT_SIZE_T "d in operation `%s'"),
+                         info->pos + 1, const_cast<char*>(mappedName(op, mapping).c_str()));
+            return false;
+        }
+    }
 
-            ObjectMap objectMap;
-            ParamInfoList::iterator p;
+    return true;
+}
 
-            //
-            // Validate the supplied arguments.
-            //
-            for(p = op->inParams.begin(); p != op->inParams.end(); ++p)
-            {
-                ParamInfoPtr info = *p;
-                PyObject* arg = PyTuple_GET_ITEM(args, info->pos);
-                if((!info->optional || arg != Unset) && !info->type->validate(arg))
-                {
-                    string name;
-                    if(mapping == NewAsyncMapping)
-                    {
-                        name = op->name + "Async";
-                    }
-                    else if(mapping == AsyncMapping)
-                    {
-                        name = "begin_" + op->name;
-                    }
-                    else
-                    {
-                        name = fixIdent(op->name);
-                    }
-                    PyErr_Format(PyExc_ValueError, STRCAST("invalid value for argument %" PY_FORMAT_SIZE_T "d in operation `%s'"),
-                                 info->pos + 1, const_cast<char*>(name.c_str()));
-                    return false;
-                }
-            }
+bool
+IcePy::Invocation::writeParams(const OperationPtr& op, PyObject* args, MappingType mapping, Ice::OutputStream* os)
+{
+    return validateParams(op, args, mapping) && marshalParams(op, args, os);
+}
 
-            //
-            // Marshal the required parameters.
-            //
-            for(p = op->inParams.begin(); p != op->inParams.end(); ++p)
-            {
-                ParamInfoPtr info = *p;
-                if(!info->optional)
-                {
-                    PyObject* arg = PyTuple_GET_ITEM(args, info->pos);
-                    info->type->marshal(arg, os, &objectMap, false, &info->metaData);
-                }
-            }
+bool
+IcePy::Invocation::marshalParams(const OperationPtr& op, PyObject* args, Ice::OutputStream* os)
+{
+    if(op->inParams.empty())
+    {
+        return true;
+    }
 
-            //
-            // Marshal the optional parameters.
-            //
-            for(p = op->optionalInParams.begin(); p != op->optionalInParams.end(); ++p)
+    try
+    {
+        //
+        // Marshal the in parameters, the caller starts and ends the encapsulation.
+        //
+        ObjectMap objectMap;
+        ParamInfoList::iterator p;
+
+        //
+        // Marshal the required parameters.
+        //
+        for(p = op->inParams.begin(); p != op->inParams.end(); ++p)
+        {
+            ParamInfoPtr info = *p;
+            if(!info->optional)
             {
-                ParamInfoPtr info = *p;
                 PyObject* arg = PyTuple_GET_ITEM(args, info->pos);
-                if(arg != Unset && os->writeOptional(info->tag, info->type->optionalFormat()))
-                {
-                    info->type->marshal(arg, os, &objectMap, true, &info->metaData);
-                }
+                info->type->marshal(arg, os, &objectMap, false, &info->metaData);
             }
+        }
 
-            if(op->sendsClasses)
+        //
+        // Marshal the optional parameters.
+        //
+        for(p = op->optionalInParams.begin(); p != op->optionalInParams.end(); ++p)
+        {
+            ParamInfoPtr info = *p;
+            PyObject* arg = PyTuple_GET_ITEM(args, info->pos);
+            if(arg != Unset && os->writeOptional(info->tag, info->type->optionalFormat()))
             {
-                os->writePendingValues();
+                info->type->marshal(arg, os, &objectMap, true, &info->metaData);
             }
-
-            os->endEncapsulation();
-            params = os->finished();
-        }
-        catch(const AbortMarshaling&)
-        {
-            assert(PyErr_Occurred());
-            return false;
         }
-        catch(const Ice::Exception& ex)
+
+        if(op->sendsClasses)
         {
-            setPythonException(ex);
-            return false;
+            os->writePendingValues();
         }
     }
+    catch(const AbortMarshaling&)
+    {
+        assert(PyErr_Occurred());
+        return false;
+    }
+    catch(const Ice::Exception& ex)
+    {
+        setPythonException(ex);
+        return false;
+    }
 
     return true;
 }
@@ -2054,7 +2471,7 @@ IcePy::Invocation::unmarshalResults(const OperationPtr& op, const pair<const Ice
         // Store a pointer to a local StreamUtil object as the stream's closure.
         // This is necessary to support object unmarshaling (see ObjectReader).
         //
-        StreamUtil util;
+        StreamUtil util(_communicator);
         assert(!is.getClosure());
         is.setClosure(&util);
 
@@ -2124,7 +2541,7 @@ IcePy::Invocation::unmarshalException(const OperationPtr& op, const pair<const I
     // Store a pointer to a local StreamUtil object as the stream's closure.
     // This is necessary to support object unmarshaling (see ObjectReader).
     //
-    StreamUtil util;
+    StreamUtil util(_communicator);
     assert(!is.getClosure());
     is.setClosure(&util);
 
@@ -2217,53 +2634,135 @@ PyObject*
 IcePy::SyncTypedInvocation::invoke(PyObject* args, PyObject* /* kwds */)
 {
     assert(PyTuple_Check(args));
-    assert(PyTuple_GET_SIZE(args) == 2); // Format is ((params...), context|None)
+    assert(PyTuple_GET_SIZE(args) == 2); // Format is ((params...)|EncodedArgs, context|None)
     PyObject* pyparams = PyTuple_GET_ITEM(args, 0);
-    assert(PyTuple_Check(pyparams));
+    const bool encoded = PyObject_TypeCheck(pyparams, &EncodedArgsType);
+    assert(encoded || PyTuple_Check(pyparams));
     PyObject* pyctx = PyTuple_GET_ITEM(args, 1);
 
-    //
-    // Marshal the input parameters to a byte sequence.
-    //
-    Ice::OutputStream os(_communicator);
-    pair<const Ice::Byte*, const Ice::Byte*> params;
-    if(!prepareRequest(_op, pyparams, SyncMapping, &os, params))
-    {
-        return 0;
-    }
-
     try
     {
         checkTwowayOnly(_op, _prx);
 
+        Ice::Context ctx;
+        if(pyctx != Py_None)
+        {
+            if(!PyDict_Check(pyctx))
+            {
+                PyErr_Format(PyExc_ValueError, STRCAST("context argument must be None or a dictionary"));
+                return 0;
+            }
+
+            if(!dictionaryToContext(pyctx, ctx))
+            {
+                return 0;
+            }
+        }
+        const Ice::Context& context = pyctx != Py_None ? ctx : Ice::noExplicitContext;
+
+        IceInternal::OutgoingAsyncPtr out =
+            new IceInternal::CallbackOutgoing(_prx, _op->name, IceInternal::dummyCallback, 0, true);
+
+        if(_prx->ice_isBatchOneway() || _prx->ice_isBatchDatagram())
+        {
+            //
+            // The batch request queue is locked from the preparation of a batch request until the request
+            // is queued, the parameters are marshaled before so that no Python code runs in between.
+            //
+            Ice::OutputStream os(_communicator);
+            pair<const Ice::Byte*, const Ice::Byte*> params;
+            if(encoded ? !getEncodedParams(pyparams, params) : !prepareRequest(_op, pyparams, SyncMapping, &os, params))
+            {
+                return 0;
+            }
+
+            AllowThreads allowThreads; // Release Python's global interpreter lock during remote invocations.
+            try
+            {
+                out->prepare(_op->name, _op->sendMode, context);
+                out->writeParamEncaps(params.first, static_cast<Ice::Int>(params.second - params.first));
+                out->invoke(_op->name);
+            }
+            catch(const Ice::Exception& ex)
+            {
+                out->abort(ex);
+            }
+            out->_waitForResponse();
+            return incRef(Py_None);
+        }
+
         //
-        // Invoke the operation.
+        // Marshal the input parameters directly into the request, and unmarshal the results directly
+        // from the reply instead of copying them to and from byte sequences as ice_invoke does.
         //
-        vector<Ice::Byte> result;
-        bool status;
+        if(encoded)
         {
-            if(pyctx != Py_None)
+            //
+            // The parameters are already marshaled, copy their encapsulation into the request.
+            //
+            pair<const Ice::Byte*, const Ice::Byte*> params;
+            if(!getEncodedParams(pyparams, params))
             {
-                Ice::Context ctx;
-
-                if(!PyDict_Check(pyctx))
-                {
-                    PyErr_Format(PyExc_ValueError, STRCAST("context argument must be None or a dictionary"));
-                    return 0;
-                }
+                return 0;
+            }
+            out->prepare(_op->name, _op->sendMode, context);
+            out->writeParamEncaps(params.first, static_cast<Ice::Int>(params.second - params.first));
+        }
+        else
+        {
+            //
+            // Validate the arguments before preparing the request, which attaches the invocation
+            // observer, so that invalid arguments aren't reported as a failed invocation.
+            //
+            if(!validateParams(_op, pyparams, SyncMapping))
+            {
+                return 0;
+            }
 
-                if(!dictionaryToContext(pyctx, ctx))
+            out->prepare(_op->name, _op->sendMode, context);
+            if(_op->inParams.empty())
+            {
+                out->writeEmptyParams();
+            }
+            else
+            {
+                if(!marshalParams(_op, pyparams, out->startWriteParams(_op->format)))
                 {
+                    //
+                    // A nested value is invalid, this is only detected while marshaling.
+                    //
+                    out->abort(Ice::MarshalException(__FILE__, __LINE__, "invalid parameters"));
                     return 0;
                 }
+                out->endWriteParams();
+            }
+        }
 
-                AllowThreads allowThreads; // Release Python's global interpreter lock during remote invocations.
-                status = _prx->ice_invoke(_op->name, _op->sendMode, params, result, ctx);
+        //
+        // Invoke the operation.
+        //
+        bool status;
+        pair<const Ice::Byte*, const Ice::Byte*> rb(static_cast<const Ice::Byte*>(0),
+                                                    static_cast<const Ice::Byte*>(0));
+        {
+            AllowThreads allowThreads; // Release Python's global interpreter lock during remote invocations.
+            try
+            {
+                out->invoke(_op->name);
             }
-            else
+            catch(const Ice::Exception& ex)
             {
-                AllowThreads allowThreads; // Release Python's global interpreter lock during remote invocations.
-                status = _prx->ice_invoke(_op->name, _op->sendMode, params, result);
+                out->abort(ex);
+            }
+            status = out->_waitForResponse();
+            if(_prx->ice_isTwoway())
+            {
+                //
+                // The encapsulation remains valid as long as the invocation.
+                //
+                Ice::Int sz;
+                out->_readParamEncaps(rb.first, sz);
+                rb.second = rb.first + sz;
             }
         }
 
@@ -2277,13 +2776,6 @@ IcePy::SyncTypedInvocation::invoke(PyObject* args, PyObject* /* kwds */)
                 //
                 // Unmarshal a user exception.
                 //
-                pair<const Ice::Byte*, const Ice::Byte*> rb(static_cast<const Ice::Byte*>(0),
-                                                            static_cast<const Ice::Byte*>(0));
-                if(!result.empty())
-                {
-                    rb.first = &result[0];
-                    rb.second = &result[0] + result.size();
-                }
                 PyObjectHandle ex = unmarshalException(_op, rb);
 
                 //
@@ -2298,13 +2790,6 @@ IcePy::SyncTypedInvocation::invoke(PyObject* args, PyObject* /* kwds */)
                 // Unmarshal the results. If there is more than one value to be returned, then return them
                 // in a tuple of the form (result, outParam1, ...). Otherwise just return the value.
                 //
-                pair<const Ice::Byte*, const Ice::Byte*> rb(static_cast<const Ice::Byte*>(0),
-                                                            static_cast<const Ice::Byte*>(0));
-                if(!result.empty())
-                {
-                    rb.first = &result[0];
-                    rb.second = &result[0] + result.size();
-                }
                 PyObjectHandle results = unmarshalResults(_op, rb);
                 if(!results.get())
                 {
@@ -2680,7 +3165,8 @@ IcePy::AsyncTypedInvocation::checkAsyncTwowayOnly(const Ice::ObjectPrx& proxy) c
 //
 IcePy::NewAsyncInvocation::NewAsyncInvocation(const Ice::ObjectPrx& prx, PyObject* pyProxy, const string& operation)
     : Invocation(prx), _pyProxy(pyProxy), _operation(operation), _twoway(prx->ice_isTwoway()), _sent(false),
-      _sentSynchronously(false), _done(false), _future(0), _ok(false), _exception(0)
+      _sentSynchronously(false), _done(false), _future(0), _ok(false), _exception(0),
+      _eventLoop(getEventLoopQueue(_communicator)), _completionQueue(getCompletionQueue(_communicator))
 {
     Py_INCREF(_pyProxy);
 }
@@ -2743,15 +3229,23 @@ IcePy::NewAsyncInvocation::invoke(PyObject* args, PyObject* kwds)
     // allowed to run!
     //
 
-    PyObjectHandle communicatorObj = getCommunicatorWrapper(_communicator);
-
-    PyObjectHandle asyncResultObj = createAsyncResult(result, _pyProxy, 0, communicatorObj.get());
-    if(!asyncResultObj.get())
+    PyObjectHandle future;
+    if(_eventLoop)
     {
-        return 0;
+        future = _eventLoop->createFuture();
     }
+    else
+    {
+        PyObjectHandle communicatorObj = getCommunicatorWrapper(_communicator);
+
+        PyObjectHandle asyncResultObj = createAsyncResult(result, _pyProxy, 0, communicatorObj.get());
+        if(!asyncResultObj.get())
+        {
+            return 0;
+        }
 
-    PyObjectHandle future = createFuture(_operation, asyncResultObj.get()); // Calls into Python code.
+        future = createFuture(_operation, asyncResultObj.get());
+    }
     if(!future.get())
     {
         return 0;
@@ -2764,7 +3258,7 @@ IcePy::NewAsyncInvocation::invoke(PyObject* args, PyObject* kwds)
     {
         if(_sent)
         {
-            PyObjectHandle tmp = callMethod(future.get(), "set_sent", _sentSynchronously ? getTrue() : getFalse());
+            setSent(future.get(), _sentSynchronously);
             if(PyErr_Occurred())
             {
                 return 0;
@@ -2775,7 +3269,7 @@ IcePy::NewAsyncInvocation::invoke(PyObject* args, PyObject* kwds)
                 //
                 // For a oneway/datagram invocation, we consider it complete when sent.
                 //
-                tmp = callMethod(future.get(), "set_result", Py_None);
+                setResult(future.get(), Py_None);
                 if(PyErr_Occurred())
                 {
                     return 0;
@@ -2787,7 +3281,7 @@ IcePy::NewAsyncInvocation::invoke(PyObject* args, PyObject* kwds)
         {
             if(_exception)
             {
-                PyObjectHandle tmp = callMethod(future.get(), "set_exception", _exception);
+                setException(future.get(), _exception);
                 if(PyErr_Occurred())
                 {
                     return 0;
@@ -2811,7 +3305,7 @@ IcePy::NewAsyncInvocation::invoke(PyObject* args, PyObject* kwds)
     }
     else
     {
-        PyObjectHandle tmp = callMethod(future.get(), "set_result", Py_None);
+        setResult(future.get(), Py_None);
         if(PyErr_Occurred())
         {
             return 0;
@@ -2823,8 +3317,45 @@ IcePy::NewAsyncInvocation::invoke(PyObject* args, PyObject* kwds)
 void
 IcePy::NewAsyncInvocation::response(bool ok, const pair<const Ice::Byte*, const Ice::Byte*>& results)
 {
+    if(_completionQueue)
+    {
+        _completionQueue->response(this, ok, results);
+        return;
+    }
+
+    AdoptThread adoptThread; // Ensure the current thread is able to call into Python.
+    completeResponse(ok, results);
+}
+
+void
+IcePy::NewAsyncInvocation::exception(const Ice::Exception& ex)
+{
+    if(_completionQueue)
+    {
+        _completionQueue->exception(this, ex);
+        return;
+    }
+
+    AdoptThread adoptThread; // Ensure the current thread is able to call into Python.
+    completeException(ex);
+}
+
+void
+IcePy::NewAsyncInvocation::sent(bool sentSynchronously)
+{
+    if(_completionQueue)
+    {
+        _completionQueue->sent(this, sentSynchronously);
+        return;
+    }
+
     AdoptThread adoptThread; // Ensure the current thread is able to call into Python.
+    completeSent(sentSynchronously);
+}
 
+void
+IcePy::NewAsyncInvocation::completeResponse(bool ok, const pair<const Ice::Byte*, const Ice::Byte*>& results)
+{
     if(!_future)
     {
         //
@@ -2866,10 +3397,8 @@ IcePy::NewAsyncInvocation::response(bool ok, const pair<const Ice::Byte*, const
 }
 
 void
-IcePy::NewAsyncInvocation::exception(const Ice::Exception& ex)
+IcePy::NewAsyncInvocation::completeException(const Ice::Exception& ex)
 {
-    AdoptThread adoptThread; // Ensure the current thread is able to call into Python.
-
     PyObjectHandle exh = convertException(ex); // NOTE: This can release the GIL
 
     if(!_future)
@@ -2887,7 +3416,7 @@ IcePy::NewAsyncInvocation::exception(const Ice::Exception& ex)
     _done = true;
 
     assert(exh.get());
-    PyObjectHandle tmp = callMethod(future.get(), "set_exception", exh.get());
+    setException(future.get(), exh.get());
     if(PyErr_Occurred())
     {
         handleException();
@@ -2895,10 +3424,8 @@ IcePy::NewAsyncInvocation::exception(const Ice::Exception& ex)
 }
 
 void
-IcePy::NewAsyncInvocation::sent(bool sentSynchronously)
+IcePy::NewAsyncInvocation::completeSent(bool sentSynchronously)
 {
-    AdoptThread adoptThread; // Ensure the current thread is able to call into Python.
-
     if(!_future)
     {
         //
@@ -2925,7 +3452,7 @@ IcePy::NewAsyncInvocation::sent(bool sentSynchronously)
         Py_INCREF(_future);
     }
 
-    PyObjectHandle tmp = callMethod(future.get(), "set_sent", sentSynchronously ? getTrue() : getFalse());
+    setSent(future.get(), sentSynchronously);
     if(PyErr_Occurred())
     {
         handleException();
@@ -2936,7 +3463,7 @@ IcePy::NewAsyncInvocation::sent(bool sentSynchronously)
         //
         // For a oneway/datagram invocation, we consider it complete when sent.
         //
-        tmp = callMethod(future.get(), "set_result", Py_None);
+        setResult(future.get(), Py_None);
         if(PyErr_Occurred())
         {
             handleException();
@@ -2944,6 +3471,44 @@ IcePy::NewAsyncInvocation::sent(bool sentSynchronously)
     }
 }
 
+void
+IcePy::NewAsyncInvocation::setResult(PyObject* future, PyObject* result)
+{
+    if(_eventLoop)
+    {
+        _eventLoop->setResult(future, result);
+    }
+    else
+    {
+        setFutureResult(future, result);
+    }
+}
+
+void
+IcePy::NewAsyncInvocation::setException(PyObject* future, PyObject* ex)
+{
+    if(_eventLoop)
+    {
+        _eventLoop->setException(future, ex);
+    }
+    else
+    {
+        setFutureException(future, ex);
+    }
+}
+
+void
+IcePy::NewAsyncInvocation::setSent(PyObject* future, bool sentSynchronously)
+{
+    //
+    // asyncio futures don't support sent notifications.
+    //
+    if(!_eventLoop)
+    {
+        setFutureSent(future, sentSynchronously);
+    }
+}
+
 //
 // NewAsyncTypedInvocation
 //
@@ -2961,17 +3526,18 @@ IcePy::NewAsyncTypedInvocation::handleInvoke(PyObject* args, PyObject* /* kwds *
     //
 
     assert(PyTuple_Check(args));
-    assert(PyTuple_GET_SIZE(args) == 2); // Format is ((params...), context|None)
+    assert(PyTuple_GET_SIZE(args) == 2); // Format is ((params...)|EncodedArgs, context|None)
     PyObject* pyparams = PyTuple_GET_ITEM(args, 0);
-    assert(PyTuple_Check(pyparams));
+    const bool encoded = PyObject_TypeCheck(pyparams, &EncodedArgsType);
+    assert(encoded || PyTuple_Check(pyparams));
     PyObject* pyctx = PyTuple_GET_ITEM(args, 1);
 
     //
-    // Marshal the input parameters to a byte sequence.
+    // Marshal the input parameters to a byte sequence, unless they are already marshaled.
     //
     Ice::OutputStream os(_communicator);
     pair<const Ice::Byte*, const Ice::Byte*> params;
-    if(!prepareRequest(_op, pyparams, NewAsyncMapping, &os, params))
+    if(encoded ? !getEncodedParams(pyparams, params) : !prepareRequest(_op, pyparams, NewAsyncMapping, &os, params))
     {
         return 0;
     }
@@ -3054,7 +3620,7 @@ IcePy::NewAsyncTypedInvocation::handleResponse(PyObject* future, bool ok,
             {
                 PyObjectHandle exh = convertException(ex);
                 assert(exh.get());
-                PyObjectHandle tmp = callMethod(future, "set_exception", exh.get());
+                setException(future, exh.get());
                 PyErr_Clear();
                 return;
             }
@@ -3080,13 +3646,13 @@ IcePy::NewAsyncTypedInvocation::handleResponse(PyObject* future, bool ok,
                 r = args;
             }
 
-            PyObjectHandle tmp = callMethod(future, "set_result", r.get());
+            setResult(future, r.get());
             PyErr_Clear();
         }
         else
         {
             PyObjectHandle ex = unmarshalException(_op, results);
-            PyObjectHandle tmp = callMethod(future, "set_exception", ex.get());
+            setException(future, ex.get());
             PyErr_Clear();
         }
     }
@@ -3113,8 +3679,7 @@ IcePy::SyncBlobjectInvocation::invoke(PyObject* args, PyObject* /* kwds */)
     PyObject* operationModeType = lookupType("Ice.OperationMode");
     PyObject* ctx = 0;
 #if PY_VERSION_HEX >= 0x03000000
-    if(!PyArg_ParseTuple(args, STRCAST("sO!O!|O"), &operation, operationModeType, &mode, &PyBytes_Type, &inParams,
-                         &ctx))
+    if(!PyArg_ParseTuple(args, STRCAST("sO!O|O"), &operation, operationModeType, &mode, &inParams, &ctx))
     {
         return 0;
     }
@@ -3131,13 +3696,15 @@ IcePy::SyncBlobjectInvocation::invoke(PyObject* args, PyObject* /* kwds */)
     assert(!PyErr_Occurred());
 
 #if PY_VERSION_HEX >= 0x03000000
-    Py_ssize_t sz = PyBytes_GET_SIZE(inParams);
-    pair<const ::Ice::Byte*, const ::Ice::Byte*> in(static_cast<const Ice::Byte*>(0),
-                                                    static_cast<const Ice::Byte*>(0));
-    if(sz > 0)
+    //
+    // Accept any object that supports the buffer protocol, the encapsulation isn't copied before
+    // it's written to the request.
+    //
+    ByteBuffer inBuffer;
+    pair<const ::Ice::Byte*, const ::Ice::Byte*> in;
+    if(!inBuffer.get(inParams, in))
     {
-        in.first = reinterpret_cast<Ice::Byte*>(PyBytes_AS_STRING(inParams));
-        in.second = in.first + sz;
+        return 0;
     }
 #else
     //
@@ -3157,24 +3724,44 @@ IcePy::SyncBlobjectInvocation::invoke(PyObject* args, PyObject* /* kwds */)
 
     try
     {
-        vector<Ice::Byte> out;
+        Ice::Context context;
+        if(ctx != 0 && ctx != Py_None && !dictionaryToContext(ctx, context))
+        {
+            return 0;
+        }
+
+        //
+        // Unmarshal the results directly from the reply instead of copying them to a byte
+        // sequence as ice_invoke does.
+        //
+        IceInternal::OutgoingAsyncPtr outAsync =
+            new IceInternal::CallbackOutgoing(_prx, iceInvokeOperationName, IceInternal::dummyCallback, 0, true);
 
         bool ok;
-        if(ctx == 0 || ctx == Py_None)
+        pair<const Ice::Byte*, const Ice::Byte*> out(static_cast<const Ice::Byte*>(0),
+                                                     static_cast<const Ice::Byte*>(0));
         {
             AllowThreads allowThreads; // Release Python's global interpreter lock during remote invocations.
-            ok = _prx->ice_invoke(operation, sendMode, in, out);
-        }
-        else
-        {
-            Ice::Context context;
-            if(!dictionaryToContext(ctx, context))
+            try
             {
-                return 0;
+                outAsync->prepare(operation, sendMode, ctx == 0 || ctx == Py_None ? Ice::noExplicitContext : context);
+                outAsync->writeParamEncaps(in.first, static_cast<Ice::Int>(in.second - in.first));
+                outAsync->invoke(operation);
+            }
+            catch(const Ice::Exception& ex)
+            {
+                outAsync->abort(ex);
+            }
+            ok = outAsync->_waitForResponse();
+            if(_prx->ice_isTwoway())
+            {
+                //
+                // The encapsulation remains valid as long as the invocation.
+                //
+                Ice::Int sz;
+                outAsync->_readParamEncaps(out.first, sz);
+                out.second = out.first + sz;
             }
-
-            AllowThreads allowThreads; // Release Python's global interpreter lock during remote invocations.
-            ok = _prx->ice_invoke(operation, sendMode, in, out, context);
         }
 
         //
@@ -3190,13 +3777,13 @@ IcePy::SyncBlobjectInvocation::invoke(PyObject* args, PyObject* /* kwds */)
 
 #if PY_VERSION_HEX >= 0x03000000
         PyObjectHandle op;
-        if(out.empty())
+        if(out.first == out.second)
         {
             op = PyBytes_FromString("");
         }
         else
         {
-            op = PyBytes_FromStringAndSize(reinterpret_cast<const char*>(&out[0]), out.size());
+            op = PyBytes_FromStringAndSize(reinterpret_cast<const char*>(out.first), out.second - out.first);
         }
         if(!op.get())
         {
@@ -3206,12 +3793,12 @@ IcePy::SyncBlobjectInvocation::invoke(PyObject* args, PyObject* /* kwds */)
         //
         // Create the output buffer and copy in the outParams.
         //
-        PyObjectHandle op = PyBuffer_New(out.size());
+        PyObjectHandle op = PyBuffer_New(out.second - out.first);
         if(!op.get())
         {
             throwPythonException();
         }
-        if(!out.empty())
+        if(out.first != out.second)
         {
             void* buf;
             Py_ssize_t sz;
@@ -3219,7 +3806,7 @@ IcePy::SyncBlobjectInvocation::invoke(PyObject* args, PyObject* /* kwds */)
             {
                 throwPythonException();
             }
-            memcpy(buf, &out[0], sz);
+            memcpy(buf, out.first, sz);
         }
 #endif
 
@@ -3276,8 +3863,8 @@ IcePy::AsyncBlobjectInvocation::invoke(PyObject* args, PyObject* kwds)
     PyObject* sent = Py_None;
     PyObject* pyctx = Py_None;
 #if PY_VERSION_HEX >= 0x03000000
-    if(!PyArg_ParseTupleAndKeywords(args, kwds, STRCAST("sO!O!|OOOO"), argNames, &operation, operationModeType, &mode,
-                                    &PyBytes_Type, &inParams, &response, &ex, &sent, &pyctx))
+    if(!PyArg_ParseTupleAndKeywords(args, kwds, STRCAST("sO!O|OOOO"), argNames, &operation, operationModeType, &mode,
+                                    &inParams, &response, &ex, &sent, &pyctx))
     {
         return 0;
     }
@@ -3339,13 +3926,15 @@ IcePy::AsyncBlobjectInvocation::invoke(PyObject* args, PyObject* kwds)
     }
 
 #if PY_VERSION_HEX >= 0x03000000
-    Py_ssize_t sz = PyBytes_GET_SIZE(inParams);
-    pair<const ::Ice::Byte*, const ::Ice::Byte*> in(static_cast<const Ice::Byte*>(0),
-                                                    static_cast<const Ice::Byte*>(0));
-    if(sz > 0)
+    //
+    // Accept any object that supports the buffer protocol, the encapsulation isn't copied before
+    // it's written to the request.
+    //
+    ByteBuffer inBuffer;
+    pair<const ::Ice::Byte*, const ::Ice::Byte*> in;
+    if(!inBuffer.get(inParams, in))
     {
-        in.first = reinterpret_cast<Ice::Byte*>(PyBytes_AS_STRING(inParams));
-        in.second = in.first + sz;
+        return 0;
     }
 #else
     //
@@ -3618,8 +4207,7 @@ IcePy::NewAsyncBlobjectInvocation::handleInvoke(PyObject* args, PyObject* /* kwd
     PyObject* operationModeType = lookupType("Ice.OperationMode");
     PyObject* ctx = 0;
 #if PY_VERSION_HEX >= 0x03000000
-    if(!PyArg_ParseTuple(args, STRCAST("sO!O!|O"), &operation, operationModeType, &mode,
-                         &PyBytes_Type, &inParams, &ctx))
+    if(!PyArg_ParseTuple(args, STRCAST("sO!O|O"), &operation, operationModeType, &mode, &inParams, &ctx))
     {
         return 0;
     }
@@ -3638,13 +4226,15 @@ IcePy::NewAsyncBlobjectInvocation::handleInvoke(PyObject* args, PyObject* /* kwd
     assert(!PyErr_Occurred());
 
 #if PY_VERSION_HEX >= 0x03000000
-    Py_ssize_t sz = PyBytes_GET_SIZE(inParams);
-    pair<const ::Ice::Byte*, const ::Ice::Byte*> in(static_cast<const Ice::Byte*>(0),
-                                                    static_cast<const Ice::Byte*>(0));
-    if(sz > 0)
+    //
+    // Accept any object that supports the buffer protocol, the encapsulation isn't copied before
+    // it's written to the request.
+    //
+    ByteBuffer inBuffer;
+    pair<const ::Ice::Byte*, const ::Ice::Byte*> in;
+    if(!inBuffer.get(inParams, in))
     {
-        in.first = reinterpret_cast<Ice::Byte*>(PyBytes_AS_STRING(inParams));
-        in.second = in.first + sz;
+        return 0;
     }
 #else
     //
@@ -3762,7 +4352,7 @@ IcePy::NewAsyncBlobjectInvocation::handleResponse(PyObject* future, bool ok,
 
     PyTuple_SET_ITEM(args.get(), 1, op.release()); // PyTuple_SET_ITEM steals a reference.
 
-    PyObjectHandle tmp = callMethod(future, "set_result", args.get());
+    setResult(future, args.get());
     PyErr_Clear();
 }
 
@@ -3770,14 +4360,15 @@ IcePy::NewAsyncBlobjectInvocation::handleResponse(PyObject* future, bool ok,
 // Upcall
 //
 void
-Upcall::dispatchImpl(PyObject* servant, const string& dispatchName, PyObject* args, const Ice::Current& current)
+Upcall::dispatchImpl(PyObject* servant, const string& dispatchName, PyObject* pyDispatchName, PyObject* args,
+                     const Ice::Current& current)
 {
     Ice::CommunicatorPtr communicator = current.adapter->getCommunicator();
 
     //
     // Find the servant method for the operation. Use dispatchName here, not current.operation.
     //
-    PyObjectHandle servantMethod = getAttr(servant, dispatchName, false);
+    PyObjectHandle servantMethod = getAttr(servant, pyDispatchName, false);
     if(!servantMethod.get())
     {
         ostringstream ostr;
@@ -3792,12 +4383,15 @@ Upcall::dispatchImpl(PyObject* servant, const string& dispatchName, PyObject* ar
 
     //
     // Get the _iceDispatch method. The _iceDispatch method will invoke the servant method and pass it the arguments.
+    // If the object adapter has an event loop, _iceDispatchEventLoop is called by the event loop thread instead.
     //
-    PyObjectHandle dispatchMethod = getAttr(servant, "_iceDispatch", false);
+    EventLoopQueuePtr eventLoop = getEventLoopQueue(current.adapter);
+    PyObjectHandle dispatchMethod = getAttr(servant, eventLoop ? iceDispatchEventLoopName : iceDispatchName, false);
     if(!dispatchMethod.get())
     {
         ostringstream ostr;
-        ostr << "_iceDispatch method not found for identity " << communicator->identityToString(current.id)
+        ostr << (eventLoop ? "_iceDispatchEventLoop" : "_iceDispatch")
+             << " method not found for identity " << communicator->identityToString(current.id)
              << " and operation `" << dispatchName << "'";
         string str = ostr.str();
         PyErr_WarnEx(PyExc_RuntimeWarning, const_cast<char*>(str.c_str()), 1);
@@ -3822,6 +4416,15 @@ Upcall::dispatchImpl(PyObject* servant, const string& dispatchName, PyObject* ar
     PyTuple_SET_ITEM(dispatchArgs.get(), 1, servantMethod.release()); // Steals a reference.
     PyTuple_SET_ITEM(dispatchArgs.get(), 2, incRef(args)); // Steals a reference.
 
+    if(eventLoop)
+    {
+        //
+        // The response is sent when _iceDispatchEventLoop or the task it creates uses the dispatch callback.
+        //
+        eventLoop->call(dispatchMethod.get(), dispatchArgs.get());
+        return;
+    }
+
     //
     // Ignore the return value of _iceDispatch -- it will use the dispatch callback.
     //
@@ -3872,7 +4475,7 @@ IcePy::TypedUpcall::dispatch(PyObject* servant, const pair<const Ice::Byte*, con
         // Store a pointer to a local StreamUtil object as the stream's closure.
         // This is necessary to support object unmarshaling (see ObjectReader).
         //
-        StreamUtil util;
+        StreamUtil util(_communicator);
         assert(!is.getClosure());
         is.setClosure(&util);
 
@@ -3934,7 +4537,7 @@ IcePy::TypedUpcall::dispatch(PyObject* servant, const pair<const Ice::Byte*, con
     PyTuple_SET_ITEM(args.get(), PyTuple_GET_SIZE(args.get()) - 1,
                      curr.release()); // PyTuple_SET_ITEM steals a reference.
 
-    dispatchImpl(servant, _op->dispatchName, args.get(), current);
+    dispatchImpl(servant, _op->dispatchName, _op->pyDispatchName.get(), args.get(), current);
 }
 
 void
@@ -4065,13 +4668,30 @@ IcePy::BlobjectUpcall::dispatch(PyObject* servant, const pair<const Ice::Byte*,
     PyObjectHandle ip;
 
 #if PY_VERSION_HEX >= 0x03000000
+    //
+    // A servant with a true memoryView attribute receives a read-only memoryview instead of bytes.
+    // The request is only valid during the dispatch, the memoryview refers to a copy of it so that
+    // the memoryview and the views created from it remain valid after the dispatch.
+    //
+    PyObjectHandle memoryView = getAttr(servant, memoryViewName, false);
+    bool useMemoryView = memoryView.get() && PyObject_IsTrue(memoryView.get()) == 1;
+    PyErr_Clear();
     if(inBytes.second == inBytes.first)
     {
         ip = PyBytes_FromString("");
     }
     else
     {
-        ip = PyBytes_FromStringAndSize(reinterpret_cast<const char*>(inBytes.first), inBytes.second - inBytes.first);
+        ip = PyBytes_FromStringAndSize(reinterpret_cast<const char*>(inBytes.first),
+                                       inBytes.second - inBytes.first);
+    }
+    if(ip.get() && useMemoryView)
+    {
+        ip = PyMemoryView_FromObject(ip.get());
+    }
+    if(!ip.get())
+    {
+        throwPythonException();
     }
 #else
     //
@@ -4102,7 +4722,7 @@ IcePy::BlobjectUpcall::dispatch(PyObject* servant, const pair<const Ice::Byte*,
     PyObjectHandle curr = createCurrent(current);
     PyTuple_SET_ITEM(args.get(), start, curr.release()); // PyTuple_SET_ITEM steals a reference.
 
-    dispatchImpl(servant, "ice_invoke", args.get(), current);
+    dispatchImpl(servant, "ice_invoke", iceInvokeName, args.get(), current);
 }
 
 void
@@ -4126,23 +4746,21 @@ IcePy::BlobjectUpcall::response(PyObject* result)
         arg = PyTuple_GET_ITEM(result, 1);
 
 #if PY_VERSION_HEX >= 0x03000000
-        if(!PyBytes_Check(arg))
+        //
+        // The results can be any object that supports the buffer protocol, for example the
+        // memoryview passed to ice_invoke by a router.
+        //
+        ByteBuffer resultBuffer;
+        pair<const ::Ice::Byte*, const ::Ice::Byte*> r;
+        if(!resultBuffer.get(arg, r))
         {
+            PyErr_Clear();
             ostringstream ostr;
             ostr << "invalid return value for operation `ice_invoke'";
             string str = ostr.str();
             PyErr_WarnEx(PyExc_RuntimeWarning, const_cast<char*>(str.c_str()), 1);
             throw Ice::MarshalException(__FILE__, __LINE__);
         }
-
-        Py_ssize_t sz = PyBytes_GET_SIZE(arg);
-        pair<const ::Ice::Byte*, const ::Ice::Byte*> r(static_cast<const Ice::Byte*>(0),
-                                                       static_cast<const Ice::Byte*>(0));
-        if(sz > 0)
-        {
-            r.first = reinterpret_cast<Ice::Byte*>(PyBytes_AS_STRING(arg));
-            r.second = r.first + sz;
-        }
 #else
         if(!PyBuffer_Check(arg))
         {
@@ -4416,17 +5034,17 @@ IcePy::FlushAsyncCallback::setFuture(PyObject* future)
     //
     if(_exception)
     {
-        PyObjectHandle tmp = callMethod(future, "set_exception", _exception);
+        setFutureException(future, _exception);
         PyErr_Clear();
     }
     else if(_sent)
     {
-        PyObjectHandle tmp = callMethod(future, "set_sent", _sentSynchronously ? getTrue() : getFalse());
+        setFutureSent(future, _sentSynchronously);
         PyErr_Clear();
         //
         // We consider the invocation complete when sent.
         //
-        tmp = callMethod(future, "set_result", Py_None);
+        setFutureResult(future, Py_None);
         PyErr_Clear();
     }
     else
@@ -4451,7 +5069,7 @@ IcePy::FlushAsyncCallback::exception(const Ice::Exception& ex)
 
     PyObjectHandle exh = convertException(ex);
     assert(exh.get());
-    PyObjectHandle tmp = callMethod(_future, "set_exception", exh.get());
+    setFutureException(_future, exh.get());
     PyErr_Clear();
 
     Py_DECREF(_future); // Break cyclic dependency.
@@ -4473,12 +5091,12 @@ IcePy::FlushAsyncCallback::sent(bool sentSynchronously)
         return;
     }
 
-    PyObjectHandle tmp = callMethod(_future, "set_sent", _sentSynchronously ? getTrue() : getFalse());
+    setFutureSent(_future, sentSynchronously);
     PyErr_Clear();
     //
     // We consider the invocation complete when sent.
     //
-    tmp = callMethod(_future, "set_result", Py_None);
+    setFutureResult(_future, Py_None);
     PyErr_Clear();
 
     Py_DECREF(_future); // Break cyclic dependency.
@@ -4552,12 +5170,12 @@ IcePy::GetConnectionAsyncCallback::setFuture(PyObject* future)
     {
         PyObjectHandle pyConn = createConnection(_connection, _communicator);
         assert(pyConn.get());
-        PyObjectHandle tmp = callMethod(future, "set_result", pyConn.get());
+        setFutureResult(future, pyConn.get());
         PyErr_Clear();
     }
     else if(_exception)
     {
-        PyObjectHandle tmp = callMethod(future, "set_exception", _exception);
+        setFutureException(future, _exception);
         PyErr_Clear();
     }
     else
@@ -4581,7 +5199,7 @@ IcePy::GetConnectionAsyncCallback::response(const Ice::ConnectionPtr& conn)
     }
 
     PyObjectHandle pyConn = createConnection(conn, _communicator);
-    PyObjectHandle tmp = callMethod(_future, "set_result", pyConn.get());
+    setFutureResult(_future, pyConn.get());
     PyErr_Clear();
 
     Py_DECREF(_future); // Break cyclic dependency.
@@ -4603,7 +5221,7 @@ IcePy::GetConnectionAsyncCallback::exception(const Ice::Exception& ex)
     }
 
     PyObjectHandle exh = convertException(ex);
-    PyObjectHandle tmp = callMethod(_future, "set_exception", exh.get());
+    setFutureException(_future, exh.get());
     PyErr_Clear();
 
     Py_DECREF(_future); // Break cyclic dependency.
@@ -4753,50 +5371,3 @@ IcePy::createServantWrapper(PyObject* servant)
 
     return new TypedServantWrapper(servant);
 }
-
-PyObject*
-IcePy::createFuture()
-{
-    PyObject* futureType = lookupType("Ice.Future");
-    assert(futureType);
-    PyObjectHandle args = PyTuple_New(0);
-    if(!args.get())
-    {
-        return 0;
-    }
-    PyTypeObject* type = reinterpret_cast<PyTypeObject*>(futureType);
-    PyObject* future = type->tp_new(type, args.get(), 0);
-    if(!future)
-    {
-        return 0;
-    }
-    type->tp_init(future, args.get(), 0); // Call the constructor
-    return future;
-}
-
-PyObject*
-IcePy::createFuture(const string& operation, PyObject* asyncResult)
-{
-    if(!asyncResult) // Can be nil for batch invocations.
-    {
-        asyncResult = Py_None;
-    }
-
-    PyObject* futureType = lookupType("Ice.InvocationFuture");
-    assert(futureType);
-    PyObjectHandle args = PyTuple_New(2);
-    if(!args.get())
-    {
-        return 0;
-    }
-    PyTuple_SET_ITEM(args.get(), 0, createString(operation));
-    PyTuple_SET_ITEM(args.get(), 1, incRef(asyncResult));
-    PyTypeObject* type = reinterpret_cast<PyTypeObject*>(futureType);
-    PyObject* future = type->tp_new(type, args.get(), 0);
-    if(!future)
-    {
-        return 0;
-    }
-    type->tp_init(future, args.get(), 0); // Call the constructor
-    return future;
-}
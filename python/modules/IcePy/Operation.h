@@ -156,9 +156,6 @@ typedef IceUtil::Handle<ServantWrapper> ServantWrapperPtr;
 
 ServantWrapperPtr createServantWrapper(PyObject*);
 
-PyObject* createFuture();
-PyObject* createFuture(const std::string&, PyObject*);
-
 }
 
 #endif
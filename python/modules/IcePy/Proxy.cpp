@@ -16,6 +16,7 @@
 #include <Communicator.h>
 #include <Connection.h>
 #include <Endpoint.h>
+#include <Future.h>
 #include <Operation.h>
 #include <Thread.h>
 #include <Util.h>
@@ -2366,6 +2367,20 @@ checkedCastImpl(ProxyObject* p, const string& id, PyObject* facet, PyObject* ctx
         target = (*p->proxy)->ice_facet(facetStr);
     }
 
+    //
+    // The successful checked casts without an explicit context are cached if the communicator
+    // was created with a checked cast cache.
+    //
+    CheckedCastCachePtr cache;
+    if(!ctx || ctx == Py_None)
+    {
+        cache = getCheckedCastCache(*p->communicator);
+        if(cache && cache->find(target, id))
+        {
+            return createProxy(target, *p->communicator, type);
+        }
+    }
+
     bool b = false;
     try
     {
@@ -2393,6 +2408,10 @@ checkedCastImpl(ProxyObject* p, const string& id, PyObject* facet, PyObject* ctx
 
     if(b)
     {
+        if(cache)
+        {
+            cache->add(target, id);
+        }
         return createProxy(target, *p->communicator, type);
     }
 
@@ -15,14 +15,21 @@
 #include <Slice/Preprocessor.h>
 #include <Slice/PythonUtil.h>
 #include <Slice/Util.h>
+#include <Slice/MD5.h>
 #include <IceUtil/Options.h>
 #include <IceUtil/ConsoleUtil.h>
+#include <IceUtil/FileUtil.h>
+#include <IceUtil/StringUtil.h>
+#include <IceUtil/UUID.h>
+#include <fstream>
+#include <iomanip>
 
 //
-// Python headers needed for PyEval_EvalCode.
+// Python headers needed for PyEval_EvalCode and PyMarshal_*.
 //
 #include <compile.h>
 #include <eval.h>
+#include <marshal.h>
 
 using namespace std;
 using namespace IcePy;
@@ -30,6 +37,236 @@ using namespace Slice;
 using namespace Slice::Python;
 using namespace IceUtilInternal;
 
+namespace
+{
+
+//
+// A cache entry stores the marshaled code object generated for a Slice file, preceded by
+// the path and MD5 digest of every file the code depends on (the file itself and all the
+// files it includes). An entry is only used if all these files are unchanged.
+//
+const string cacheHeader = "IcePy loadSlice cache 1";
+
+string
+computeDigest(const string& data)
+{
+    MD5 md5(reinterpret_cast<const unsigned char*>(data.data()), static_cast<int>(data.size()));
+    unsigned char digest[16];
+    md5.getDigest(digest);
+
+    ostringstream os;
+    os << hex << setfill('0');
+    for(int i = 0; i < 16; ++i)
+    {
+        os << setw(2) << static_cast<int>(digest[i]);
+    }
+    return os.str();
+}
+
+bool
+readFile(const string& path, string& data)
+{
+    ifstream in(IceUtilInternal::streamFilename(path).c_str(), ios::in | ios::binary);
+    if(!in)
+    {
+        return false;
+    }
+    ostringstream os;
+    os << in.rdbuf();
+    data = os.str();
+    return !in.bad();
+}
+
+//
+// Returns the path of the cache entry for the given file. The key covers everything that
+// affects the generated code: the translator options, the Ice and Python bytecode versions,
+// and the path and contents of the file.
+//
+string
+getCacheEntry(const string& cacheDir, const string& file, const string& contents, const string& options)
+{
+    ostringstream key;
+    key << cacheHeader << '\n' << ICE_STRING_VERSION << '\n' << PyImport_GetMagicNumber() << '\n' << options
+        << '\n' << file << '\n' << computeDigest(contents);
+    return cacheDir + "/" + computeDigest(key.str()) + ".pyc";
+}
+
+//
+// Returns the code object stored in the cache entry, or 0 (with no Python exception set) if
+// there's no usable entry.
+//
+PyObject*
+loadCacheEntry(const string& path)
+{
+    string data;
+    if(!readFile(path, data))
+    {
+        return 0;
+    }
+
+    istringstream in(data);
+    string line;
+    if(!getline(in, line) || line != cacheHeader)
+    {
+        return 0;
+    }
+
+    size_t count;
+    if(!(in >> count) || !getline(in, line))
+    {
+        return 0;
+    }
+
+    for(size_t i = 0; i < count; ++i)
+    {
+        string file;
+        string digest;
+        string contents;
+        if(!getline(in, file) || !getline(in, digest) || !readFile(file, contents) ||
+           computeDigest(contents) != digest)
+        {
+            return 0;
+        }
+    }
+
+    streamoff pos = in.tellg();
+    if(pos < 0)
+    {
+        return 0;
+    }
+
+    PyObject* code = PyMarshal_ReadObjectFromString(const_cast<char*>(data.c_str() + pos),
+                                                    static_cast<Py_ssize_t>(data.size() - pos));
+    if(!code || !PyCode_Check(code))
+    {
+        Py_XDECREF(code);
+        PyErr_Clear();
+        return 0;
+    }
+    return code;
+}
+
+//
+// Writes the cache entry. Failures are ignored, the cache is only an optimization.
+//
+void
+saveCacheEntry(const string& path, const StringList& files, PyObject* code)
+{
+    PyObjectHandle marshaled = PyMarshal_WriteObjectToString(code, Py_MARSHAL_VERSION);
+    if(!marshaled.get())
+    {
+        PyErr_Clear();
+        return;
+    }
+
+    ostringstream os;
+    os << cacheHeader << '\n' << files.size() << '\n';
+    for(StringList::const_iterator p = files.begin(); p != files.end(); ++p)
+    {
+        string contents;
+        if(!readFile(*p, contents))
+        {
+            return;
+        }
+        os << *p << '\n' << computeDigest(contents) << '\n';
+    }
+#if PY_VERSION_HEX >= 0x03000000
+    os.write(PyBytes_AS_STRING(marshaled.get()), PyBytes_GET_SIZE(marshaled.get()));
+#else
+    os.write(PyString_AS_STRING(marshaled.get()), PyString_GET_SIZE(marshaled.get()));
+#endif
+
+    //
+    // Write to a temporary file first so that concurrent processes never read a partial entry.
+    //
+    const string tmp = path + "." + IceUtil::generateUUID();
+    {
+        ofstream out(IceUtilInternal::streamFilename(tmp).c_str(), ios::out | ios::binary);
+        if(!out)
+        {
+            return;
+        }
+        const string data = os.str();
+        out.write(data.c_str(), static_cast<streamsize>(data.size()));
+        if(!out)
+        {
+            out.close();
+            IceUtilInternal::remove(tmp);
+            return;
+        }
+    }
+
+    if(IceUtilInternal::rename(tmp, path) != 0)
+    {
+        IceUtilInternal::remove(tmp);
+    }
+}
+
+//
+// Preprocesses and parses the Slice file and compiles the generated Python code. The code
+// object is saved to the cache entry if one is given.
+//
+PyObject*
+compileSlice(const string& file, const vector<string>& cppArgs, const char* cmd, bool debug, bool all, bool ice,
+             bool underscore, bool checksum, const vector<string>& includePaths, const string& cacheEntry)
+{
+    bool ignoreRedefs = false;
+    bool keepComments = true;
+
+    Slice::PreprocessorPtr icecpp = Slice::Preprocessor::create("icecpp", file, cppArgs);
+    FILE* cppHandle = icecpp->preprocess(keepComments, "-D__SLICE2PY__");
+
+    if(cppHandle == 0)
+    {
+        PyErr_Format(PyExc_RuntimeError, "Slice preprocessing failed for `%s'", cmd);
+        return 0;
+    }
+
+    UnitPtr u = Slice::Unit::createUnit(ignoreRedefs, all, ice, underscore);
+    int parseStatus = u->parse(file, cppHandle, debug);
+
+    if(!icecpp->close() || parseStatus == EXIT_FAILURE)
+    {
+        PyErr_Format(PyExc_RuntimeError, "Slice parsing failed for `%s'", cmd);
+        u->destroy();
+        return 0;
+    }
+
+    //
+    // Generate the Python code into a string stream.
+    //
+    ostringstream codeStream;
+    IceUtilInternal::Output out(codeStream);
+    out.setUseTab(false);
+
+    //
+    // Emit a Python magic comment to set the file encoding.
+    // It must be the first or second line.
+    //
+    out << "# -*- coding: utf-8 -*-\n";
+    generate(u, all, checksum, includePaths, out);
+    StringList files = u->allFiles();
+    u->destroy();
+
+    string code = codeStream.str();
+
+    //
+    // We need to invoke Ice.updateModules() so that all of the types we've just generated
+    // are made "public".
+    //
+    code += "\nIce.updateModules()\n";
+
+    PyObject* src = Py_CompileString(const_cast<char*>(code.c_str()), const_cast<char*>(file.c_str()),
+                                     Py_file_input);
+    if(src && !cacheEntry.empty())
+    {
+        saveCacheEntry(cacheEntry, files, src);
+    }
+    return src;
+}
+
+}
+
 extern "C"
 PyObject*
 IcePy_loadSlice(PyObject* /*self*/, PyObject* args)
@@ -74,6 +311,7 @@ IcePy_loadSlice(PyObject* /*self*/, PyObject* args)
     opts.addOpt("", "underscore");
     opts.addOpt("", "checksum");
     opts.addOpt("", "all");
+    opts.addOpt("", "cache-dir", IceUtilInternal::Options::NeedArg);
 
     vector<string> files;
     try
@@ -132,59 +370,54 @@ IcePy_loadSlice(PyObject* /*self*/, PyObject* args)
     all = opts.isSet("all");
     checksum = opts.isSet("checksum");
 
-    bool ignoreRedefs = false;
-    bool keepComments = true;
-
-    for(vector<string>::const_iterator p = files.begin(); p != files.end(); ++p)
+    //
+    // The generated code is only cached if a cache directory is given.
+    //
+    string cacheDir;
+    string cacheOptions;
+    if(opts.isSet("cache-dir"))
     {
-        string file = *p;
-        Slice::PreprocessorPtr icecpp = Slice::Preprocessor::create("icecpp", file, cppArgs);
-        FILE* cppHandle = icecpp->preprocess(keepComments, "-D__SLICE2PY__");
-
-        if(cppHandle == 0)
+        cacheDir = opts.optArg("cache-dir");
+        if(!IceUtilInternal::directoryExists(cacheDir) && IceUtilInternal::mkdir(cacheDir, 0777) != 0 &&
+           !IceUtilInternal::directoryExists(cacheDir))
         {
-            PyErr_Format(PyExc_RuntimeError, "Slice preprocessing failed for `%s'", cmd);
+            PyErr_Format(PyExc_RuntimeError, "unable to create Slice cache directory `%s'", cacheDir.c_str());
             return 0;
         }
 
-        UnitPtr u = Slice::Unit::createUnit(ignoreRedefs, all, ice, underscore);
-        int parseStatus = u->parse(file, cppHandle, debug);
-
-        if(!icecpp->close() || parseStatus == EXIT_FAILURE)
+        ostringstream os;
+        for(vector<string>::const_iterator i = cppArgs.begin(); i != cppArgs.end(); ++i)
         {
-            PyErr_Format(PyExc_RuntimeError, "Slice parsing failed for `%s'", cmd);
-            u->destroy();
-            return 0;
+            os << *i << '\n';
         }
+        os << underscore << all << checksum;
+        cacheOptions = os.str();
+    }
 
-        //
-        // Generate the Python code into a string stream.
-        //
-        ostringstream codeStream;
-        IceUtilInternal::Output out(codeStream);
-        out.setUseTab(false);
-
-        //
-        // Emit a Python magic comment to set the file encoding.
-        // It must be the first or second line.
-        //
-        out << "# -*- coding: utf-8 -*-\n";
-        generate(u, all, checksum, includePaths, out);
-        u->destroy();
-
-        string code = codeStream.str();
+    for(vector<string>::const_iterator p = files.begin(); p != files.end(); ++p)
+    {
+        string file = *p;
 
-        //
-        // We need to invoke Ice.updateModules() so that all of the types we've just generated
-        // are made "public".
-        //
-        code += "\nIce.updateModules()\n";
+        string cacheEntry;
+        PyObjectHandle src;
+        if(!cacheDir.empty())
+        {
+            string contents;
+            if(readFile(file, contents))
+            {
+                cacheEntry = getCacheEntry(cacheDir, file, contents, cacheOptions);
+                src = loadCacheEntry(cacheEntry);
+            }
+        }
 
-        PyObjectHandle src = Py_CompileString(const_cast<char*>(code.c_str()), const_cast<char*>(file.c_str()),
-                                              Py_file_input);
         if(!src.get())
         {
-            return 0;
+            src = compileSlice(file, cppArgs, cmd, debug, all, ice, underscore, checksum, includePaths,
+                               cacheEntry);
+            if(!src.get())
+            {
+                return 0;
+            }
         }
 
         PyObjectHandle globals = PyDict_New();
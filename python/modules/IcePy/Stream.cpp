@@ -0,0 +1,1185 @@
+// **********************************************************************
+//
+// Copyright (c) 2003-2018 ZeroC, Inc. All rights reserved.
+//
+// This copy of Ice is licensed to you under the terms described in the
+// ICE_LICENSE file included in this distribution.
+//
+// **********************************************************************
+
+#ifdef _WIN32
+#   include <IceUtil/Config.h>
+#endif
+#include <Stream.h>
+#include <Communicator.h>
+#include <Types.h>
+#include <Util.h>
+#include <Ice/InputStream.h>
+#include <Ice/OutputStream.h>
+
+using namespace std;
+using namespace IcePy;
+
+namespace IcePy
+{
+
+struct OutputStreamObject
+{
+    PyObject_HEAD
+    Ice::OutputStream* out;
+    ObjectMap* objectMap;
+    int encapsDepth;
+    Py_ssize_t exports; // The number of buffers exported with finished() that are not released yet.
+};
+
+struct InputStreamObject
+{
+    PyObject_HEAD
+    Ice::InputStream* in;
+    StreamUtil* util;
+    Py_buffer* view; // The buffer of the data object, the stream reads it without copying.
+    int encapsDepth;
+};
+
+}
+
+namespace
+{
+
+//
+// Receives the value unmarshaled by InputStream.readValue. The target is a list holding the
+// value and the callback supplied by the caller. The callback of a class instance is invoked
+// by readPendingValues when the instance is encoded with the 1.0 encoding.
+//
+class ReadValueCallback : public UnmarshalCallback
+{
+public:
+
+    virtual void unmarshaled(PyObject* val, PyObject* target, void*)
+    {
+        assert(PyList_Check(target) && PyList_GET_SIZE(target) == 2);
+        if(PyList_SetItem(target, 0, incRef(val)) < 0) // PyList_SetItem steals a reference.
+        {
+            throw AbortMarshaling();
+        }
+
+        PyObject* cb = PyList_GET_ITEM(target, 1);
+        if(cb != Py_None)
+        {
+            PyObjectHandle tmp = PyObject_CallFunctionObjArgs(cb, val, 0);
+            if(!tmp.get())
+            {
+                throw AbortMarshaling();
+            }
+        }
+    }
+};
+
+bool
+getCommunicatorArg(PyObject* obj, Ice::CommunicatorPtr& communicator)
+{
+    PyObjectHandle impl;
+    if(!PyObject_IsInstance(obj, reinterpret_cast<PyObject*>(&CommunicatorType)))
+    {
+        impl = getAttr(obj, "_impl", false);
+        if(!impl.get() || !PyObject_IsInstance(impl.get(), reinterpret_cast<PyObject*>(&CommunicatorType)))
+        {
+            PyErr_Format(PyExc_TypeError, STRCAST("expected an Ice.Communicator object"));
+            return false;
+        }
+        obj = impl.get();
+    }
+    communicator = getCommunicator(obj);
+    return true;
+}
+
+bool
+getEncodingArg(PyObject* obj, Ice::EncodingVersion& encoding)
+{
+    PyObject* encodingType = lookupType("Ice.EncodingVersion");
+    assert(encodingType);
+    if(!PyObject_IsInstance(obj, encodingType))
+    {
+        PyErr_Format(PyExc_TypeError, STRCAST("expected an Ice.EncodingVersion object"));
+        return false;
+    }
+    return getEncodingVersion(obj, encoding);
+}
+
+bool
+getFormatArg(PyObject* obj, Ice::FormatType& format)
+{
+    if(obj == Py_None)
+    {
+        format = Ice::DefaultFormat;
+        return true;
+    }
+
+    PyObject* formatType = lookupType("Ice.FormatType");
+    assert(formatType);
+    if(!PyObject_IsInstance(obj, formatType))
+    {
+        PyErr_Format(PyExc_TypeError, STRCAST("expected an Ice.FormatType enumerator"));
+        return false;
+    }
+    PyObjectHandle value = getAttr(obj, "value", false);
+    assert(value.get());
+    format = static_cast<Ice::FormatType>(PyLong_AsLong(value.get()));
+    return true;
+}
+
+bool
+getTypeArg(PyObject* obj, TypeInfoPtr& type)
+{
+    if(!PyObject_IsInstance(obj, reinterpret_cast<PyObject*>(&TypeInfoType)))
+    {
+        PyErr_Format(PyExc_TypeError, STRCAST("expected a type object such as IcePy._t_int"));
+        return false;
+    }
+    type = getType(obj);
+    return true;
+}
+
+//
+// Sets tag to -1 if obj is None.
+//
+bool
+getTagArg(PyObject* obj, int encapsDepth, Ice::Int& tag)
+{
+    if(obj == Py_None)
+    {
+        tag = -1;
+        return true;
+    }
+
+    long val = PyLong_AsLong(obj);
+    if(PyErr_Occurred())
+    {
+        return false;
+    }
+    if(val < 0 || val > INT_MAX)
+    {
+        PyErr_Format(PyExc_ValueError, STRCAST("tag must be a non-negative integer"));
+        return false;
+    }
+    if(encapsDepth == 0)
+    {
+        PyErr_Format(PyExc_RuntimeError, STRCAST("tagged values require an encapsulation"));
+        return false;
+    }
+    tag = static_cast<Ice::Int>(val);
+    return true;
+}
+
+bool
+checkWritable(OutputStreamObject* self)
+{
+    if(!self->out)
+    {
+        PyErr_Format(PyExc_RuntimeError, STRCAST("output stream is not initialized"));
+        return false;
+    }
+    if(self->exports > 0)
+    {
+        PyErr_Format(PyExc_BufferError, STRCAST("cannot write to an output stream while its buffer is exported"));
+        return false;
+    }
+    return true;
+}
+
+bool
+checkReadable(InputStreamObject* self)
+{
+    if(!self->in)
+    {
+        PyErr_Format(PyExc_RuntimeError, STRCAST("input stream is not initialized"));
+        return false;
+    }
+    return true;
+}
+
+}
+
+#ifdef WIN32
+extern "C"
+#endif
+static OutputStreamObject*
+outputStreamNew(PyTypeObject* type, PyObject* /*args*/, PyObject* /*kwds*/)
+{
+    OutputStreamObject* self = reinterpret_cast<OutputStreamObject*>(type->tp_alloc(type, 0));
+    if(!self)
+    {
+        return 0;
+    }
+    self->out = 0;
+    self->objectMap = 0;
+    self->encapsDepth = 0;
+    self->exports = 0;
+    return self;
+}
+
+#ifdef WIN32
+extern "C"
+#endif
+static int
+outputStreamInit(OutputStreamObject* self, PyObject* args, PyObject* kwds)
+{
+    static char* argNames[] =
+    {
+        const_cast<char*>("communicator"),
+        const_cast<char*>("encoding"),
+        0
+    };
+    PyObject* communicatorObj;
+    PyObject* encodingObj = Py_None;
+    if(!PyArg_ParseTupleAndKeywords(args, kwds, STRCAST("O|O"), argNames, &communicatorObj, &encodingObj))
+    {
+        return -1;
+    }
+
+    Ice::CommunicatorPtr communicator;
+    if(!getCommunicatorArg(communicatorObj, communicator))
+    {
+        return -1;
+    }
+
+    Ice::EncodingVersion encoding;
+    if(encodingObj != Py_None && !getEncodingArg(encodingObj, encoding))
+    {
+        return -1;
+    }
+
+    if(self->out)
+    {
+        PyErr_Format(PyExc_RuntimeError, STRCAST("output stream is already initialized"));
+        return -1;
+    }
+
+    try
+    {
+        if(encodingObj != Py_None)
+        {
+            self->out = new Ice::OutputStream(communicator, encoding);
+        }
+        else
+        {
+            self->out = new Ice::OutputStream(communicator);
+        }
+    }
+    catch(const Ice::Exception& ex)
+    {
+        setPythonException(ex);
+        return -1;
+    }
+    self->objectMap = new ObjectMap;
+    return 0;
+}
+
+#ifdef WIN32
+extern "C"
+#endif
+static void
+outputStreamDealloc(OutputStreamObject* self)
+{
+    //
+    // The stream holds the class instances that are not written yet, it must be destroyed before
+    // the object map.
+    //
+    delete self->out;
+    delete self->objectMap;
+    Py_TYPE(self)->tp_free(reinterpret_cast<PyObject*>(self));
+}
+
+#ifdef WIN32
+extern "C"
+#endif
+static PyObject*
+outputStreamStartEncapsulation(OutputStreamObject* self, PyObject* args, PyObject* kwds)
+{
+    static char* argNames[] =
+    {
+        const_cast<char*>("encoding"),
+        const_cast<char*>("format"),
+        0
+    };
+    PyObject* encodingObj = Py_None;
+    PyObject* formatObj = Py_None;
+    if(!PyArg_ParseTupleAndKeywords(args, kwds, STRCAST("|OO"), argNames, &encodingObj, &formatObj))
+    {
+        return 0;
+    }
+
+    if(!checkWritable(self))
+    {
+        return 0;
+    }
+
+    //
+    // By default, a nested encapsulation uses the encoding of the enclosing encapsulation.
+    //
+    Ice::EncodingVersion encoding = self->out->getEncoding();
+    if(encodingObj != Py_None && !getEncodingArg(encodingObj, encoding))
+    {
+        return 0;
+    }
+
+    Ice::FormatType format;
+    if(!getFormatArg(formatObj, format))
+    {
+        return 0;
+    }
+
+    try
+    {
+        self->out->startEncapsulation(encoding, format);
+    }
+    catch(const Ice::Exception& ex)
+    {
+        setPythonException(ex);
+        return 0;
+    }
+    ++self->encapsDepth;
+
+    Py_INCREF(Py_None);
+    return Py_None;
+}
+
+#ifdef WIN32
+extern "C"
+#endif
+static PyObject*
+outputStreamEndEncapsulation(OutputStreamObject* self, PyObject* /*args*/)
+{
+    if(!checkWritable(self))
+    {
+        return 0;
+    }
+
+    if(self->encapsDepth == 0)
+    {
+        PyErr_Format(PyExc_RuntimeError, STRCAST("no encapsulation is started"));
+        return 0;
+    }
+
+    try
+    {
+        self->out->endEncapsulation();
+    }
+    catch(const AbortMarshaling&)
+    {
+        assert(PyErr_Occurred());
+        return 0;
+    }
+    catch(const Ice::Exception& ex)
+    {
+        setPythonException(ex);
+        return 0;
+    }
+    --self->encapsDepth;
+
+    Py_INCREF(Py_None);
+    return Py_None;
+}
+
+#ifdef WIN32
+extern "C"
+#endif
+static PyObject*
+outputStreamWriteValue(OutputStreamObject* self, PyObject* args, PyObject* kwds)
+{
+    static char* argNames[] =
+    {
+        const_cast<char*>("type"),
+        const_cast<char*>("value"),
+        const_cast<char*>("tag"),
+        0
+    };
+    PyObject* typeObj;
+    PyObject* value;
+    PyObject* tagObj = Py_None;
+    if(!PyArg_ParseTupleAndKeywords(args, kwds, STRCAST("OO|O"), argNames, &typeObj, &value, &tagObj))
+    {
+        return 0;
+    }
+
+    TypeInfoPtr type;
+    Ice::Int tag;
+    if(!checkWritable(self) || !getTypeArg(typeObj, type) || !getTagArg(tagObj, self->encapsDepth, tag))
+    {
+        return 0;
+    }
+
+    try
+    {
+        if(tag < 0)
+        {
+            if(!type->validateAndMarshal(value, self->out, self->objectMap, false))
+            {
+                PyErr_Format(PyExc_ValueError, STRCAST("invalid value for type `%s'"), type->getId().c_str());
+                return 0;
+            }
+        }
+        else if(value != Unset)
+        {
+            if(!type->validate(value))
+            {
+                PyErr_Format(PyExc_ValueError, STRCAST("invalid value for type `%s'"), type->getId().c_str());
+                return 0;
+            }
+
+            //
+            // The value is skipped if the encoding doesn't support tagged values.
+            //
+            if(self->out->writeOptional(tag, type->optionalFormat()))
+            {
+                type->marshal(value, self->out, self->objectMap, true);
+            }
+        }
+    }
+    catch(const AbortMarshaling&)
+    {
+        assert(PyErr_Occurred());
+        return 0;
+    }
+    catch(const Ice::Exception& ex)
+    {
+        setPythonException(ex);
+        return 0;
+    }
+
+    Py_INCREF(Py_None);
+    return Py_None;
+}
+
+#ifdef WIN32
+extern "C"
+#endif
+static PyObject*
+outputStreamWriteSize(OutputStreamObject* self, PyObject* args)
+{
+    Py_ssize_t size;
+    if(!PyArg_ParseTuple(args, STRCAST("n"), &size))
+    {
+        return 0;
+    }
+
+    if(!checkWritable(self))
+    {
+        return 0;
+    }
+
+    if(size < 0 || size > INT_MAX)
+    {
+        PyErr_Format(PyExc_ValueError, STRCAST("size must be a non-negative 32-bit integer"));
+        return 0;
+    }
+
+    try
+    {
+        self->out->writeSize(static_cast<Ice::Int>(size));
+    }
+    catch(const Ice::Exception& ex)
+    {
+        setPythonException(ex);
+        return 0;
+    }
+
+    Py_INCREF(Py_None);
+    return Py_None;
+}
+
+#ifdef WIN32
+extern "C"
+#endif
+static PyObject*
+outputStreamWritePendingValues(OutputStreamObject* self, PyObject* /*args*/)
+{
+    if(!checkWritable(self))
+    {
+        return 0;
+    }
+
+    try
+    {
+        self->out->writePendingValues();
+    }
+    catch(const AbortMarshaling&)
+    {
+        assert(PyErr_Occurred());
+        return 0;
+    }
+    catch(const Ice::Exception& ex)
+    {
+        setPythonException(ex);
+        return 0;
+    }
+
+    Py_INCREF(Py_None);
+    return Py_None;
+}
+
+#ifdef WIN32
+extern "C"
+#endif
+static PyObject*
+outputStreamWriteException(OutputStreamObject* self, PyObject* args)
+{
+    PyObject* userExceptionType = lookupType("Ice.UserException");
+    assert(userExceptionType);
+    PyObject* ex;
+    if(!PyArg_ParseTuple(args, STRCAST("O!"), userExceptionType, &ex))
+    {
+        return 0;
+    }
+
+    if(!checkWritable(self))
+    {
+        return 0;
+    }
+
+    PyObjectHandle iceType = getAttr(ex, "_ice_type", false);
+    if(!iceType.get())
+    {
+        PyErr_Format(PyExc_TypeError, STRCAST("expected an exception generated from Slice"));
+        return 0;
+    }
+
+    try
+    {
+        ExceptionWriter writer(incRef(ex));
+        self->out->writeException(writer);
+    }
+    catch(const AbortMarshaling&)
+    {
+        assert(PyErr_Occurred());
+        return 0;
+    }
+    catch(const Ice::Exception& e)
+    {
+        setPythonException(e);
+        return 0;
+    }
+
+    Py_INCREF(Py_None);
+    return Py_None;
+}
+
+#ifdef WIN32
+extern "C"
+#endif
+static PyObject*
+outputStreamGetEncoding(OutputStreamObject* self, PyObject* /*args*/)
+{
+    if(!self->out)
+    {
+        PyErr_Format(PyExc_RuntimeError, STRCAST("output stream is not initialized"));
+        return 0;
+    }
+    return createEncodingVersion(self->out->getEncoding());
+}
+
+#ifdef WIN32
+extern "C"
+#endif
+static PyObject*
+outputStreamFinished(OutputStreamObject* self, PyObject* /*args*/)
+{
+    if(!self->out)
+    {
+        PyErr_Format(PyExc_RuntimeError, STRCAST("output stream is not initialized"));
+        return 0;
+    }
+
+#if PY_VERSION_HEX >= 0x03000000
+    //
+    // The memoryview exports the stream's buffer, the stream can't be written to until it's released.
+    //
+    return PyMemoryView_FromObject(reinterpret_cast<PyObject*>(self));
+#else
+    pair<const Ice::Byte*, const Ice::Byte*> data = self->out->finished();
+    return PyBytes_FromStringAndSize(reinterpret_cast<const char*>(data.first), data.second - data.first);
+#endif
+}
+
+#if PY_VERSION_HEX >= 0x03000000
+
+#ifdef WIN32
+extern "C"
+#endif
+static int
+outputStreamGetBuffer(OutputStreamObject* self, Py_buffer* view, int flags)
+{
+    if(!self->out)
+    {
+        PyErr_Format(PyExc_RuntimeError, STRCAST("output stream is not initialized"));
+        view->obj = 0;
+        return -1;
+    }
+
+    static Ice::Byte empty = 0;
+    pair<const Ice::Byte*, const Ice::Byte*> data = self->out->finished();
+    void* buf = const_cast<Ice::Byte*>(data.first ? data.first : &empty);
+    if(PyBuffer_FillInfo(view, reinterpret_cast<PyObject*>(self), buf, data.second - data.first, 1, flags) < 0)
+    {
+        return -1;
+    }
+    ++self->exports;
+    return 0;
+}
+
+#ifdef WIN32
+extern "C"
+#endif
+static void
+outputStreamReleaseBuffer(OutputStreamObject* self, Py_buffer* /*view*/)
+{
+    assert(self->exports > 0);
+    --self->exports;
+}
+
+static PyBufferProcs OutputStreamBufferProcs =
+{
+    reinterpret_cast<getbufferproc>(outputStreamGetBuffer),         /* bf_getbuffer */
+    reinterpret_cast<releasebufferproc>(outputStreamReleaseBuffer), /* bf_releasebuffer */
+};
+
+#endif
+
+static PyMethodDef OutputStreamMethods[] =
+{
+    { STRCAST("startEncapsulation"), reinterpret_cast<PyCFunction>(outputStreamStartEncapsulation),
+        METH_VARARGS | METH_KEYWORDS, PyDoc_STR(STRCAST("startEncapsulation([encoding, format]) -> None")) },
+    { STRCAST("endEncapsulation"), reinterpret_cast<PyCFunction>(outputStreamEndEncapsulation), METH_NOARGS,
+        PyDoc_STR(STRCAST("endEncapsulation() -> None")) },
+    { STRCAST("writeValue"), reinterpret_cast<PyCFunction>(outputStreamWriteValue), METH_VARARGS | METH_KEYWORDS,
+        PyDoc_STR(STRCAST("writeValue(type, value[, tag]) -> None")) },
+    { STRCAST("writeSize"), reinterpret_cast<PyCFunction>(outputStreamWriteSize), METH_VARARGS,
+        PyDoc_STR(STRCAST("writeSize(size) -> None")) },
+    { STRCAST("writePendingValues"), reinterpret_cast<PyCFunction>(outputStreamWritePendingValues), METH_NOARGS,
+        PyDoc_STR(STRCAST("writePendingValues() -> None")) },
+    { STRCAST("writeException"), reinterpret_cast<PyCFunction>(outputStreamWriteException), METH_VARARGS,
+        PyDoc_STR(STRCAST("writeException(ex) -> None")) },
+    { STRCAST("getEncoding"), reinterpret_cast<PyCFunction>(outputStreamGetEncoding), METH_NOARGS,
+        PyDoc_STR(STRCAST("getEncoding() -> Ice.EncodingVersion")) },
+    { STRCAST("finished"), reinterpret_cast<PyCFunction>(outputStreamFinished), METH_NOARGS,
+        PyDoc_STR(STRCAST("finished() -> memoryview")) },
+    { 0, 0 } /* sentinel */
+};
+
+#ifdef WIN32
+extern "C"
+#endif
+static InputStreamObject*
+inputStreamNew(PyTypeObject* type, PyObject* /*args*/, PyObject* /*kwds*/)
+{
+    InputStreamObject* self = reinterpret_cast<InputStreamObject*>(type->tp_alloc(type, 0));
+    if(!self)
+    {
+        return 0;
+    }
+    self->in = 0;
+    self->util = 0;
+    self->view = 0;
+    self->encapsDepth = 0;
+    return self;
+}
+
+#ifdef WIN32
+extern "C"
+#endif
+static int
+inputStreamInit(InputStreamObject* self, PyObject* args, PyObject* kwds)
+{
+    static char* argNames[] =
+    {
+        const_cast<char*>("communicator"),
+        const_cast<char*>("data"),
+        const_cast<char*>("encoding"),
+        0
+    };
+    PyObject* communicatorObj;
+    PyObject* data;
+    PyObject* encodingObj = Py_None;
+    if(!PyArg_ParseTupleAndKeywords(args, kwds, STRCAST("OO|O"), argNames, &communicatorObj, &data, &encodingObj))
+    {
+        return -1;
+    }
+
+    Ice::CommunicatorPtr communicator;
+    if(!getCommunicatorArg(communicatorObj, communicator))
+    {
+        return -1;
+    }
+
+    Ice::EncodingVersion encoding;
+    if(encodingObj != Py_None && !getEncodingArg(encodingObj, encoding))
+    {
+        return -1;
+    }
+
+    if(self->in)
+    {
+        PyErr_Format(PyExc_RuntimeError, STRCAST("input stream is already initialized"));
+        return -1;
+    }
+
+    //
+    // The stream reads the data in place, the buffer is held until the stream is destroyed.
+    //
+    Py_buffer* view = new Py_buffer;
+    if(PyObject_GetBuffer(data, view, PyBUF_SIMPLE) < 0)
+    {
+        delete view;
+        return -1;
+    }
+
+    pair<const Ice::Byte*, const Ice::Byte*> bytes;
+    bytes.first = reinterpret_cast<const Ice::Byte*>(view->buf);
+    bytes.second = bytes.first + view->len;
+    try
+    {
+        if(encodingObj != Py_None)
+        {
+            self->in = new Ice::InputStream(communicator, encoding, bytes);
+        }
+        else
+        {
+            self->in = new Ice::InputStream(communicator, bytes);
+        }
+    }
+    catch(const Ice::Exception& ex)
+    {
+        PyBuffer_Release(view);
+        delete view;
+        setPythonException(ex);
+        return -1;
+    }
+    self->view = view;
+
+    //
+    // Store a pointer to a StreamUtil object as the stream's closure.
+    // This is necessary to support object unmarshaling (see ObjectReader).
+    //
+    self->util = new StreamUtil(communicator);
+    self->in->setClosure(self->util);
+    return 0;
+}
+
+#ifdef WIN32
+extern "C"
+#endif
+static void
+inputStreamDealloc(InputStreamObject* self)
+{
+    delete self->in;
+    delete self->util;
+    if(self->view)
+    {
+        PyBuffer_Release(self->view);
+        delete self->view;
+    }
+    Py_TYPE(self)->tp_free(reinterpret_cast<PyObject*>(self));
+}
+
+#ifdef WIN32
+extern "C"
+#endif
+static PyObject*
+inputStreamStartEncapsulation(InputStreamObject* self, PyObject* /*args*/)
+{
+    if(!checkReadable(self))
+    {
+        return 0;
+    }
+
+    try
+    {
+        Ice::EncodingVersion encoding = self->in->startEncapsulation();
+        ++self->encapsDepth;
+        return createEncodingVersion(encoding);
+    }
+    catch(const Ice::Exception& ex)
+    {
+        setPythonException(ex);
+        return 0;
+    }
+}
+
+#ifdef WIN32
+extern "C"
+#endif
+static PyObject*
+inputStreamEndEncapsulation(InputStreamObject* self, PyObject* /*args*/)
+{
+    if(!checkReadable(self))
+    {
+        return 0;
+    }
+
+    if(self->encapsDepth == 0)
+    {
+        PyErr_Format(PyExc_RuntimeError, STRCAST("no encapsulation is started"));
+        return 0;
+    }
+
+    try
+    {
+        self->in->endEncapsulation();
+    }
+    catch(const Ice::Exception& ex)
+    {
+        setPythonException(ex);
+        return 0;
+    }
+    --self->encapsDepth;
+
+    Py_INCREF(Py_None);
+    return Py_None;
+}
+
+#ifdef WIN32
+extern "C"
+#endif
+static PyObject*
+inputStreamSkipEncapsulation(InputStreamObject* self, PyObject* /*args*/)
+{
+    if(!checkReadable(self))
+    {
+        return 0;
+    }
+
+    try
+    {
+        return createEncodingVersion(self->in->skipEncapsulation());
+    }
+    catch(const Ice::Exception& ex)
+    {
+        setPythonException(ex);
+        return 0;
+    }
+}
+
+#ifdef WIN32
+extern "C"
+#endif
+static PyObject*
+inputStreamReadValue(InputStreamObject* self, PyObject* args, PyObject* kwds)
+{
+    static char* argNames[] =
+    {
+        const_cast<char*>("type"),
+        const_cast<char*>("tag"),
+        const_cast<char*>("cb"),
+        0
+    };
+    PyObject* typeObj;
+    PyObject* tagObj = Py_None;
+    PyObject* cb = Py_None;
+    if(!PyArg_ParseTupleAndKeywords(args, kwds, STRCAST("O|OO"), argNames, &typeObj, &tagObj, &cb))
+    {
+        return 0;
+    }
+
+    TypeInfoPtr type;
+    Ice::Int tag;
+    if(!checkReadable(self) || !getTypeArg(typeObj, type) || !getTagArg(tagObj, self->encapsDepth, tag))
+    {
+        return 0;
+    }
+
+    if(cb != Py_None && !PyCallable_Check(cb))
+    {
+        PyErr_Format(PyExc_TypeError, STRCAST("cb must be a callable object"));
+        return 0;
+    }
+
+    PyObjectHandle target = Py_BuildValue(STRCAST("[OO]"), Py_None, cb);
+    if(!target.get())
+    {
+        return 0;
+    }
+
+    try
+    {
+        if(tag >= 0 && !self->in->readOptional(tag, type->optionalFormat()))
+        {
+            return incRef(Unset);
+        }
+        type->unmarshal(self->in, new ReadValueCallback, target.get(), 0, tag >= 0);
+    }
+    catch(const AbortMarshaling&)
+    {
+        assert(PyErr_Occurred());
+        return 0;
+    }
+    catch(const Ice::Exception& ex)
+    {
+        setPythonException(ex);
+        return 0;
+    }
+
+    return incRef(PyList_GET_ITEM(target.get(), 0));
+}
+
+#ifdef WIN32
+extern "C"
+#endif
+static PyObject*
+inputStreamReadSize(InputStreamObject* self, PyObject* /*args*/)
+{
+    if(!checkReadable(self))
+    {
+        return 0;
+    }
+
+    try
+    {
+        return PyLong_FromLong(self->in->readSize());
+    }
+    catch(const Ice::Exception& ex)
+    {
+        setPythonException(ex);
+        return 0;
+    }
+}
+
+#ifdef WIN32
+extern "C"
+#endif
+static PyObject*
+inputStreamReadPendingValues(InputStreamObject* self, PyObject* /*args*/)
+{
+    if(!checkReadable(self))
+    {
+        return 0;
+    }
+
+    try
+    {
+        self->in->readPendingValues();
+        self->util->updateSlicedData();
+    }
+    catch(const AbortMarshaling&)
+    {
+        assert(PyErr_Occurred());
+        return 0;
+    }
+    catch(const Ice::Exception& ex)
+    {
+        setPythonException(ex);
+        return 0;
+    }
+
+    Py_INCREF(Py_None);
+    return Py_None;
+}
+
+#ifdef WIN32
+extern "C"
+#endif
+static PyObject*
+inputStreamThrowException(InputStreamObject* self, PyObject* /*args*/)
+{
+    if(!checkReadable(self))
+    {
+        return 0;
+    }
+
+    try
+    {
+        Ice::UserExceptionFactoryPtr factory = new UserExceptionFactory;
+        self->in->throwException(factory);
+    }
+    catch(const ExceptionReader& r)
+    {
+        PyObject* ex = r.getException();
+
+        self->util->updateSlicedData();
+        Ice::SlicedDataPtr slicedData = r.getSlicedData();
+        if(slicedData)
+        {
+            StreamUtil::setSlicedDataMember(ex, slicedData);
+        }
+
+        setPythonException(ex);
+        return 0;
+    }
+    catch(const AbortMarshaling&)
+    {
+        assert(PyErr_Occurred());
+        return 0;
+    }
+    catch(const Ice::Exception& ex)
+    {
+        setPythonException(ex);
+        return 0;
+    }
+
+    //
+    // Not reached, the stream throws an exception if it doesn't hold one.
+    //
+    assert(false);
+    return 0;
+}
+
+#ifdef WIN32
+extern "C"
+#endif
+static PyObject*
+inputStreamGetEncoding(InputStreamObject* self, PyObject* /*args*/)
+{
+    if(!checkReadable(self))
+    {
+        return 0;
+    }
+    return createEncodingVersion(self->in->getEncoding());
+}
+
+static PyMethodDef InputStreamMethods[] =
+{
+    { STRCAST("startEncapsulation"), reinterpret_cast<PyCFunction>(inputStreamStartEncapsulation), METH_NOARGS,
+        PyDoc_STR(STRCAST("startEncapsulation() -> Ice.EncodingVersion")) },
+    { STRCAST("endEncapsulation"), reinterpret_cast<PyCFunction>(inputStreamEndEncapsulation), METH_NOARGS,
+        PyDoc_STR(STRCAST("endEncapsulation() -> None")) },
+    { STRCAST("skipEncapsulation"), reinterpret_cast<PyCFunction>(inputStreamSkipEncapsulation), METH_NOARGS,
+        PyDoc_STR(STRCAST("skipEncapsulation() -> Ice.EncodingVersion")) },
+    { STRCAST("readValue"), reinterpret_cast<PyCFunction>(inputStreamReadValue), METH_VARARGS | METH_KEYWORDS,
+        PyDoc_STR(STRCAST("readValue(type[, tag, cb]) -> object")) },
+    { STRCAST("readSize"), reinterpret_cast<PyCFunction>(inputStreamReadSize), METH_NOARGS,
+        PyDoc_STR(STRCAST("readSize() -> int")) },
+    { STRCAST("readPendingValues"), reinterpret_cast<PyCFunction>(inputStreamReadPendingValues), METH_NOARGS,
+        PyDoc_STR(STRCAST("readPendingValues() -> None")) },
+    { STRCAST("throwException"), reinterpret_cast<PyCFunction>(inputStreamThrowException), METH_NOARGS,
+        PyDoc_STR(STRCAST("throwException() -> None")) },
+    { STRCAST("getEncoding"), reinterpret_cast<PyCFunction>(inputStreamGetEncoding), METH_NOARGS,
+        PyDoc_STR(STRCAST("getEncoding() -> Ice.EncodingVersion")) },
+    { 0, 0 } /* sentinel */
+};
+
+namespace IcePy
+{
+
+PyTypeObject OutputStreamType =
+{
+    /* The ob_type field must be initialized in the module init function
+     * to be portable to Windows without using C++. */
+    PyVarObject_HEAD_INIT(0, 0)
+    STRCAST("IcePy.OutputStream"),   /* tp_name */
+    sizeof(OutputStreamObject),      /* tp_basicsize */
+    0,                               /* tp_itemsize */
+    /* methods */
+    reinterpret_cast<destructor>(outputStreamDealloc), /* tp_dealloc */
+    0,                               /* tp_print */
+    0,                               /* tp_getattr */
+    0,                               /* tp_setattr */
+    0,                               /* tp_reserved */
+    0,                               /* tp_repr */
+    0,                               /* tp_as_number */
+    0,                               /* tp_as_sequence */
+    0,                               /* tp_as_mapping */
+    0,                               /* tp_hash */
+    0,                               /* tp_call */
+    0,                               /* tp_str */
+    0,                               /* tp_getattro */
+    0,                               /* tp_setattro */
+#if PY_VERSION_HEX >= 0x03000000
+    &OutputStreamBufferProcs,        /* tp_as_buffer */
+#else
+    0,                               /* tp_as_buffer */
+#endif
+    Py_TPFLAGS_DEFAULT,              /* tp_flags */
+    0,                               /* tp_doc */
+    0,                               /* tp_traverse */
+    0,                               /* tp_clear */
+    0,                               /* tp_richcompare */
+    0,                               /* tp_weaklistoffset */
+    0,                               /* tp_iter */
+    0,                               /* tp_iternext */
+    OutputStreamMethods,             /* tp_methods */
+    0,                               /* tp_members */
+    0,                               /* tp_getset */
+    0,                               /* tp_base */
+    0,                               /* tp_dict */
+    0,                               /* tp_descr_get */
+    0,                               /* tp_descr_set */
+    0,                               /* tp_dictoffset */
+    reinterpret_cast<initproc>(outputStreamInit), /* tp_init */
+    0,                               /* tp_alloc */
+    reinterpret_cast<newfunc>(outputStreamNew), /* tp_new */
+    0,                               /* tp_free */
+    0,                               /* tp_is_gc */
+};
+
+PyTypeObject InputStreamType =
+{
+    /* The ob_type field must be initialized in the module init function
+     * to be portable to Windows without using C++. */
+    PyVarObject_HEAD_INIT(0, 0)
+    STRCAST("IcePy.InputStream"),    /* tp_name */
+    sizeof(InputStreamObject),       /* tp_basicsize */
+    0,                               /* tp_itemsize */
+    /* methods */
+    reinterpret_cast<destructor>(inputStreamDealloc), /* tp_dealloc */
+    0,                               /* tp_print */
+    0,                               /* tp_getattr */
+    0,                               /* tp_setattr */
+    0,                               /* tp_reserved */
+    0,                               /* tp_repr */
+    0,                               /* tp_as_number */
+    0,                               /* tp_as_sequence */
+    0,                               /* tp_as_mapping */
+    0,                               /* tp_hash */
+    0,                               /* tp_call */
+    0,                               /* tp_str */
+    0,                               /* tp_getattro */
+    0,                               /* tp_setattro */
+    0,                               /* tp_as_buffer */
+    Py_TPFLAGS_DEFAULT,              /* tp_flags */
+    0,                               /* tp_doc */
+    0,                               /* tp_traverse */
+    0,                               /* tp_clear */
+    0,                               /* tp_richcompare */
+    0,                               /* tp_weaklistoffset */
+    0,                               /* tp_iter */
+    0,                               /* tp_iternext */
+    InputStreamMethods,              /* tp_methods */
+    0,                               /* tp_members */
+    0,                               /* tp_getset */
+    0,                               /* tp_base */
+    0,                               /* tp_dict */
+    0,                               /* tp_descr_get */
+    0,                               /* tp_descr_set */
+    0,                               /* tp_dictoffset */
+    reinterpret_cast<initproc>(inputStreamInit), /* tp_init */
+    0,                               /* tp_alloc */
+    reinterpret_cast<newfunc>(inputStreamNew), /* tp_new */
+    0,                               /* tp_free */
+    0,                               /* tp_is_gc */
+};
+
+}
+
+bool
+IcePy::initStream(PyObject* module)
+{
+    if(PyType_Ready(&OutputStreamType) < 0)
+    {
+        return false;
+    }
+    PyTypeObject* type = &OutputStreamType; // Necessary to prevent GCC's strict-alias warnings.
+    if(PyModule_AddObject(module, STRCAST("OutputStream"), reinterpret_cast<PyObject*>(type)) < 0)
+    {
+        return false;
+    }
+
+    if(PyType_Ready(&InputStreamType) < 0)
+    {
+        return false;
+    }
+    type = &InputStreamType; // Necessary to prevent GCC's strict-alias warnings.
+    if(PyModule_AddObject(module, STRCAST("InputStream"), reinterpret_cast<PyObject*>(type)) < 0)
+    {
+        return false;
+    }
+    return true;
+}
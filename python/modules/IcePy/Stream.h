@@ -0,0 +1,25 @@
+// **********************************************************************
+//
+// Copyright (c) 2003-2018 ZeroC, Inc. All rights reserved.
+//
+// This copy of Ice is licensed to you under the terms described in the
+// ICE_LICENSE file included in this distribution.
+//
+// **********************************************************************
+
+#ifndef ICEPY_STREAM_H
+#define ICEPY_STREAM_H
+
+#include <Config.h>
+
+namespace IcePy
+{
+
+extern PyTypeObject OutputStreamType;
+extern PyTypeObject InputStreamType;
+
+bool initStream(PyObject*);
+
+}
+
+#endif
@@ -11,6 +11,7 @@
 #   include <IceUtil/Config.h>
 #endif
 #include <Types.h>
+#include <Communicator.h>
 #include <Current.h>
 #include <Proxy.h>
 #include <Thread.h>
@@ -118,6 +119,41 @@ writeString(PyObject* p, Ice::OutputStream* os)
 }
 #endif
 
+//
+// Unmarshals a string and returns a new reference. With Python 3, the string is decoded directly
+// from the stream buffer. With a cache, the string object is shared with the previous occurrences
+// of the same string.
+//
+PyObject*
+readString(Ice::InputStream* is, InternCache* cache)
+{
+#if PY_VERSION_HEX >= 0x03000000
+    const char* data;
+    size_t size;
+    is->read(data, size); // Bypass string conversion.
+#else
+    string val;
+    is->read(val, true);
+    const char* data = val.data();
+    size_t size = val.size();
+#endif
+    return cache ? cache->get(data, size) : createString(data, static_cast<Py_ssize_t>(size));
+}
+
+//
+// Returns the intern cache to use for a string unmarshaled with the given metadata, or 0.
+//
+InternCache*
+getInternCache(Ice::InputStream* is, bool intern, const Ice::StringSeq* metaData)
+{
+    if(intern || (metaData && hasInternMetaData(*metaData)))
+    {
+        StreamUtil* util = reinterpret_cast<StreamUtil*>(is->getClosure());
+        return util ? util->getInternCache() : 0;
+    }
+    return 0;
+}
+
 }
 
 #ifdef WIN32
@@ -305,7 +341,9 @@ addExceptionInfo(const string& id, const ExceptionInfoPtr& info)
 PyObject* IcePy::StreamUtil::_slicedDataType = 0;
 PyObject* IcePy::StreamUtil::_sliceInfoType = 0;
 
-IcePy::StreamUtil::StreamUtil()
+IcePy::StreamUtil::StreamUtil(const Ice::CommunicatorPtr& communicator) :
+    _communicator(communicator),
+    _internCacheInitialized(false)
 {
 }
 
@@ -331,6 +369,17 @@ IcePy::StreamUtil::~StreamUtil()
     }
 }
 
+InternCache*
+IcePy::StreamUtil::getInternCache()
+{
+    if(!_internCacheInitialized)
+    {
+        _internCache = IcePy::getInternCache(_communicator);
+        _internCacheInitialized = true;
+    }
+    return _internCache.get();
+}
+
 void
 IcePy::StreamUtil::add(const ReadObjectCallbackPtr& callback)
 {
@@ -643,6 +692,18 @@ IcePy::TypeInfo::destroy()
 {
 }
 
+bool
+IcePy::TypeInfo::validateAndMarshal(PyObject* p, Ice::OutputStream* os, ObjectMap* objectMap, bool optional,
+                                    const Ice::StringSeq* metaData)
+{
+    if(!validate(p))
+    {
+        return false;
+    }
+    marshal(p, os, objectMap, optional, metaData);
+    return true;
+}
+
 //
 // PrimitiveInfo implementation.
 //
@@ -949,87 +1010,103 @@ IcePy::PrimitiveInfo::marshal(PyObject* p, Ice::OutputStream* os, ObjectMap*, bo
     }
 }
 
-void
-IcePy::PrimitiveInfo::unmarshal(Ice::InputStream* is, const UnmarshalCallbackPtr& cb, PyObject* target,
-                                void* closure, bool, const Ice::StringSeq*)
+bool
+IcePy::PrimitiveInfo::validateAndMarshal(PyObject* p, Ice::OutputStream* os, ObjectMap* objectMap, bool optional,
+                                         const Ice::StringSeq* metaData)
 {
+    //
+    // Convert the value only once instead of once in validate() and once in marshal().
+    //
     switch(kind)
     {
     case PrimitiveInfo::KindBool:
     {
-        bool b;
-        is->read(b);
-        if(b)
-        {
-            cb->unmarshaled(getTrue(), target, closure);
-        }
-        else
+        int isTrue = PyObject_IsTrue(p);
+        if(isTrue < 0)
         {
-            cb->unmarshaled(getFalse(), target, closure);
+            return false;
         }
-        break;
+        os->write(isTrue ? true : false);
+        return true;
     }
     case PrimitiveInfo::KindByte:
     {
-        Ice::Byte val;
-        is->read(val);
-        PyObjectHandle p = PyLong_FromLong(val);
-        cb->unmarshaled(p.get(), target, closure);
-        break;
+        long val = PyLong_AsLong(p);
+        if(PyErr_Occurred() || val < 0 || val > 255)
+        {
+            return false;
+        }
+        os->write(static_cast<Ice::Byte>(val));
+        return true;
     }
     case PrimitiveInfo::KindShort:
     {
-        Ice::Short val;
-        is->read(val);
-        PyObjectHandle p = PyLong_FromLong(val);
-        cb->unmarshaled(p.get(), target, closure);
-        break;
+        long val = PyLong_AsLong(p);
+        if(PyErr_Occurred() || val < SHRT_MIN || val > SHRT_MAX)
+        {
+            return false;
+        }
+        os->write(static_cast<Ice::Short>(val));
+        return true;
     }
     case PrimitiveInfo::KindInt:
     {
-        Ice::Int val;
-        is->read(val);
-        PyObjectHandle p = PyLong_FromLong(val);
-        cb->unmarshaled(p.get(), target, closure);
-        break;
+        long val = PyLong_AsLong(p);
+        if(PyErr_Occurred() || val < INT_MIN || val > INT_MAX)
+        {
+            return false;
+        }
+        os->write(static_cast<Ice::Int>(val));
+        return true;
     }
     case PrimitiveInfo::KindLong:
     {
-        Ice::Long val;
-        is->read(val);
-        PyObjectHandle p = PyLong_FromLongLong(val);
-        cb->unmarshaled(p.get(), target, closure);
+        Ice::Long val = PyLong_AsLongLong(p);
+        if(PyErr_Occurred())
+        {
+            return false;
+        }
+        os->write(val);
+        return true;
+    }
+    case PrimitiveInfo::KindDouble:
+    {
+        if(PyFloat_Check(p))
+        {
+            os->write(PyFloat_AS_DOUBLE(p));
+            return true;
+        }
         break;
     }
     case PrimitiveInfo::KindFloat:
+    case PrimitiveInfo::KindString:
     {
-        Ice::Float val;
-        is->read(val);
-        PyObjectHandle p = PyFloat_FromDouble(val);
-        cb->unmarshaled(p.get(), target, closure);
         break;
     }
-    case PrimitiveInfo::KindDouble:
+    }
+
+    return TypeInfo::validateAndMarshal(p, os, objectMap, optional, metaData);
+}
+
+void
+IcePy::PrimitiveInfo::unmarshal(Ice::InputStream* is, const UnmarshalCallbackPtr& cb, PyObject* target,
+                                void* closure, bool, const Ice::StringSeq* metaData)
+{
+    PyObjectHandle p;
+    if(kind == KindString)
     {
-        Ice::Double val;
-        is->read(val);
-        PyObjectHandle p = PyFloat_FromDouble(val);
-        cb->unmarshaled(p.get(), target, closure);
-        break;
+        p = readString(is, getInternCache(is, false, metaData));
     }
-    case PrimitiveInfo::KindString:
+    else
     {
-        string val;
-#if PY_VERSION_HEX >= 0x03000000
-        is->read(val, false); // Bypass string conversion.
-#else
-        is->read(val, true);
-#endif
-        PyObjectHandle p = createString(val);
-        cb->unmarshaled(p.get(), target, closure);
-        break;
+        p = unmarshalValue(is);
     }
+    if(!p.get())
+    {
+        assert(PyErr_Occurred());
+        throw AbortMarshaling();
     }
+    cb->unmarshaled(p.get(), target, closure);
 }
 
 void
@@ -1049,6 +1126,63 @@ IcePy::PrimitiveInfo::print(PyObject* value, IceUtilInternal::Output& out, Print
     out << getString(p.get());
 }
 
+PyObject*
+IcePy::PrimitiveInfo::unmarshalValue(Ice::InputStream* is)
+{
+    switch(kind)
+    {
+    case PrimitiveInfo::KindBool:
+    {
+        bool b;
+        is->read(b);
+        return b ? incTrue() : incFalse();
+    }
+    case PrimitiveInfo::KindByte:
+    {
+        Ice::Byte val;
+        is->read(val);
+        return PyLong_FromLong(val);
+    }
+    case PrimitiveInfo::KindShort:
+    {
+        Ice::Short val;
+        is->read(val);
+        return PyLong_FromLong(val);
+    }
+    case PrimitiveInfo::KindInt:
+    {
+        Ice::Int val;
+        is->read(val);
+        return PyLong_FromLong(val);
+    }
+    case PrimitiveInfo::KindLong:
+    {
+        Ice::Long val;
+        is->read(val);
+        return PyLong_FromLongLong(val);
+    }
+    case PrimitiveInfo::KindFloat:
+    {
+        Ice::Float val;
+        is->read(val);
+        return PyFloat_FromDouble(val);
+    }
+    case PrimitiveInfo::KindDouble:
+    {
+        Ice::Double val;
+        is->read(val);
+        return PyFloat_FromDouble(val);
+    }
+    case PrimitiveInfo::KindString:
+    {
+        return readString(is, 0);
+    }
+    }
+
+    assert(false);
+    return 0;
+}
+
 //
 // EnumInfo implementation.
 //
@@ -1132,17 +1266,7 @@ void
 IcePy::EnumInfo::unmarshal(Ice::InputStream* is, const UnmarshalCallbackPtr& cb, PyObject* target,
                            void* closure, bool, const Ice::StringSeq*)
 {
-    Ice::Int val = is->readEnum(maxValue);
-
-    PyObjectHandle p = enumeratorForValue(val);
-    if(!p.get())
-    {
-        ostringstream ostr;
-        ostr << "enumerator " << val << " is out of range for enum " << id;
-        setPythonException(Ice::MarshalException(__FILE__, __LINE__, ostr.str()));
-        throw AbortMarshaling();
-    }
-
+    PyObjectHandle p = unmarshalValue(is);
     cb->unmarshaled(p.get(), target, closure);
 }
 
@@ -1212,19 +1336,39 @@ IcePy::EnumInfo::enumeratorForValue(Ice::Int v) const
     return r;
 }
 
+PyObject*
+IcePy::EnumInfo::unmarshalValue(Ice::InputStream* is)
+{
+    Ice::Int val = is->readEnum(maxValue);
+
+    PyObject* p = enumeratorForValue(val);
+    if(!p)
+    {
+        ostringstream ostr;
+        ostr << "enumerator " << val << " is out of range for enum " << id;
+        setPythonException(Ice::MarshalException(__FILE__, __LINE__, ostr.str()));
+        throw AbortMarshaling();
+    }
+    return p;
+}
+
 //
 // DataMember implementation.
 //
 void
 IcePy::DataMember::unmarshaled(PyObject* val, PyObject* target, void*)
 {
-    if(PyObject_SetAttrString(target, const_cast<char*>(name.c_str()), val) < 0)
+    if(PyObject_SetAttr(target, pyName.get(), val) < 0)
     {
         assert(PyErr_Occurred());
         throw AbortMarshaling();
     }
 }
 
+//
+// Raises AbortMarshaling with a Python exception set if the interned name of a member can't be
+// created.
+//
 static void
 convertDataMembers(PyObject* members, DataMemberList& reqMembers, DataMemberList& optMembers, bool allowOptional)
 {
@@ -1258,6 +1402,12 @@ convertDataMembers(PyObject* members, DataMemberList& reqMembers, DataMemberList
 
         DataMemberPtr member = new DataMember;
         member->name = getString(name);
+        member->pyName = createInternedString(member->name);
+        if(!member->pyName.get())
+        {
+            assert(PyErr_Occurred());
+            throw AbortMarshaling();
+        }
 #ifndef NDEBUG
         bool b =
 #endif
@@ -1304,6 +1454,51 @@ convertDataMembers(PyObject* members, DataMemberList& reqMembers, DataMemberList
 //
 // StructInfo implementation.
 //
+namespace
+{
+
+//
+// Same rules as Slice::Dictionary::legalKeyType. slice2py only generates __hash__ and the
+// ordering methods for the structures that are legal dictionary keys.
+//
+bool
+legalKeyType(const TypeInfoPtr& type)
+{
+    PrimitiveInfoPtr prim = PrimitiveInfoPtr::dynamicCast(type);
+    if(prim)
+    {
+        return prim->kind != PrimitiveInfo::KindFloat && prim->kind != PrimitiveInfo::KindDouble;
+    }
+
+    if(EnumInfoPtr::dynamicCast(type))
+    {
+        return true;
+    }
+
+    SequenceInfoPtr seq = SequenceInfoPtr::dynamicCast(type);
+    if(seq)
+    {
+        return legalKeyType(seq->elementType);
+    }
+
+    StructInfoPtr st = StructInfoPtr::dynamicCast(type);
+    if(st)
+    {
+        for(DataMemberList::const_iterator p = st->members.begin(); p != st->members.end(); ++p)
+        {
+            if(!legalKeyType((*p)->type))
+            {
+                return false;
+            }
+        }
+        return true;
+    }
+
+    return false;
+}
+
+}
+
 IcePy::StructInfo::StructInfo(const string& ident, PyObject* t, PyObject* m) :
     id(ident), pythonType(t)
 {
@@ -1324,6 +1519,12 @@ IcePy::StructInfo::StructInfo(const string& ident, PyObject* t, PyObject* m) :
         }
         _wireSize += (*p)->type->wireSize();
     }
+
+    _legalKey = true;
+    for(DataMemberList::const_iterator p = members.begin(); p != members.end() && _legalKey; ++p)
+    {
+        _legalKey = legalKeyType((*p)->type);
+    }
 }
 
 string
@@ -1405,20 +1606,19 @@ IcePy::StructInfo::marshal(PyObject* p, Ice::OutputStream* os, ObjectMap* object
     {
         DataMemberPtr member = *q;
         char* memberName = const_cast<char*>(member->name.c_str());
-        PyObjectHandle attr = getAttr(p, member->name, true);
+        PyObjectHandle attr = getAttr(p, member->pyName.get(), true);
         if(!attr.get())
         {
             PyErr_Format(PyExc_AttributeError, STRCAST("no member `%s' found in %s value"), memberName,
                          const_cast<char*>(id.c_str()));
             throw AbortMarshaling();
         }
-        if(!member->type->validate(attr.get()))
+        if(!member->type->validateAndMarshal(attr.get(), os, objectMap, false, &member->metaData))
         {
             PyErr_Format(PyExc_ValueError, STRCAST("invalid value for %s member `%s'"), const_cast<char*>(id.c_str()),
                          memberName);
             throw AbortMarshaling();
         }
-        member->type->marshal(attr.get(), os, objectMap, false, &member->metaData);
     }
 
     if(optional && _variableLength)
@@ -1478,7 +1678,7 @@ IcePy::StructInfo::print(PyObject* value, IceUtilInternal::Output& out, PrintObj
         for(DataMemberList::const_iterator q = members.begin(); q != members.end(); ++q)
         {
             DataMemberPtr member = *q;
-            PyObjectHandle attr = getAttr(value, member->name, true);
+            PyObjectHandle attr = getAttr(value, member->pyName.get(), true);
             out << nl << member->name << " = ";
             if(!attr.get())
             {
@@ -1508,6 +1708,399 @@ IcePy::StructInfo::instantiate(PyObject* pythonType)
     return type->tp_new(type, args.get(), 0);
 }
 
+namespace
+{
+
+//
+// The modulus of the hash of a structure.
+//
+const PY_LONG_LONG hashModulus = 0x7fffffff;
+
+//
+// Combines the hash of a value with h, the same way as the __hash__ method that slice2py used to
+// generate: the elements of sequences and dictionaries are hashed individually.
+//
+// The generated method computed `_h = 5 * _h + hash(value)' with Python integers and returned
+// `_h % 0x7fffffff'. h is kept reduced modulo 0x7fffffff at each step, which gives the same
+// result without overflowing.
+//
+bool
+hashValue(const TypeInfoPtr& type, PyObject* value, PY_LONG_LONG& h)
+{
+    SequenceInfoPtr seq = SequenceInfoPtr::dynamicCast(type);
+    DictionaryInfoPtr dict = DictionaryInfoPtr::dynamicCast(type);
+    if(seq || dict)
+    {
+        int isTrue = PyObject_IsTrue(value);
+        if(isTrue <= 0)
+        {
+            return isTrue == 0;
+        }
+
+        PyObjectHandle iter = PyObject_GetIter(value);
+        if(!iter.get())
+        {
+            return false;
+        }
+
+        while(true)
+        {
+            PyObjectHandle item = PyIter_Next(iter.get());
+            if(!item.get())
+            {
+                return !PyErr_Occurred();
+            }
+
+            if(seq)
+            {
+                if(!hashValue(seq->elementType, item.get(), h))
+                {
+                    return false;
+                }
+            }
+            else
+            {
+                PyObjectHandle v = PyObject_GetItem(value, item.get());
+                if(!v.get() || !hashValue(dict->keyType, item.get(), h) || !hashValue(dict->valueType, v.get(), h))
+                {
+                    return false;
+                }
+            }
+        }
+    }
+
+#if PY_VERSION_HEX >= 0x03000000
+    Py_hash_t hash = PyObject_Hash(value);
+#else
+    long hash = PyObject_Hash(value);
+#endif
+    if(hash == -1 && PyErr_Occurred())
+    {
+        return false;
+    }
+    PY_LONG_LONG r = static_cast<PY_LONG_LONG>(hash) % hashModulus;
+    if(r < 0)
+    {
+        r += hashModulus; // Python's modulo of a negative number is positive.
+    }
+    h = (5 * h + r) % hashModulus;
+    return true;
+}
+
+}
+
+PyObject*
+IcePy::StructInfo::hash(PyObject* p)
+{
+    PY_LONG_LONG h = 0;
+    for(DataMemberList::const_iterator q = members.begin(); q != members.end(); ++q)
+    {
+        PyObjectHandle attr = PyObject_GetAttr(p, (*q)->pyName.get());
+        if(!attr.get() || !hashValue((*q)->type, attr.get(), h))
+        {
+            return 0;
+        }
+    }
+    return PyLong_FromLong(static_cast<long>(h));
+}
+
+PyObject*
+IcePy::StructInfo::compare(PyObject* p, PyObject* other, int op)
+{
+    //
+    // Same semantics as the methods that slice2py used to generate. The structures that are legal
+    // dictionary keys are compared member by member with `<' and `>', and None sorts before any
+    // other value. The equality of the other structures compares each member with `!='.
+    //
+    int r = 0;
+    if(other == Py_None)
+    {
+        r = 1;
+    }
+    else
+    {
+        int isInstance = PyObject_IsInstance(other, pythonType);
+        if(isInstance < 0)
+        {
+            return 0;
+        }
+        else if(isInstance == 0)
+        {
+            return incRef(Py_NotImplemented);
+        }
+
+        for(DataMemberList::const_iterator q = members.begin(); q != members.end() && r == 0; ++q)
+        {
+            PyObjectHandle a = PyObject_GetAttr(p, (*q)->pyName.get());
+            if(!a.get())
+            {
+                return 0;
+            }
+            PyObjectHandle b = PyObject_GetAttr(other, (*q)->pyName.get());
+            if(!b.get())
+            {
+                return 0;
+            }
+
+            if(!_legalKey || a.get() == Py_None || b.get() == Py_None)
+            {
+                //
+                // Don't use PyObject_RichCompareBool, its identity shortcut doesn't match the
+                // `!=' operator for values such as NaN. The None value is not orderable in
+                // Python 3.
+                //
+                PyObjectHandle ne = PyObject_RichCompare(a.get(), b.get(), Py_NE);
+                int isTrue = ne.get() ? PyObject_IsTrue(ne.get()) : -1;
+                if(isTrue < 0)
+                {
+                    return 0;
+                }
+                else if(isTrue)
+                {
+                    r = a.get() == Py_None ? -1 : 1;
+                }
+            }
+            else
+            {
+                int isTrue = PyObject_RichCompareBool(a.get(), b.get(), Py_LT);
+                if(isTrue < 0)
+                {
+                    return 0;
+                }
+                else if(isTrue)
+                {
+                    r = -1;
+                }
+                else
+                {
+                    isTrue = PyObject_RichCompareBool(a.get(), b.get(), Py_GT);
+                    if(isTrue < 0)
+                    {
+                        return 0;
+                    }
+                    r = isTrue;
+                }
+            }
+        }
+    }
+
+    bool result;
+    switch(op)
+    {
+    case Py_LT:
+        result = r < 0;
+        break;
+    case Py_LE:
+        result = r <= 0;
+        break;
+    case Py_EQ:
+        result = r == 0;
+        break;
+    case Py_NE:
+        result = r != 0;
+        break;
+    case Py_GT:
+        result = r > 0;
+        break;
+    case Py_GE:
+        result = r >= 0;
+        break;
+    default:
+        PyErr_Format(PyExc_ValueError, STRCAST("invalid comparison operator %d"), op);
+        return 0;
+    }
+    return result ? incTrue() : incFalse();
+}
+
+namespace
+{
+
+//
+// Writes a bool sequence from the bytes of a buffer. Only 0 and 1 are valid bool values on the
+// wire, the other byte values are converted to 1.
+//
+void
+writeBoolBuffer(Ice::OutputStream* os, const Ice::Byte* b, const Ice::Byte* e)
+{
+    const Ice::Byte* q = b;
+    while(q != e && *q <= 1)
+    {
+        ++q;
+    }
+
+    if(q == e)
+    {
+        os->write(reinterpret_cast<const bool*>(b), reinterpret_cast<const bool*>(e));
+    }
+    else
+    {
+        Ice::BoolSeq seq(static_cast<size_t>(e - b));
+        for(size_t i = 0; i < seq.size(); ++i)
+        {
+            seq[i] = b[i] != 0;
+        }
+        os->write(seq);
+    }
+}
+
+}
+
+#if PY_VERSION_HEX >= 0x03000000
+namespace
+{
+
+//
+// Holds a view of the memory exported by an object that implements the buffer
+// protocol and releases it when it goes out of scope.
+//
+class PrimitiveBuffer : private IceUtil::noncopyable
+{
+public:
+
+    PrimitiveBuffer() :
+        _acquired(false)
+    {
+    }
+
+    ~PrimitiveBuffer()
+    {
+        if(_acquired)
+        {
+            PyBuffer_Release(&_view);
+        }
+    }
+
+    //
+    // Acquires a view of the buffer exported by the given object. Returns false if the
+    // object does not export a one-dimensional C-contiguous buffer or if its item format
+    // does not match the Slice primitive type, in which case the caller must fall back to
+    // the per-element path. No Python exception is set when false is returned.
+    //
+    bool acquire(PyObject* p, PrimitiveInfo::Kind kind)
+    {
+        assert(!_acquired);
+        if(!PyObject_CheckBuffer(p))
+        {
+            return false;
+        }
+
+        if(PyObject_GetBuffer(p, &_view, PyBUF_C_CONTIGUOUS | PyBUF_FORMAT) != 0)
+        {
+            PyErr_Clear(); // PyObject_GetBuffer sets an exception on failure.
+            return false;
+        }
+        _acquired = true;
+
+        if(_view.ndim != 1 || !checkFormat(kind))
+        {
+            PyBuffer_Release(&_view);
+            _acquired = false;
+            return false;
+        }
+        return true;
+    }
+
+    const Ice::Byte* begin() const
+    {
+        return reinterpret_cast<const Ice::Byte*>(_view.buf);
+    }
+
+    const Ice::Byte* end() const
+    {
+        return begin() + _view.len;
+    }
+
+    Py_ssize_t size() const
+    {
+        return _view.len / _view.itemsize;
+    }
+
+private:
+
+    bool checkFormat(PrimitiveInfo::Kind kind) const
+    {
+        //
+        // A null format means unsigned bytes.
+        //
+        const char* fmt = _view.format ? _view.format : "B";
+
+        //
+        // The values are copied as is, so the buffer must use the native byte order.
+        //
+        switch(*fmt)
+        {
+            case '@':
+            case '=':
+#ifdef ICE_BIG_ENDIAN
+            case '>':
+            case '!':
+#else
+            case '<':
+#endif
+            {
+                ++fmt;
+                break;
+            }
+            default:
+            {
+                break;
+            }
+        }
+
+        if(fmt[0] == '\0' || fmt[1] != '\0')
+        {
+            return false;
+        }
+
+        const char code = fmt[0];
+        switch(kind)
+        {
+            case PrimitiveInfo::KindBool:
+            {
+                //
+                // The bytes of a 'b' or 'B' buffer are converted by writeBoolBuffer.
+                //
+                return _view.itemsize == 1 && (code == '?' || code == 'b' || code == 'B');
+            }
+            case PrimitiveInfo::KindByte:
+            {
+                return _view.itemsize == 1 && (code == 'b' || code == 'B' || code == 'c');
+            }
+            case PrimitiveInfo::KindShort:
+            {
+                return _view.itemsize == 2 && code == 'h';
+            }
+            case PrimitiveInfo::KindInt:
+            {
+                return _view.itemsize == 4 && (code == 'i' || code == 'l');
+            }
+            case PrimitiveInfo::KindLong:
+            {
+                return _view.itemsize == 8 && (code == 'q' || code == 'l');
+            }
+            case PrimitiveInfo::KindFloat:
+            {
+                return _view.itemsize == 4 && code == 'f';
+            }
+            case PrimitiveInfo::KindDouble:
+            {
+                return _view.itemsize == 8 && code == 'd';
+            }
+            case PrimitiveInfo::KindString:
+            {
+                return false;
+            }
+        }
+        return false;
+    }
+
+    Py_buffer _view;
+    bool _acquired;
+};
+
+}
+#endif
+
 //
 // SequenceInfo implementation.
 //
@@ -1525,6 +2118,7 @@ IcePy::SequenceInfo::SequenceInfo(const string& ident, PyObject* m, PyObject* t)
 
     const_cast<SequenceMappingPtr&>(mapping) = new SequenceMapping(metaData);
     const_cast<TypeInfoPtr&>(elementType) = getType(t);
+    _intern = hasInternMetaData(metaData);
 }
 
 string
@@ -1584,6 +2178,13 @@ IcePy::SequenceInfo::marshal(PyObject* p, Ice::OutputStream* os, ObjectMap* obje
             Py_ssize_t sz = 0;
             if(p != Py_None)
             {
+#if PY_VERSION_HEX >= 0x03000000
+                PrimitiveBuffer buf;
+                if(pi && buf.acquire(p, pi->kind))
+                {
+                    sz = buf.size();
+                }
+#else
                 const void* buf = 0;
                 if(PyObject_AsReadBuffer(p, &buf, &sz) == 0)
                 {
@@ -1592,10 +2193,14 @@ IcePy::SequenceInfo::marshal(PyObject* p, Ice::OutputStream* os, ObjectMap* obje
                         PyErr_Format(PyExc_ValueError, STRCAST("expected sequence value"));
                         throw AbortMarshaling();
                     }
+                    sz /= elementType->wireSize();
                 }
+#endif
                 else
                 {
+#if PY_VERSION_HEX < 0x03000000
                     PyErr_Clear(); // PyObject_AsReadBuffer sets an exception on failure.
+#endif
 
                     PyObjectHandle fs;
                     if(pi)
@@ -1646,13 +2251,12 @@ IcePy::SequenceInfo::marshal(PyObject* p, Ice::OutputStream* os, ObjectMap* obje
                 assert(PyErr_Occurred());
                 throw AbortMarshaling();
             }
-            if(!elementType->validate(item))
+            if(!elementType->validateAndMarshal(item, os, objectMap, false))
             {
                 PyErr_Format(PyExc_ValueError, STRCAST("invalid value for element %d of `%s'"), static_cast<int>(i),
                              const_cast<char*>(id.c_str()));
                 throw AbortMarshaling();
             }
-            elementType->marshal(item, os, objectMap, false);
         }
     }
 
@@ -1704,7 +2308,8 @@ IcePy::SequenceInfo::unmarshal(Ice::InputStream* is, const UnmarshalCallbackPtr&
     PrimitiveInfoPtr pi = PrimitiveInfoPtr::dynamicCast(elementType);
     if(pi)
     {
-        unmarshalPrimitiveSequence(pi, is, cb, target, closure, sm);
+        InternCache* cache = pi->kind == PrimitiveInfo::KindString ? getInternCache(is, _intern, metaData) : 0;
+        unmarshalPrimitiveSequence(pi, is, cb, target, closure, sm, cache);
         return;
     }
 
@@ -1799,19 +2404,78 @@ IcePy::SequenceInfo::getSequence(const PrimitiveInfoPtr& pi, PyObject* p)
     {
         fs = PySequence_Fast(p, STRCAST("expected a sequence or buffer value"));
     }
-
-    return fs.release();
-}
-
-void
-IcePy::SequenceInfo::marshalPrimitiveSequence(const PrimitiveInfoPtr& pi, PyObject* p, Ice::OutputStream* os)
-{
+
+    return fs.release();
+}
+
+void
+IcePy::SequenceInfo::marshalPrimitiveSequence(const PrimitiveInfoPtr& pi, PyObject* p, Ice::OutputStream* os)
+{
+    Py_ssize_t sz;
+
+#if PY_VERSION_HEX >= 0x03000000
+    //
+    // We accept any object that implements the buffer protocol with an item format that
+    // matches the element type (this includes array.array, memoryview, bytes, bytearray and
+    // NumPy arrays). The memory is written directly to the stream without creating a Python
+    // object for each element.
+    //
+    PrimitiveBuffer buf;
+    if(buf.acquire(p, pi->kind))
+    {
+        const Ice::Byte* b = buf.begin();
+        const Ice::Byte* e = buf.end();
+        switch(pi->kind)
+        {
+        case PrimitiveInfo::KindBool:
+        {
+            writeBoolBuffer(os, b, e);
+            break;
+        }
+        case PrimitiveInfo::KindByte:
+        {
+            os->write(b, e);
+            break;
+        }
+        case PrimitiveInfo::KindShort:
+        {
+            os->write(reinterpret_cast<const Ice::Short*>(b), reinterpret_cast<const Ice::Short*>(e));
+            break;
+        }
+        case PrimitiveInfo::KindInt:
+        {
+            os->write(reinterpret_cast<const Ice::Int*>(b), reinterpret_cast<const Ice::Int*>(e));
+            break;
+        }
+        case PrimitiveInfo::KindLong:
+        {
+            os->write(reinterpret_cast<const Ice::Long*>(b), reinterpret_cast<const Ice::Long*>(e));
+            break;
+        }
+        case PrimitiveInfo::KindFloat:
+        {
+            os->write(reinterpret_cast<const Ice::Float*>(b), reinterpret_cast<const Ice::Float*>(e));
+            break;
+        }
+        case PrimitiveInfo::KindDouble:
+        {
+            os->write(reinterpret_cast<const Ice::Double*>(b), reinterpret_cast<const Ice::Double*>(e));
+            break;
+        }
+        case PrimitiveInfo::KindString:
+        {
+            assert(false); // Rejected by PrimitiveBuffer::acquire.
+            break;
+        }
+        }
+        return;
+    }
+#else
     //
     // For most types, we accept an object that implements the buffer protocol
     // (this includes the array.array type).
     //
     const void* buf = 0;
-    Py_ssize_t sz;
     if(PyObject_AsReadBuffer(p, &buf, &sz) == 0)
     {
         const Ice::Byte* b = reinterpret_cast<const Ice::Byte*>(buf);
@@ -1819,7 +2483,7 @@ IcePy::SequenceInfo::marshalPrimitiveSequence(const PrimitiveInfoPtr& pi, PyObje
         {
         case PrimitiveInfo::KindBool:
         {
-            os->write(reinterpret_cast<const bool*>(b), reinterpret_cast<const bool*>(b + sz));
+            writeBoolBuffer(os, b, b + sz);
             break;
         }
         case PrimitiveInfo::KindByte:
@@ -1864,6 +2528,7 @@ IcePy::SequenceInfo::marshalPrimitiveSequence(const PrimitiveInfoPtr& pi, PyObje
     {
         PyErr_Clear(); // PyObject_AsReadBuffer sets an exception on failure.
     }
+#endif
 
     PyObjectHandle fs = getSequence(pi, p);
     if(!fs.get())
@@ -2109,7 +2774,7 @@ IcePy::SequenceInfo::marshalPrimitiveSequence(const PrimitiveInfoPtr& pi, PyObje
 void
 IcePy::SequenceInfo::unmarshalPrimitiveSequence(const PrimitiveInfoPtr& pi, Ice::InputStream* is,
                                                 const UnmarshalCallbackPtr& cb, PyObject* target, void* closure,
-                                                const SequenceMappingPtr& sm)
+                                                const SequenceMappingPtr& sm, InternCache* cache)
 {
     PyObjectHandle result;
 
@@ -2121,6 +2786,12 @@ IcePy::SequenceInfo::unmarshalPrimitiveSequence(const PrimitiveInfoPtr& pi, Ice:
         IceUtil::ScopedArray<bool> arr;
         is->read(p, arr);
         int sz = static_cast<int>(p.second - p.first);
+        if(sm->usesBuffer(pi->kind))
+        {
+            result = sm->createBuffer(pi->kind, p.first, sz);
+            break;
+        }
+
         result = sm->createContainer(sz);
         if(!result.get())
         {
@@ -2139,7 +2810,11 @@ IcePy::SequenceInfo::unmarshalPrimitiveSequence(const PrimitiveInfoPtr& pi, Ice:
         pair<const Ice::Byte*, const Ice::Byte*> p;
         is->read(p);
         int sz = static_cast<int>(p.second - p.first);
-        if(sm->type == SequenceMapping::SEQ_DEFAULT)
+        if(sm->usesBuffer(pi->kind))
+        {
+            result = sm->createBuffer(pi->kind, p.first, sz);
+        }
+        else if(sm->type == SequenceMapping::SEQ_DEFAULT)
         {
 #if PY_VERSION_HEX >= 0x03000000
             result = PyBytes_FromStringAndSize(reinterpret_cast<const char*>(p.first), sz);
@@ -2180,6 +2855,12 @@ IcePy::SequenceInfo::unmarshalPrimitiveSequence(const PrimitiveInfoPtr& pi, Ice:
         IceUtil::ScopedArray<Ice::Short> arr;
         is->read(p, arr);
         int sz = static_cast<int>(p.second - p.first);
+        if(sm->usesBuffer(pi->kind))
+        {
+            result = sm->createBuffer(pi->kind, p.first, sz);
+            break;
+        }
+
         result = sm->createContainer(sz);
         if(!result.get())
         {
@@ -2205,6 +2886,12 @@ IcePy::SequenceInfo::unmarshalPrimitiveSequence(const PrimitiveInfoPtr& pi, Ice:
         IceUtil::ScopedArray<Ice::Int> arr;
         is->read(p, arr);
         int sz = static_cast<int>(p.second - p.first);
+        if(sm->usesBuffer(pi->kind))
+        {
+            result = sm->createBuffer(pi->kind, p.first, sz);
+            break;
+        }
+
         result = sm->createContainer(sz);
         if(!result.get())
         {
@@ -2230,6 +2917,12 @@ IcePy::SequenceInfo::unmarshalPrimitiveSequence(const PrimitiveInfoPtr& pi, Ice:
         IceUtil::ScopedArray<Ice::Long> arr;
         is->read(p, arr);
         int sz = static_cast<int>(p.second - p.first);
+        if(sm->usesBuffer(pi->kind))
+        {
+            result = sm->createBuffer(pi->kind, p.first, sz);
+            break;
+        }
+
         result = sm->createContainer(sz);
         if(!result.get())
         {
@@ -2255,6 +2948,12 @@ IcePy::SequenceInfo::unmarshalPrimitiveSequence(const PrimitiveInfoPtr& pi, Ice:
         IceUtil::ScopedArray<Ice::Float> arr;
         is->read(p, arr);
         int sz = static_cast<int>(p.second - p.first);
+        if(sm->usesBuffer(pi->kind))
+        {
+            result = sm->createBuffer(pi->kind, p.first, sz);
+            break;
+        }
+
         result = sm->createContainer(sz);
         if(!result.get())
         {
@@ -2280,6 +2979,12 @@ IcePy::SequenceInfo::unmarshalPrimitiveSequence(const PrimitiveInfoPtr& pi, Ice:
         IceUtil::ScopedArray<Ice::Double> arr;
         is->read(p, arr);
         int sz = static_cast<int>(p.second - p.first);
+        if(sm->usesBuffer(pi->kind))
+        {
+            result = sm->createBuffer(pi->kind, p.first, sz);
+            break;
+        }
+
         result = sm->createContainer(sz);
         if(!result.get())
         {
@@ -2301,13 +3006,10 @@ IcePy::SequenceInfo::unmarshalPrimitiveSequence(const PrimitiveInfoPtr& pi, Ice:
     }
     case PrimitiveInfo::KindString:
     {
-        Ice::StringSeq seq;
-#if PY_VERSION_HEX >= 0x03000000
-        is->read(seq, false); // Bypass string conversion.
-#else
-        is->read(seq, true);
-#endif
-        int sz = static_cast<int>(seq.size());
+        //
+        // Create the strings directly instead of reading them into a StringSeq first.
+        //
+        int sz = is->readAndCheckSeqSize(1);
         result = sm->createContainer(sz);
         if(!result.get())
         {
@@ -2317,7 +3019,7 @@ IcePy::SequenceInfo::unmarshalPrimitiveSequence(const PrimitiveInfoPtr& pi, Ice:
 
         for(int i = 0; i < sz; ++i)
         {
-            PyObjectHandle item = createString(seq[i]);
+            PyObjectHandle item = readString(is, cache);
             if(!item.get())
             {
                 assert(PyErr_Occurred());
@@ -2353,6 +3055,21 @@ IcePy::SequenceInfo::SequenceMapping::getType(const Ice::StringSeq& metaData, Ty
                 t = SEQ_LIST;
                 return true;
             }
+            else if((*p) == "python:array.array")
+            {
+                t = SEQ_ARRAY;
+                return true;
+            }
+            else if((*p) == "python:memoryview")
+            {
+                t = SEQ_MEMORYVIEW;
+                return true;
+            }
+            else if((*p) == "python:numpy.ndarray")
+            {
+                t = SEQ_NUMPYARRAY;
+                return true;
+            }
         }
     }
 
@@ -2376,47 +3093,203 @@ void
 IcePy::SequenceInfo::SequenceMapping::unmarshaled(PyObject* val, PyObject* target, void* closure)
 {
     Py_ssize_t i = reinterpret_cast<Py_ssize_t>(closure);
-    if(type == SEQ_DEFAULT || type == SEQ_LIST)
+    if(type == SEQ_TUPLE)
     {
-        PyList_SET_ITEM(target, i, val);
-        Py_INCREF(val); // PyList_SET_ITEM steals a reference.
+        PyTuple_SET_ITEM(target, i, val);
+        Py_INCREF(val); // PyTuple_SET_ITEM steals a reference.
     }
     else
     {
-        assert(type == SEQ_TUPLE);
-        PyTuple_SET_ITEM(target, i, val);
-        Py_INCREF(val); // PyTuple_SET_ITEM steals a reference.
+        PyList_SET_ITEM(target, i, val);
+        Py_INCREF(val); // PyList_SET_ITEM steals a reference.
     }
 }
 
+//
+// The array, memoryview and NumPy mappings only apply to sequences of numeric and bool
+// types, other sequences with this metadata use the list mapping.
+//
 PyObject*
 IcePy::SequenceInfo::SequenceMapping::createContainer(int sz) const
 {
-    if(type == SEQ_DEFAULT || type == SEQ_LIST)
+    if(type == SEQ_TUPLE)
     {
-        return PyList_New(sz);
+        return PyTuple_New(sz);
     }
     else
     {
-        assert(type == SEQ_TUPLE);
-        return PyTuple_New(sz);
+        return PyList_New(sz);
     }
 }
 
 void
 IcePy::SequenceInfo::SequenceMapping::setItem(PyObject* cont, int i, PyObject* val) const
 {
-    if(type == SEQ_DEFAULT || type == SEQ_LIST)
+    if(type == SEQ_TUPLE)
     {
         Py_INCREF(val);
-        PyList_SET_ITEM(cont, i, val); // PyList_SET_ITEM steals a reference.
+        PyTuple_SET_ITEM(cont, i, val); // PyTuple_SET_ITEM steals a reference.
     }
     else
     {
-        assert(type == SEQ_TUPLE);
         Py_INCREF(val);
-        PyTuple_SET_ITEM(cont, i, val); // PyTuple_SET_ITEM steals a reference.
+        PyList_SET_ITEM(cont, i, val); // PyList_SET_ITEM steals a reference.
+    }
+}
+
+bool
+IcePy::SequenceInfo::SequenceMapping::usesBuffer(PrimitiveInfo::Kind kind) const
+{
+    return (type == SEQ_ARRAY || type == SEQ_MEMORYVIEW || type == SEQ_NUMPYARRAY) &&
+        kind != PrimitiveInfo::KindString;
+}
+
+PyObject*
+IcePy::SequenceInfo::SequenceMapping::createBuffer(PrimitiveInfo::Kind kind, const void* data, int sz) const
+{
+    //
+    // The array.array type code and item size for each primitive kind. Bool values are
+    // stored as signed bytes.
+    //
+    static const char* typeCodes[] = { "b", "B", "h", "i", "q", "f", "d" };
+    static const int itemSizes[] = { 1, 1, 2, 4, 8, 4, 8 };
+    assert(kind != PrimitiveInfo::KindString);
+
+    if(type == SEQ_NUMPYARRAY)
+    {
+        //
+        // The data is in native byte order, which is the byte order of these NumPy types.
+        //
+        static const char* dtypes[] = { "bool", "uint8", "int16", "int32", "int64", "float32", "float64" };
+
+        //
+        // NumPy is only imported the first time this mapping is used.
+        //
+        PyObject* empty = lookupType("numpy.empty");
+        if(!empty)
+        {
+            if(!PyErr_Occurred())
+            {
+                PyErr_Format(PyExc_ImportError, STRCAST("unable to find function `numpy.empty'"));
+            }
+            throw AbortMarshaling();
+        }
+
+        PyObjectHandle result = PyObject_CallFunction(empty, STRCAST("ns"), static_cast<Py_ssize_t>(sz),
+                                                      STRCAST(dtypes[kind]));
+        if(!result.get())
+        {
+            assert(PyErr_Occurred());
+            throw AbortMarshaling();
+        }
+
+        if(sz > 0)
+        {
+            Py_buffer view;
+            if(PyObject_GetBuffer(result.get(), &view, PyBUF_WRITABLE | PyBUF_C_CONTIGUOUS) != 0)
+            {
+                assert(PyErr_Occurred());
+                throw AbortMarshaling();
+            }
+            assert(view.len == static_cast<Py_ssize_t>(sz) * itemSizes[kind]);
+            memcpy(view.buf, data, static_cast<size_t>(view.len));
+            PyBuffer_Release(&view);
+        }
+
+        return result.release();
+    }
+
+    const char* typeCode = typeCodes[kind];
+#if PY_VERSION_HEX < 0x03000000
+    if(kind == PrimitiveInfo::KindLong)
+    {
+        //
+        // The array module of Python 2 doesn't support the "q" type code. The "l" type code is
+        // used if it's 8 bytes wide, otherwise the values are returned in a list.
+        //
+        if(sizeof(long) != 8)
+        {
+            PyObjectHandle result = PyList_New(sz);
+            if(!result.get())
+            {
+                throw AbortMarshaling();
+            }
+            for(int i = 0; i < sz; ++i)
+            {
+                Ice::Long v;
+                memcpy(&v, reinterpret_cast<const Ice::Byte*>(data) + i * sizeof(Ice::Long), sizeof(Ice::Long));
+                PyObject* item = PyLong_FromLongLong(v);
+                if(!item)
+                {
+                    throw AbortMarshaling();
+                }
+                PyList_SET_ITEM(result.get(), i, item); // PyList_SET_ITEM steals a reference.
+            }
+            return result.release();
+        }
+        typeCode = "l";
+    }
+#endif
+
+    PyObject* arrayType = lookupType("array.array");
+    if(!arrayType)
+    {
+        if(!PyErr_Occurred())
+        {
+            PyErr_Format(PyExc_ImportError, STRCAST("unable to find type `array.array'"));
+        }
+        throw AbortMarshaling();
+    }
+
+    PyObjectHandle result = PyObject_CallFunction(arrayType, STRCAST("s"), STRCAST(typeCode));
+    if(!result.get())
+    {
+        assert(PyErr_Occurred());
+        throw AbortMarshaling();
+    }
+
+    if(sz > 0)
+    {
+        //
+        // Wrap the unmarshaled data without copying it, the array then copies it into its
+        // own storage with a single memcpy.
+        //
+        const Py_ssize_t len = static_cast<Py_ssize_t>(sz) * itemSizes[kind];
+#if PY_VERSION_HEX >= 0x03000000
+        PyObjectHandle mem = PyMemoryView_FromMemory(reinterpret_cast<char*>(const_cast<void*>(data)), len,
+                                                     PyBUF_READ);
+        const char* method = "frombytes";
+#else
+        PyObjectHandle mem = PyBuffer_FromMemory(const_cast<void*>(data), len);
+        const char* method = "fromstring";
+#endif
+        if(!mem.get())
+        {
+            assert(PyErr_Occurred());
+            throw AbortMarshaling();
+        }
+
+        PyObjectHandle tmp = PyObject_CallMethod(result.get(), STRCAST(method), STRCAST("O"), mem.get());
+        if(!tmp.get())
+        {
+            assert(PyErr_Occurred());
+            throw AbortMarshaling();
+        }
+    }
+
+#if PY_VERSION_HEX >= 0x03000000
+    if(type == SEQ_MEMORYVIEW)
+    {
+        result = PyMemoryView_FromObject(result.get());
+        if(!result.get())
+        {
+            assert(PyErr_Occurred());
+            throw AbortMarshaling();
+        }
     }
+#endif
+
+    return result.release();
 }
 
 //
@@ -2593,6 +3466,11 @@ IcePy::DictionaryInfo::DictionaryInfo(const string& ident, PyObject* kt, PyObjec
 
     _variableLength = keyType->variableLength() || valueType->variableLength();
     _wireSize = keyType->wireSize() + valueType->wireSize();
+
+    _primitiveKeyType = PrimitiveInfoPtr::dynamicCast(keyType);
+    _enumKeyType = EnumInfoPtr::dynamicCast(keyType);
+    _primitiveValueType = PrimitiveInfoPtr::dynamicCast(valueType);
+    _enumValueType = EnumInfoPtr::dynamicCast(valueType);
 }
 
 string
@@ -2669,19 +3547,17 @@ IcePy::DictionaryInfo::marshal(PyObject* p, Ice::OutputStream* os, ObjectMap* ob
         PyObject* value;
         while(PyDict_Next(p, &pos, &key, &value))
         {
-            if(!keyType->validate(key))
+            if(!keyType->validateAndMarshal(key, os, objectMap, false))
             {
                 PyErr_Format(PyExc_ValueError, STRCAST("invalid key in `%s' element"), const_cast<char*>(id.c_str()));
                 throw AbortMarshaling();
             }
-            keyType->marshal(key, os, objectMap, false);
 
-            if(!valueType->validate(value))
+            if(!valueType->validateAndMarshal(value, os, objectMap, false))
             {
                 PyErr_Format(PyExc_ValueError, STRCAST("invalid value in `%s' element"), const_cast<char*>(id.c_str()));
                 throw AbortMarshaling();
             }
-            valueType->marshal(value, os, objectMap, false);
         }
     }
 
@@ -2707,17 +3583,46 @@ IcePy::DictionaryInfo::unmarshal(Ice::InputStream* is, const UnmarshalCallbackPt
         }
     }
 
-    PyObjectHandle p = PyDict_New();
+    //
+    // The size is checked against the remaining bytes before the dictionary is presized.
+    //
+    Ice::Int sz = is->readAndCheckSeqSize(_wireSize);
+
+    PyObjectHandle p = _PyDict_NewPresized(sz);
     if(!p.get())
     {
         assert(PyErr_Occurred());
         throw AbortMarshaling();
     }
 
+    if((_primitiveKeyType || _enumKeyType) && (_primitiveValueType || _enumValueType))
+    {
+        //
+        // Insert each entry once, without callbacks.
+        //
+        for(Ice::Int i = 0; i < sz; ++i)
+        {
+            PyObjectHandle key = unmarshalElement(is, _primitiveKeyType, _enumKeyType);
+            if(!key.get())
+            {
+                assert(PyErr_Occurred());
+                throw AbortMarshaling();
+            }
+            PyObjectHandle value = unmarshalElement(is, _primitiveValueType, _enumValueType);
+            if(!value.get() || PyDict_SetItem(p.get(), key.get(), value.get()) < 0)
+            {
+                assert(PyErr_Occurred());
+                throw AbortMarshaling();
+            }
+        }
+
+        cb->unmarshaled(p.get(), target, closure);
+        return;
+    }
+
     KeyCallbackPtr keyCB = new KeyCallback;
     keyCB->key = 0;
 
-    Ice::Int sz = is->readSize();
     for(Ice::Int i = 0; i < sz; ++i)
     {
         //
@@ -2749,6 +3654,13 @@ IcePy::DictionaryInfo::unmarshal(Ice::InputStream* is, const UnmarshalCallbackPt
     cb->unmarshaled(p.get(), target, closure);
 }
 
+PyObject*
+IcePy::DictionaryInfo::unmarshalElement(Ice::InputStream* is, const PrimitiveInfoPtr& primitiveType,
+                                        const EnumInfoPtr& enumType)
+{
+    return primitiveType ? primitiveType->unmarshalValue(is) : enumType->unmarshalValue(is);
+}
+
 void
 IcePy::DictionaryInfo::unmarshaled(PyObject* val, PyObject* target, void* closure)
 {
@@ -3174,7 +4086,7 @@ IcePy::ValueInfo::printMembers(PyObject* value, IceUtilInternal::Output& out, Pr
     for(q = members.begin(); q != members.end(); ++q)
     {
         DataMemberPtr member = *q;
-        PyObjectHandle attr = getAttr(value, member->name, true);
+        PyObjectHandle attr = getAttr(value, member->pyName.get(), true);
         out << nl << member->name << " = ";
         if(!attr.get())
         {
@@ -3189,7 +4101,7 @@ IcePy::ValueInfo::printMembers(PyObject* value, IceUtilInternal::Output& out, Pr
     for(q = optionalMembers.begin(); q != optionalMembers.end(); ++q)
     {
         DataMemberPtr member = *q;
-        PyObjectHandle attr = getAttr(value, member->name, true);
+        PyObjectHandle attr = getAttr(value, member->pyName.get(), true);
         out << nl << member->name << " = ";
         if(!attr.get())
         {
@@ -3435,7 +4347,7 @@ IcePy::ObjectWriter::writeMembers(Ice::OutputStream* os, const DataMemberList& m
 
         char* memberName = const_cast<char*>(member->name.c_str());
 
-        PyObjectHandle val = getAttr(_object, member->name, true);
+        PyObjectHandle val = getAttr(_object, member->pyName.get(), true);
         if(!val.get())
         {
             if(member->optional)
@@ -3456,14 +4368,12 @@ IcePy::ObjectWriter::writeMembers(Ice::OutputStream* os, const DataMemberList& m
             continue;
         }
 
-        if(!member->type->validate(val.get()))
+        if(!member->type->validateAndMarshal(val.get(), os, _map, member->optional, &member->metaData))
         {
             PyErr_Format(PyExc_ValueError, STRCAST("invalid value for %s member `%s'"),
                          const_cast<char*>(_info->id.c_str()), memberName);
             throw AbortMarshaling();
         }
-
-        member->type->marshal(val.get(), os, _map, member->optional, &member->metaData);
     }
 }
 
@@ -3536,7 +4446,7 @@ IcePy::ObjectReader::_iceRead(Ice::InputStream* is)
                 {
                     member->type->unmarshal(is, member, _object, 0, true, &member->metaData);
                 }
-                else if(PyObject_SetAttrString(_object, const_cast<char*>(member->name.c_str()), Unset) < 0)
+                else if(PyObject_SetAttr(_object, member->pyName.get(), Unset) < 0)
                 {
                     assert(PyErr_Occurred());
                     throw AbortMarshaling();
@@ -3686,7 +4596,7 @@ IcePy::ExceptionInfo::writeMembers(PyObject* p, Ice::OutputStream* os, const Dat
 
         char* memberName = const_cast<char*>(member->name.c_str());
 
-        PyObjectHandle val = getAttr(p, member->name, true);
+        PyObjectHandle val = getAttr(p, member->pyName.get(), true);
         if(!val.get())
         {
             if(member->optional)
@@ -3707,14 +4617,12 @@ IcePy::ExceptionInfo::writeMembers(PyObject* p, Ice::OutputStream* os, const Dat
             continue;
         }
 
-        if(!member->type->validate(val.get()))
+        if(!member->type->validateAndMarshal(val.get(), os, objectMap, member->optional, &member->metaData))
         {
             PyErr_Format(PyExc_ValueError, STRCAST("invalid value for %s member `%s'"),
                          const_cast<char*>(id.c_str()), memberName);
             throw AbortMarshaling();
         }
-
-        member->type->marshal(val.get(), os, objectMap, member->optional, &member->metaData);
     }
 }
 
@@ -3746,7 +4654,7 @@ IcePy::ExceptionInfo::unmarshal(Ice::InputStream* is)
             {
                 member->type->unmarshal(is, member, p.get(), 0, true, &member->metaData);
             }
-            else if(PyObject_SetAttrString(p.get(), const_cast<char*>(member->name.c_str()), Unset) < 0)
+            else if(PyObject_SetAttr(p.get(), member->pyName.get(), Unset) < 0)
             {
                 assert(PyErr_Occurred());
                 throw AbortMarshaling();
@@ -3792,7 +4700,7 @@ IcePy::ExceptionInfo::printMembers(PyObject* value, IceUtilInternal::Output& out
     for(q = members.begin(); q != members.end(); ++q)
     {
         DataMemberPtr member = *q;
-        PyObjectHandle attr = getAttr(value, member->name, true);
+        PyObjectHandle attr = getAttr(value, member->pyName.get(), true);
         out << nl << member->name << " = ";
         if(!attr.get() || attr.get() == Unset)
         {
@@ -3807,7 +4715,7 @@ IcePy::ExceptionInfo::printMembers(PyObject* value, IceUtilInternal::Output& out
     for(q = optionalMembers.begin(); q != optionalMembers.end(); ++q)
     {
         DataMemberPtr member = *q;
-        PyObjectHandle attr = getAttr(value, member->name, true);
+        PyObjectHandle attr = getAttr(value, member->pyName.get(), true);
         out << nl << member->name << " = ";
         if(!attr.get())
         {
@@ -3957,6 +4865,19 @@ IcePy::ExceptionReader::getSlicedData() const
     return _slicedData;
 }
 
+//
+// UserExceptionFactory
+//
+void
+IcePy::UserExceptionFactory::createAndThrow(const string& id)
+{
+    ExceptionInfoPtr info = lookupExceptionInfo(id);
+    if(info)
+    {
+        throw ExceptionReader(info);
+    }
+}
+
 //
 // IdResolver
 //
@@ -4358,7 +5279,15 @@ IcePy_defineStruct(PyObject*, PyObject* args)
     assert(PyTuple_Check(meta));
     assert(PyTuple_Check(members));
 
-    StructInfoPtr info = new StructInfo(id, type, members);
+    StructInfoPtr info;
+    try
+    {
+        info = new StructInfo(id, type, members);
+    }
+    catch(const AbortMarshaling&)
+    {
+        return 0;
+    }
 
     return createType(info);
 }
@@ -4600,7 +5529,14 @@ IcePy_defineValue(PyObject*, PyObject* args)
         r = info->typeObj;
     }
 
-    info->define(type, compactId, preserve ? true : false, interface ? true : false, base, members);
+    try
+    {
+        info->define(type, compactId, preserve ? true : false, interface ? true : false, base, members);
+    }
+    catch(const AbortMarshaling&)
+    {
+        return 0;
+    }
 
     if(info->compactId != -1)
     {
@@ -4645,7 +5581,14 @@ IcePy_defineException(PyObject*, PyObject* args)
         assert(info->base);
     }
 
-    convertDataMembers(members, info->members, info->optionalMembers, true);
+    try
+    {
+        convertDataMembers(members, info->members, info->optionalMembers, true);
+    }
+    catch(const AbortMarshaling&)
+    {
+        return 0;
+    }
 
     info->usesClasses = false;
 
@@ -4691,6 +5634,58 @@ IcePy_stringify(PyObject*, PyObject* args)
     return createString(str);
 }
 
+extern "C"
+PyObject*
+IcePy_hashStruct(PyObject*, PyObject* args)
+{
+    PyObject* value;
+    PyObject* type;
+    if(!PyArg_ParseTuple(args, STRCAST("OO"), &value, &type))
+    {
+        return 0;
+    }
+
+    StructInfoPtr info;
+    if(PyObject_IsInstance(type, reinterpret_cast<PyObject*>(&TypeInfoType)) == 1)
+    {
+        info = StructInfoPtr::dynamicCast(getType(type));
+    }
+    if(!info)
+    {
+        PyErr_Format(PyExc_TypeError, STRCAST("expected a structure type"));
+        return 0;
+    }
+
+    return info->hash(value);
+}
+
+extern "C"
+PyObject*
+IcePy_compareStruct(PyObject*, PyObject* args)
+{
+    PyObject* value;
+    PyObject* other;
+    PyObject* type;
+    int op;
+    if(!PyArg_ParseTuple(args, STRCAST("OOOi"), &value, &other, &type, &op))
+    {
+        return 0;
+    }
+
+    StructInfoPtr info;
+    if(PyObject_IsInstance(type, reinterpret_cast<PyObject*>(&TypeInfoType)) == 1)
+    {
+        info = StructInfoPtr::dynamicCast(getType(type));
+    }
+    if(!info)
+    {
+        PyErr_Format(PyExc_TypeError, STRCAST("expected a structure type"));
+        return 0;
+    }
+
+    return info->compare(value, other, op);
+}
+
 extern "C"
 PyObject*
 IcePy_stringifyException(PyObject*, PyObject* args)
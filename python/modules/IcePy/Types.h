@@ -11,7 +11,9 @@
 #define ICEPY_TYPES_H
 
 #include <Config.h>
+#include <InternCache.h>
 #include <Util.h>
+#include <Ice/CommunicatorF.h>
 #include <Ice/FactoryTable.h>
 #include <Ice/Object.h>
 #include <Ice/SlicedDataF.h>
@@ -98,9 +100,15 @@ class StreamUtil
 {
 public:
 
-    StreamUtil();
+    StreamUtil(const Ice::CommunicatorPtr&);
     ~StreamUtil();
 
+    //
+    // Returns the cache for the strings unmarshaled with the python:intern metadata, or 0 if the
+    // communicator doesn't intern strings.
+    //
+    InternCache* getInternCache();
+
     //
     // Keep a reference to a ReadObjectCallback for patching purposes.
     //
@@ -123,6 +131,9 @@ private:
 
     std::vector<ReadObjectCallbackPtr> _callbacks;
     std::set<ObjectReaderPtr> _readers;
+    const Ice::CommunicatorPtr _communicator;
+    InternCachePtr _internCache;
+    bool _internCacheInitialized;
     static PyObject* _slicedDataType;
     static PyObject* _sliceInfoType;
 };
@@ -168,6 +179,13 @@ public:
     virtual void unmarshal(Ice::InputStream*, const UnmarshalCallbackPtr&, PyObject*, void*, bool,
                            const Ice::StringSeq* = 0) = 0;
 
+    //
+    // Validates and marshals a value in a single pass. Returns false without marshaling
+    // anything if the value is invalid, the caller is responsible for raising an error.
+    // The default implementation calls validate() and then marshal().
+    //
+    virtual bool validateAndMarshal(PyObject*, Ice::OutputStream*, ObjectMap*, bool, const Ice::StringSeq* = 0);
+
     virtual void print(PyObject*, IceUtilInternal::Output&, PrintObjectHistory*) = 0;
 };
 typedef IceUtil::Handle<TypeInfo> TypeInfoPtr;
@@ -204,9 +222,15 @@ public:
     virtual void marshal(PyObject*, Ice::OutputStream*, ObjectMap*, bool, const Ice::StringSeq* = 0);
     virtual void unmarshal(Ice::InputStream*, const UnmarshalCallbackPtr&, PyObject*, void*, bool,
                            const Ice::StringSeq* = 0);
+    virtual bool validateAndMarshal(PyObject*, Ice::OutputStream*, ObjectMap*, bool, const Ice::StringSeq* = 0);
 
     virtual void print(PyObject*, IceUtilInternal::Output&, PrintObjectHistory*);
 
+    //
+    // Unmarshals a value and returns a new reference.
+    //
+    PyObject* unmarshalValue(Ice::InputStream*);
+
     const Kind kind;
 };
 typedef IceUtil::Handle<PrimitiveInfo> PrimitiveInfoPtr;
@@ -241,6 +265,11 @@ public:
     Ice::Int valueForEnumerator(PyObject*) const;
     PyObject* enumeratorForValue(Ice::Int) const;
 
+    //
+    // Unmarshals an enumerator and returns a new reference.
+    //
+    PyObject* unmarshalValue(Ice::InputStream*);
+
     const std::string id;
     PyObject* pythonType; // Borrowed reference - the enclosing Python module owns the reference.
     const Ice::Int maxValue;
@@ -255,6 +284,7 @@ public:
     virtual void unmarshaled(PyObject*, PyObject*, void*);
 
     std::string name;
+    PyObjectHandle pyName; // Interned name, used for attribute lookups.
     std::vector<std::string> metaData;
     TypeInfoPtr type;
     bool optional;
@@ -292,6 +322,13 @@ public:
 
     static PyObject* instantiate(PyObject*);
 
+    //
+    // Implement the __hash__ and rich comparison methods of the generated class, op is one of
+    // Py_LT, Py_LE, Py_EQ, Py_NE, Py_GT or Py_GE.
+    //
+    PyObject* hash(PyObject*);
+    PyObject* compare(PyObject*, PyObject*, int);
+
     const std::string id;
     const DataMemberList members;
     PyObject* pythonType; // Borrowed reference - the enclosing Python module owns the reference.
@@ -300,6 +337,7 @@ private:
 
     bool _variableLength;
     int _wireSize;
+    bool _legalKey;
     PyObjectHandle _nullMarshalValue;
 };
 typedef IceUtil::Handle<StructInfo> StructInfoPtr;
@@ -335,7 +373,7 @@ private:
 
     struct SequenceMapping : public UnmarshalCallback
     {
-        enum Type { SEQ_DEFAULT, SEQ_TUPLE, SEQ_LIST };
+        enum Type { SEQ_DEFAULT, SEQ_TUPLE, SEQ_LIST, SEQ_ARRAY, SEQ_MEMORYVIEW, SEQ_NUMPYARRAY };
 
         SequenceMapping(Type);
         SequenceMapping(const Ice::StringSeq&);
@@ -347,6 +385,9 @@ private:
         PyObject* createContainer(int) const;
         void setItem(PyObject*, int, PyObject*) const;
 
+        bool usesBuffer(PrimitiveInfo::Kind) const;
+        PyObject* createBuffer(PrimitiveInfo::Kind, const void*, int) const;
+
         Type type;
     };
     typedef IceUtil::Handle<SequenceMapping> SequenceMappingPtr;
@@ -354,7 +395,9 @@ private:
     PyObject* getSequence(const PrimitiveInfoPtr&, PyObject*);
     void marshalPrimitiveSequence(const PrimitiveInfoPtr&, PyObject*, Ice::OutputStream*);
     void unmarshalPrimitiveSequence(const PrimitiveInfoPtr&, Ice::InputStream*, const UnmarshalCallbackPtr&,
-                                    PyObject*, void*, const SequenceMappingPtr&);
+                                    PyObject*, void*, const SequenceMappingPtr&, InternCache*);
+
+    bool _intern; // Set by the python:intern metadata of a string sequence.
 
 public:
 
@@ -438,8 +481,19 @@ public:
 
 private:
 
+    PyObject* unmarshalElement(Ice::InputStream*, const PrimitiveInfoPtr&, const EnumInfoPtr&);
+
     bool _variableLength;
     int _wireSize;
+
+    //
+    // Set when the key or value type is a primitive type, string or enum. A dictionary with such
+    // key and value types is unmarshaled without callbacks.
+    //
+    PrimitiveInfoPtr _primitiveKeyType;
+    EnumInfoPtr _enumKeyType;
+    PrimitiveInfoPtr _primitiveValueType;
+    EnumInfoPtr _enumValueType;
 };
 typedef IceUtil::Handle<DictionaryInfo> DictionaryInfoPtr;
 
@@ -703,6 +757,16 @@ private:
     Ice::SlicedDataPtr _slicedData;
 };
 
+//
+// Throws an ExceptionReader for the user exceptions whose type is defined.
+//
+class UserExceptionFactory : public Ice::UserExceptionFactory
+{
+public:
+
+    virtual void createAndThrow(const std::string&);
+};
+
 class IdResolver : public Ice::CompactIdResolver
 {
 public:
@@ -716,6 +780,8 @@ ExceptionInfoPtr lookupExceptionInfo(const std::string&);
 
 extern PyObject* Unset;
 
+extern PyTypeObject TypeInfoType;
+
 bool initTypes(PyObject*);
 
 PyObject* createType(const TypeInfoPtr&);
@@ -739,6 +805,8 @@ extern "C" PyObject* IcePy_declareValue(PyObject*, PyObject*);
 extern "C" PyObject* IcePy_defineValue(PyObject*, PyObject*);
 extern "C" PyObject* IcePy_defineException(PyObject*, PyObject*);
 extern "C" PyObject* IcePy_stringify(PyObject*, PyObject*);
+extern "C" PyObject* IcePy_hashStruct(PyObject*, PyObject*);
+extern "C" PyObject* IcePy_compareStruct(PyObject*, PyObject*);
 extern "C" PyObject* IcePy_stringifyException(PyObject*, PyObject*);
 
 #endif
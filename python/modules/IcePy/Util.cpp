@@ -228,6 +228,26 @@ IcePy::getAttr(PyObject* obj, const string& attrib, bool allowNone)
     return v;
 }
 
+PyObject*
+IcePy::getAttr(PyObject* obj, PyObject* attrib, bool allowNone)
+{
+    PyObject* v = PyObject_GetAttr(obj, attrib);
+    if(v == Py_None)
+    {
+        if(!allowNone)
+        {
+            Py_DECREF(v);
+            v = 0;
+        }
+    }
+    else if(!v)
+    {
+        PyErr_Clear(); // PyObject_GetAttr sets an error on failure.
+    }
+
+    return v;
+}
+
 string
 IcePy::getFunction()
 {
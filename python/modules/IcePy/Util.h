@@ -75,23 +75,40 @@ inline PyObject* incTrue()
 //
 // Create a string object.
 //
-inline PyObject* createString(const std::string& str)
+inline PyObject* createString(const char* str, Py_ssize_t size)
 {
 #if PY_VERSION_HEX >= 0x03000000
     //
     // PyUnicode_FromStringAndSize interprets the argument as UTF-8.
     //
-    return PyUnicode_FromStringAndSize(str.c_str(), static_cast<Py_ssize_t>(str.size()));
+    return PyUnicode_FromStringAndSize(size > 0 ? str : "", size);
 #else
-    return PyString_FromStringAndSize(str.c_str(), static_cast<Py_ssize_t>(str.size()));
+    return PyString_FromStringAndSize(size > 0 ? str : "", size);
 #endif
 }
 
+inline PyObject* createString(const std::string& str)
+{
+    return createString(str.c_str(), static_cast<Py_ssize_t>(str.size()));
+}
+
 //
 // Obtain a string from a string object; None is also legal.
 //
 std::string getString(PyObject*);
 
+//
+// Create an interned string object, suitable for attribute lookups.
+//
+inline PyObject* createInternedString(const std::string& str)
+{
+#if PY_VERSION_HEX >= 0x03000000
+    return PyUnicode_InternFromString(str.c_str());
+#else
+    return PyString_InternFromString(str.c_str());
+#endif
+}
+
 //
 // Verify that the object is a string; None is NOT legal.
 //
@@ -116,6 +133,12 @@ bool getStringArg(PyObject*, const std::string&, std::string&);
 //
 PyObject* getAttr(PyObject*, const std::string&, bool allowNone);
 
+//
+// Same as above but with a string object for the attribute name, which avoids creating a new string
+// object for each lookup.
+//
+PyObject* getAttr(PyObject*, PyObject*, bool allowNone);
+
 //
 // Get the name of the current Python function.
 //
@@ -170,12 +193,16 @@ public:
     //
     void checkSystemExit();
 
+    //
+    // Returns the formatted traceback of the exception, or an empty string if there's no traceback.
+    //
+    std::string getTraceback();
+
     PyObjectHandle ex;
 
 private:
 
     void raiseLocalException();
-    std::string getTraceback();
     std::string getTypeName();
 
     PyObjectHandle _type;
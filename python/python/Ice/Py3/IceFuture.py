@@ -11,7 +11,7 @@
 # This file should only be used in Python >= 3.5.
 #
 
-import asyncio
+import IcePy, sys
 
 #
 # This class defines an __await__ method so that coroutines can call 'await <future>'.
@@ -26,10 +26,12 @@ class FutureBase(object):
 
 def wrap_future(future, *, loop=None):
     '''Wrap Ice.Future object into an asyncio.Future.'''
+    import asyncio # Imported on first use as it noticeably slows down "import Ice".
+
     if isinstance(future, asyncio.Future):
         return future
 
-    assert isinstance(future, FutureBase), 'Ice.Future is expected, got {!r}'.format(future)
+    assert isinstance(future, (FutureBase, IcePy.Future)), 'Ice.Future is expected, got {!r}'.format(future)
 
     if loop is None:
         loop = asyncio.get_event_loop()
@@ -46,3 +48,11 @@ def wrap_future(future, *, loop=None):
 
     future.add_done_callback(lambda f: loop.call_soon_threadsafe(callback))
     return af
+
+def getRunningLoop():
+    '''Returns the asyncio event loop running in the current thread, or None.'''
+    asyncio = sys.modules.get("asyncio") # No event loop can be running if asyncio isn't imported yet.
+    if asyncio is None:
+        return None
+    getLoop = getattr(asyncio.events, "_get_running_loop", None) # Added in Python 3.5.3.
+    return getLoop() if getLoop else None
@@ -11,7 +11,7 @@
 Ice module
 """
 
-import sys, string, imp, os, threading, warnings, datetime, logging, time, inspect, traceback
+import sys, string, imp, os, threading, warnings, datetime, logging, time, inspect, traceback, collections
 
 #
 # RTTI problems can occur in C++ code unless we modify Python's dlopen flags.
@@ -74,246 +74,255 @@ encodingVersionToString = IcePy.encodingVersionToString
 generateUUID = IcePy.generateUUID
 loadSlice = IcePy.loadSlice
 AsyncResult = IcePy.AsyncResult
+EncodedArgs = IcePy.EncodedArgs
 Unset = IcePy.Unset
 
 def Python35():
     return sys.version_info[:2] >= (3, 5)
 
 if Python35():
-    from Ice.Py3.IceFuture import FutureBase, wrap_future
+    from Ice.Py3.IceFuture import FutureBase, wrap_future, getRunningLoop
 else:
     FutureBase = object
 
-class Future(FutureBase):
-    def __init__(self):
-        self._result = None
-        self._exception = None
-        self._condition = threading.Condition()
-        self._doneCallbacks = []
-        self._state = Future.StateRunning
-
-    def cancel(self):
-        callbacks = []
-        with self._condition:
-            if self._state == Future.StateDone:
-                return False
-
-            if self._state == Future.StateCancelled:
-                return True
-
-            self._state = Future.StateCancelled
-            callbacks = self._doneCallbacks
-            self._doneCallbacks = []
-            self._condition.notify_all()
-
-        self._callCallbacks(callbacks)
-
-        return True
-
-    def cancelled(self):
-        with self._condition:
-            return self._state == Future.StateCancelled
-
-    def running(self):
-        with self._condition:
-            return self._state == Future.StateRunning
-
-    def done(self):
-        with self._condition:
-            return self._state in [Future.StateCancelled, Future.StateDone]
-
-    def add_done_callback(self, fn):
-        with self._condition:
-            if self._state == Future.StateRunning:
-                self._doneCallbacks.append(fn)
-                return
-        fn(self)
-
-    def result(self, timeout=None):
-        with self._condition:
-            if not self._wait(timeout, lambda: self._state == Future.StateRunning):
-                raise TimeoutException()
-            if self._state == Future.StateCancelled:
-                raise InvocationCanceledException()
-            elif self._exception:
-                raise self._exception
-            else:
-                return self._result
-
-    def exception(self, timeout=None):
-        with self._condition:
-            if not self._wait(timeout, lambda: self._state == Future.StateRunning):
-                raise TimeoutException()
-            if self._state == Future.StateCancelled:
-                raise InvocationCanceledException()
-            else:
-                return self._exception
-
-    def set_result(self, result):
-        callbacks = []
-        with self._condition:
-            if self._state != Future.StateRunning:
-                return
-            self._result = result
-            self._state = Future.StateDone
-            callbacks = self._doneCallbacks
-            self._doneCallbacks = []
-            self._condition.notify_all()
-
-        self._callCallbacks(callbacks)
-
-    def set_exception(self, ex):
-        callbacks = []
-        with self._condition:
-            if self._state != Future.StateRunning:
-                return
-            self._exception = ex
-            self._state = Future.StateDone
-            callbacks = self._doneCallbacks
+#
+# The futures are implemented by IcePy, which creates and completes them without calling into
+# Python code. The Python implementations below are only used if IcePy doesn't provide them.
+#
+if hasattr(IcePy, "Future"):
+    Future = IcePy.Future
+    InvocationFuture = IcePy.InvocationFuture
+else:
+    class Future(FutureBase):
+        def __init__(self):
+            self._result = None
+            self._exception = None
+            self._condition = threading.Condition()
             self._doneCallbacks = []
-            self._condition.notify_all()
-
-        self._callCallbacks(callbacks)
+            self._state = Future.StateRunning
 
-    @staticmethod
-    def completed(result):
-        f = Future()
-        f.set_result(result)
-        return f
-
-    def _wait(self, timeout, testFn=None):
-        # Must be called with _condition acquired
-
-        while testFn():
-            if timeout:
-                start = time.time()
-                self._condition.wait(timeout)
-                # Subtract the elapsed time so far from the timeout
-                timeout -= (time.time() - start)
-                if timeout <= 0:
+        def cancel(self):
+            callbacks = []
+            with self._condition:
+                if self._state == Future.StateDone:
                     return False
-            else:
-                self._condition.wait()
-
-        return True
 
-    def _callCallbacks(self, callbacks):
-        for callback in callbacks:
-            try:
-                callback(self)
-            except:
-                self._warn('done callback raised exception')
-
-    def _warn(self, msg):
-        logging.getLogger("Ice.Future").exception(msg)
-
-    StateRunning = 'running'
-    StateCancelled = 'cancelled'
-    StateDone = 'done'
-
-class InvocationFuture(Future):
-    def __init__(self, operation, asyncResult):
-        Future.__init__(self)
-        assert(asyncResult)
-        self._operation = operation
-        self._asyncResult = asyncResult # May be None for a batch invocation.
-        self._sent = False
-        self._sentSynchronously = False
-        self._sentCallbacks = []
-
-    def cancel(self):
-        self._asyncResult.cancel()
-        return Future.cancel(self)
+                if self._state == Future.StateCancelled:
+                    return True
+
+                self._state = Future.StateCancelled
+                callbacks = self._doneCallbacks
+                self._doneCallbacks = []
+                self._condition.notify_all()
+
+            self._callCallbacks(callbacks)
+
+            return True
+
+        def cancelled(self):
+            with self._condition:
+                return self._state == Future.StateCancelled
+
+        def running(self):
+            with self._condition:
+                return self._state == Future.StateRunning
+
+        def done(self):
+            with self._condition:
+                return self._state in [Future.StateCancelled, Future.StateDone]
+
+        def add_done_callback(self, fn):
+            with self._condition:
+                if self._state == Future.StateRunning:
+                    self._doneCallbacks.append(fn)
+                    return
+            fn(self)
+
+        def result(self, timeout=None):
+            with self._condition:
+                if not self._wait(timeout, lambda: self._state == Future.StateRunning):
+                    raise TimeoutException()
+                if self._state == Future.StateCancelled:
+                    raise InvocationCanceledException()
+                elif self._exception:
+                    raise self._exception
+                else:
+                    return self._result
+
+        def exception(self, timeout=None):
+            with self._condition:
+                if not self._wait(timeout, lambda: self._state == Future.StateRunning):
+                    raise TimeoutException()
+                if self._state == Future.StateCancelled:
+                    raise InvocationCanceledException()
+                else:
+                    return self._exception
+
+        def set_result(self, result):
+            callbacks = []
+            with self._condition:
+                if self._state != Future.StateRunning:
+                    return
+                self._result = result
+                self._state = Future.StateDone
+                callbacks = self._doneCallbacks
+                self._doneCallbacks = []
+                self._condition.notify_all()
+
+            self._callCallbacks(callbacks)
+
+        def set_exception(self, ex):
+            callbacks = []
+            with self._condition:
+                if self._state != Future.StateRunning:
+                    return
+                self._exception = ex
+                self._state = Future.StateDone
+                callbacks = self._doneCallbacks
+                self._doneCallbacks = []
+                self._condition.notify_all()
+
+            self._callCallbacks(callbacks)
+
+        @staticmethod
+        def completed(result):
+            f = Future()
+            f.set_result(result)
+            return f
+
+        def _wait(self, timeout, testFn=None):
+            # Must be called with _condition acquired
+
+            while testFn():
+                if timeout:
+                    start = time.time()
+                    self._condition.wait(timeout)
+                    # Subtract the elapsed time so far from the timeout
+                    timeout -= (time.time() - start)
+                    if timeout <= 0:
+                        return False
+                else:
+                    self._condition.wait()
+
+            return True
+
+        def _callCallbacks(self, callbacks):
+            for callback in callbacks:
+                try:
+                    callback(self)
+                except:
+                    self._warn('done callback raised exception')
 
-    def add_done_callback_async(self, fn):
-        def callback():
-            try:
-                fn(self)
-            except:
-                self._warn('done callback raised exception')
+        def _warn(self, msg):
+            logging.getLogger("Ice.Future").exception(msg)
 
-        with self._condition:
-            if self._state == Future.StateRunning:
-                self._doneCallbacks.append(fn)
-                return
-        self._asyncResult.callLater(callback)
+        StateRunning = 'running'
+        StateCancelled = 'cancelled'
+        StateDone = 'done'
+
+    class InvocationFuture(Future):
+        def __init__(self, operation, asyncResult):
+            Future.__init__(self)
+            assert(asyncResult)
+            self._operation = operation
+            self._asyncResult = asyncResult # May be None for a batch invocation.
+            self._sent = False
+            self._sentSynchronously = False
+            self._sentCallbacks = []
 
-    def is_sent(self):
-        with self._condition:
-            return self._sent
+        def cancel(self):
+            self._asyncResult.cancel()
+            return Future.cancel(self)
 
-    def is_sent_synchronously(self):
-        with self._condition:
-            return self._sentSynchronously
+        def add_done_callback_async(self, fn):
+            def callback():
+                try:
+                    fn(self)
+                except:
+                    self._warn('done callback raised exception')
 
-    def add_sent_callback(self, fn):
-        with self._condition:
-            if not self._sent:
-                self._sentCallbacks.append(fn)
-                return
-        fn(self, self._sentSynchronously)
+            with self._condition:
+                if self._state == Future.StateRunning:
+                    self._doneCallbacks.append(fn)
+                    return
+            self._asyncResult.callLater(callback)
 
-    def add_sent_callback_async(self, fn):
-        def callback():
-            try:
-                fn(self, self._sentSynchronously)
-            except:
-                self._warn('sent callback raised exception')
+        def is_sent(self):
+            with self._condition:
+                return self._sent
 
-        with self._condition:
-            if not self._sent:
-                self._sentCallbacks.append(fn)
-                return
-        self._asyncResult.callLater(callback)
-
-    def sent(self, timeout=None):
-        with self._condition:
-            if not self._wait(timeout, lambda: not self._sent):
-                raise TimeoutException()
-            if self._state == Future.StateCancelled:
-                raise InvocationCanceledException()
-            elif self._exception:
-                raise self._exception
-            else:
+        def is_sent_synchronously(self):
+            with self._condition:
                 return self._sentSynchronously
 
-    def set_sent(self, sentSynchronously):
-        callbacks = []
-        with self._condition:
-            if self._sent:
-                return
-
-            self._sent = True
-            self._sentSynchronously = sentSynchronously
-            callbacks = self._sentCallbacks
-            self._sentCallbacks = []
-            self._condition.notify_all()
+        def add_sent_callback(self, fn):
+            with self._condition:
+                if not self._sent:
+                    self._sentCallbacks.append(fn)
+                    return
+            fn(self, self._sentSynchronously)
 
-        for callback in callbacks:
-            try:
-                callback(self, sentSynchronously)
-            except Exception:
-                self._warn('sent callback raised exception')
+        def add_sent_callback_async(self, fn):
+            def callback():
+                try:
+                    fn(self, self._sentSynchronously)
+                except:
+                    self._warn('sent callback raised exception')
+
+            with self._condition:
+                if not self._sent:
+                    self._sentCallbacks.append(fn)
+                    return
+            self._asyncResult.callLater(callback)
+
+        def sent(self, timeout=None):
+            with self._condition:
+                if not self._wait(timeout, lambda: not self._sent):
+                    raise TimeoutException()
+                if self._state == Future.StateCancelled:
+                    raise InvocationCanceledException()
+                elif self._exception:
+                    raise self._exception
+                else:
+                    return self._sentSynchronously
+
+        def set_sent(self, sentSynchronously):
+            callbacks = []
+            with self._condition:
+                if self._sent:
+                    return
+
+                self._sent = True
+                self._sentSynchronously = sentSynchronously
+                callbacks = self._sentCallbacks
+                self._sentCallbacks = []
+                self._condition.notify_all()
+
+            for callback in callbacks:
+                try:
+                    callback(self, sentSynchronously)
+                except Exception:
+                    self._warn('sent callback raised exception')
 
-    def operation(self):
-        return self._operation
+        def operation(self):
+            return self._operation
 
-    def proxy(self):
-        return self._asyncResult.getProxy()
+        def proxy(self):
+            return self._asyncResult.getProxy()
 
-    def connection(self):
-        return self._asyncResult.getConnection()
+        def connection(self):
+            return self._asyncResult.getConnection()
 
-    def communicator(self):
-        return self._asyncResult.getCommunicator()
+        def communicator(self):
+            return self._asyncResult.getCommunicator()
 
-    def _warn(self, msg):
-        communicator = self.communicator()
-        if communicator:
-            if communicator.getProperties().getPropertyAsIntWithDefault("Ice.Warn.AMICallback", 1) > 0:
-                communicator.getLogger().warning("Ice.Future: " + msg + ":\n" + traceback.format_exc())
-        else:
-            logging.getLogger("Ice.Future").exception(msg)
+        def _warn(self, msg):
+            communicator = self.communicator()
+            if communicator:
+                if communicator.getProperties().getPropertyAsIntWithDefault("Ice.Warn.AMICallback", 1) > 0:
+                    communicator.getLogger().warning("Ice.Future: " + msg + ":\n" + traceback.format_exc())
+            else:
+                logging.getLogger("Ice.Future").exception(msg)
 
 #
 # This value is used as the default value for struct types in the constructors
@@ -412,19 +421,32 @@ Returns:
         # Invoke the given servant method. Exceptions can propagate to the caller.
         result = method(*args)
 
+        def handler(future):
+            try:
+                cb.response(future.result())
+            except:
+                cb.exception(sys.exc_info()[1])
+
         # Check for a future.
         if isinstance(result, Future) or callable(getattr(result, "add_done_callback", None)):
-            def handler(future):
-                try:
-                    cb.response(future.result())
-                except:
-                    cb.exception(sys.exc_info()[1])
             result.add_done_callback(handler)
         elif Python35() and inspect.iscoroutine(result): # The iscoroutine() function was added in Python 3.5.
-            self._iceDispatchCoroutine(cb, result)
+            loop = getRunningLoop()
+            if loop:
+                # Run the coroutine as a task of the event loop that runs this dispatch.
+                loop.create_task(result).add_done_callback(handler)
+            else:
+                self._iceDispatchCoroutine(cb, result)
         else:
             cb.response(result)
 
+    def _iceDispatchEventLoop(self, cb, method, args):
+        # Called by the event loop of the object adapter.
+        try:
+            self._iceDispatch(cb, method, args)
+        except:
+            cb.exception(sys.exc_info()[1])
+
     def _iceDispatchCoroutine(self, cb, coro, value=None, exception=None):
         try:
             if exception:
@@ -450,7 +472,14 @@ Returns:
 
 class Blobject(Object):
     '''Special-purpose servant base class that allows a subclass to
-handle synchronous Ice invocations as "blobs" of bytes.'''
+handle synchronous Ice invocations as "blobs" of bytes.
+
+With Python 3, a subclass can set the memoryView attribute to True to
+receive the encoded arguments as a read-only memoryview instead of
+bytes. The memoryview can be passed to ice_invoke or sliced without
+copying the arguments again.'''
+
+    memoryView = False
 
     def ice_invoke(self, bytes, current):
         '''Dispatch a synchronous Ice invocation. The operation's
@@ -459,13 +488,22 @@ value must be a tuple of two values: the first is a
 boolean indicating whether the operation succeeded (True)
 or raised a user exception (False), and the second is
 the encoded form of the operation's results or the user
-exception.
+exception. With Python 3, the encoded results can be any
+object that supports the buffer protocol, such as bytes,
+bytearray or memoryview.
 '''
         pass
 
 class BlobjectAsync(Object):
     '''Special-purpose servant base class that allows a subclass to
-handle asynchronous Ice invocations as "blobs" of bytes.'''
+handle asynchronous Ice invocations as "blobs" of bytes.
+
+With Python 3, a subclass can set the memoryView attribute to True to
+receive the encoded arguments as a read-only memoryview instead of
+bytes. The memoryview can be passed to ice_invoke or sliced without
+copying the arguments again.'''
+
+    memoryView = False
 
     def ice_invoke(self, bytes, current):
         '''Dispatch an asynchronous Ice invocation. The operation's
@@ -475,7 +513,9 @@ operation succeeded (True) or raised a user exception (False), and
 the second is the encoded form of the operation's results or the user
 exception. The subclass can either return the tuple directly (for
 synchronous completion) or return a future that is eventually
-completed with the tuple.
+completed with the tuple. With Python 3, the encoded results can be
+any object that supports the buffer protocol, such as bytes, bytearray
+or memoryview.
 '''
         pass
 
@@ -750,7 +790,9 @@ IcePy._t_LocalObject = IcePy.declareValue('::Ice::LocalObject')
 IcePy.SEQ_DEFAULT = 0
 IcePy.SEQ_TUPLE = 1
 IcePy.SEQ_LIST = 2
-#IcePy.SEQ_ARRAY = 3
+IcePy.SEQ_ARRAY = 3
+IcePy.SEQ_MEMORYVIEW = 4
+IcePy.SEQ_NUMPYARRAY = 5
 
 #
 # Slice checksum dictionary.
@@ -775,13 +817,39 @@ import Ice.ObjectFactory_ice
 import Ice.ValueFactory_ice
 import Ice.Process_ice
 import Ice.Properties_ice
-import Ice.RemoteLogger_ice
 import Ice.Router_ice
 import Ice.ServantLocator_ice
 import Ice.Connection_ice
 import Ice.Version_ice
 import Ice.Instrumentation_ice
-import Ice.Metrics_ice
+
+#
+# The remaining generated modules are seldom used. With Python >= 3.7 they are only
+# imported the first time an attribute that isn't defined yet is accessed.
+#
+_lazyModules = ["Ice.RemoteLogger_ice", "Ice.Metrics_ice"]
+_lazyModulesLock = threading.RLock()
+
+def _loadLazyModules():
+    global _lazyModules
+    with _lazyModulesLock:
+        for m in _lazyModules:
+            __import__(m)
+        _lazyModules = []
+
+if sys.version_info[:2] >= (3, 7):
+    def __getattr__(name):
+        if not name.startswith("__"):
+            _loadLazyModules()
+            if name in globals():
+                return globals()[name]
+        raise AttributeError("module 'Ice' has no attribute '{0}'".format(name))
+
+    def __dir__():
+        _loadLazyModules()
+        return sorted(globals().keys())
+else:
+    _loadLazyModules()
 
 #
 # Replace EndpointInfo with our implementation.
@@ -866,6 +934,124 @@ define the enqueue method.'''
         '''Invoked when a request is batched.'''
         pass
 
+class BatchObserver(object):
+    '''An observer that can be assigned to InitializationData.observer to collect the
+latency of invocations and dispatches. The statistics are aggregated by the Ice
+run time without calling into Python, and the callback is invoked every interval
+seconds with a list of OperationStats objects, one for each operation that was
+invoked or dispatched since the previous call. The latency histograms use the
+given bucket upper bounds, in seconds.'''
+
+    def __init__(self, callback, interval=1.0, buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)):
+        self.callback = callback
+        self.interval = interval
+        self.buckets = buckets
+
+class OperationStats(object):
+    '''The statistics of an operation reported to the callback of a BatchObserver.
+
+kind: Either "invocation" or "dispatch".
+
+operation: The name of the operation.
+
+count: The number of invocations or dispatches that completed.
+
+failures: The number of invocations or dispatches that failed with a local exception.
+
+userExceptions: The number of invocations or dispatches that raised a user exception.
+
+totalTime: The total latency, in seconds.
+
+maxTime: The maximum latency, in seconds.
+
+buckets: The upper bounds of the histogram buckets, in seconds.
+
+histogram: The number of invocations or dispatches for each bucket. The last entry
+    counts the invocations or dispatches slower than the last bucket upper bound.'''
+
+    def __init__(self, kind, operation, count, failures, userExceptions, totalTime, maxTime, buckets, histogram):
+        self.kind = kind
+        self.operation = operation
+        self.count = count
+        self.failures = failures
+        self.userExceptions = userExceptions
+        self.totalTime = totalTime
+        self.maxTime = maxTime
+        self.buckets = buckets
+        self.histogram = histogram
+
+CompletionQueue = IcePy.CompletionQueue
+
+class CompletionQueueMetrics(object):
+    '''The metrics of an Ice.CompletionQueue, as returned by its getMetrics method.
+
+completions: The number of completions (responses, exceptions and sent notifications)
+    processed by the queue.
+
+batches: The number of batches processed by the queue, the queue thread acquires the
+    GIL once per batch.
+
+largestBatch: The largest number of completions processed in a single batch.
+
+queueDepth: The number of completions waiting in the queue.
+
+maxQueueDepth: The largest number of completions that waited in the queue.'''
+
+    def __init__(self, completions, batches, largestBatch, queueDepth, maxQueueDepth):
+        self.completions = completions
+        self.batches = batches
+        self.largestBatch = largestBatch
+        self.queueDepth = queueDepth
+        self.maxQueueDepth = maxQueueDepth
+
+#
+# Checked cast cache.
+#
+# Ice.CheckedCastCache(capacity=1024, ttl=None) is a cache for the checkedCastCache attribute of
+# Ice.InitializationData. A checkedCast without an explicit context first looks up the target of
+# the proxy (its identity, facet, adapter id and endpoints) and the requested type id in the
+# cache, and only sends an ice_isA request on a miss. Only the successful casts are cached. The
+# entries expire ttl seconds after they were added, or never if ttl is None, and the least
+# recently used entry is evicted once the cache holds capacity entries.
+#
+# invalidate(proxy) removes the entries of the proxy's target, and invalidate() removes all the
+# entries, for example after a server was redeployed with different servants.
+#
+CheckedCastCache = IcePy.CheckedCastCache
+
+class CheckedCastCacheMetrics(object):
+    '''The metrics of an Ice.CheckedCastCache, as returned by its getMetrics method.
+
+hits: The number of checked casts answered by the cache.
+
+misses: The number of checked casts that sent an ice_isA request.
+
+size: The number of entries in the cache.'''
+
+    def __init__(self, hits, misses, size):
+        self.hits = hits
+        self.misses = misses
+        self.size = size
+
+#
+# Ice.OutputStream(communicator, encoding=None) and Ice.InputStream(communicator, data, encoding=None)
+# marshal and unmarshal Slice types with the Ice encoding, outside of an invocation. The type
+# argument of writeValue and readValue is the type object generated for the Slice type, such as
+# Test._t_MyStruct, or IcePy._t_int for a builtin type. An optional tag writes or reads the value
+# as a tagged value, readValue returns Ice.Unset if the tagged value isn't present.
+#
+# OutputStream.finished() returns a read-only memoryview of the encoded data, the stream can't be
+# written to until the view is released. InputStream reads the data in place, from any object
+# supporting the buffer protocol such as bytes, bytearray or memoryview.
+#
+# With the 1.0 encoding, the class instances are only read by readPendingValues. In this case,
+# readValue returns None and the cb argument of readValue is called with the instance.
+# User exceptions are written with OutputStream.writeException and raised by
+# InputStream.throwException.
+#
+OutputStream = IcePy.OutputStream
+InputStream = IcePy.InputStream
+
 #
 # Initialization data.
 #
@@ -876,7 +1062,7 @@ communicator instance. The supported attributes are as follows:
 properties: An instance of Ice.Properties. You can use the
     Ice.createProperties function to create a new property set.
 
-logger: An instance of Ice.Logger.
+logger: An instance of Ice.Logger, or an Ice.AsyncLogger.
 
 threadStart: A callable that is invoked for each new Ice thread that is started.
 
@@ -893,6 +1079,31 @@ batchRequestInterceptor: A callable that will be invoked when a batch request is
     enqueue method on the BatchRequest object.
 
 valueFactoryManager: An object that implements ValueFactoryManager.
+
+observer: An object that implements Ice.Instrumentation.CommunicatorObserver, or an
+    instance of Ice.BatchObserver to collect per-operation latency statistics without
+    calling into Python for each invocation or dispatch.
+
+eventLoop: An asyncio event loop. When set, the asynchronous invocations (opAsync) on
+    the proxies of the communicator return an asyncio.Future created with this event
+    loop instead of an Ice.InvocationFuture. The futures are completed by the event
+    loop thread, which is woken up once for all the invocations completed in the
+    meantime. Such futures don't provide sent notifications, and cancelling one of
+    them doesn't cancel the invocation.
+
+completionQueue: An instance of Ice.CompletionQueue. When set, the Ice threads don't
+    complete the asynchronous invocations (opAsync) themselves: they queue the replies,
+    and the queue thread unmarshals them and completes the futures, acquiring the GIL
+    once for up to maxBatchSize replies. A queue can be shared by several communicators.
+
+internCacheSize: The maximum number of strings kept by the communicator for the strings
+    unmarshaled with the python:intern metadata, which is the default of 4096 when None.
+    Receiving a string already in the cache returns the same object instead of a new
+    copy. A size of 0 disables interning.
+
+checkedCastCache: An instance of Ice.CheckedCastCache. When set, the successful checked
+    casts without an explicit context are cached and repeating them doesn't send another
+    ice_isA request. A cache can be shared by several communicators.
 '''
     def __init__(self):
         self.properties = None
@@ -903,6 +1114,11 @@ valueFactoryManager: An object that implements ValueFactoryManager.
         self.dispatcher = None
         self.batchRequestInterceptor = None
         self.valueFactoryManager = None
+        self.observer = None
+        self.eventLoop = None
+        self.completionQueue = None
+        self.internCacheSize = None
+        self.checkedCastCache = None
 
 #
 # Communicator wrapper.
@@ -1204,6 +1420,609 @@ class ObjectAdapterI(ObjectAdapter):
     def setPublishedEndpoints(self, newEndpoints):
         self._impl.setPublishedEndpoints(newEndpoints)
 
+    def setEventLoop(self, loop):
+        '''Dispatch the requests of this object adapter with the given asyncio event loop, or
+with the Ice thread pool if loop is None. Servant methods are then called by the event loop
+thread, and the coroutines they return run as tasks of the event loop. The event loop must
+keep running until the object adapter is deactivated.'''
+        self._impl.setEventLoop(loop)
+
+    def getEventLoop(self):
+        '''Returns the event loop used to dispatch the requests of this object adapter, or None.'''
+        return self._impl.getEventLoop()
+
+#
+# Evictor.
+#
+# Ice.Evictor(loader, capacity, saver=None) is a servant locator implemented in IcePy, which is
+# registered with ObjectAdapter.addServantLocator. It keeps the servants of the most recently
+# used identities and facets in a cache of the given capacity, and the dispatch of a request
+# to a cached servant doesn't call into Python. loader(current) is only called when the servant
+# of current.id and current.facet isn't cached, it returns the servant or None. When a servant
+# is evicted, or when the object adapter is deactivated, the evictor calls
+# saver(identity, facet, servant). The servants dispatching requests are not evicted.
+#
+Evictor = IcePy.Evictor
+
+class EvictorMetrics(object):
+    '''The metrics of an Ice.Evictor, as returned by its getMetrics method.
+
+hits: The number of requests dispatched to a cached servant.
+
+misses: The number of requests for which the loader was called.
+
+evictions: The number of servants evicted from the cache.
+
+size: The number of servants in the cache.'''
+
+    def __init__(self, hits, misses, evictions, size):
+        self.hits = hits
+        self.misses = misses
+        self.evictions = evictions
+        self.size = size
+
+#
+# Servant pool.
+#
+def _servantPoolWorker(factory, properties, conn):
+    # The main function of the worker processes of a ServantPool. The requests are received over the
+    # pipe and dispatched with collocated invocations to the servants added by the factory to an object
+    # adapter without endpoints, so no other process can reach these servants. The replies are sent
+    # back over the pipe, until the pool asks the worker to stop or closes its end of the pipe.
+    import signal
+    signal.signal(signal.SIGINT, signal.SIG_IGN) # The pool process handles Ctrl-C.
+
+    initData = InitializationData()
+    initData.properties = createProperties()
+    for k, v in properties.items():
+        initData.properties.setProperty(k, v)
+    initData.properties.setProperty("ServantPoolWorker.AdapterId", "ServantPoolWorker")
+    with initialize(initData) as communicator:
+        adapter = communicator.createObjectAdapter("ServantPoolWorker")
+        adapter.setLocator(None) # The adapter id is only used for collocated invocations.
+        factory(adapter)
+        adapter.activate()
+        base = adapter.createIndirectProxy(stringToIdentity("worker")).ice_collocationOptimized(True)
+        lock = threading.Lock()
+
+        def reply(requestId, future):
+            try:
+                (ok, outParams) = future.result()
+                message = (requestId, ok, bytes(outParams))
+            except Exception as ex:
+                message = (requestId, None, ex)
+            with lock:
+                try:
+                    conn.send(message)
+                except OSError:
+                    pass # The pool closed the pipe.
+                except Exception as ex:
+                    conn.send((requestId, None, UnknownException(str(ex)))) # The exception can't be pickled.
+
+        conn.send(None) # The worker is ready.
+        while True:
+            try:
+                request = conn.recv()
+            except EOFError:
+                break
+            if request is None:
+                break
+            (requestId, identity, facet, operation, mode, ctx, inParams) = request
+            try:
+                prx = base.ice_identity(identity)
+                if facet:
+                    prx = prx.ice_facet(facet)
+                future = prx.ice_invokeAsync(operation, OperationMode.valueOf(mode), inParams, ctx)
+            except Exception as ex:
+                future = Future()
+                future.set_exception(ex)
+            future.add_done_callback(lambda f, requestId=requestId: reply(requestId, f))
+
+class _ServantPoolWorker(object):
+    def __init__(self, process, conn):
+        self.process = process
+        self.conn = conn
+        self._lock = threading.Lock()
+        self._sendLock = threading.Lock()
+        self._requestId = 0
+        self._pending = {}
+        self._closed = False
+        self._reader = None
+
+    def start(self):
+        self._reader = threading.Thread(target=self._read)
+        self._reader.daemon = True
+        self._reader.start()
+
+    def invoke(self, inParams, current):
+        future = Future()
+        with self._lock:
+            if self._closed:
+                raise ConnectionLostException()
+            self._requestId += 1
+            requestId = self._requestId
+            self._pending[requestId] = future
+        try:
+            with self._sendLock:
+                self.conn.send((requestId, current.id, current.facet, current.operation, current.mode.value,
+                                current.ctx, inParams))
+        except (OSError, ValueError):
+            with self._lock:
+                self._pending.pop(requestId, None)
+            raise ConnectionLostException()
+        return future
+
+    def close(self):
+        with self._sendLock:
+            try:
+                self.conn.send(None)
+            except (OSError, ValueError):
+                pass # The worker exited.
+        self.process.join(5)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join()
+        if self._reader:
+            self._reader.join()
+        self.conn.close()
+
+    def _read(self):
+        try:
+            while True:
+                (requestId, ok, result) = self.conn.recv()
+                with self._lock:
+                    future = self._pending.pop(requestId)
+                if ok is None:
+                    future.set_exception(result)
+                else:
+                    future.set_result((ok, result))
+        except (EOFError, OSError):
+            pass
+
+        #
+        # The worker exited, the requests it didn't reply to fail.
+        #
+        with self._lock:
+            self._closed = True
+            pending = self._pending
+            self._pending = {}
+        for future in pending.values():
+            future.set_exception(ConnectionLostException())
+
+class ServantPool(BlobjectAsync):
+    '''A servant that forwards the requests it receives to servants running in a pool of Python
+worker processes, so that CPU-bound servants can use several cores despite the GIL.
+
+Each worker process is started with the spawn method of the multiprocessing module. It
+creates its own communicator and an object adapter without endpoints, and calls factory
+with this object adapter to add the servants. The pool sends the requests to the worker
+over a pipe, and the worker dispatches them with collocated invocations, so only the pool
+can reach the servants of the workers. The factory must be a
+callable that can be pickled, such as a function defined at the top level of a module,
+and this module must import the generated code for the Slice definitions of the servants.
+
+The pool is a Blobject servant: add it to the object adapter that receives the requests,
+for example as a default servant. It forwards the encoded arguments of each request to a
+worker, with the same identity, facet, operation and context, and returns the encoded
+results, so the arguments and results are not unmarshaled by this process. The route
+argument selects the worker of each request:
+
+RouteByIdentity: the requests for the same identity always go to the same worker, which
+    suits servants that keep a state for each identity. This is the default.
+
+RouteByCategory: the requests for identities with the same category go to the same worker.
+
+RouteRoundRobin: the requests are sent to each worker in turn.
+
+route can also be a callable that receives the Ice.Current object of the request and
+returns an integer, the worker is this integer modulo the pool size.
+
+A thread of the pool restarts the workers that exit or crash. The requests sent to a
+worker that stops fail and raise Ice.UnknownLocalException in the client.
+
+properties: An Ice.Properties object with the properties of the worker communicators, by
+    default they only use the default property values.
+
+startTimeout: The number of seconds to wait for a worker to start.
+
+This class requires Python 3.4 or later. Call destroy to stop the workers, they also stop
+when this process exits.'''
+
+    RouteByIdentity = 0
+    RouteByCategory = 1
+    RouteRoundRobin = 2
+
+    def __init__(self, adapter, factory, size, route=RouteByIdentity, properties=None, startTimeout=60):
+        if sys.version_info[:2] < (3, 4):
+            raise RuntimeError("Ice.ServantPool requires Python 3.4 or later")
+        if size < 1:
+            raise ValueError("the size of a servant pool must be at least 1")
+
+        import itertools, multiprocessing # Imported on first use.
+
+        if route == ServantPool.RouteByIdentity:
+            self._route = lambda current: hash(current.id)
+        elif route == ServantPool.RouteByCategory:
+            self._route = lambda current: hash(current.id.category)
+        elif route == ServantPool.RouteRoundRobin:
+            counter = itertools.count()
+            self._route = lambda current: next(counter)
+        elif callable(route):
+            self._route = route
+        else:
+            raise ValueError("invalid route for a servant pool")
+
+        self._communicator = adapter.getCommunicator()
+        self._factory = factory
+        self._properties = properties.getPropertiesForPrefix("") if properties else {}
+        self._startTimeout = startTimeout
+        self._context = multiprocessing.get_context("spawn")
+        self._lock = threading.Lock()
+        self._restarts = 0
+        self._destroyed = False
+
+        self._workers = [self._spawn() for i in range(0, size)]
+        try:
+            for w in self._workers:
+                self._connect(w)
+        except:
+            for w in self._workers:
+                w.close()
+            raise
+
+        (self._wakeupReader, self._wakeupWriter) = self._context.Pipe(False)
+        self._monitor = threading.Thread(target=self._run)
+        self._monitor.daemon = True
+        self._monitor.start()
+
+    def ice_invoke(self, inParams, current):
+        workers = self._workers
+        return workers[self._route(current) % len(workers)].invoke(inParams, current)
+
+    def getSize(self):
+        '''Returns the number of worker processes.'''
+        return len(self._workers)
+
+    def getWorkerPids(self):
+        '''Returns the process identifiers of the workers.'''
+        with self._lock:
+            return [w.process.pid for w in self._workers]
+
+    def getRestartCount(self):
+        '''Returns the number of workers restarted after they exited or crashed.'''
+        with self._lock:
+            return self._restarts
+
+    def destroy(self):
+        '''Stops the worker processes, the pool must no longer receive requests.'''
+        with self._lock:
+            if self._destroyed:
+                return
+            self._destroyed = True
+        self._wakeupWriter.send(None)
+        self._monitor.join()
+        for w in self._workers:
+            w.close()
+        self._wakeupReader.close()
+        self._wakeupWriter.close()
+
+    def _spawn(self):
+        (conn, workerConn) = self._context.Pipe()
+        process = self._context.Process(target=_servantPoolWorker, args=(self._factory, self._properties, workerConn))
+        process.daemon = True
+        process.start()
+        workerConn.close() # The worker gets an end-of-file when the pool closes conn.
+        return _ServantPoolWorker(process, conn)
+
+    def _connect(self, worker):
+        try:
+            if not worker.conn.poll(self._startTimeout):
+                raise RuntimeError("timeout")
+            worker.conn.recv()
+        except (EOFError, RuntimeError, OSError):
+            worker.close()
+            raise RuntimeError("servant pool worker process {0} failed to start".format(worker.process.pid))
+        worker.start()
+
+    def _run(self):
+        from multiprocessing.connection import wait
+        while True:
+            with self._lock:
+                if self._destroyed:
+                    return
+                sentinels = dict((w.process.sentinel, i) for i, w in enumerate(self._workers))
+
+            for s in wait(list(sentinels.keys()) + [self._wakeupReader]):
+                if s in sentinels:
+                    self._restart(sentinels[s])
+
+    def _restart(self, i):
+        self._workers[i].close()
+        worker = self._spawn()
+        restarted = True
+        try:
+            self._connect(worker)
+        except RuntimeError as ex:
+            restarted = False
+            #
+            # The monitor thread retries since the process exited, wait a little before or until
+            # the pool is destroyed.
+            #
+            self._communicator.getLogger().error(str(ex))
+            self._wakeupReader.poll(1)
+        with self._lock:
+            if self._destroyed:
+                worker.close()
+                return
+            self._workers[i] = worker
+            if restarted:
+                self._restarts += 1
+
+#
+# Chunked transfers.
+#
+def sendChunks(invoke, source, chunkSize=65536, window=4):
+    '''Sends the bytes of source as a sequence of chunks and returns an Ice.Future that completes
+with the number of bytes sent once all the chunks were received.
+
+source is either a file-like object opened in binary mode, which is read chunkSize bytes at a
+time, or an iterable of bytes objects, which are split into chunks of up to chunkSize bytes.
+
+invoke is a callable that receives the offset and the bytes of a chunk and sends them with an
+asynchronous invocation, for example:
+
+    Ice.sendChunks(lambda offset, data: prx.writeAsync(name, offset, data), f)
+
+It must return the future of the invocation. Up to window invocations are pending at any time,
+the next chunk is read once the oldest pending invocation completes, so only window chunks
+are in memory regardless of the size of source. The operation should be implemented with an
+Ice.ChunkReceiver to provide the same bound on the receiving side.
+
+The future raises the exception of the first invocation that fails, or of source. Cancelling
+the future stops sending chunks.'''
+
+    if chunkSize <= 0:
+        raise ValueError("chunkSize must be a positive integer")
+    if window <= 0:
+        raise ValueError("window must be a positive integer")
+    return _ChunkSender(invoke, source, chunkSize, window).future
+
+class _ChunkSender(object):
+    def __init__(self, invoke, source, chunkSize, window):
+        self.future = Future()
+        self._invoke = invoke
+        self._chunks = self._read(source, chunkSize)
+        self._window = window
+        self._lock = threading.Lock()
+        self._offset = 0
+        self._pending = 0
+        self._eof = False
+        self._pumping = False
+        self._again = False
+        self._pump()
+
+    @staticmethod
+    def _read(source, chunkSize):
+        if hasattr(source, "read"):
+            while True:
+                data = source.read(chunkSize)
+                if not data:
+                    return
+                yield data
+        else:
+            for data in source:
+                if len(data) <= chunkSize:
+                    if data:
+                        yield data
+                else:
+                    for i in range(0, len(data), chunkSize):
+                        yield data[i:i + chunkSize]
+
+    def _pump(self):
+        #
+        # Only one thread sends chunks at a time, a completion that occurs meanwhile (possibly in
+        # the sending thread if the invocation completed synchronously) makes it check the
+        # window again instead of recursing.
+        #
+        with self._lock:
+            if self._pumping:
+                self._again = True
+                return
+            self._pumping = True
+
+        while True:
+            with self._lock:
+                if self.future.done() or self._eof or self._pending >= self._window:
+                    if self._again:
+                        self._again = False
+                        continue
+                    self._pumping = False
+                    done = self._eof and self._pending == 0
+                    break
+                self._pending += 1
+
+            try:
+                data = next(self._chunks, None)
+                if data is None:
+                    with self._lock:
+                        self._pending -= 1
+                        self._eof = True
+                    continue
+                offset = self._offset
+                self._offset += len(data)
+                f = self._invoke(offset, data)
+            except:
+                with self._lock:
+                    self._pumping = False
+                self.future.set_exception(sys.exc_info()[1])
+                return
+            f.add_done_callback(self._sent)
+
+        if done:
+            self.future.set_result(self._offset)
+
+    def _sent(self, f):
+        try:
+            f.result()
+        except:
+            self.future.set_exception(sys.exc_info()[1])
+            return
+        with self._lock:
+            self._pending -= 1
+        self._pump()
+
+class ChunkReceiver(object):
+    '''Receives the chunks sent with Ice.sendChunks, in order, and writes them to a file-like sink
+or returns them from its iterator.
+
+The operation that receives the chunks must use AMD and return the future returned by put:
+
+    def write(self, name, offset, data, current):
+        return self._receivers[name].put(offset, data)
+
+The future completes once the chunk was written to the sink, or returned by the iterator, so
+that the sender doesn't send more chunks than its window until the receiver consumed them.
+The chunks received ahead of the next chunk, for example when they are dispatched by several
+threads, are kept until the next chunk is received. A chunk received again with the same
+offset, for example after a retry, is ignored.
+
+If sink is None, iterate over the receiver to get the chunks, with a for loop or, with
+Python 3.5 or later, with an async for loop in an asyncio coroutine. The iteration ends once
+close was called and all the chunks up to size were returned. If sink is set, the chunks are
+written to sink by the thread that dispatches put, the exception raised by sink.write is
+raised by the future of the chunk and by the following calls to put.'''
+
+    def __init__(self, sink=None):
+        self._sink = sink
+        self._lock = threading.Lock()
+        self._offset = 0 # The offset of the next chunk.
+        self._ahead = {} # The chunks received ahead of the next chunk and their futures, by offset.
+        self._ready = collections.deque() # The chunks waiting for the iterator and their futures.
+        self._waiters = collections.deque() # The futures of the iterator calls waiting for a chunk.
+        self._size = None
+        self._exception = None
+
+    def put(self, offset, data):
+        '''Receives the chunk with the given offset and returns an Ice.Future that completes once
+the chunk was consumed.'''
+        future = Future()
+        completed = []
+        with self._lock:
+            if self._exception:
+                completed.append((future, None, self._exception))
+            elif not data or offset < self._offset or offset in self._ahead:
+                completed.append((future, None, None))
+            else:
+                self._ahead[offset] = (data, future)
+                self._deliver(completed)
+        self._complete(completed)
+        return future
+
+    def close(self, size=None):
+        '''Ends the stream once the chunks up to size bytes were consumed. If size is None, the stream
+ends after the chunks received so far.'''
+        completed = []
+        with self._lock:
+            if size is None:
+                size = max([self._offset] + [o + len(d) for o, (d, f) in self._ahead.items()])
+            self._size = size
+            self._deliver(completed)
+        self._complete(completed)
+
+    def fail(self, ex):
+        '''Ends the stream with the given exception. The iterator raises the exception once it returned
+the chunks received so far, and the futures of the other chunks raise it.'''
+        completed = []
+        with self._lock:
+            self._fail(ex, completed)
+        self._complete(completed)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        data = self._take().result()
+        if data is None:
+            raise StopIteration()
+        return data
+
+    next = __next__ # Python 2.x
+
+    def __aiter__(self):
+        return self
+
+    def __anext__(self):
+        future = Future()
+        def done(f):
+            ex = f.exception()
+            if ex:
+                future.set_exception(ex)
+            elif f.result() is None:
+                future.set_exception(StopAsyncIteration())
+            else:
+                future.set_result(f.result())
+        self._take().add_done_callback(done)
+        return wrap_future(future)
+
+    def _take(self):
+        future = Future()
+        completed = []
+        with self._lock:
+            if self._ready:
+                data, f = self._ready.popleft()
+                completed.append((future, data, None))
+                completed.append((f, None, None))
+            elif self._exception:
+                completed.append((future, None, self._exception))
+            elif self._size is not None and self._offset >= self._size:
+                completed.append((future, None, None))
+            else:
+                self._waiters.append(future)
+        self._complete(completed)
+        return future
+
+    def _deliver(self, completed):
+        while self._offset in self._ahead:
+            data, future = self._ahead.pop(self._offset)
+            self._offset += len(data)
+            if self._sink is not None:
+                try:
+                    self._sink.write(data)
+                except:
+                    ex = sys.exc_info()[1]
+                    completed.append((future, None, ex))
+                    self._fail(ex, completed)
+                    return
+                completed.append((future, None, None))
+            elif self._waiters:
+                completed.append((self._waiters.popleft(), data, None))
+                completed.append((future, None, None))
+            else:
+                self._ready.append((data, future))
+
+        if self._size is not None and self._offset >= self._size:
+            while self._waiters:
+                completed.append((self._waiters.popleft(), None, None))
+
+    def _fail(self, ex, completed):
+        if self._exception:
+            return
+        self._exception = ex
+        for data, future in self._ahead.values():
+            completed.append((future, None, ex))
+        self._ahead.clear()
+        for future in self._waiters:
+            completed.append((future, None, ex))
+        self._waiters.clear()
+
+    @staticmethod
+    def _complete(completed):
+        for future, result, ex in completed:
+            if ex:
+                future.set_exception(ex)
+            else:
+                future.set_result(result)
+
 #
 # Logger wrapper.
 #
@@ -1230,6 +2049,43 @@ class LoggerI(Logger):
         logger = self._impl.cloneWithPrefix(prefix)
         return LoggerI(logger)
 
+#
+# Asynchronous logger.
+#
+# Ice.AsyncLogger(logger=None, capacity=4096, maxBatchSize=256) is a logger implemented in IcePy
+# for the logger attribute of Ice.InitializationData. The Ice threads don't acquire the GIL to
+# log a message: they append it to a buffer of the given capacity, and the logger thread
+# delivers the records in batches of up to maxBatchSize records, acquiring the GIL once per
+# batch. The records are delivered to the given Ice.Logger or, if logger is None, to the
+# logging module: the traces are logged with the DEBUG level by the logger named after the
+# trace category ("Ice.Network" for example), and the other messages by the "Ice" logger with
+# the INFO, WARNING or ERROR level. The records that don't fit in the buffer are dropped, and
+# a warning with the number of dropped records is delivered once there is room again.
+#
+# The logger thread runs while the logger is used by a communicator that is not destroyed,
+# destroying the communicator delivers the pending records. flush() waits for the records
+# logged so far to be delivered.
+#
+AsyncLogger = IcePy.AsyncLogger
+
+class AsyncLoggerMetrics(object):
+    '''The metrics of an Ice.AsyncLogger, as returned by its getMetrics method.
+
+delivered: The number of records delivered to the Python logger.
+
+dropped: The number of records dropped because the buffer was full.
+
+batches: The number of batches delivered by the logger thread, the thread acquires the
+    GIL once per batch.
+
+queueDepth: The number of records waiting in the buffer.'''
+
+    def __init__(self, delivered, dropped, batches, queueDepth):
+        self.delivered = delivered
+        self.dropped = dropped
+        self.batches = batches
+        self.queueDepth = queueDepth
+
 #
 # Properties wrapper.
 #
@@ -7,7 +7,7 @@
 #
 # **********************************************************************
 
-import Ice, Test, sys, threading, random
+import Ice, Test, gc, sys, threading, random, weakref
 
 def test(b):
     if not b:
@@ -1879,4 +1879,146 @@ def allTestsFuture(helper, communicator, collocated):
 
     print("ok")
 
+    sys.stdout.write("testing futures... ")
+    sys.stdout.flush()
+
+    f = Ice.Future()
+    test(f.running() and not f.done() and not f.cancelled())
+    try:
+        f.result(timeout=0.01)
+        test(False)
+    except Ice.TimeoutException:
+        pass
+    called = []
+    f.add_done_callback(lambda f: called.append(f.result()))
+    f.set_result((1, 2))
+    f.set_result(3) # Ignored, the future is already completed.
+    test(f.done() and f.result() == (1, 2) and f.exception() is None and called == [(1, 2)])
+    test(not f.cancel())
+
+    f = Ice.Future()
+    def complete():
+        f.set_exception(Test.TestIntfException())
+    t = threading.Timer(0.05, complete)
+    t.start()
+    test(isinstance(f.exception(), Test.TestIntfException))
+    t.join()
+    try:
+        f.result()
+        test(False)
+    except Test.TestIntfException:
+        pass
+
+    f = Ice.Future()
+    test(f.cancel() and f.cancel() and f.cancelled() and f.done())
+    try:
+        f.result()
+        test(False)
+    except Ice.InvocationCanceledException:
+        pass
+
+    test(Ice.Future.completed(5).result() == 5)
+
+    f = p.opWithResultAsync()
+    test(isinstance(f, Ice.InvocationFuture) and isinstance(f, Ice.Future))
+    test(f.operation() == "opWithResult" and f.proxy() == p and f.communicator() == communicator)
+    test(f.sent(timeout=5) in [True, False] and f.is_sent() and f.result() == 15)
+
+    #
+    # Attributes can be set on futures and they support weak references.
+    #
+    for f in [Ice.Future.completed(15), p.opWithResultAsync()]:
+        test(f.result() == 15)
+        f.tag = "tag"
+        test(f.tag == "tag")
+        r = weakref.ref(f)
+        test(r() is f)
+        f.tag = f # Reference cycle through the attributes.
+        del f
+        gc.collect()
+        test(r() is None)
+
+    #
+    # Futures can be subclassed and are garbage collected.
+    #
+    class MyFuture(Ice.Future):
+        pass
+    f = MyFuture()
+    f.set_result(f)
+    test(f.result() is f)
+    r = weakref.ref(f)
+    del f
+    gc.collect()
+    test(r() is None)
+
+    print("ok")
+
+    sys.stdout.write("testing completion queue... ")
+    sys.stdout.flush()
+
+    queue = Ice.CompletionQueue(maxBatchSize=16)
+    initData = Ice.InitializationData()
+    initData.properties = communicator.getProperties().clone()
+    initData.completionQueue = queue
+    with Ice.initialize(initData) as ic:
+        q = Test.TestIntfPrx.uncheckedCast(ic.stringToProxy(p.ice_toString()))
+        futures = [q.opWithResultAsync() for i in range(0, 200)]
+        test(all(f.result() == 15 for f in futures))
+
+        try:
+            q.opWithUEAsync().result()
+            test(False)
+        except Test.TestIntfException:
+            pass
+
+        cb = FutureSentCallback()
+        f = q.ice_oneway().opAsync()
+        f.add_sent_callback(cb.sent)
+        cb.check()
+        test(f.result() is None and f.is_sent())
+
+        #
+        # A queue can be shared by communicators.
+        #
+        with Ice.initialize(initData) as ic2:
+            test(Test.TestIntfPrx.uncheckedCast(ic2.stringToProxy(p.ice_toString())).opWithResultAsync().result() == 15)
+
+    metrics = queue.getMetrics()
+    test(isinstance(metrics, Ice.CompletionQueueMetrics))
+    test(metrics.completions >= 203 and metrics.queueDepth == 0)
+    test(metrics.batches > 0 and metrics.batches * 16 >= metrics.completions)
+    test(metrics.largestBatch > 0 and metrics.largestBatch <= 16)
+    test(metrics.maxQueueDepth >= metrics.largestBatch)
+
+    #
+    # Destroying the communicator from a callback called by the queue thread.
+    #
+    ic = Ice.initialize(initData)
+    q = Test.TestIntfPrx.uncheckedCast(ic.stringToProxy(p.ice_toString()))
+    cb = CallbackBase()
+    def destroyCallback(f):
+        test(threading.current_thread().name != "MainThread")
+        ic.destroy()
+        cb.called()
+    q.sleepAsync(100).add_done_callback(destroyCallback)
+    cb.check()
+    ic.destroy()
+    test(queue.getMetrics().queueDepth == 0)
+
+    try:
+        Ice.CompletionQueue(maxBatchSize=0)
+        test(False)
+    except ValueError:
+        pass
+
+    initData = Ice.InitializationData()
+    initData.completionQueue = object()
+    try:
+        Ice.initialize(initData)
+        test(False)
+    except Ice.InitializationException:
+        pass
+
+    print("ok")
+
     p.shutdown()
@@ -0,0 +1,211 @@
+# **********************************************************************
+#
+# Copyright (c) 2003-2018 ZeroC, Inc. All rights reserved.
+#
+# This copy of Ice is licensed to you under the terms described in the
+# ICE_LICENSE file included in this distribution.
+#
+# **********************************************************************
+
+import Ice, Test, asyncio, concurrent.futures, sys, threading, time
+
+
+def test(b):
+    if not b:
+        raise RuntimeError('test assertion failed')
+
+
+class EventLoop(asyncio.SelectorEventLoop):
+    '''Counts the calls to call_soon_threadsafe, each of them wakes up the event loop.'''
+
+    def __init__(self):
+        asyncio.SelectorEventLoop.__init__(self)
+        self.wakeups = 0
+
+    def call_soon_threadsafe(self, *args):
+        self.wakeups += 1
+        return asyncio.SelectorEventLoop.call_soon_threadsafe(self, *args)
+
+
+class EventLoopIntfI(Test.EventLoopIntf):
+
+    def __init__(self, thread):
+        self._thread = thread
+
+    async def sleep(self, ms, current):
+        await asyncio.sleep(ms / 1000.0)
+        return self.isLoopThread(current)
+
+    def isLoopThread(self, current):
+        return threading.current_thread() is self._thread
+
+    async def throwException(self, reason, current):
+        await asyncio.sleep(0)
+        raise Test.TestIntfException(reason)
+
+
+async def run(helper, communicator, loop):
+    p = Test.TestIntfPrx.checkedCast(communicator.stringToProxy("test:" + helper.getTestEndpoint()))
+
+    sys.stdout.write("testing asyncio futures... ")
+    sys.stdout.flush()
+    f = p.addAsync(1, 2)
+    test(isinstance(f, asyncio.Future))
+    test(await f == 3)
+    test(await p.ice_isAAsync("::Test::TestIntf"))
+    test(await Ice.wrap_future(p.addAsync(3, 4)) == 7)
+    try:
+        await p.throwExceptionAsync("reason")
+        test(False)
+    except Test.TestIntfException as ex:
+        test(ex.reason == "reason")
+    try:
+        await p.ice_identity(Ice.stringToIdentity("none")).ice_pingAsync()
+        test(False)
+    except Ice.ObjectNotExistException:
+        pass
+    print("ok")
+
+    sys.stdout.write("testing oneway and batch oneway invocations... ")
+    sys.stdout.flush()
+    test(await p.ice_oneway().opAsync() is None)
+    batch = p.ice_batchOneway()
+    test(await batch.opAsync() is None)
+    test(await batch.opAsync() is None)
+    batch.ice_flushBatchRequests()
+    while await p.getOpCountAsync() != 3:
+        await asyncio.sleep(0.01)
+    print("ok")
+
+    sys.stdout.write("testing concurrent invocations... ")
+    sys.stdout.flush()
+    results = await asyncio.gather(*[p.addAsync(i, i) for i in range(0, 1000)])
+    test(results == [i * 2 for i in range(0, 1000)])
+
+    #
+    # Block the event loop until all the responses are received, the futures are then completed
+    # after a single wake up.
+    #
+    futures = [p.addAsync(i, 1) for i in range(0, 100)]
+    wakeups = loop.wakeups
+    p.ice_ping()
+    time.sleep(0.5)
+    results = await asyncio.gather(*futures)
+    test(results == [i + 1 for i in range(0, 100)])
+    test(loop.wakeups - wakeups == 1)
+    print("ok")
+
+    sys.stdout.write("testing invocations from other threads... ")
+    sys.stdout.flush()
+    with concurrent.futures.ThreadPoolExecutor(4) as executor:
+        futures = await asyncio.gather(*[loop.run_in_executor(executor, p.addAsync, i, 2) for i in range(0, 100)])
+        results = await asyncio.gather(*futures)
+    test(results == [i + 2 for i in range(0, 100)])
+    print("ok")
+
+    sys.stdout.write("testing cancellation... ")
+    sys.stdout.flush()
+    f = p.addAsync(1, 1)
+    f.cancel()
+    try:
+        await f
+        test(False)
+    except asyncio.CancelledError:
+        pass
+    test(await p.addAsync(2, 2) == 4)
+    try:
+        await asyncio.wait_for(p.addAsync(1, 1), 0)
+        test(False)
+    except asyncio.TimeoutError:
+        pass
+    print("ok")
+
+
+async def runDispatch(helper, communicator, adapter, loop):
+    p = Test.EventLoopIntfPrx.uncheckedCast(communicator.stringToProxy("test:" + helper.getTestEndpoint(num=1)))
+
+    sys.stdout.write("testing dispatch with an event loop... ")
+    sys.stdout.flush()
+    test(adapter.getEventLoop() is loop)
+    test(await p.isLoopThreadAsync())
+    test(await p.sleepAsync(10))
+    try:
+        await p.throwExceptionAsync("reason")
+        test(False)
+    except Test.TestIntfException as ex:
+        test(ex.reason == "reason")
+
+    #
+    # The server thread pool has a single thread, the requests are dispatched concurrently
+    # by the event loop.
+    #
+    start = time.time()
+    results = await asyncio.gather(*[p.sleepAsync(500) for i in range(0, 100)])
+    test(all(results))
+    test(time.time() - start < 20)
+
+    adapter.setEventLoop(None)
+    test(adapter.getEventLoop() is None)
+    test(not await p.isLoopThreadAsync())
+    adapter.setEventLoop(loop)
+    test(await p.isLoopThreadAsync())
+
+    try:
+        adapter.setEventLoop(object())
+        test(False)
+    except ValueError:
+        pass
+    print("ok")
+
+
+def allTests(helper, args):
+    loop = EventLoop()
+    try:
+        initData = Ice.InitializationData()
+        initData.properties = helper.createTestProperties(args)
+        initData.eventLoop = loop
+        with Ice.initialize(initData) as communicator:
+            loop.run_until_complete(run(helper, communicator, loop))
+
+            communicator.getProperties().setProperty("EventLoopAdapter.Endpoints", helper.getTestEndpoint(num=1))
+            adapter = communicator.createObjectAdapter("EventLoopAdapter")
+            adapter.add(EventLoopIntfI(threading.current_thread()), Ice.stringToIdentity("test"))
+            adapter.setEventLoop(loop)
+            adapter.activate()
+            loop.run_until_complete(runDispatch(helper, communicator, adapter, loop))
+    finally:
+        loop.close()
+
+    sys.stdout.write("testing closed event loop... ")
+    sys.stdout.flush()
+    loop = EventLoop()
+    initData = Ice.InitializationData()
+    initData.properties = helper.createTestProperties(args)
+    initData.eventLoop = loop
+    with Ice.initialize(initData) as communicator:
+        p = Test.TestIntfPrx.uncheckedCast(communicator.stringToProxy("test:" + helper.getTestEndpoint()))
+        loop.close()
+
+        #
+        # The completions that can't be scheduled with the closed event loop are run by the Ice
+        # thread, the futures don't remain pending.
+        #
+        for i in range(0, 3):
+            f = p.addAsync(i, 1)
+            start = time.time()
+            while not f.done():
+                test(time.time() - start < 10)
+                time.sleep(0.01)
+            test(f.result() == i + 1)
+    print("ok")
+
+    sys.stdout.write("testing invalid event loop... ")
+    sys.stdout.flush()
+    initData = Ice.InitializationData()
+    initData.eventLoop = object()
+    try:
+        Ice.initialize(initData)
+        test(False)
+    except Ice.InitializationException:
+        pass
+    print("ok")
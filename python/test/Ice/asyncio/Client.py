@@ -0,0 +1,34 @@
+#!/usr/bin/env python
+# **********************************************************************
+#
+# Copyright (c) 2003-2018 ZeroC, Inc. All rights reserved.
+#
+# This copy of Ice is licensed to you under the terms described in the
+# ICE_LICENSE file included in this distribution.
+#
+# **********************************************************************
+
+import sys
+from TestHelper import TestHelper
+TestHelper.loadSlice("Test.ice")
+import Ice
+import TestI
+
+
+class Client(TestHelper):
+
+    def run(self, args):
+        #
+        # Older versions of Python cannot load a source file that uses the async/await keywords.
+        #
+        if sys.version_info < (3, 5):
+            print("asyncio is not supported by this Python version")
+            return
+
+        import AllTests
+        with self.initialize(properties=self.createTestProperties(args)) as communicator:
+            communicator.getProperties().setProperty("TestAdapter.Endpoints", self.getTestEndpoint())
+            adapter = communicator.createObjectAdapter("TestAdapter")
+            adapter.add(TestI.TestIntfI(), Ice.stringToIdentity("test"))
+            adapter.activate()
+            AllTests.allTests(self, args)
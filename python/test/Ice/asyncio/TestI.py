@@ -0,0 +1,31 @@
+# **********************************************************************
+#
+# Copyright (c) 2003-2018 ZeroC, Inc. All rights reserved.
+#
+# This copy of Ice is licensed to you under the terms described in the
+# ICE_LICENSE file included in this distribution.
+#
+# **********************************************************************
+
+import Test, threading
+
+
+class TestIntfI(Test.TestIntf):
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._opCount = 0
+
+    def add(self, x, y, current=None):
+        return x + y
+
+    def throwException(self, reason, current=None):
+        raise Test.TestIntfException(reason)
+
+    def op(self, current=None):
+        with self._lock:
+            self._opCount += 1
+
+    def getOpCount(self, current=None):
+        with self._lock:
+            return self._opCount
@@ -61,6 +61,15 @@ class Client(TestHelper):
             print("ok")
             router.destroy()
 
+        if sys.version_info[0] >= 3:
+            with self.initialize(properties=properties) as communicator:
+                router = RouterI.RouterI(communicator, True, True)
+                sys.stdout.write("testing sync blobject with memoryview... ")
+                sys.stdout.flush()
+                self.allTests(communicator, False)
+                print("ok")
+                router.destroy()
+
         with self.initialize(properties=properties) as communicator:
             router = RouterI.RouterI(communicator, True)
             sys.stdout.write("testing sync blobject... ")
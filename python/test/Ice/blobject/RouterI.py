@@ -91,13 +91,25 @@ class BlobjectAsyncI(Ice.BlobjectAsync):
             self._queue.join()
 
 class BlobjectI(Ice.Blobject):
-    def __init__(self):
+    def __init__(self, memoryView=False):
         self._objects = {}
         self._lock = threading.Lock()
+        self._lastInParams = None
+        self.memoryView = memoryView
 
     def ice_invoke(self, inParams, curr):
         with self._lock:
             proxy = self._objects[curr.id]
+            if self.memoryView:
+                assert isinstance(inParams, memoryview) and inParams.readonly
+                if self._lastInParams is not None:
+                    #
+                    # The memoryview of the previous request and its slices remain valid after the dispatch.
+                    #
+                    assert self._lastInParams[1:].tobytes() == self._lastInParams.tobytes()[1:]
+                self._lastInParams = inParams
+                if curr.operation == "add":
+                    inParams = bytearray(inParams)
 
         if len(curr.facet) > 0:
             proxy = proxy.ice_facet(curr.facet)
@@ -132,10 +144,10 @@ class ServantLocatorI(Ice.ServantLocator):
         pass
 
 class RouterI(Ice.Router):
-    def __init__(self, communicator, sync):
+    def __init__(self, communicator, sync, memoryView=False):
         self._adapter = communicator.createObjectAdapterWithEndpoints("forward", "default -h 127.0.0.1")
         if sync:
-            self._blobject = BlobjectI()
+            self._blobject = BlobjectI(memoryView)
         else:
             self._blobject = BlobjectAsyncI()
         self._adapter.addServantLocator(ServantLocatorI(self._blobject), "")
@@ -0,0 +1,212 @@
+# **********************************************************************
+#
+# Copyright (c) 2003-2018 ZeroC, Inc. All rights reserved.
+#
+# This copy of Ice is licensed to you under the terms described in the
+# ICE_LICENSE file included in this distribution.
+#
+# **********************************************************************
+
+import Ice, Test, hashlib, io, os, sys, threading
+
+def test(b):
+    if not b:
+        raise RuntimeError('test assertion failed')
+
+class Invoker(object):
+    '''Sends the chunks to the storage and records the largest number of pending invocations.'''
+    def __init__(self, storage, name):
+        self.storage = storage
+        self.name = name
+        self.lock = threading.Lock()
+        self.pending = 0
+        self.maxPending = 0
+
+    def __call__(self, offset, data):
+        with self.lock:
+            self.pending += 1
+            self.maxPending = max(self.maxPending, self.pending)
+        f = self.storage.writeAsync(self.name, offset, data)
+        f.add_done_callback(self.done)
+        return f
+
+    def done(self, f):
+        with self.lock:
+            self.pending -= 1
+
+def pieces(data, size):
+    for i in range(0, len(data), size):
+        yield data[i:i + size]
+
+def allTests(helper, communicator):
+    storage = Test.StoragePrx.checkedCast(communicator.stringToProxy("storage:{0}".format(helper.getTestEndpoint())))
+    test(storage)
+
+    sys.stdout.write("testing chunk receiver... ")
+    sys.stdout.flush()
+
+    sink = io.BytesIO()
+    receiver = Ice.ChunkReceiver(sink)
+    f2 = receiver.put(4, b"45")
+    f1 = receiver.put(2, b"23")
+    test(not f1.done() and not f2.done())
+    f0 = receiver.put(0, b"01")
+    test(f0.done() and f1.done() and f2.done())
+    test(sink.getvalue() == b"012345")
+    test(receiver.put(2, b"23").done()) # Already received
+    test(sink.getvalue() == b"012345")
+
+    receiver = Ice.ChunkReceiver()
+    f1 = receiver.put(2, b"23")
+    f0 = receiver.put(0, b"01")
+    test(not f0.done() and not f1.done())
+    test(next(receiver) == b"01")
+    test(f0.done() and not f1.done())
+    receiver.close()
+    test(list(receiver) == [b"23"])
+    test(f1.done())
+
+    receiver = Ice.ChunkReceiver()
+    chunks = []
+    t = threading.Thread(target=lambda: chunks.extend(receiver))
+    t.start()
+    receiver.close(6)
+    receiver.put(4, b"45")
+    receiver.put(0, b"0123")
+    t.join()
+    test(chunks == [b"0123", b"45"])
+
+    receiver = Ice.ChunkReceiver(Test.SinkKind) # No write method.
+    f1 = receiver.put(2, b"23")
+    f0 = receiver.put(0, b"01")
+    test(isinstance(f0.exception(), AttributeError) and f1.exception() is f0.exception())
+    test(receiver.put(4, b"45").exception() is f0.exception())
+
+    receiver = Ice.ChunkReceiver()
+    f0 = receiver.put(0, b"01")
+    f2 = receiver.put(4, b"45")
+    receiver.fail(RuntimeError("cancelled"))
+    test(isinstance(f2.exception(), RuntimeError))
+    test(next(receiver) == b"01" and f0.done() and not f0.exception())
+    try:
+        next(receiver)
+        test(False)
+    except RuntimeError:
+        pass
+
+    if sys.version_info[:2] >= (3, 5):
+        import asyncio
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            receiver = Ice.ChunkReceiver()
+            test(receiver.__aiter__() is receiver)
+            f = receiver.__anext__()
+            receiver.put(0, b"01")
+            test(loop.run_until_complete(f) == b"01")
+            receiver.put(2, b"23")
+            receiver.close()
+            test(loop.run_until_complete(receiver.__anext__()) == b"23")
+            try:
+                loop.run_until_complete(receiver.__anext__())
+                test(False)
+            except StopAsyncIteration:
+                pass
+        finally:
+            asyncio.set_event_loop(None)
+            loop.close()
+    print("ok")
+
+    sys.stdout.write("testing chunk sender... ")
+    sys.stdout.flush()
+
+    for args in [(0, 4), (-1, 4), (16, 0)]:
+        try:
+            Ice.sendChunks(lambda offset, data: None, b"", *args)
+            test(False)
+        except ValueError:
+            pass
+
+    #
+    # Invocations that complete synchronously.
+    #
+    sink = io.BytesIO()
+    data = b"x" * 10000
+    test(Ice.sendChunks(Ice.ChunkReceiver(sink).put, io.BytesIO(data), 1).result() == len(data))
+    test(sink.getvalue() == data)
+
+    sink = io.BytesIO()
+    test(Ice.sendChunks(Ice.ChunkReceiver(sink).put, [b"0123", b"", b"4", b"56789"], 2).result() == 10)
+    test(sink.getvalue() == b"0123456789")
+
+    test(Ice.sendChunks(Ice.ChunkReceiver(sink).put, io.BytesIO()).result() == 0)
+
+    def fail(offset, data):
+        raise RuntimeError("failed")
+    test(isinstance(Ice.sendChunks(fail, [b"01"]).exception(), RuntimeError))
+
+    def source():
+        yield b"01"
+        raise RuntimeError("failed")
+    test(isinstance(Ice.sendChunks(Ice.ChunkReceiver(io.BytesIO()).put, source()).exception(), RuntimeError))
+
+    #
+    # The sender stops once its window is full.
+    #
+    receiver = Ice.ChunkReceiver()
+    sent = []
+    def invoke(offset, data):
+        sent.append(offset)
+        return receiver.put(offset, data)
+    f = Ice.sendChunks(invoke, io.BytesIO(b"0123456789"), 2, 3)
+    test(not f.done() and sent == [0, 2, 4])
+    test(next(receiver) == b"01" and sent == [0, 2, 4, 6])
+    f.cancel()
+    test(next(receiver) == b"23" and sent == [0, 2, 4, 6])
+    print("ok")
+
+    sys.stdout.write("testing chunked transfer to a file... ")
+    sys.stdout.flush()
+    #
+    # The data is larger than Ice.MessageSizeMax.
+    #
+    data = os.urandom(2 * 1024 * 1024)
+    digest = hashlib.sha1(data).hexdigest()
+    storage.open("file", Test.SinkKind.File, 0)
+    invoker = Invoker(storage, "file")
+    size = Ice.sendChunks(invoker, io.BytesIO(data), 8 * 1024, 4).result()
+    test(size == len(data))
+    storage.close("file", size)
+    test(storage.getDigest("file") == digest)
+    test(invoker.maxPending <= 4 and storage.getMaxPending("file") <= 4)
+    print("ok")
+
+    sys.stdout.write("testing chunked transfer to an iterator... ")
+    sys.stdout.flush()
+    storage.open("iterator", Test.SinkKind.Iterator, 0)
+    invoker = Invoker(storage, "iterator")
+    size = Ice.sendChunks(invoker, pieces(data, 10000), 4 * 1024, 8).result()
+    test(size == len(data))
+    storage.close("iterator", size)
+    test(storage.getDigest("iterator") == digest)
+    test(invoker.maxPending <= 8 and storage.getMaxPending("iterator") <= 8)
+    print("ok")
+
+    sys.stdout.write("testing chunked transfer failures... ")
+    sys.stdout.flush()
+    storage.open("failing", Test.SinkKind.Failing, 100 * 1024)
+    try:
+        Ice.sendChunks(Invoker(storage, "failing"), io.BytesIO(data), 8 * 1024).result()
+        test(False)
+    except Ice.UnknownException:
+        pass
+
+    try:
+        bogus = Test.StoragePrx.uncheckedCast(storage.ice_identity(Ice.stringToIdentity("bogus")))
+        Ice.sendChunks(Invoker(bogus, "file"), io.BytesIO(data)).result()
+        test(False)
+    except Ice.ObjectNotExistException:
+        pass
+    print("ok")
+
+    return storage
@@ -0,0 +1,32 @@
+#!/usr/bin/env python
+# **********************************************************************
+#
+# Copyright (c) 2003-2018 ZeroC, Inc. All rights reserved.
+#
+# This copy of Ice is licensed to you under the terms described in the
+# ICE_LICENSE file included in this distribution.
+#
+# **********************************************************************
+
+from TestHelper import TestHelper
+TestHelper.loadSlice("Test.ice")
+import TestI
+import Ice
+
+
+class Server(TestHelper):
+
+    def run(self, args):
+        properties = self.createTestProperties(args)
+        #
+        # The chunks of a transfer can be dispatched out of order by the threads of the pool.
+        #
+        properties.setProperty("Ice.ThreadPool.Server.Size", "4")
+        properties.setProperty("Ice.ThreadPool.Server.Serialize", "0")
+        properties.setProperty("Ice.Warn.Dispatch", "0")
+        with self.initialize(properties=properties) as communicator:
+            communicator.getProperties().setProperty("TestAdapter.Endpoints", self.getTestEndpoint())
+            adapter = communicator.createObjectAdapter("TestAdapter")
+            adapter.add(TestI.StorageI(), Ice.stringToIdentity("storage"))
+            adapter.activate()
+            communicator.waitForShutdown()
@@ -0,0 +1,78 @@
+# **********************************************************************
+#
+# Copyright (c) 2003-2018 ZeroC, Inc. All rights reserved.
+#
+# This copy of Ice is licensed to you under the terms described in the
+# ICE_LICENSE file included in this distribution.
+#
+# **********************************************************************
+
+import Ice, Test, hashlib, io, threading, time
+
+class FailingSink(object):
+    def __init__(self, limit):
+        self.limit = limit
+        self.size = 0
+
+    def write(self, data):
+        self.size += len(data)
+        if self.size > self.limit:
+            raise RuntimeError("no space left")
+
+class Transfer(object):
+    def __init__(self, kind, limit):
+        self.data = io.BytesIO()
+        self.lock = threading.Lock()
+        self.pending = 0
+        self.maxPending = 0
+        self.thread = None
+        if kind == Test.SinkKind.File:
+            self.receiver = Ice.ChunkReceiver(self.data)
+        elif kind == Test.SinkKind.Failing:
+            self.receiver = Ice.ChunkReceiver(FailingSink(limit))
+        else:
+            self.receiver = Ice.ChunkReceiver()
+            self.thread = threading.Thread(target=self.consume)
+            self.thread.start()
+
+    def consume(self):
+        for chunk in self.receiver:
+            time.sleep(0.001) # A slow consumer, the senders must wait for it.
+            self.data.write(chunk)
+
+    def put(self, offset, data):
+        with self.lock:
+            self.pending += 1
+            self.maxPending = max(self.maxPending, self.pending)
+        f = self.receiver.put(offset, data)
+        f.add_done_callback(self.done)
+        return f
+
+    def done(self, f):
+        with self.lock:
+            self.pending -= 1
+
+class StorageI(Test.Storage):
+    def __init__(self):
+        self._transfers = {}
+
+    def open(self, name, kind, limit, current=None):
+        self._transfers[name] = Transfer(kind, limit)
+
+    def write(self, name, offset, data, current=None):
+        return self._transfers[name].put(offset, data)
+
+    def close(self, name, size, current=None):
+        transfer = self._transfers[name]
+        transfer.receiver.close(size)
+        if transfer.thread:
+            transfer.thread.join()
+
+    def getDigest(self, name, current=None):
+        return hashlib.sha1(self._transfers[name].data.getvalue()).hexdigest()
+
+    def getMaxPending(self, name, current=None):
+        return self._transfers[name].maxPending
+
+    def shutdown(self, current=None):
+        current.adapter.getCommunicator().shutdown()
@@ -7,7 +7,7 @@
 #
 # **********************************************************************
 
-import sys, string, re, traceback, Ice, Test
+import sys, string, re, traceback, array, copy, Ice, Test
 
 def test(b):
     if not b:
@@ -91,6 +91,142 @@ def allTests(helper, communicator):
     test(r == stringList)
     test(b2 == stringList)
 
+    print("ok")
+
+    sys.stdout.write("testing array sequences... ")
+    sys.stdout.flush()
+
+    (r, v2) = custom.opBoolArray([True, False, True])
+    test(isinstance(r, array.array) and isinstance(v2, array.array))
+    test(r.tolist() == [1, 0, 1])
+    test(v2.tolist() == [1, 0, 1])
+
+    (r, v2) = custom.opByteArray(byteString)
+    test(isinstance(r, array.array) and r.typecode == 'B')
+    test(r.tolist() == byteList)
+    test(v2.tolist() == byteList)
+
+    #
+    # The array module of Python 2 doesn't support the 'q' type code, long sequences use the 'l'
+    # type code if it's 8 bytes wide and are returned as lists otherwise.
+    #
+    if sys.version_info[0] >= 3:
+        longTypecode = 'q'
+    elif array.array('l').itemsize == 8:
+        longTypecode = 'l'
+    else:
+        longTypecode = None
+
+    values = [-1, 0, 1, 32767, -32768]
+    if longTypecode is None:
+        (r, v2) = custom.opLongArray(values)
+        test(r == values and v2 == values)
+        (r, v2) = custom.opLongArray([2 ** 40])
+        test(r == [2 ** 40])
+
+    for op, typecode in [(custom.opShortArray, 'h'), (custom.opIntArray, 'i'), (custom.opLongArray, longTypecode)]:
+        if typecode is None:
+            continue
+
+        (r, v2) = op(values)
+        test(isinstance(r, array.array) and r.typecode == typecode)
+        test(r.tolist() == values)
+        test(v2.tolist() == values)
+
+        (r, v2) = op(array.array(typecode, values))
+        test(r.tolist() == values)
+
+        (r, v2) = op([])
+        test(isinstance(r, array.array) and len(r) == 0)
+
+    doubleList = [1.5, -2.25, 1.1E10]
+
+    (r, v2) = custom.opFloatArray(doubleList[0:2])
+    test(isinstance(r, array.array) and r.typecode == 'f')
+    test(r.tolist() == doubleList[0:2])
+    test(v2.tolist() == doubleList[0:2])
+
+    (r, v2) = custom.opDoubleArray(array.array('d', doubleList))
+    test(isinstance(r, array.array) and r.typecode == 'd')
+    test(r.tolist() == doubleList)
+    test(v2.tolist() == doubleList)
+
+    (r, v2) = custom.opDoubleView(doubleList)
+    if sys.version_info[0] >= 3:
+        test(isinstance(r, memoryview) and r.format == 'd')
+    test(r.tolist() == doubleList)
+    test(isinstance(v2, array.array))
+    test(v2.tolist() == doubleList)
+
+    (r, v2) = custom.opDoubleList(doubleList)
+    if sys.version_info[0] >= 3:
+        test(isinstance(r, memoryview))
+    test(r.tolist() == doubleList)
+    test(isinstance(v2, list))
+    test(v2 == doubleList)
+
+    print("ok")
+
+    try:
+        import numpy
+        hasNumPy = True
+    except ImportError:
+        hasNumPy = False
+
+    if hasNumPy:
+        sys.stdout.write("testing NumPy sequences... ")
+        sys.stdout.flush()
+
+        (r, v2) = custom.opBoolNumPy([True, False, True])
+        test(isinstance(r, numpy.ndarray) and r.dtype == numpy.bool_)
+        test(r.tolist() == [True, False, True])
+        test(v2.tolist() == [True, False, True])
+
+        (r, v2) = custom.opIntNumPy(numpy.array([1, -2, 3], dtype=numpy.int32))
+        test(isinstance(r, numpy.ndarray) and r.dtype == numpy.int32)
+        test(r.tolist() == [1, -2, 3])
+
+        (r, v2) = custom.opIntNumPy(numpy.array([1, -2, 3], dtype=numpy.int64)) # Sent element by element
+        test(r.tolist() == [1, -2, 3])
+
+        (r, v2) = custom.opIntNumPy([])
+        test(isinstance(r, numpy.ndarray) and len(r) == 0)
+
+        values = numpy.linspace(0.0, 1.0, 1000)
+        (r, v2) = custom.opDoubleNumPy(values)
+        test(isinstance(r, numpy.ndarray) and r.dtype == numpy.float64)
+        test(numpy.array_equal(r, values))
+        test(isinstance(v2, list))
+        test(v2 == values.tolist())
+
+        print("ok")
+
+    sys.stdout.write("testing structs with slots... ")
+    sys.stdout.flush()
+
+    test(Test.Point.__slots__ == ('x', 'y'))
+    p = Test.Point(1, 2)
+    test(not hasattr(p, "__dict__"))
+    test(p == Test.Point(1, 2) and hash(p) == hash(Test.Point(1, 2)))
+    test(p != Test.Point(1, 3) and p < Test.Point(1, 3))
+    test(copy.copy(p) == p)
+    try:
+        p.z = 3
+        test(False)
+    except AttributeError:
+        pass
+
+    points = [Test.Point(i, -i) for i in range(0, 100)]
+    (r, v2) = custom.opPointSeq(points)
+    test(r == points and v2 == points)
+    for p in r:
+        test(not hasattr(p, "__dict__"))
+
+    print("ok")
+
+    sys.stdout.write("testing custom sequences in structs and classes... ")
+    sys.stdout.flush()
+
     s = Test.S()
     s.b1 = byteList;
     s.b2 = byteList;
@@ -115,4 +251,52 @@ def allTests(helper, communicator):
 
     print("ok")
 
+    sys.stdout.write("testing string interning... ")
+    sys.stdout.flush()
+
+    values = ["interned string {0}".format(i % 3) for i in range(0, 6)]
+    (r, s2) = custom.opInternedStringList(values)
+    test(r == values and s2 == values)
+    test(r[0] is r[3] and r[1] is r[4])
+    test(s2[0] is not s2[3])
+    (r2, s2) = custom.opInternedStringList(values)
+    test(r2[0] is r[0])
+
+    (r, s2) = custom.opInternedString(values[0])
+    test(r == values[0] and s2 == values[0])
+    test(r is custom.opInternedString(values[0])[0])
+    test(s2 is not custom.opInternedString(values[0])[1])
+
+    s = Test.InternedS(values[0], values, values)
+    r = custom.opInternedS(s)
+    test(r == s)
+    test(r.name is r.values[0] and r.values[0] is r.values[3])
+    test(r.others[0] is not r.others[3])
+
+    initData = Ice.InitializationData()
+    initData.properties = communicator.getProperties().clone()
+    initData.internCacheSize = 0
+    with Ice.initialize(initData) as ic:
+        prx = Test.CustomPrx.uncheckedCast(ic.stringToProxy(ref))
+        (r, s2) = prx.opInternedStringList(values)
+        test(r == values and r[0] is not r[3])
+
+    initData.internCacheSize = 1
+    with Ice.initialize(initData) as ic:
+        prx = Test.CustomPrx.uncheckedCast(ic.stringToProxy(ref))
+        lru = [values[0], values[0], values[1], values[0]]
+        (r, s2) = prx.opInternedStringList(lru)
+        test(r == lru)
+        test(r[0] is r[1])
+        test(r[0] is not r[3]) # Evicted by the second string.
+
+    initData.internCacheSize = -1
+    try:
+        Ice.initialize(initData)
+        test(False)
+    except Ice.InitializationException:
+        pass
+
+    print("ok")
+
     return custom
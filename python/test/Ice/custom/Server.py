@@ -11,6 +11,7 @@
 from TestHelper import TestHelper
 TestHelper.loadSlice("Test.ice")
 import sys
+import array
 import Test
 import Ice
 
@@ -56,6 +57,75 @@ class CustomI(Test.Custom):
         test(isinstance(s1, list))
         return (s1, s1)
 
+    def opBoolArray(self, v1, current=None):
+        test(isinstance(v1, array.array))
+        return (v1, v1)
+
+    def opByteArray(self, v1, current=None):
+        test(isinstance(v1, array.array))
+        return (v1, v1)
+
+    def opShortArray(self, v1, current=None):
+        test(isinstance(v1, array.array))
+        return (v1, v1)
+
+    def opIntArray(self, v1, current=None):
+        test(isinstance(v1, array.array))
+        return (v1, v1)
+
+    def opLongArray(self, v1, current=None):
+        test(isinstance(v1, array.array))
+        return (v1, v1)
+
+    def opFloatArray(self, v1, current=None):
+        test(isinstance(v1, array.array))
+        return (v1, v1)
+
+    def opDoubleArray(self, v1, current=None):
+        test(isinstance(v1, array.array))
+        return (v1, v1)
+
+    def opDoubleView(self, v1, current=None):
+        if sys.version_info[0] >= 3:
+            test(isinstance(v1, memoryview))
+        return (v1, v1)
+
+    def opDoubleList(self, v1, current=None):
+        test(isinstance(v1, array.array))
+        return (v1, v1)
+
+    def opBoolNumPy(self, v1, current=None):
+        import numpy
+        test(isinstance(v1, numpy.ndarray))
+        return (v1, v1)
+
+    def opIntNumPy(self, v1, current=None):
+        import numpy
+        test(isinstance(v1, numpy.ndarray))
+        return (v1, v1)
+
+    def opDoubleNumPy(self, v1, current=None):
+        import numpy
+        test(isinstance(v1, numpy.ndarray))
+        return (v1, v1)
+
+    def opPointSeq(self, v1, current=None):
+        for p in v1:
+            test(not hasattr(p, "__dict__"))
+        return (v1, v1)
+
+    def opInternedStringList(self, s1, current=None):
+        test(s1[0] is s1[3])
+        return (s1, s1)
+
+    def opInternedString(self, s1, current=None):
+        return (s1, s1)
+
+    def opInternedS(self, s, current=None):
+        test(s.values[0] is s.values[3])
+        test(s.others[0] is not s.others[3])
+        return s
+
     def sendS(self, val, current=None):
         if sys.version_info[0] == 2:
             test(isinstance(val.b1, str))
@@ -0,0 +1,148 @@
+# **********************************************************************
+#
+# Copyright (c) 2003-2018 ZeroC, Inc. All rights reserved.
+#
+# This copy of Ice is licensed to you under the terms described in the
+# ICE_LICENSE file included in this distribution.
+#
+# **********************************************************************
+
+import sys, time, Ice, Test, TestI
+
+def test(b):
+    if not b:
+        raise RuntimeError('test assertion failed')
+
+def testMetrics(evictor, hits, misses, evictions, size):
+    m = evictor.getMetrics()
+    test(isinstance(m, Ice.EvictorMetrics))
+    test(m.hits == hits)
+    test(m.misses == misses)
+    test(m.evictions == evictions)
+    test(m.size == size)
+
+def allTests(helper, communicator, clientCommunicator):
+    sys.stdout.write("testing evictor registration... ")
+    sys.stdout.flush()
+    store = TestI.AccountStore()
+    try:
+        Ice.Evictor(None, 2)
+        test(False)
+    except ValueError:
+        pass
+    try:
+        Ice.Evictor(store.load, 0)
+        test(False)
+    except ValueError:
+        pass
+    try:
+        Ice.Evictor(store.load, 2, 5)
+        test(False)
+    except ValueError:
+        pass
+
+    evictor = Ice.Evictor(store.load, 2, store.save)
+    test(evictor.getCapacity() == 2)
+    testMetrics(evictor, 0, 0, 0, 0)
+
+    adapter = communicator.createObjectAdapter("TestAdapter")
+    adapter.addServantLocator(evictor, "account")
+    test(adapter.findServantLocator("account") is evictor)
+    try:
+        adapter.addServantLocator(evictor, "account")
+        test(False)
+    except Ice.AlreadyRegisteredException:
+        pass
+    try:
+        adapter.addServantLocator(store, "store")
+        test(False)
+    except TypeError:
+        pass
+    adapter.activate()
+    print("ok")
+
+    base = clientCommunicator.stringToProxy("account/a:{0}".format(helper.getTestEndpoint()))
+
+    def account(name, facet=""):
+        return Test.AccountPrx.uncheckedCast(base.ice_identity(Ice.Identity(name, "account")).ice_facet(facet))
+
+    sys.stdout.write("testing cache hits and misses... ")
+    sys.stdout.flush()
+    a = account("a")
+    test(a.deposit(10) == 10)
+    test(a.deposit(5) == 15)
+    test(a.getBalance() == 15)
+    testMetrics(evictor, 2, 1, 0, 1)
+    test(store.loaded == [("account/a", "")])
+
+    test(account("a", "f").deposit(1) == 1)
+    test(account("a", "f").getFacet() == "f")
+    testMetrics(evictor, 3, 2, 0, 2)
+    test(store.loaded == [("account/a", ""), ("account/a", "f")])
+    print("ok")
+
+    sys.stdout.write("testing eviction... ")
+    sys.stdout.flush()
+    test(a.getBalance() == 15) # a is now the most recently used servant.
+    test(account("b").deposit(7) == 7)
+    testMetrics(evictor, 4, 3, 1, 2)
+    test(store.saved == [("account/a", "f")])
+    test(store.balances[("account/a", "f")] == 1)
+
+    test(account("a", "f").getBalance() == 1) # Reloaded by the loader.
+    test(store.loaded[-1] == ("account/a", "f"))
+    test(store.saved[-1] == ("account/a", ""))
+    testMetrics(evictor, 4, 4, 2, 2)
+
+    evictor.setCapacity(1)
+    test(evictor.getCapacity() == 1)
+    test(store.saved[-1] == ("account/b", ""))
+    testMetrics(evictor, 4, 4, 3, 1)
+    try:
+        evictor.setCapacity(0)
+        test(False)
+    except ValueError:
+        pass
+    print("ok")
+
+    sys.stdout.write("testing servants in use... ")
+    sys.stdout.flush()
+    test(a.getBalance() == 15)
+    testMetrics(evictor, 4, 5, 4, 1)
+    f = a.sleepAsync(500)
+    while evictor.getMetrics().hits < 5:
+        time.sleep(0.01)
+    test(account("b").getBalance() == 7)
+    testMetrics(evictor, 5, 6, 5, 1) # b is evicted when its dispatch completes, a is in use.
+    test(store.saved[-1] == ("account/b", ""))
+    f.result()
+    test(a.getBalance() == 15)
+    testMetrics(evictor, 6, 6, 5, 1)
+    print("ok")
+
+    sys.stdout.write("testing loader errors... ")
+    sys.stdout.flush()
+    try:
+        account("missing").getBalance()
+        test(False)
+    except Ice.ObjectNotExistException:
+        pass
+    try:
+        account("python").getBalance()
+        test(False)
+    except Ice.UnknownException as ex:
+        test("loader failure" in ex.unknown)
+    testMetrics(evictor, 6, 8, 5, 1)
+    print("ok")
+
+    sys.stdout.write("testing deactivation... ")
+    sys.stdout.flush()
+    evictor.setCapacity(4)
+    test(account("b").deposit(1) == 8)
+    count = len(store.saved)
+    adapter.destroy()
+    test(len(store.saved) == count + 2)
+    test(set(store.saved[-2:]) == set([("account/a", ""), ("account/b", "")]))
+    test(store.balances[("account/b", "")] == 8)
+    testMetrics(evictor, 6, 9, 5, 0)
+    print("ok")
@@ -0,0 +1,29 @@
+#!/usr/bin/env python
+# **********************************************************************
+#
+# Copyright (c) 2003-2018 ZeroC, Inc. All rights reserved.
+#
+# This copy of Ice is licensed to you under the terms described in the
+# ICE_LICENSE file included in this distribution.
+#
+# **********************************************************************
+
+from TestHelper import TestHelper
+TestHelper.loadSlice("Test.ice")
+import AllTests
+
+
+class Client(TestHelper):
+
+    def run(self, args):
+        properties = self.createTestProperties(args)
+        properties.setProperty("Ice.ThreadPool.Server.Size", "2")
+        properties.setProperty("Ice.Warn.Dispatch", "0")
+        with self.initialize(properties=properties) as communicator:
+            communicator.getProperties().setProperty("TestAdapter.Endpoints", self.getTestEndpoint())
+
+            #
+            # Use another communicator for the client to avoid collocated invocations.
+            #
+            with self.initialize(properties=self.createTestProperties(args)) as clientCommunicator:
+                AllTests.allTests(self, communicator, clientCommunicator)
@@ -0,0 +1,53 @@
+# **********************************************************************
+#
+# Copyright (c) 2003-2018 ZeroC, Inc. All rights reserved.
+#
+# This copy of Ice is licensed to you under the terms described in the
+# ICE_LICENSE file included in this distribution.
+#
+# **********************************************************************
+
+import threading, time, Ice, Test
+
+class AccountI(Test.Account):
+    def __init__(self, balance):
+        self.balance = balance
+
+    def deposit(self, amount, current=None):
+        self.balance += amount
+        return self.balance
+
+    def getBalance(self, current=None):
+        return self.balance
+
+    def getFacet(self, current=None):
+        return current.facet
+
+    def sleep(self, ms, current=None):
+        time.sleep(ms / 1000.0)
+
+#
+# Loads and saves the account servants, the balances are stored in a dictionary.
+#
+class AccountStore(object):
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.balances = {}
+        self.loaded = []
+        self.saved = []
+
+    def load(self, current):
+        with self._lock:
+            key = (Ice.identityToString(current.id), current.facet)
+            self.loaded.append(key)
+            if current.id.name == "python":
+                raise RuntimeError("loader failure")
+            if current.id.name == "missing":
+                return None
+            return AccountI(self.balances.get(key, 0))
+
+    def save(self, identity, facet, servant):
+        with self._lock:
+            key = (Ice.identityToString(identity), facet)
+            self.saved.append(key)
+            self.balances[key] = servant.balance
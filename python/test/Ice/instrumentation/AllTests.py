@@ -0,0 +1,258 @@
+# **********************************************************************
+#
+# Copyright (c) 2003-2018 ZeroC, Inc. All rights reserved.
+#
+# This copy of Ice is licensed to you under the terms described in the
+# ICE_LICENSE file included in this distribution.
+#
+# **********************************************************************
+
+import Ice, Test, TestI, sys, threading
+
+
+def test(b):
+    if not b:
+        raise RuntimeError('test assertion failed')
+
+
+class Recorder(object):
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._events = []
+
+    def record(self, *args):
+        with self._lock:
+            self._events.append(args)
+
+    def events(self, kind=None):
+        with self._lock:
+            return [e for e in self._events if kind is None or e[0] == kind]
+
+    def clear(self):
+        with self._lock:
+            self._events = []
+
+
+class ObserverI(Ice.Instrumentation.Observer):
+
+    def __init__(self, recorder, name):
+        self.recorder = recorder
+        self.name = name
+
+    def attach(self):
+        self.recorder.record("attach", self.name)
+
+    def detach(self):
+        self.recorder.record("detach", self.name)
+
+    def failed(self, exceptionName):
+        self.recorder.record("failed", self.name, exceptionName)
+
+
+class ThreadObserverI(ObserverI):
+
+    def stateChanged(self, oldState, newState):
+        self.recorder.record("stateChanged", self.name, oldState, newState)
+
+
+class ConnectionObserverI(ObserverI):
+
+    def sentBytes(self, num):
+        self.recorder.record("sentBytes", self.name, num)
+
+    def receivedBytes(self, num):
+        self.recorder.record("receivedBytes", self.name, num)
+
+
+class DispatchObserverI(ObserverI):
+
+    def userException(self):
+        self.recorder.record("userException", self.name)
+
+    def reply(self, size):
+        self.recorder.record("reply", self.name, size)
+
+
+class RemoteObserverI(ObserverI):
+
+    def reply(self, size):
+        self.recorder.record("reply", self.name, size)
+
+
+class InvocationObserverI(ObserverI):
+
+    def retried(self):
+        self.recorder.record("retried", self.name)
+
+    def userException(self):
+        self.recorder.record("userException", self.name)
+
+    def getRemoteObserver(self, con, endpt, requestId, size):
+        test(isinstance(con, Ice.ConnectionInfo))
+        test(endpt.getInfo() is not None)
+        self.recorder.record("getRemoteObserver", self.name, requestId, size)
+        return RemoteObserverI(self.recorder, "remote " + self.name)
+
+    def getCollocatedObserver(self, adapter, requestId, size):
+        self.recorder.record("getCollocatedObserver", self.name, requestId, size)
+        return None
+
+
+class CommunicatorObserverI(Ice.Instrumentation.CommunicatorObserver):
+
+    def __init__(self, recorder):
+        self.recorder = recorder
+        self.updater = None
+
+    def getConnectionEstablishmentObserver(self, endpt, connector):
+        test(endpt.getInfo() is not None)
+        return ObserverI(self.recorder, "establishment")
+
+    def getEndpointLookupObserver(self, endpt):
+        return None
+
+    def getConnectionObserver(self, con, endpt, state, old):
+        test(isinstance(state, Ice.Instrumentation.ConnectionState))
+        test(old is None or isinstance(old, ConnectionObserverI))
+        self.recorder.record("getConnectionObserver", state)
+        return ConnectionObserverI(self.recorder, "connection")
+
+    def getThreadObserver(self, parent, id, state, old):
+        test(isinstance(state, Ice.Instrumentation.ThreadState))
+        test(old is None or isinstance(old, ThreadObserverI))
+        self.recorder.record("getThreadObserver", parent, id)
+        return ThreadObserverI(self.recorder, "thread")
+
+    def getInvocationObserver(self, prx, operation, ctx):
+        test(isinstance(prx, Ice.ObjectPrx))
+        test(isinstance(ctx, dict))
+        return InvocationObserverI(self.recorder, "invocation " + operation)
+
+    def getDispatchObserver(self, current, size):
+        test(current.adapter is not None)
+        return DispatchObserverI(self.recorder, "dispatch " + current.operation)
+
+    def setObserverUpdater(self, updater):
+        self.updater = updater
+
+
+def allTests(helper, args):
+
+    sys.stdout.write("testing communicator observer... ")
+    sys.stdout.flush()
+
+    recorder = Recorder()
+    observer = CommunicatorObserverI(recorder)
+    initData = Ice.InitializationData()
+    initData.properties = helper.createTestProperties(args)
+    initData.observer = observer
+    with helper.initialize(initData=initData) as communicator:
+        test(observer.updater is not None)
+        communicator.getProperties().setProperty("TestAdapter.Endpoints", helper.getTestEndpoint())
+        adapter = communicator.createObjectAdapter("TestAdapter")
+        adapter.add(TestI.HelloI(), Ice.stringToIdentity("hello"))
+        adapter.activate()
+
+        hello = Test.HelloPrx.uncheckedCast(communicator.stringToProxy("hello:" + helper.getTestEndpoint()))
+        hello = hello.ice_collocationOptimized(False)
+        hello.sayHello()
+
+        test(("attach", "invocation sayHello") in recorder.events())
+        test(("detach", "invocation sayHello") in recorder.events())
+        test(("attach", "dispatch sayHello") in recorder.events())
+        test(("detach", "dispatch sayHello") in recorder.events())
+        test(("attach", "establishment") in recorder.events())
+        test(len(recorder.events("getRemoteObserver")) == 1)
+        test(len([e for e in recorder.events("reply") if e[1] == "remote invocation sayHello"]) == 1)
+        test(len(recorder.events("sentBytes")) > 0)
+        test(len(recorder.events("receivedBytes")) > 0)
+        test(len(recorder.events("getConnectionObserver")) > 0)
+        test(len(recorder.events("getThreadObserver")) > 0)
+
+        recorder.clear()
+        try:
+            hello.throwUserEx()
+            test(False)
+        except Test.UserEx:
+            pass
+        test(("userException", "invocation throwUserEx") in recorder.events())
+        test(("userException", "dispatch throwUserEx") in recorder.events())
+
+        recorder.clear()
+        try:
+            Test.HelloPrx.uncheckedCast(hello.ice_identity(Ice.stringToIdentity("none"))).sayHello()
+            test(False)
+        except Ice.ObjectNotExistException:
+            pass
+        test(("failed", "invocation sayHello", "::Ice::ObjectNotExistException") in recorder.events())
+
+        recorder.clear()
+        try:
+            hello.sayHelloTo(5)
+            test(False)
+        except ValueError:
+            pass
+        test(len([e for e in recorder.events() if e[1] == "invocation sayHelloTo"]) == 0)
+        hello.sayHelloTo("world")
+        test(("detach", "invocation sayHelloTo") in recorder.events())
+
+        recorder.clear()
+        observer.updater.updateConnectionObservers()
+        test(len(recorder.events("getConnectionObserver")) > 0)
+        observer.updater.updateThreadObservers()
+        test(len(recorder.events("getThreadObserver")) > 0)
+    test(observer.updater is None)
+    print("ok")
+
+    sys.stdout.write("testing batch observer... ")
+    sys.stdout.flush()
+
+    reports = []
+    initData = Ice.InitializationData()
+    initData.properties = helper.createTestProperties(args)
+    initData.observer = Ice.BatchObserver(reports.extend, interval=0.1, buckets=(0.5, 1.0))
+    with helper.initialize(initData=initData) as communicator:
+        adapter = communicator.createObjectAdapter("")
+        hello = Test.HelloPrx.uncheckedCast(adapter.addWithUUID(TestI.HelloI()))
+        adapter.activate()
+        for i in range(0, 10):
+            hello.sayHello()
+        for i in range(0, 3):
+            try:
+                hello.throwUserEx()
+                test(False)
+            except Test.UserEx:
+                pass
+
+    stats = {}
+    for s in reports:
+        test(isinstance(s, Ice.OperationStats))
+        test(s.buckets == (0.5, 1.0))
+        test(len(s.histogram) == 3)
+        test(sum(s.histogram) == s.count)
+        test(s.maxTime >= 0 and s.totalTime >= s.maxTime)
+        total = stats.setdefault((s.kind, s.operation), [0, 0, 0])
+        total[0] += s.count
+        total[1] += s.failures
+        total[2] += s.userExceptions
+    test(stats[("invocation", "sayHello")] == [10, 0, 0])
+    test(stats[("dispatch", "sayHello")] == [10, 0, 0])
+    test(stats[("invocation", "throwUserEx")] == [3, 0, 3])
+    test(stats[("dispatch", "throwUserEx")] == [3, 0, 3])
+    print("ok")
+
+    sys.stdout.write("testing batch observer validation... ")
+    sys.stdout.flush()
+
+    for o in [Ice.BatchObserver(None), Ice.BatchObserver(reports.extend, interval=0),
+              Ice.BatchObserver(reports.extend, buckets=(1.0, 0.5)),
+              Ice.BatchObserver(reports.extend, buckets=("a",))]:
+        initData = Ice.InitializationData()
+        initData.observer = o
+        try:
+            Ice.initialize(initData)
+            test(False)
+        except Ice.InitializationException:
+            pass
+    print("ok")
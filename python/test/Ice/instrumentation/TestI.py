@@ -0,0 +1,22 @@
+# **********************************************************************
+#
+# Copyright (c) 2003-2018 ZeroC, Inc. All rights reserved.
+#
+# This copy of Ice is licensed to you under the terms described in the
+# ICE_LICENSE file included in this distribution.
+#
+# **********************************************************************
+
+import Test
+
+
+class HelloI(Test.Hello):
+
+    def sayHello(self, current=None):
+        pass
+
+    def sayHelloTo(self, name, current=None):
+        pass
+
+    def throwUserEx(self, current=None):
+        raise Test.UserEx()
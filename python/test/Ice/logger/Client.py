@@ -0,0 +1,161 @@
+#!/usr/bin/env python
+# **********************************************************************
+#
+# Copyright (c) 2003-2018 ZeroC, Inc. All rights reserved.
+#
+# This copy of Ice is licensed to you under the terms described in the
+# ICE_LICENSE file included in this distribution.
+#
+# **********************************************************************
+
+import logging, sys, threading
+import Ice
+from TestHelper import TestHelper
+
+
+def test(b):
+    if not b:
+        raise RuntimeError('test assertion failed')
+
+
+class LoggerI(Ice.Logger):
+    def __init__(self, prefix="", records=None):
+        self._prefix = prefix
+        self.records = records if records is not None else []
+
+    def _print(self, message):
+        self.records.append(("print", self._prefix, "", message, threading.current_thread()))
+
+    def trace(self, category, message):
+        self.records.append(("trace", self._prefix, category, message, threading.current_thread()))
+
+    def warning(self, message):
+        self.records.append(("warning", self._prefix, "", message, threading.current_thread()))
+
+    def error(self, message):
+        self.records.append(("error", self._prefix, "", message, threading.current_thread()))
+
+    def getPrefix(self):
+        return self._prefix
+
+    def cloneWithPrefix(self, prefix):
+        return LoggerI(prefix, self.records)
+
+
+class Handler(logging.Handler):
+    def __init__(self):
+        logging.Handler.__init__(self, logging.DEBUG)
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+class Client(TestHelper):
+
+    def run(self, args):
+        sys.stdout.write("testing asynchronous logger with Ice.Logger... ")
+        sys.stdout.flush()
+        try:
+            Ice.AsyncLogger(5)
+            test(False)
+        except ValueError:
+            pass
+        try:
+            Ice.AsyncLogger(None, 0)
+            test(False)
+        except ValueError:
+            pass
+
+        target = LoggerI()
+        initData = Ice.InitializationData()
+        initData.properties = self.createTestProperties(args)
+        initData.logger = Ice.AsyncLogger(target)
+        with self.initialize(initData=initData) as communicator:
+            logger = communicator.getLogger()
+            logger._print("print")
+            logger.trace("Category", "trace")
+            logger.warning("warning")
+            logger.error("error")
+            logger.cloneWithPrefix("prefix").warning("warning with prefix")
+            initData.logger.flush()
+            test([r[:4] for r in target.records] == [("print", "", "", "print"),
+                                                     ("trace", "", "Category", "trace"),
+                                                     ("warning", "", "", "warning"),
+                                                     ("error", "", "", "error"),
+                                                     ("warning", "prefix", "", "warning with prefix")])
+            test(threading.current_thread() not in [r[4] for r in target.records])
+            m = initData.logger.getMetrics()
+            test(isinstance(m, Ice.AsyncLoggerMetrics))
+            test(m.delivered == 5 and m.dropped == 0 and m.batches >= 1 and m.queueDepth == 0)
+
+            logger.trace("Category", "pending")
+        test(target.records[-1][:4] == ("trace", "", "Category", "pending")) # Delivered by destroy.
+
+        #
+        # Destroying the communicator from the logger thread.
+        #
+        destroyed = threading.Event()
+        class DestroyLoggerI(LoggerI):
+            def warning(self, message):
+                LoggerI.warning(self, message)
+                communicator.destroy()
+                destroyed.set()
+
+        target = DestroyLoggerI()
+        initData.logger = Ice.AsyncLogger(target)
+        communicator = self.initialize(initData=initData)
+        communicator.getLogger().warning("destroy")
+        test(destroyed.wait(10))
+        test(target.records[0][4] != threading.current_thread())
+        communicator.destroy()
+        print("ok")
+
+        sys.stdout.write("testing asynchronous logger with the logging module... ")
+        sys.stdout.flush()
+        handler = Handler()
+        iceLogger = logging.getLogger("Ice")
+        iceLogger.addHandler(handler)
+        iceLogger.setLevel(logging.DEBUG)
+        try:
+            initData = Ice.InitializationData()
+            initData.properties = self.createTestProperties(args)
+            initData.properties.setProperty("Ice.Trace.Network", "1")
+            initData.logger = Ice.AsyncLogger()
+            with self.initialize(initData=initData) as communicator:
+                logger = communicator.getLogger()
+                logger._print("print")
+                logger.trace("Category", "trace")
+                logger.warning("warning")
+                logger.error("error")
+                logger.cloneWithPrefix("Prefix").trace("Category", "trace with prefix")
+                initData.logger.flush()
+                test([(r.name, r.levelno, r.getMessage()) for r in handler.records] ==
+                     [("Ice", logging.INFO, "print"),
+                      ("Ice.Category", logging.DEBUG, "trace"),
+                      ("Ice", logging.WARNING, "warning"),
+                      ("Ice", logging.ERROR, "error")])
+
+                communicator.createObjectAdapterWithEndpoints("", "tcp -h 127.0.0.1").activate()
+                initData.logger.flush()
+                test("Ice.Network" in [r.name for r in handler.records])
+        finally:
+            iceLogger.removeHandler(handler)
+        print("ok")
+
+        sys.stdout.write("testing dropped records... ")
+        sys.stdout.flush()
+        target = LoggerI()
+        logger = Ice.AsyncLogger(target, 4)
+        for i in range(0, 10):
+            logger.trace("Category", str(i))
+        m = logger.getMetrics()
+        test(m.delivered == 0 and m.dropped == 6 and m.queueDepth == 4)
+        test(len(target.records) == 0) # Not used by a communicator, the records are delivered by flush.
+        logger.flush()
+        test([r[3] for r in target.records[:4]] == ["0", "1", "2", "3"])
+        test(len(target.records) == 5 and target.records[4][0] == "warning" and "6" in target.records[4][3])
+        test(target.records[0][4] == threading.current_thread())
+        m = logger.getMetrics()
+        test(m.delivered == 4 and m.dropped == 6 and m.queueDepth == 0)
+        print("ok")
@@ -8,7 +8,7 @@
 # **********************************************************************
 
 import Ice, Test, Twoways, TwowaysFuture, TwowaysAMI, Oneways, OnewaysFuture, OnewaysAMI, BatchOneways, sys
-import BatchOnewaysAMI, BatchOnewaysFuture
+import BatchOnewaysAMI, BatchOnewaysFuture, EncodedArgs
 
 def test(b):
     if not b:
@@ -53,6 +53,11 @@ def allTests(helper, communicator):
     OnewaysAMI.onewaysAMI(helper, cl)
     print("ok")
 
+    sys.stdout.write("testing encoded arguments... ")
+    sys.stdout.flush()
+    EncodedArgs.encodedArgs(helper, cl)
+    print("ok")
+
     sys.stdout.write("testing batch oneway operations...  ")
     sys.stdout.flush()
     BatchOneways.batchOneways(cl)
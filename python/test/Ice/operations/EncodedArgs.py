@@ -0,0 +1,139 @@
+# **********************************************************************
+#
+# Copyright (c) 2003-2018 ZeroC, Inc. All rights reserved.
+#
+# This copy of Ice is licensed to you under the terms described in the
+# ICE_LICENSE file included in this distribution.
+#
+# **********************************************************************
+
+import Ice, Test, time
+
+def test(b):
+    if not b:
+        raise RuntimeError('test assertion failed')
+
+def encodedArgs(helper, p):
+    p10 = Test.MyClassPrx.uncheckedCast(p.ice_encodingVersion(Ice.Encoding_1_0))
+
+    #
+    # Invoke the same encoded arguments on several proxies.
+    #
+    e = Test.MyClassPrx.opByte.encode(0xff, 0x0f)
+    test(isinstance(e, Ice.EncodedArgs))
+    test(e.getOperation() == "opByte")
+    for prx in [p, p10, p, p10]:
+        r, b = e.invoke(prx)
+        test(b == 0xf0)
+        test(r == 0xff)
+        r, b = e.invokeAsync(prx).result()
+        test(b == 0xf0)
+        test(r == 0xff)
+
+    #
+    # The encode function is also available through the proxy methods.
+    #
+    r, b = p.opByte.encode(0x01, 0x03).invoke(p)
+    test(b == 0x02)
+    test(r == 0x01)
+
+    #
+    # Operations without parameters.
+    #
+    e = Test.MyClassPrx.opVoid.encode()
+    e.invoke(p)
+    e.invoke(p10)
+    test(e.invokeAsync(p).result() is None)
+
+    #
+    # Structs with proxies, and classes which are marshaled differently by each encoding.
+    #
+    si1 = Test.Structure()
+    si1.p = p
+    si1.e = Test.MyEnum.enum3
+    si1.s = Test.AnotherStruct()
+    si1.s.s = "abc"
+    si2 = Test.Structure()
+    si2.p = None
+    si2.e = Test.MyEnum.enum2
+    si2.s = Test.AnotherStruct()
+    si2.s.s = "def"
+    e = Test.MyClassPrx.opStruct.encode(si1, si2)
+    for prx in [p, p10]:
+        rso, so = e.invoke(prx)
+        test(rso.e == Test.MyEnum.enum2)
+        test(rso.s.s == "def")
+        test(so.p.ice_getIdentity() == p.ice_getIdentity()) # The 1.0 encoding doesn't marshal the proxy encoding.
+        test(so.e == Test.MyEnum.enum3)
+
+    d = Test.MyDerivedClassPrx.uncheckedCast(p)
+    c = Test.MyClass1()
+    c.tesT = "Test.MyClass1.testT"
+    c.myClass = None
+    c.myClass1 = "Test.MyClass1.myClass1"
+    e = Test.MyDerivedClassPrx.opMyClass1.encode(c)
+    for prx in [d, Test.MyDerivedClassPrx.uncheckedCast(p10), d]:
+        r = e.invoke(prx)
+        test(r.tesT == "Test.MyClass1.testT")
+        test(r.myClass1 == "Test.MyClass1.myClass1")
+
+    #
+    # Contexts.
+    #
+    ctx = {'one': 'ONE', 'two': 'TWO', 'three': 'THREE'}
+    e = Test.MyClassPrx.opContext.encode()
+    test(e.invoke(p) != ctx)
+    test(e.invoke(p, ctx) == ctx)
+    test(e.invoke(p, context=ctx) == ctx)
+    test(e.invokeAsync(p, ctx).result() == ctx)
+    test(e.invoke(p.ice_context(ctx)) == ctx)
+    try:
+        e.invoke(p, "context")
+        test(False)
+    except ValueError:
+        pass
+
+    #
+    # Oneway and batch oneway invocations.
+    #
+    bs1 = bytes(b'\x01' * 100)
+    e = Test.MyClassPrx.opByteSOneway.encode(bs1)
+    p.opByteSOnewayCallCount() # Reset the call count
+    e.invoke(p.ice_oneway())
+    e.invokeAsync(p.ice_oneway()).result()
+    batch = p.ice_batchOneway()
+    for i in range(0, 3):
+        e.invoke(batch)
+    batch.ice_flushBatchRequests()
+    count = 0
+    while count < 5:
+        count += p.opByteSOnewayCallCount()
+        time.sleep(0.01)
+    test(count == 5)
+
+    try:
+        Test.MyClassPrx.opByte.encode(0xff, 0x0f).invoke(p.ice_oneway())
+        test(False)
+    except Ice.TwowayOnlyException:
+        pass
+
+    #
+    # Invalid arguments are reported by encode.
+    #
+    try:
+        Test.MyClassPrx.opByte.encode(0x01ff, 0x01ff)
+        test(False)
+    except ValueError:
+        pass
+
+    try:
+        e.invoke(None)
+        test(False)
+    except TypeError:
+        pass
+
+    try:
+        Ice.EncodedArgs()
+        test(False)
+    except TypeError:
+        pass
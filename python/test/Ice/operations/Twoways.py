@@ -429,6 +429,13 @@ def twoways(helper, p):
     test(rso[1])
     test(rso[2])
 
+    #
+    # opBoolS (buffer with values other than 0 and 1)
+    #
+    rso, bso = p.opBoolS(bytearray([2, 255, 0]), array.array('b', [-1]))
+    test(list(bso) == [True, True, False, True])
+    test(list(rso) == [False, True, True])
+
     #
     # opShortIntLongS
     #
@@ -489,6 +496,26 @@ def twoways(helper, p):
     test(rso[1] == 30)
     test(rso[2] == 20)
 
+    if sys.version_info[0] >= 3:
+        #
+        # opShortIntLongS (buffer)
+        #
+        ssi = memoryview(array.array('h', [1, 2, 3]))
+        isi = array.array('b', [5, 6, 7, 8]) # Item format doesn't match, sent element by element.
+        lsi = array.array('q', [10, 30, 20])
+
+        rso, sso, iso, lso = p.opShortIntLongS(ssi, isi, lsi)
+        test(sso == [1, 2, 3])
+        test(iso == [8, 7, 6, 5])
+        test(lso == [10, 30, 20, 10, 30, 20])
+        test(rso == [10, 30, 20])
+
+        try:
+            p.opShortIntLongS(ssi, array.array('q', [2**40]), lsi)
+            test(False)
+        except ValueError:
+            pass
+
     #
     # opFloatDoubleS
     #
@@ -7,7 +7,7 @@
 #
 # **********************************************************************
 
-import Ice, Test, sys, threading
+import Ice, Test, sys, threading, time
 
 def test(b):
     if not b:
@@ -655,6 +655,94 @@ def allTests(helper, communicator, collocated):
     test(c == c2)
     print("ok")
 
+    if not collocated:
+        sys.stdout.write("testing checked cast cache... ")
+        sys.stdout.flush()
+
+        for args in [(0,), (-1,), (16, 0), (16, -1.0), (16, "1")]:
+            try:
+                Ice.CheckedCastCache(*args)
+                test(False)
+            except ValueError:
+                pass
+
+        initData = Ice.InitializationData()
+        initData.properties = communicator.getProperties().clone()
+        initData.checkedCastCache = Ice.CheckedCastCache(16, 0.5)
+        with Ice.initialize(initData) as ic:
+            cache = initData.checkedCastCache
+            base2 = ic.stringToProxy(ref)
+
+            m = cache.getMetrics()
+            test(m.hits == 0 and m.misses == 0 and m.size == 0)
+
+            test(Test.MyClassPrx.checkedCast(base2))
+            m = cache.getMetrics()
+            test(m.hits == 0 and m.misses == 1 and m.size == 1)
+
+            #
+            # The other proxy settings don't change the target of the cast.
+            #
+            for prx in [base2, base2.ice_oneway(), base2.ice_context({"one": "hello"}), ic.stringToProxy(ref)]:
+                cl2 = Test.MyClassPrx.checkedCast(prx)
+                test(cl2 and cl2.ice_getIdentity() == base2.ice_getIdentity())
+            m = cache.getMetrics()
+            test(m.hits == 4 and m.misses == 1 and m.size == 1)
+
+            #
+            # Each type id and facet has its own entry, the failed casts aren't cached.
+            #
+            test(Ice.ObjectPrx.checkedCast(base2))
+            test(Ice.ObjectPrx.checkedCast(base2))
+            test(Ice.LocatorPrx.checkedCast(base2) == None)
+            test(Ice.LocatorPrx.checkedCast(base2) == None)
+            test(Test.MyClassPrx.checkedCast(base2, "facet") == None)
+            m = cache.getMetrics()
+            test(m.hits == 5 and m.misses == 5 and m.size == 2)
+
+            #
+            # A cast with an explicit context always sends an ice_isA request.
+            #
+            test(Test.MyClassPrx.checkedCast(base2, {"one": "hello"}))
+            m = cache.getMetrics()
+            test(m.hits == 5 and m.misses == 5 and m.size == 2)
+
+            cache.invalidate(base2.ice_facet("facet"))
+            test(cache.getMetrics().size == 2)
+            cache.invalidate(base2.ice_oneway())
+            test(cache.getMetrics().size == 0)
+            test(Test.MyClassPrx.checkedCast(base2))
+            test(Ice.ObjectPrx.checkedCast(base2))
+            test(cache.getMetrics().size == 2)
+            cache.invalidate()
+            test(cache.getMetrics().size == 0)
+            try:
+                cache.invalidate(ic)
+                test(False)
+            except ValueError:
+                pass
+
+            #
+            # The entries expire after the time-to-live of the cache.
+            #
+            test(Test.MyClassPrx.checkedCast(base2))
+            test(Test.MyClassPrx.checkedCast(base2))
+            m = cache.getMetrics()
+            test(m.hits == 6 and m.misses == 8 and m.size == 1)
+            time.sleep(0.6)
+            test(Test.MyClassPrx.checkedCast(base2))
+            m = cache.getMetrics()
+            test(m.hits == 6 and m.misses == 9 and m.size == 1)
+
+        initData = Ice.InitializationData()
+        initData.checkedCastCache = "bogus"
+        try:
+            Ice.initialize(initData)
+            test(False)
+        except Ice.InitializationException:
+            pass
+        print("ok")
+
     sys.stdout.write("testing ice_fixed... ")
     sys.stdout.flush()
     connection = cl.ice_getConnection()
@@ -0,0 +1,79 @@
+# **********************************************************************
+#
+# Copyright (c) 2003-2018 ZeroC, Inc. All rights reserved.
+#
+# This copy of Ice is licensed to you under the terms described in the
+# ICE_LICENSE file included in this distribution.
+#
+# **********************************************************************
+
+import os, sys, time, Ice, Test
+
+def test(b):
+    if not b:
+        raise RuntimeError('test assertion failed')
+
+def allTests(helper, communicator, pools):
+    base = communicator.stringToProxy("test:{0}".format(helper.getTestEndpoint()))
+
+    def counter(identity):
+        return Test.CounterPrx.uncheckedCast(base.ice_identity(Ice.stringToIdentity(identity)))
+
+    sys.stdout.write("testing dispatch by worker processes... ")
+    sys.stdout.flush()
+    test(pools[""].getSize() == 2)
+    pids = pools[""].getWorkerPids()
+    test(len(pids) == 2 and os.getpid() not in pids)
+    used = set()
+    for i in range(0, 20):
+        c = counter("counter{0}".format(i))
+        pid = c.getPid()
+        test(pid in pids)
+        used.add(pid)
+        for j in range(1, 4):
+            test(c.increment() == j)
+            test(c.getPid() == pid)
+    test(len(used) == 2)
+    print("ok")
+
+    sys.stdout.write("testing routing by category... ")
+    sys.stdout.flush()
+    for category in ["a", "b"]:
+        pid = counter(category + "/counter0").getPid()
+        test(pid in pools["a"].getWorkerPids())
+        for i in range(1, 10):
+            test(counter("{0}/counter{1}".format(category, i)).getPid() == pid)
+    print("ok")
+
+    sys.stdout.write("testing exceptions and contexts... ")
+    sys.stdout.flush()
+    c = counter("counter0")
+    try:
+        c.fail("reason")
+        test(False)
+    except Test.TestFailure as ex:
+        test(ex.reason == "reason")
+    ctx = {"one": "ONE", "two": "TWO"}
+    test(c.getContext(ctx) == ctx)
+    test(c.getContextAsync(ctx).result() == ctx)
+    print("ok")
+
+    sys.stdout.write("testing worker restart... ")
+    sys.stdout.flush()
+    pid = c.getPid()
+    try:
+        c.crash()
+        test(False)
+    except Ice.UnknownLocalException:
+        pass
+
+    for i in range(0, 200):
+        if pools[""].getRestartCount() == 1:
+            break
+        time.sleep(0.1)
+    test(pools[""].getRestartCount() == 1)
+    pids = pools[""].getWorkerPids()
+    test(pid not in pids and len(pids) == 2)
+    test(c.getPid() in pids)
+    test(c.increment() == 1) # The state of the crashed worker is lost.
+    print("ok")
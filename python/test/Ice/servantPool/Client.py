@@ -0,0 +1,47 @@
+#!/usr/bin/env python
+# **********************************************************************
+#
+# Copyright (c) 2003-2018 ZeroC, Inc. All rights reserved.
+#
+# This copy of Ice is licensed to you under the terms described in the
+# ICE_LICENSE file included in this distribution.
+#
+# **********************************************************************
+
+import sys
+from TestHelper import TestHelper
+TestHelper.loadSlice("Test.ice")
+import Ice
+import TestI
+import AllTests
+
+
+class Client(TestHelper):
+
+    def run(self, args):
+        if sys.version_info < (3, 4):
+            print("servant pools are not supported by this Python version")
+            return
+
+        with self.initialize(args=args) as communicator:
+            communicator.getProperties().setProperty("TestAdapter.Endpoints", self.getTestEndpoint())
+            communicator.getProperties().setProperty("Ice.Warn.Dispatch", "0")
+
+            adapter = communicator.createObjectAdapter("TestAdapter")
+            pools = {}
+            try:
+                pools[""] = Ice.ServantPool(adapter, TestI.createServants, 2)
+                pools["a"] = Ice.ServantPool(adapter, TestI.createServants, 2, Ice.ServantPool.RouteByCategory)
+                adapter.addDefaultServant(pools[""], "")
+                adapter.addDefaultServant(pools["a"], "a")
+                adapter.addDefaultServant(pools["a"], "b")
+                adapter.activate()
+
+                #
+                # Use another communicator for the client to avoid collocated invocations.
+                #
+                with self.initialize(properties=self.createTestProperties(args)) as clientCommunicator:
+                    AllTests.allTests(self, clientCommunicator, pools)
+            finally:
+                for pool in pools.values():
+                    pool.destroy()
@@ -0,0 +1,44 @@
+# **********************************************************************
+#
+# Copyright (c) 2003-2018 ZeroC, Inc. All rights reserved.
+#
+# This copy of Ice is licensed to you under the terms described in the
+# ICE_LICENSE file included in this distribution.
+#
+# **********************************************************************
+
+#
+# This module is also imported by the worker processes of the servant pools, which
+# need the generated code for the servants.
+#
+from TestHelper import TestHelper
+TestHelper.loadSlice("Test.ice")
+import os, threading, Ice, Test
+
+class CounterI(Test.Counter):
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+
+    def increment(self, current=None):
+        with self._lock:
+            key = Ice.identityToString(current.id)
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+    def getPid(self, current=None):
+        return os.getpid()
+
+    def getContext(self, current=None):
+        return current.ctx
+
+    def fail(self, reason, current=None):
+        raise Test.TestFailure(reason)
+
+    def crash(self, current=None):
+        os._exit(1)
+
+def createServants(adapter):
+    servant = CounterI()
+    for category in ["", "a", "b"]:
+        adapter.addDefaultServant(servant, category)
@@ -0,0 +1,459 @@
+#!/usr/bin/env python
+# **********************************************************************
+#
+# Copyright (c) 2003-2018 ZeroC, Inc. All rights reserved.
+#
+# This copy of Ice is licensed to you under the terms described in the
+# ICE_LICENSE file included in this distribution.
+#
+# **********************************************************************
+
+import array
+import sys
+from TestHelper import TestHelper
+TestHelper.loadSlice("Test.ice")
+import Ice, IcePy, Test
+
+
+def test(b):
+    if not b:
+        raise RuntimeError('test assertion failed')
+
+
+def roundTrip(communicator, type, value):
+    out = Ice.OutputStream(communicator)
+    out.writeValue(type, value)
+    ins = Ice.InputStream(communicator, out.finished())
+    return ins.readValue(type)
+
+
+def roundTripValue(communicator, type, value):
+    out = Ice.OutputStream(communicator)
+    out.writeValue(type, value)
+    out.writePendingValues()
+    ins = Ice.InputStream(communicator, out.finished())
+    received = []
+    v = ins.readValue(type, cb=received.append)
+    ins.readPendingValues()
+    test(len(received) == 1)
+    test(v is received[0] or (v is None and ins.getEncoding() == Ice.Encoding_1_0))
+    return received[0]
+
+
+def createMyClass(i):
+    c = Test.MyClass()
+    c.c = c
+    c.o = c
+    c.s = Test.SmallStruct()
+    c.s.e = Test.MyEnum.enum2
+    c.seq1 = [True, False, True, False]
+    c.seq2 = b"\x01\x02\x03\x04"
+    c.seq3 = [1, 2, 3, 4]
+    c.seq4 = [1, 2, 3, 4]
+    c.seq5 = [1, 2, 3, 4]
+    c.seq6 = [1.0, 2.0, 3.0, 4.0]
+    c.seq7 = [1.0, 2.0, 3.0, 4.0]
+    c.seq8 = ["string1", "string2", "string3", "string4"]
+    c.seq9 = [Test.MyEnum.enum3, Test.MyEnum.enum2, Test.MyEnum.enum1]
+    c.seq10 = [None, c]
+    c.d = {"hi": c}
+    c.s.i = i
+    return c
+
+
+def checkMyClass(c, i):
+    test(c.c is c)
+    test(c.o is c)
+    test(c.s.e == Test.MyEnum.enum2 and c.s.i == i)
+    test(list(c.seq1) == [True, False, True, False])
+    test(c.seq2 == b"\x01\x02\x03\x04")
+    test(list(c.seq3) == [1, 2, 3, 4])
+    test(list(c.seq4) == [1, 2, 3, 4])
+    test(list(c.seq5) == [1, 2, 3, 4])
+    test(list(c.seq6) == [1.0, 2.0, 3.0, 4.0])
+    test(list(c.seq7) == [1.0, 2.0, 3.0, 4.0])
+    test(list(c.seq8) == ["string1", "string2", "string3", "string4"])
+    test(list(c.seq9) == [Test.MyEnum.enum3, Test.MyEnum.enum2, Test.MyEnum.enum1])
+    test(c.seq10[0] is None and c.seq10[1] is c)
+    test(c.d["hi"] is c)
+
+
+def allTests(helper, communicator):
+    encoding10 = communicator.getProperties().getProperty("Ice.Default.EncodingVersion") == "1.0"
+
+    sys.stdout.write("testing primitive types... ")
+    sys.stdout.flush()
+
+    try:
+        Ice.InputStream(communicator, b"").readValue(IcePy._t_bool)
+        test(False)
+    except Ice.UnmarshalOutOfBoundsException:
+        pass
+
+    out = Ice.OutputStream(communicator)
+    out.startEncapsulation()
+    out.writeValue(IcePy._t_bool, True)
+    out.endEncapsulation()
+    data = bytes(out.finished())
+    for i in range(0, 2):
+        ins = Ice.InputStream(communicator, data)
+        test(ins.startEncapsulation() == out.getEncoding())
+        test(ins.readValue(IcePy._t_bool) is True)
+        ins.endEncapsulation()
+
+    test(roundTrip(communicator, IcePy._t_bool, True) is True)
+    test(roundTrip(communicator, IcePy._t_byte, 1) == 1)
+    test(roundTrip(communicator, IcePy._t_short, 2) == 2)
+    test(roundTrip(communicator, IcePy._t_int, 3) == 3)
+    test(roundTrip(communicator, IcePy._t_long, 4) == 4)
+    test(roundTrip(communicator, IcePy._t_float, 5.0) == 5.0)
+    test(roundTrip(communicator, IcePy._t_double, 6.0) == 6.0)
+    test(roundTrip(communicator, IcePy._t_string, "hello world") == "hello world")
+
+    out = Ice.OutputStream(communicator)
+    for size in [0, 254, 255, 100000]:
+        out.writeSize(size)
+    ins = Ice.InputStream(communicator, out.finished())
+    test([ins.readSize() for i in range(0, 4)] == [0, 254, 255, 100000])
+
+    out = Ice.OutputStream(communicator)
+    try:
+        out.writeValue(IcePy._t_int, "hello")
+        test(False)
+    except ValueError:
+        pass
+
+    try:
+        out.writeSize(-1)
+        test(False)
+    except ValueError:
+        pass
+
+    try:
+        out.writeValue(3, 3)
+        test(False)
+    except TypeError:
+        pass
+    print("ok")
+
+    sys.stdout.write("testing constructed types... ")
+    sys.stdout.flush()
+
+    test(roundTrip(communicator, Test._t_MyEnum, Test.MyEnum.enum3) == Test.MyEnum.enum3)
+
+    s = Test.SmallStruct()
+    s.bo = True
+    s.by = 1
+    s.sh = 2
+    s.i = 3
+    s.l = 4
+    s.f = 5.0
+    s.d = 6.0
+    s.str = "7"
+    s.e = Test.MyEnum.enum2
+    s.p = Test.MyInterfacePrx.uncheckedCast(communicator.stringToProxy("test:default"))
+    test(roundTrip(communicator, Test._t_SmallStruct, s) == s)
+
+    o = Test.OptionalClass()
+    o.bo = True
+    o.by = 5
+    o.sh = 4
+    o.i = 3
+    o2 = roundTripValue(communicator, Test._t_OptionalClass, o)
+    test(o2.bo == o.bo)
+    test(o2.by == o.by)
+    if encoding10:
+        test(o2.sh is Ice.Unset)
+        test(o2.i is Ice.Unset)
+    else:
+        test(o2.sh == o.sh)
+        test(o2.i == o.i)
+
+    #
+    # The stream's encoding doesn't depend on the communicator's default encoding.
+    #
+    out = Ice.OutputStream(communicator, Ice.Encoding_1_0)
+    test(out.getEncoding() == Ice.Encoding_1_0)
+    out.writeValue(Test._t_OptionalClass, o)
+    out.writePendingValues()
+    ins = Ice.InputStream(communicator, out.finished(), Ice.Encoding_1_0)
+    received = []
+    test(ins.readValue(Test._t_OptionalClass, cb=received.append) is None)
+    test(not received)
+    ins.readPendingValues()
+    test(received[0].by == o.by and received[0].sh is Ice.Unset)
+    print("ok")
+
+    sys.stdout.write("testing sequences... ")
+    sys.stdout.flush()
+
+    test(list(roundTrip(communicator, Ice._t_BoolSeq, [True, False, True, False])) == [True, False, True, False])
+
+    #
+    # The bytes of a buffer are converted to valid bool values.
+    #
+    if sys.version_info[0] >= 3:
+        for v in [bytearray([2, 0, 255, 1]), array.array('b', [-1, 0, 2, 1]), array.array('B', [0, 1, 0, 1])]:
+            out = Ice.OutputStream(communicator)
+            out.writeValue(Ice._t_BoolSeq, v)
+            test(bytes(out.finished()) == b"\x04" + bytes([1 if b else 0 for b in v]))
+    test(roundTrip(communicator, Ice._t_ByteSeq, b"\x00\x01\x11\x12\x22") == b"\x00\x01\x11\x12\x22")
+    test(list(roundTrip(communicator, Ice._t_ShortSeq, [0, 1, 11, 12, 22])) == [0, 1, 11, 12, 22])
+    test(list(roundTrip(communicator, Ice._t_IntSeq, [0, 1, 11, 12, 22])) == [0, 1, 11, 12, 22])
+    test(list(roundTrip(communicator, Ice._t_LongSeq, [0, 1, 11, 12, 22])) == [0, 1, 11, 12, 22])
+    test(list(roundTrip(communicator, Ice._t_FloatSeq, [1.0, 2.0, 3.0])) == [1.0, 2.0, 3.0])
+    test(list(roundTrip(communicator, Ice._t_DoubleSeq, [1.0, 2.0, 3.0])) == [1.0, 2.0, 3.0])
+    test(list(roundTrip(communicator, Ice._t_StringSeq, ["string1", "", "string3"])) == ["string1", "", "string3"])
+    test(len(roundTrip(communicator, Ice._t_IntSeq, [])) == 0)
+
+    enums = [Test.MyEnum.enum3, Test.MyEnum.enum2, Test.MyEnum.enum1, Test.MyEnum.enum2]
+    test(list(roundTrip(communicator, Test._t_MyEnumS, enums)) == enums)
+    test([list(e) for e in roundTrip(communicator, Test._t_MyEnumSS, [enums, [], enums])] == [enums, [], enums])
+
+    structs = [Test.SmallStruct(), s, Test.SmallStruct(by=7)]
+    test(list(roundTrip(communicator, Test._t_SmallStructS, structs)) == structs)
+    test([list(e) for e in roundTrip(communicator, Test._t_SmallStructSS, [structs, []])] == [structs, []])
+
+    test([list(e) for e in roundTrip(communicator, Test._t_BoolSS, [[True], [], [False, True]])] ==
+         [[True], [], [False, True]])
+    test(list(roundTrip(communicator, Test._t_ByteSS, [b"\x01", b"", b"\x02\x03"])) == [b"\x01", b"", b"\x02\x03"])
+    test([list(e) for e in roundTrip(communicator, Test._t_ShortSS, [[1], [], [2, 3]])] == [[1], [], [2, 3]])
+    test([list(e) for e in roundTrip(communicator, Test._t_IntSS, [[1], [], [2, 3]])] == [[1], [], [2, 3]])
+    test([list(e) for e in roundTrip(communicator, Test._t_LongSS, [[1], [], [2, 3]])] == [[1], [], [2, 3]])
+    test([list(e) for e in roundTrip(communicator, Test._t_FloatSS, [[1.0], [], [2.0]])] == [[1.0], [], [2.0]])
+    test([list(e) for e in roundTrip(communicator, Test._t_DoubleSS, [[1.0], [], [2.0]])] == [[1.0], [], [2.0]])
+    test([list(e) for e in roundTrip(communicator, Test._t_StringSS, [["a"], [], ["b", "c"]])] ==
+         [["a"], [], ["b", "c"]])
+
+    classes = roundTripValue(communicator, Test._t_MyClassS, [createMyClass(i) for i in range(0, 4)])
+    test(len(classes) == 4)
+    for i in range(0, 4):
+        checkMyClass(classes[i], i)
+
+    classes = roundTripValue(communicator, Test._t_MyClassSS, [[createMyClass(0)], [], [createMyClass(1)]])
+    test(len(classes) == 3 and len(classes[1]) == 0)
+    checkMyClass(classes[0][0], 0)
+    checkMyClass(classes[2][0], 1)
+    print("ok")
+
+    sys.stdout.write("testing dictionaries... ")
+    sys.stdout.flush()
+
+    for type, d in [(Test._t_ByteBoolD, {4: True, 1: False}),
+                    (Test._t_ShortIntD, {1: 9, 4: 8}),
+                    (Test._t_LongFloatD, {123809828: 0.5, 123809829: 0.25}),
+                    (Test._t_StringStringD, {"key1": "value1", "key2": "value2"})]:
+        test(roundTrip(communicator, type, d) == d)
+
+    d = roundTripValue(communicator, Test._t_StringMyClassD, {"key1": createMyClass(1), "key2": createMyClass(2)})
+    test(len(d) == 2)
+    checkMyClass(d["key1"], 1)
+    checkMyClass(d["key2"], 2)
+    print("ok")
+
+    sys.stdout.write("testing classes... ")
+    sys.stdout.flush()
+
+    c = roundTripValue(communicator, Test._t_MyClass, createMyClass(5))
+    checkMyClass(c, 5)
+
+    test(roundTripValue(communicator, Test._t_MyClass, None) is None)
+
+    #
+    # The instances written before writePendingValues are shared, with any encoding.
+    #
+    c = createMyClass(6)
+    out = Ice.OutputStream(communicator)
+    out.writeValue(Test._t_MyClass, c)
+    out.writeValue(Test._t_MyClass, c)
+    out.writePendingValues()
+    ins = Ice.InputStream(communicator, out.finished())
+    received = []
+    ins.readValue(Test._t_MyClass, cb=received.append)
+    ins.readValue(Test._t_MyClass, cb=received.append)
+    ins.readPendingValues()
+    test(len(received) == 2 and received[0] is received[1])
+    checkMyClass(received[0], 6)
+
+    try:
+        Ice.InputStream(communicator, b"").readValue(Test._t_MyClass, cb=3)
+        test(False)
+    except TypeError:
+        pass
+    print("ok")
+
+    sys.stdout.write("testing exceptions... ")
+    sys.stdout.flush()
+
+    ex = Test.MyException(createMyClass(7))
+    out = Ice.OutputStream(communicator)
+    out.writeException(ex)
+    ins = Ice.InputStream(communicator, out.finished())
+    try:
+        ins.throwException()
+        test(False)
+    except Test.MyException as e:
+        checkMyClass(e.c, 7)
+
+    out = Ice.OutputStream(communicator)
+    out.startEncapsulation()
+    out.writeException(Test.Sub.NestedException("nested"))
+    out.endEncapsulation()
+    ins = Ice.InputStream(communicator, out.finished())
+    ins.startEncapsulation()
+    try:
+        ins.throwException()
+        test(False)
+    except Test.Sub.NestedException as e:
+        test(e.str == "nested")
+    ins.endEncapsulation()
+
+    try:
+        out.writeException(Ice.ObjectNotExistException())
+        test(False)
+    except TypeError:
+        pass
+    print("ok")
+
+    sys.stdout.write("testing encapsulations and tagged values... ")
+    sys.stdout.flush()
+
+    out = Ice.OutputStream(communicator)
+    out.startEncapsulation()
+    out.writeValue(IcePy._t_int, 1, 1)
+    out.writeValue(IcePy._t_string, Ice.Unset, 2)
+    out.writeValue(Test._t_SmallStruct, s, tag=3)
+    out.endEncapsulation()
+    out.startEncapsulation(Ice.Encoding_1_0)
+    out.writeValue(IcePy._t_int, 2, tag=1)
+    out.writeValue(IcePy._t_int, 3)
+    out.endEncapsulation()
+
+    ins = Ice.InputStream(communicator, out.finished())
+    test(ins.startEncapsulation() == out.getEncoding())
+    if encoding10:
+        test(ins.readValue(IcePy._t_int, 1) is Ice.Unset)
+        test(ins.readValue(Test._t_SmallStruct, 3) is Ice.Unset)
+    else:
+        test(ins.readValue(IcePy._t_int, 1) == 1)
+        test(ins.readValue(IcePy._t_string, 2) is Ice.Unset)
+        test(ins.readValue(Test._t_SmallStruct, tag=3) == s)
+    ins.endEncapsulation()
+    test(ins.startEncapsulation() == Ice.Encoding_1_0)
+    test(ins.readValue(IcePy._t_int, 1) is Ice.Unset)
+    test(ins.readValue(IcePy._t_int) == 3)
+    ins.endEncapsulation()
+
+    ins = Ice.InputStream(communicator, out.finished())
+    test(ins.skipEncapsulation() == out.getEncoding())
+    test(ins.startEncapsulation() == Ice.Encoding_1_0)
+    test(ins.readValue(IcePy._t_int) == 3)
+    ins.endEncapsulation()
+
+    out = Ice.OutputStream(communicator)
+    out.startEncapsulation(format=Ice.FormatType.SlicedFormat)
+    out.writeValue(Test._t_MyClass, createMyClass(8))
+    out.writePendingValues()
+    out.endEncapsulation()
+    ins = Ice.InputStream(communicator, out.finished())
+    ins.startEncapsulation()
+    received = []
+    ins.readValue(Test._t_MyClass, cb=received.append)
+    ins.readPendingValues()
+    ins.endEncapsulation()
+    checkMyClass(received[0], 8)
+
+    out = Ice.OutputStream(communicator)
+    for f in [lambda: out.endEncapsulation(), lambda: out.writeValue(IcePy._t_int, 1, 1)]:
+        try:
+            f()
+            test(False)
+        except RuntimeError:
+            pass
+
+    ins = Ice.InputStream(communicator, b"\x00")
+    for f in [lambda: ins.endEncapsulation(), lambda: ins.readValue(IcePy._t_int, 1)]:
+        try:
+            f()
+            test(False)
+        except RuntimeError:
+            pass
+
+    try:
+        out.startEncapsulation(format=1)
+        test(False)
+    except TypeError:
+        pass
+
+    try:
+        Ice.InputStream(communicator, b"\x00\x00\x00\x00").startEncapsulation()
+        test(False)
+    except Ice.UnmarshalOutOfBoundsException:
+        pass
+    print("ok")
+
+    sys.stdout.write("testing buffers... ")
+    sys.stdout.flush()
+
+    out = Ice.OutputStream(communicator)
+    out.writeValue(Ice._t_StringSeq, ["string1", "string2"])
+    data = out.finished()
+    encoded = bytes(data)
+    for d in [data, encoded, bytearray(encoded), memoryview(bytearray(encoded))]:
+        ins = Ice.InputStream(communicator, d)
+        test(list(ins.readValue(Ice._t_StringSeq)) == ["string1", "string2"])
+
+    if sys.version_info[0] >= 3:
+        test(isinstance(data, memoryview) and data.readonly)
+        try:
+            out.writeValue(IcePy._t_int, 1)
+            test(False)
+        except BufferError:
+            pass
+        data.release()
+        ins = None
+        out.writeValue(IcePy._t_int, 1)
+        with out.finished() as data:
+            test(bytes(data) == encoded + b"\x01\x00\x00\x00")
+        test(len(memoryview(Ice.OutputStream(communicator))) == 0)
+
+    #
+    # The input stream reads the data in place.
+    #
+    buf = bytearray(encoded)
+    ins = Ice.InputStream(communicator, buf)
+    try:
+        buf.extend(b"\x00")
+        test(False)
+    except BufferError:
+        pass
+    buf[2] = ord("S")
+    test(list(ins.readValue(Ice._t_StringSeq)) == ["String1", "string2"])
+    ins = None
+    buf.extend(b"\x00")
+
+    try:
+        Ice.InputStream(communicator, 3)
+        test(False)
+    except TypeError:
+        pass
+
+    try:
+        Ice.OutputStream(None)
+        test(False)
+    except TypeError:
+        pass
+
+    try:
+        Ice.OutputStream(communicator, "1.0")
+        test(False)
+    except TypeError:
+        pass
+    print("ok")
+
+
+class Client(TestHelper):
+
+    def run(self, args):
+        with self.initialize(args=args) as communicator:
+            allTests(self, communicator)
@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+# **********************************************************************
+#
+# Copyright (c) 2003-2018 ZeroC, Inc. All rights reserved.
+#
+# This copy of Ice is licensed to you under the terms described in the
+# ICE_LICENSE file included in this distribution.
+#
+# **********************************************************************
+
+from TestHelper import TestHelper
+import os
+import shutil
+import sys
+import tempfile
+import Ice
+
+
+def test(b):
+    if not b:
+        raise RuntimeError('test assertion failed')
+
+
+def writeFile(path, data):
+    with open(path, "w") as f:
+        f.write(data)
+
+
+class Client(TestHelper):
+
+    def run(self, args):
+        sys.stdout.write("testing Slice cache... ")
+        sys.stdout.flush()
+
+        tmpDir = tempfile.mkdtemp()
+        try:
+            cacheDir = os.path.join(tmpDir, "cache")
+            writeFile(os.path.join(tmpDir, "Dep.ice"), "module CacheTest { const int Number = 1; }\n")
+            writeFile(os.path.join(tmpDir, "Test.ice"),
+                      "#include <Dep.ice>\nmodule CacheTest { const int Copy = Number; }\n")
+            options = "--all --cache-dir '{0}' '-I{1}' '{2}'".format(cacheDir, tmpDir,
+                                                                      os.path.join(tmpDir, "Test.ice"))
+
+            #
+            # The first load creates the cache directory and a single entry for Test.ice.
+            #
+            Ice.loadSlice(options)
+            import CacheTest
+            test(CacheTest.Copy == 1)
+            entries = os.listdir(cacheDir)
+            test(len(entries) == 1)
+            entry = os.path.join(cacheDir, entries[0])
+            st = os.stat(entry)
+
+            #
+            # The second load uses the cached entry, which isn't rewritten.
+            #
+            CacheTest.Copy = 0
+            Ice.loadSlice(options)
+            test(CacheTest.Copy == 1)
+            test(os.listdir(cacheDir) == entries)
+            test(os.stat(entry).st_ino == st.st_ino and os.stat(entry).st_mtime == st.st_mtime)
+
+            #
+            # Changing an included file invalidates the entry.
+            #
+            writeFile(os.path.join(tmpDir, "Dep.ice"), "module CacheTest { const int Number = 2; }\n")
+            Ice.loadSlice(options)
+            test(CacheTest.Copy == 2)
+            test(os.listdir(cacheDir) == entries)
+
+            #
+            # Different options use a different entry.
+            #
+            Ice.loadSlice("-DFOO " + options)
+            test(CacheTest.Copy == 2)
+            test(len(os.listdir(cacheDir)) == 2)
+
+            #
+            # A corrupted entry is ignored and replaced.
+            #
+            writeFile(entry, "corrupted")
+            Ice.loadSlice(options)
+            test(CacheTest.Copy == 2)
+            with open(entry, "rb") as f:
+                test(f.read() != b"corrupted")
+
+            #
+            # Without a cache directory the cache isn't used.
+            #
+            writeFile(os.path.join(tmpDir, "Dep.ice"), "module CacheTest { const int Number = 3; }\n")
+            Ice.loadSlice("--all '-I{0}' '{1}'".format(tmpDir, os.path.join(tmpDir, "Test.ice")))
+            test(CacheTest.Copy == 3)
+            test(len(os.listdir(cacheDir)) == 2)
+        finally:
+            shutil.rmtree(tmpDir)
+
+        print("ok")
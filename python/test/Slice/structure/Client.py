@@ -12,6 +12,7 @@ from TestHelper import TestHelper
 TestHelper.loadSlice('Test.ice')
 import sys
 import copy
+import IcePy
 import Test
 
 
@@ -181,6 +182,68 @@ def allTests(communicator):
 
     print("ok")
 
+    sys.stdout.write("testing hash and ordering for Slice structures... ")
+    sys.stdout.flush()
+
+    test(Test.S1("a") < Test.S1("b") and Test.S1("a") <= Test.S1("a"))
+    test(Test.S1("b") > Test.S1("a") and Test.S1("b") >= Test.S1("b"))
+    test(Test.S1(None) < Test.S1("a") and Test.S1("a") > Test.S1(None))
+    test(Test.S1("a") != None and not Test.S1("a") == None)
+    test(Test.S1("a").__lt__(1) is NotImplemented)
+    test(sorted([Test.S1("c"), Test.S1("a"), Test.S1("b")]) == [Test.S1("a"), Test.S1("b"), Test.S1("c")])
+
+    v1 = copy.copy(def_s2)
+    v1.l = v1.l + 1
+    test(def_s2 < v1 and v1 > def_s2)
+
+    test(hash(Test.S1("name")) == hash(Test.S1("name")))
+    test(hash(copy.copy(def_s2)) == hash(def_s2))
+    d = {def_s2: 1, Test.S2(): 2}
+    test(d[copy.copy(def_s2)] == 1 and d[Test.S2()] == 2)
+
+    if sys.version_info[0] >= 3:
+        try:
+            hash(def_s3)
+            test(False)
+        except TypeError:
+            pass
+
+    #
+    # The hash is computed as with the __hash__ method generated by previous releases.
+    #
+    def oldHash(*values):
+        h = 0
+        for v in values:
+            h = 5 * h + hash(v)
+        return h % 0x7fffffff
+
+    test(hash(Test.S1("name")) == oldHash("name"))
+    v1 = Test.S2(False, -1, -2, -3, -(2 ** 40), "string", (4, -5, 6), Test.S1("name"))
+    test(hash(v1) == oldHash(False, -1, -2, -3, -(2 ** 40), "string", 4, -5, 6, hash(Test.S1("name"))))
+    test(hash(def_s2) == oldHash(True, 98, 99, 100, 101, "string", 1, 2, 3, hash(Test.S1("name"))))
+
+    #
+    # Structures that aren't legal dictionary keys compare their members with `!='.
+    #
+    nan = float("nan")
+    v1 = Test.S4(nan, "a")
+    test(v1 != v1 and not v1 == v1)
+    test(Test.S4(1.5, "a") == Test.S4(1.5, "a") and Test.S4(1.5, "a") != Test.S4(1.5, "b"))
+
+    try:
+        IcePy.hashStruct(def_s2, Test.S2)
+        test(False)
+    except TypeError:
+        pass
+
+    try:
+        IcePy.compareStruct(def_s2, def_s2, IcePy._t_string, 2)
+        test(False)
+    except TypeError:
+        pass
+
+    print("ok")
+
 
 class Client(TestHelper):
 